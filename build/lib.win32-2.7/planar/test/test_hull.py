@@ -0,0 +1,223 @@
+"""Convex hull builder and parallel convex hull unit tests"""
+
+from __future__ import division
+import sys
+import math
+import random
+import unittest
+from nose.tools import assert_equal, assert_almost_equal, raises
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_points(count, seed=0):
+    rand = random.Random(seed)
+    return [(rand.uniform(-10, 10), rand.uniform(-10, 10))
+        for i in range(count)]
+
+
+class ConvexHullBuilderTestCase(unittest.TestCase):
+
+    def test_empty(self):
+        from planar import ConvexHullBuilder
+        builder = ConvexHullBuilder()
+        assert_equal(len(builder), 0)
+
+    def test_add_chunks(self):
+        from planar import ConvexHullBuilder, Polygon
+        builder = ConvexHullBuilder()
+        builder.add([(0, 0), (2, 0), (1, 1)])
+        assert_equal(len(builder), 3)
+        builder.add([(2, 2), (0, 2), (1, 1.5)])
+        assert_equal(len(builder), 4)
+        hull = builder.polygon()
+        assert isinstance(hull, Polygon)
+        assert hull.is_convex_known
+        assert hull.is_convex
+        assert_equal(tuple(hull), ((0, 0), (0, 2), (2, 2), (2, 0)))
+
+    def test_chunks_of_few_points(self):
+        from planar import ConvexHullBuilder
+        builder = ConvexHullBuilder()
+        builder.add([(0, 0)])
+        builder.add([])
+        builder.add([(1, 0), (1, 0)])
+        builder.add([(0, 1)])
+        assert_equal(tuple(builder.polygon()), ((0, 0), (0, 1), (1, 0)))
+
+    def test_init_with_chunks_matches_convex_hull(self):
+        from planar import ConvexHullBuilder, Polygon
+        points = random_points(1000)
+        builder = ConvexHullBuilder(
+            points[i:i + 150] for i in range(0, len(points), 150))
+        assert_equal(set(builder.polygon()),
+            set(Polygon.convex_hull(points)))
+
+    def test_extend(self):
+        from planar import ConvexHullBuilder
+        builder = ConvexHullBuilder([[(0, 0), (4, 0)]])
+        builder.extend([[(4, 4)], [(0, 4), (1, 1)]])
+        assert_equal(tuple(builder.polygon()),
+            ((0, 0), (0, 4), (4, 4), (4, 0)))
+
+    def test_chunk_types(self):
+        from planar import ConvexHullBuilder, Vec2Array
+        from array import array
+        builder = ConvexHullBuilder()
+        builder.add(Vec2Array([(0, 0), (3, 0)]))
+        builder.add(iter([(3, 3), (1, 1)]))
+        builder.add(array('d', [0, 3, 2, 2]))
+        assert_equal(tuple(builder.polygon()),
+            ((0, 0), (0, 3), (3, 3), (3, 0)))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_chunks(self):
+        from planar import ConvexHullBuilder, Polygon
+        points = numpy.array(random_points(500))
+        builder = ConvexHullBuilder()
+        builder.add(points[:200])
+        builder.add(numpy.asfortranarray(points[200:300]))
+        builder.add(points[300:400:2])
+        builder.add(points[301:400:2])
+        builder.add(points[400:][::-1])
+        assert_equal(set(builder.polygon()),
+            set(Polygon.convex_hull(points.tolist())))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_chunks_of_other_types(self):
+        from planar import ConvexHullBuilder, Polygon
+        points = (numpy.array(random_points(500)) * 1000).round()
+        builder = ConvexHullBuilder()
+        builder.add(points[:200].astype(numpy.int64))
+        builder.add(points[200:400].astype(numpy.float32))
+        builder.add(numpy.asfortranarray(points[400:].astype(numpy.int32)))
+        assert_equal(set(builder.polygon()),
+            set(Polygon.convex_hull(points.tolist())))
+
+    def test_collinear_points_dropped(self):
+        from planar import ConvexHullBuilder
+        builder = ConvexHullBuilder([[(0, 0), (1, 0), (2, 0), (2, 2), (0, 2)]])
+        assert_equal(tuple(builder.polygon()),
+            ((0, 0), (0, 2), (2, 2), (2, 0)))
+
+    @raises(ValueError)
+    def test_polygon_too_few_points(self):
+        from planar import ConvexHullBuilder
+        ConvexHullBuilder([[(0, 0), (1, 1)]]).polygon()
+
+    @raises(ValueError)
+    def test_polygon_collinear_points(self):
+        from planar import ConvexHullBuilder
+        ConvexHullBuilder([[(0, 0), (1, 1)], [(2, 2), (3, 3)]]).polygon()
+
+
+class ParallelConvexHullBaseTestCase(object):
+
+    def setUp(self):
+        import planar.hull
+        self.min_points = planar.hull._parallel_min_points
+        # Split even small inputs between the workers
+        planar.hull._parallel_min_points = 10
+
+    def tearDown(self):
+        import planar.hull
+        planar.hull._parallel_min_points = self.min_points
+
+    def test_matches_serial(self):
+        points = random_points(2000)
+        hull = self.Polygon.convex_hull(points, workers=3)
+        assert isinstance(hull, self.Polygon)
+        assert hull.is_convex_known
+        assert hull.is_convex
+        assert_equal(set(hull), set(self.Polygon.convex_hull(points)))
+
+    def test_one_worker_is_serial(self):
+        points = random_points(100)
+        assert_equal(tuple(self.Polygon.convex_hull(points, workers=1)),
+            tuple(self.Polygon.convex_hull(points)))
+
+    def test_small_input_is_serial(self):
+        import planar.hull
+        planar.hull._parallel_min_points = 100000
+        points = random_points(100)
+        assert_equal(tuple(self.Polygon.convex_hull(points, workers=4)),
+            tuple(self.Polygon.convex_hull(points)))
+
+    def test_iterator(self):
+        points = random_points(500)
+        for workers in (1, 2):
+            hull = self.Polygon.convex_hull(iter(points), workers=workers)
+            assert_equal(set(hull), set(self.Polygon.convex_hull(points)))
+
+    def test_vec2_array(self):
+        from planar import Vec2Array
+        points = random_points(500)
+        hull = self.Polygon.convex_hull(Vec2Array(points), workers=2)
+        assert_equal(set(hull), set(self.Polygon.convex_hull(points)))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_arrays_copied(self):
+        points = (numpy.array(random_points(500)) * 1000).round()
+        for array in (points.astype(numpy.int64),
+            points.astype(numpy.float32), numpy.asfortranarray(points),
+            numpy.repeat(points, 2, axis=0)[::2]):
+            expected = set(self.Polygon.convex_hull(
+                array.astype(float).tolist()))
+            for workers in (1, 2):
+                hull = self.Polygon.convex_hull(array, workers=workers)
+                assert_equal(set(hull), expected)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_read_only(self):
+        import planar.hull
+        points = numpy.array(random_points(500))
+        points.flags.writeable = False
+        expected = set(self.Polygon.convex_hull(points.tolist()))
+        for min_points in (10, 100000):
+            # Split between the workers, and too small to split
+            planar.hull._parallel_min_points = min_points
+            for workers in (1, 2):
+                hull = self.Polygon.convex_hull(points, workers=workers)
+                assert_equal(set(hull), expected)
+
+    def test_all_collinear_points(self):
+        import planar.hull
+        planar.hull._parallel_min_points = 2
+        points = [(0,1), (2,1), (5,1), (7,1), (12,1)]
+        expected = self.Polygon.convex_hull(points)
+        assert_equal(len(expected), 3)
+        for workers in (1, 2):
+            hull = self.Polygon.convex_hull(points, workers=workers)
+            assert isinstance(hull, self.Polygon)
+            assert_equal(hull, expected)
+
+    def test_collinear_points_dropped(self):
+        import planar.hull
+        planar.hull._parallel_min_points = 2
+        points = [(0, 0), (1, 0), (2, 0), (2, 2), (0, 2)]
+        assert_equal(tuple(self.Polygon.convex_hull(points, workers=2)),
+            ((0, 0), (0, 2), (2, 2), (2, 0)))
+
+    @raises(ValueError)
+    def test_no_workers(self):
+        self.Polygon.convex_hull(random_points(10), workers=0)
+
+
+class PyParallelConvexHullTestCase(
+    ParallelConvexHullBaseTestCase, unittest.TestCase):
+    from planar.polygon import Polygon
+
+
+class CParallelConvexHullTestCase(
+    ParallelConvexHullBaseTestCase, unittest.TestCase):
+    from planar.c import Polygon
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
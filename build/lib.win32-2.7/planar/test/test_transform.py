@@ -6,6 +6,11 @@ import math
 import unittest
 from nose.tools import assert_equal, assert_almost_equal, raises
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 def seq_almost_equal(t1, t2, error=0.00001):
     assert len(t1) == len(t2), "%r != %r" % (t1, t2)
@@ -283,6 +288,107 @@ class AffineBaseTestCase(object):
         assert r is None, r
         assert_equal(pts, [V(-8, -2), V(2,0), V(-6,-4)])
 
+    def assert_transformed(self, result, t, points):
+        assert_equal(len(result), len(points))
+        for r, p in zip(result, points):
+            seq_almost_equal(tuple(r), tuple(t * self.Vec2(*p)))
+
+    def test_transform_vec2_array(self):
+        t = self.Affine.translation((1, -2)) * self.Affine.rotation(30)
+        points = [(4,1), (-1,0), (3,2), (0.5,-7)]
+        pts = self.Vec2Array(points)
+        tpts = t.transform(pts)
+        assert isinstance(tpts, self.Vec2Array)
+        assert tpts is not pts
+        self.assert_transformed(tpts, t, points)
+        assert_equal(tuple(pts), tuple(self.Vec2(*p) for p in points))
+        assert_equal(len(t.transform(self.Vec2Array())), 0)
+
+    def test_transform_large_array(self):
+        t = self.Affine.scale((2, -3)) * self.Affine.shear(10, 5)
+        points = [(i * 0.5, 7 - i) for i in range(100)]
+        self.assert_transformed(
+            t.transform(self.Vec2Array(points)), t, points)
+
+    def test_transform_seq2_and_buffer(self):
+        from array import array
+        import planar
+        t = self.Affine.rotation(-45) * self.Affine.scale(1.5)
+        points = [(0,0), (2,0), (1,3)]
+        self.assert_transformed(t.transform(planar.Seq2(points)), t, points)
+        self.assert_transformed(
+            t.transform(planar.Polygon(points)), t, points)
+        self.assert_transformed(
+            t.transform(array('d', [0,0, 2,0, 1,3])), t, points)
+
+    def test_transform_out(self):
+        t = self.Affine.translation((5, 5)) * self.Affine.scale(2)
+        points = [(4,1), (-1,0), (3,2)]
+        pts = self.Vec2Array(points)
+        out = self.Vec2Array([(0,0)] * 3)
+        assert t.transform(pts, out=out) is out
+        self.assert_transformed(out, t, points)
+        assert t.transform(pts, out=pts) is pts
+        self.assert_transformed(pts, t, points)
+
+    @raises(ValueError)
+    def test_transform_out_wrong_length(self):
+        pts = self.Vec2Array([(4,1), (-1,0), (3,2)])
+        self.Affine.scale(2).transform(pts, out=self.Vec2Array([(0,0)] * 2))
+
+    @raises(BufferError)
+    def test_transform_out_read_only(self):
+        pts = self.Vec2Array([(0,0), (1,0)])
+        self.Affine.scale(2).transform(pts, out=bytes(32))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    @raises(BufferError)
+    def test_transform_out_read_only_numpy(self):
+        pts = self.Vec2Array([(0,0), (1,0)])
+        out = numpy.zeros((2, 2))
+        out.flags.writeable = False
+        self.Affine.scale(2).transform(pts, out=out)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    @raises(BufferError)
+    def test_transform_in_place_read_only_numpy(self):
+        points = numpy.zeros((2, 2))
+        points.flags.writeable = False
+        self.Affine.scale(2).itransform(points)
+
+    @raises(TypeError)
+    def test_transform_not_buffer(self):
+        self.Affine.scale(2).transform([(4,1), (-1,0)])
+
+    @raises(ValueError)
+    def test_transform_wrong_buffer_type(self):
+        from array import array
+        self.Affine.scale(2).transform(array('i', [4,1, -1,0]))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_transform_numpy(self):
+        t = self.Affine.translation((1, -2)) * self.Affine.rotation(30)
+        for count in (3, 100):
+            points = numpy.arange(count * 2, dtype=numpy.float64).reshape(-1, 2)
+            out = numpy.zeros_like(points)
+            assert t.transform(points, out=out) is out
+            self.assert_transformed(out, t, points.tolist())
+            self.assert_transformed(t.transform(points), t, points.tolist())
+            t.itransform(points)
+            assert_equal(points.tolist(), out.tolist())
+
+    def test_itransform_array(self):
+        from array import array
+        t = self.Affine.scale(-2) * self.Affine.translation((1, 1))
+        points = [(4,1), (-1,0), (3,2)]
+        pts = self.Vec2Array(points)
+        assert t.itransform(pts) is None
+        self.assert_transformed(pts, t, points)
+        coords = array('d', [4,1, -1,0, 3,2])
+        t.itransform(coords)
+        self.assert_transformed(
+            list(zip(coords[0::2], coords[1::2])), t, points)
+
     @raises(TypeError)
     def test_mul_wrong_type(self):
         self.Affine(1,2,3,4,5,6) * None
@@ -336,7 +442,7 @@ class AffineBaseTestCase(object):
 
 class PyAffineTestCase(AffineBaseTestCase, unittest.TestCase):
     from planar.transform import Affine
-    from planar.vector import Vec2
+    from planar.vector import Vec2, Vec2Array
     
     def test_mul_vector_seq(self):
         class SomePoints(tuple):
@@ -356,7 +462,7 @@ class PyAffineTestCase(AffineBaseTestCase, unittest.TestCase):
 
 
 class CAffineTestCase(AffineBaseTestCase, unittest.TestCase):
-    from planar.c import Affine, Vec2
+    from planar.c import Affine, Vec2, Vec2Array
 
 
 if __name__ == '__main__':
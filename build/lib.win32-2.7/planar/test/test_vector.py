@@ -6,6 +6,30 @@ import math
 import unittest
 from nose.tools import assert_equal, assert_almost_equal, raises
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def noisy_spiral(count, seed=0):
+    import random
+    rand = random.Random(seed)
+    return [(math.cos(a) * a / 4 + rand.uniform(-0.1, 0.1), 
+        math.sin(a) * a / 4 + rand.uniform(-0.1, 0.1)) 
+        for a in (i * 0.3 for i in range(count))]
+
+
+def polyline_is_simple(points):
+    from planar.intersect import _segments_intersect
+    for i in range(len(points) - 1):
+        (ax, ay), (bx, by) = points[i], points[i + 1]
+        for j in range(i + 2, len(points) - 1):
+            (cx, cy), (dx, dy) = points[j], points[j + 1]
+            if _segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+                return False
+    return True
+
 
 class Vec2BaseTestCase(object):
 
@@ -118,6 +142,26 @@ class Vec2BaseTestCase(object):
         assert not self.Vec2(0, -0.1).is_null
         assert not self.Vec2(float('nan'), 0).is_null
 
+    def test_is_null_follows_epsilon(self):
+        import planar
+        v = self.Vec2(0.01, 0)
+        assert not v.is_null
+        old_epsilon = planar.EPSILON
+        try:
+            planar.set_epsilon(0.1)
+            assert v.is_null
+        finally:
+            planar.set_epsilon(old_epsilon)
+        assert not v.is_null
+
+    @raises(AttributeError)
+    def test_x_read_only(self):
+        self.Vec2(1, 2).x = 3
+
+    @raises(AttributeError)
+    def test_y_read_only(self):
+        self.Vec2(1, 2).y = 3
+
     def test_almost_equals(self):
         from planar import EPSILON
         v = self.Vec2(-1, 56)
@@ -1450,6 +1494,296 @@ class Vec2ArrayBaseTestCase(object):
         assert_equal(repr(va), 'Vec2Array([(0.0, 1.5), (2.0, 3.0)])')
         assert_equal(repr(va), str(va))
 
+    def large_arrays(self):
+        # Large enough for the Python implementation to use NumPy
+        a = self.Vec2Array([(i % 7 - 3, (i * 5) % 11 - 5) for i in range(40)])
+        a[10] = (0, 0)
+        a[20] = (1e-9, 0)
+        b = self.Vec2Array([(1 + i % 3, (i * 3) % 5 - 2.5) for i in range(40)])
+        return a, b
+
+    def assert_vectors_almost_equal(self, actual, expected):
+        actual = list(actual)
+        expected = list(expected)
+        assert_equal(len(actual), len(expected))
+        for a, e in zip(actual, expected):
+            assert a.almost_equals(e), (a, e)
+
+    def test_large_arithmetic(self):
+        a, b = self.large_arrays()
+        v = self.Vec2(2.5, -1)
+        for result, expected in (
+            (a + b, [i + j for i, j in zip(a, b)]),
+            (a + v, [i + v for i in a]),
+            (v + a, [i + v for i in a]),
+            (a - b, [i - j for i, j in zip(a, b)]),
+            (a - v, [i - v for i in a]),
+            (a * b, [i * j for i, j in zip(a, b)]),
+            (a * v, [i * v for i in a]),
+            (a * 3, [i * 3 for i in a]),
+            (3 * a, [i * 3 for i in a]),
+            (a / b, [i / j for i, j in zip(a, b)]),
+            (a / v, [i / v for i in a]),
+            (a / 4, [i / 4 for i in a])):
+            assert isinstance(result, self.Vec2Array)
+            self.assert_vectors_almost_equal(result, expected)
+
+    def test_large_inplace_arithmetic(self):
+        a, b = self.large_arrays()
+        v = self.Vec2(2.5, -1)
+        for op, other, expected in (
+            ('__iadd__', b, [i + j for i, j in zip(a, b)]),
+            ('__iadd__', v, [i + v for i in a]),
+            ('__isub__', b, [i - j for i, j in zip(a, b)]),
+            ('__imul__', b, [i * j for i, j in zip(a, b)]),
+            ('__imul__', v, [i * v for i in a]),
+            ('__imul__', 3, [i * 3 for i in a]),
+            ('__itruediv__', b, [i / j for i, j in zip(a, b)]),
+            ('__itruediv__', 4, [i / 4 for i in a])):
+            c = self.Vec2Array(a)
+            assert getattr(c, op)(other) is c
+            self.assert_vectors_almost_equal(c, expected)
+
+    def test_large_normalized(self):
+        a, b = self.large_arrays()
+        expected = [i.normalized() for i in a]
+        self.assert_vectors_almost_equal(a.normalized(), expected)
+        a.normalize()
+        self.assert_vectors_almost_equal(a, expected)
+
+    def test_large_clamped(self):
+        a, b = self.large_arrays()
+        for lengths in (dict(max_length=3), dict(min_length=2), 
+            dict(min_length=1.5, max_length=4)):
+            expected = [i.clamped(**lengths) for i in a]
+            self.assert_vectors_almost_equal(a.clamped(**lengths), expected)
+            c = self.Vec2Array(a)
+            c.clamp(**lengths)
+            self.assert_vectors_almost_equal(c, expected)
+
+    @raises(ValueError)
+    def test_large_clamped_bad_args(self):
+        a, b = self.large_arrays()
+        a.clamped(3, 2)
+
+    def test_large_longest_and_shortest(self):
+        a, b = self.large_arrays()
+        assert_equal(a.longest(), max(a, key=lambda i: i.length2))
+        assert_equal(a.shortest(), self.Vec2(0, 0))
+        assert_equal(b.longest(), max(b, key=lambda i: i.length2))
+        assert_equal(b.shortest(), min(b, key=lambda i: i.length2))
+
+    def test_simplify_mask_collinear(self):
+        va = self.Vec2Array([(0,0), (1,0), (2,0), (3,1), (4,2), (5,2)])
+        for method in ('douglas-peucker', 'visvalingam'):
+            mask = va.simplify_mask(method=method)
+            assert isinstance(mask, bytearray)
+            assert_equal(list(mask), [1, 0, 1, 0, 1, 1])
+
+    def test_simplify_mask_short(self):
+        for points in ([], [(1,1)], [(1,1), (1,1)]):
+            assert_equal(self.Vec2Array(points).simplify_mask(10), 
+                bytearray(b'\x01') * len(points))
+
+    def test_simplify_mask_douglas_peucker(self):
+        from planar import LineSegment
+        points = noisy_spiral(100)
+        va = self.Vec2Array(points)
+        last = None
+        for tolerance in (0, 0.2, 1, 3, 100):
+            mask = va.simplify_mask(tolerance)
+            assert_equal(len(mask), len(points))
+            assert mask[0] and mask[-1]
+            if last is not None:
+                # Larger tolerances keep a subset of the vertices
+                assert all(more or not kept 
+                    for kept, more in zip(mask, last))
+            last = mask
+            kept = [i for i, k in enumerate(mask) if k]
+            for first, end in zip(kept, kept[1:]):
+                span = LineSegment.from_points([points[first], points[end]])
+                for i in range(first + 1, end):
+                    assert span.distance_to(points[i]) <= tolerance
+        assert_equal(sum(va.simplify_mask(0)), len(points))
+        assert_equal(sum(last), 2)
+
+    def test_simplify_mask_visvalingam(self):
+        points = noisy_spiral(100)
+        va = self.Vec2Array(points)
+        last = None
+        for tolerance in (0, 0.2, 1, 3, 100):
+            mask = va.simplify_mask(tolerance, 'visvalingam')
+            assert_equal(len(mask), len(points))
+            assert mask[0] and mask[-1]
+            if last is not None:
+                assert all(more or not kept 
+                    for kept, more in zip(mask, last))
+            last = mask
+        assert_equal(sum(va.simplify_mask(0, 'visvalingam')), len(points))
+        assert_equal(sum(last), 2)
+
+    def test_simplify_mask_preserve_simple(self):
+        va = self.Vec2Array(
+            [(0,0), (5,1), (10,0), (10,-2), (5,0.5), (5,-3)])
+        assert_equal(list(va.simplify_mask(1.5)), [1, 0, 1, 1, 1, 1])
+        assert_equal(list(va.simplify_mask(1.5, preserve_simple=True)), 
+            [1, 1, 1, 1, 1, 1])
+        points = noisy_spiral(150, seed=1)
+        assert polyline_is_simple(points)
+        va = self.Vec2Array(points)
+        for method in ('douglas-peucker', 'visvalingam'):
+            for tolerance in (0.5, 2, 5):
+                mask = va.simplify_mask(tolerance, method)
+                simple_mask = va.simplify_mask(
+                    tolerance, method, preserve_simple=True)
+                assert all(simple or not plain 
+                    for simple, plain in zip(simple_mask, mask))
+                assert polyline_is_simple(
+                    [p for p, k in zip(points, simple_mask) if k])
+            # The spiral's turns are closer together than this
+            assert not polyline_is_simple(
+                [p for p, k in zip(points, mask) if k])
+
+    def test_simplify_mask_bad_args(self):
+        va = self.Vec2Array([(0,0), (1,1), (2,0)])
+        self.assertRaises(ValueError, va.simplify_mask, -1)
+        self.assertRaises(ValueError, va.simplify_mask, 1, 'nearest')
+
+    def assert_not_resizable(self, va):
+        size = len(va)
+        for resize, args in ((va.append, ((1,1),)), (va.extend, ([(1,1)],)),
+            (va.__delitem__, (0,)), (va.__setitem__, (slice(0, 1), []))):
+            try:
+                resize(*args)
+            except BufferError:
+                pass
+            else:
+                assert False, "%s did not raise BufferError" % resize
+        assert_equal(len(va), size)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_shares_memory(self):
+        va = self.Vec2Array([(0,1), (2,3), (4,5)])
+        a = numpy.asarray(va)
+        assert_equal(a.shape, (3, 2))
+        assert_equal(a.dtype, numpy.float64)
+        assert_equal(a.tolist(), [[0,1], [2,3], [4,5]])
+        a[1] = (-2, -3)
+        assert_equal(va[1], self.Vec2(-2, -3))
+        va[2] = (6, 7)
+        assert_equal(a[2].tolist(), [6, 7])
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_not_resizable_while_exported(self):
+        va = self.Vec2Array([(0,1), (2,3)])
+        a = numpy.asarray(va)
+        self.assert_not_resizable(va)
+        del a
+        va.append((4,5))
+        del va[0]
+        assert_equal(tuple(va), (self.Vec2(2,3), self.Vec2(4,5)))
+
+    def test_from_buffer_shares_memory(self):
+        from array import array
+        coords = array('d', [0,1, 2,3])
+        va = self.Vec2Array.from_buffer(coords)
+        assert isinstance(va, self.Vec2Array)
+        assert_equal(tuple(va), (self.Vec2(0,1), self.Vec2(2,3)))
+        coords[0] = 5
+        assert_equal(va[0], self.Vec2(5,1))
+        va[1] = (-2,-3)
+        assert_equal(list(coords), [5,1, -2,-3])
+        self.assert_not_resizable(va)
+
+    def test_from_buffer_copy(self):
+        from array import array
+        coords = array('d', [0,1, 2,3])
+        va = self.Vec2Array.from_buffer(coords, copy=True)
+        coords[0] = 5
+        assert_equal(tuple(va), (self.Vec2(0,1), self.Vec2(2,3)))
+        va.append((4,5))
+        assert_equal(len(va), 3)
+
+    def test_from_buffer_bytes(self):
+        from array import array
+        data = array('d', [0,1, 2,3]).tobytes()
+        assert_equal(tuple(self.Vec2Array.from_buffer(bytearray(data))),
+            (self.Vec2(0,1), self.Vec2(2,3)))
+        assert_equal(tuple(self.Vec2Array.from_buffer(data, copy=True)),
+            (self.Vec2(0,1), self.Vec2(2,3)))
+        assert_equal(len(self.Vec2Array.from_buffer(bytearray())), 0)
+
+    @raises(ValueError)
+    def test_from_buffer_read_only(self):
+        from array import array
+        self.Vec2Array.from_buffer(array('d', [0,1, 2,3]).tobytes())
+
+    @raises(ValueError)
+    def test_from_buffer_odd_size(self):
+        from array import array
+        self.Vec2Array.from_buffer(array('d', [0,1, 2]))
+
+    @raises(ValueError)
+    def test_from_buffer_wrong_type(self):
+        from array import array
+        self.Vec2Array.from_buffer(array('i', [0,1, 2,3]), copy=True)
+
+    @raises(TypeError)
+    def test_from_buffer_not_buffer(self):
+        self.Vec2Array.from_buffer([(0,1), (2,3)])
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_from_numpy_shares_memory(self):
+        a = numpy.array([(0,1), (2,3)], dtype=numpy.float64)
+        va = self.Vec2Array.from_numpy(a)
+        assert isinstance(va, self.Vec2Array)
+        assert_equal(tuple(va), (self.Vec2(0,1), self.Vec2(2,3)))
+        a[0] = (5,6)
+        assert_equal(va[0], self.Vec2(5,6))
+        va[1] = (-2,-3)
+        assert_equal(a.tolist(), [[5,6], [-2,-3]])
+        self.assert_not_resizable(va)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_from_numpy_copy(self):
+        a = numpy.arange(8, dtype=numpy.float64).reshape(4, 2)
+        read_only = a.copy()
+        read_only.flags.writeable = False
+        for array in (a, numpy.asfortranarray(a), a[::2], read_only):
+            va = self.Vec2Array.from_numpy(array, copy=True)
+            expected = [tuple(v) for v in array.tolist()]
+            assert_equal([tuple(v) for v in va], expected)
+            a[0] = (9, 9)
+            assert_equal([tuple(v) for v in va], expected)
+            a[0] = (0, 1)
+            va.append((1, 1))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_from_numpy_not_shareable(self):
+        a = numpy.arange(8, dtype=numpy.float64).reshape(4, 2)
+        read_only = a.copy()
+        read_only.flags.writeable = False
+        for array in (numpy.asfortranarray(a), a[::2], read_only):
+            try:
+                self.Vec2Array.from_numpy(array)
+            except ValueError:
+                pass
+            else:
+                assert False, "shared %r" % array
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_from_numpy_wrong_shape_or_type(self):
+        for array in (numpy.zeros(4), numpy.zeros((2, 3)), 
+            numpy.zeros((2, 2), dtype=numpy.int64), 
+            numpy.zeros((2, 2), dtype=numpy.float32)):
+            for copy in (False, True):
+                try:
+                    self.Vec2Array.from_numpy(array, copy=copy)
+                except ValueError:
+                    pass
+                else:
+                    assert False, "accepted %r" % array
+
 
 class PyVec2ArrayTestCase(
     Vec2ArrayBaseTestCase, VectorSeqBaseTestCase, unittest.TestCase):
@@ -1470,6 +1804,28 @@ class CVec2ArrayTestCase(
         assert_equal(repr(va), 'Vec2Array([(0, 1.5), (2, 3)])')
         assert_equal(repr(va), str(va))
 
+    def test_memoryview(self):
+        va = self.Vec2Array([(0,1), (2,3)])
+        view = memoryview(va)
+        assert_equal(view.format, 'd')
+        assert_equal(view.shape, (2, 2))
+        assert not view.readonly
+        view[1, 0] = 5
+        assert_equal(va[1], self.Vec2(5, 3))
+        self.assert_not_resizable(va)
+        view.release()
+        va.append((1,1))
+        assert_equal(len(va), 3)
+
+    def test_seq2_memoryview(self):
+        from planar.c import Polygon
+        view = memoryview(self.Seq2([(0,1), (2,3)]))
+        assert_equal(view.shape, (2, 2))
+        assert not view.readonly
+        view = memoryview(Polygon([(0,0), (0,1), (1,1)]))
+        assert_equal(view.tolist(), [[0,0], [0,1], [1,1]])
+        assert view.readonly
+
 
 if __name__ == '__main__':
     unittest.main()
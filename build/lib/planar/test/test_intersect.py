@@ -0,0 +1,182 @@
+"""Segment intersection unit tests"""
+
+from __future__ import division
+import sys
+import math
+import random
+import unittest
+from nose.tools import assert_equal, assert_almost_equal, raises
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_endpoints(count, length, seed=0):
+    rand = random.Random(seed)
+    endpoints = []
+    for i in range(count):
+        x = rand.uniform(0, 100)
+        y = rand.uniform(0, 100)
+        angle = rand.uniform(0, 2 * math.pi)
+        endpoints.append((x, y))
+        endpoints.append((x + math.cos(angle) * length,
+            y + math.sin(angle) * length))
+    return endpoints
+
+
+def brute_force_pairs(endpoints):
+    from planar.intersect import _segments_intersect
+    pairs = []
+    for i in range(0, len(endpoints), 2):
+        (ax, ay), (bx, by) = endpoints[i:i + 2]
+        for j in range(i + 2, len(endpoints), 2):
+            (cx, cy), (dx, dy) = endpoints[j:j + 2]
+            if _segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+                pairs.append((i // 2, j // 2))
+    return pairs
+
+
+def distance_to_segment(point, a, b):
+    from planar import LineSegment
+    return LineSegment.from_points([a, b]).distance_to(point)
+
+
+class SegmentIntersectionsTestCase(unittest.TestCase):
+
+    def assert_intersections(self, found, endpoints):
+        assert_equal(sorted((i, j) for p, i, j in found),
+            brute_force_pairs(endpoints))
+        for point, i, j in found:
+            assert i < j
+            assert_almost_equal(distance_to_segment(
+                point, *endpoints[2*i:2*i + 2]), 0)
+            assert_almost_equal(distance_to_segment(
+                point, *endpoints[2*j:2*j + 2]), 0)
+
+    def test_cross(self):
+        from planar import segment_intersections, Vec2
+        found = list(segment_intersections([(0,0), (2,2), (0,2), (2,0)]))
+        assert_equal(found, [(Vec2(1, 1), 0, 1)])
+        assert isinstance(found[0][0], Vec2)
+
+    def test_no_segments(self):
+        from planar import segment_intersections
+        assert_equal(list(segment_intersections([])), [])
+        assert_equal(list(segment_intersections([(0,0), (1,1)])), [])
+
+    def test_touching_and_collinear(self):
+        from planar import segment_intersections, Vec2
+        found = list(segment_intersections(
+            [(0,0), (2,0), (1,0), (3,0), (2,0), (2,2), (3,3), (2,1)]))
+        assert_equal(sorted(found), [
+            (Vec2(2, 0), 0, 2), (Vec2(2, 0), 1, 2), (Vec2(2, 1), 2, 3)])
+
+    def test_shared_point(self):
+        from planar import segment_intersections, Vec2
+        found = list(segment_intersections(
+            [(0,0), (2,2), (0,2), (2,0), (1,0), (1,2)]))
+        assert_equal(sorted(found), [
+            (Vec2(1, 1), 0, 1), (Vec2(1, 1), 0, 2), (Vec2(1, 1), 1, 2)])
+
+    def test_random(self):
+        from planar import segment_intersections
+        for length in (5, 40):
+            endpoints = random_endpoints(150, length)
+            for cell_size in (None, 3, 10, 1000):
+                self.assert_intersections(list(
+                    segment_intersections(endpoints, cell_size)), endpoints)
+
+    def test_random_grid(self):
+        # End points on a small grid, so many segments touch or are
+        # vertical
+        from planar import segment_intersections
+        rand = random.Random(1)
+        endpoints = [(rand.randint(0, 8), rand.randint(0, 8))
+            for i in range(160)]
+        for cell_size in (None, 1, 2.5):
+            self.assert_intersections(list(
+                segment_intersections(endpoints, cell_size)), endpoints)
+
+    def test_long_diagonals_small_cells(self):
+        # The segments cross many more cells than this as bounding boxes
+        from planar import segment_intersections
+        endpoints = [(0,0), (100,100), (0,100), (100,0), (0,50), (100,60), 
+            (10,0), (90,100)]
+        expected = sorted(segment_intersections(endpoints))
+        assert_equal(len(expected), 6)
+        for cell_size in (5, 1, 0.25, 0.01):
+            found = sorted(segment_intersections(endpoints, cell_size))
+            assert_equal([(i, j) for p, i, j in found], 
+                [(i, j) for p, i, j in expected])
+            for (p, i, j), (q, k, l) in zip(found, expected):
+                assert_almost_equal(p.x, q.x)
+                assert_almost_equal(p.y, q.y)
+
+    def test_segment_cells(self):
+        from planar.intersect import _segment_cells
+        cells = list(_segment_cells((0, 0, 100, 100), 1))
+        assert_equal(len(set(cells)), len(cells))
+        assert len(cells) <= 3 * 100 + 4
+        for i in range(100):
+            assert (i, i) in cells
+        assert_equal(sorted(_segment_cells((0.5, 0.5, 2.5, 0.5), 1)), 
+            [(0, 0), (1, 0), (2, 0)])
+        assert_equal(sorted(_segment_cells((0.5, 2.5, 0.5, 0.5), 1)), 
+            [(0, 0), (0, 1), (0, 2)])
+        # Cells only touched at a corner are included
+        assert (0, 1) in list(_segment_cells((0.5, 0.5, 1.5, 1.5), 1))
+
+    def test_intersections_on_cell_boundaries(self):
+        from planar import segment_intersections
+        import random
+        rand = random.Random(2)
+        endpoints = [(rand.randint(0, 20) / 4.0, rand.randint(0, 20) / 4.0) 
+            for i in range(200)]
+        for cell_size in (0.25, 0.5, 0.3):
+            self.assert_intersections(list(
+                segment_intersections(endpoints, cell_size)), endpoints)
+
+    def test_iterator(self):
+        from planar import segment_intersections
+        found = segment_intersections(random_endpoints(50, 30))
+        assert_equal(iter(found), found)
+        assert next(found)
+
+    def test_point_types(self):
+        from array import array
+        import planar
+        endpoints = random_endpoints(50, 30)
+        expected = sorted(planar.segment_intersections(endpoints))
+        assert expected
+        for points in (planar.Vec2Array(endpoints), iter(endpoints),
+            array('d', [c for p in endpoints for c in p])):
+            assert_equal(sorted(planar.segment_intersections(points)),
+                expected)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_points(self):
+        from planar import segment_intersections
+        points = numpy.array(random_endpoints(50, 30)).round()
+        for array in (points, points.astype(numpy.int64),
+            numpy.asfortranarray(points)):
+            self.assert_intersections(
+                list(segment_intersections(array)), points.tolist())
+
+    @raises(ValueError)
+    def test_end_points_not_in_pairs(self):
+        from planar import segment_intersections
+        segment_intersections([(0,0), (2,2), (0,2)])
+
+    @raises(ValueError)
+    def test_bad_cell_size(self):
+        from planar import segment_intersections
+        segment_intersections([(0,0), (2,2), (0,2), (2,0)], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
@@ -6,6 +6,11 @@ import math
 import unittest
 from nose.tools import assert_equal, assert_almost_equal, raises
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 def assert_contains_point(polys, i, p):
     containing = [j for j, t in enumerate(polys) 
@@ -16,6 +21,52 @@ def assert_contains_point(polys, i, p):
         assert_equal([], containing)
 
 
+def brute_force_intersecting_edges(verts):
+    from planar.intersect import _segments_intersect
+    n = len(verts)
+    pairs = []
+    for i in range(n):
+        for j in range(i + 2, n - (i == 0)):
+            (ax, ay), (bx, by) = verts[i], verts[(i + 1) % n]
+            (cx, cy), (dx, dy) = verts[j], verts[(j + 1) % n]
+            if _segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+                pairs.append((i, j))
+    return pairs
+
+
+def signed_area(points):
+    area = 0.0
+    for i in range(len(points)):
+        (x0, y0), (x1, y1) = points[i - 1], points[i]
+        area += x0 * y1 - x1 * y0
+    return area / 2.0
+
+
+def random_radial_verts(count, seed=0):
+    import random
+    rand = random.Random(seed)
+    angles = sorted(rand.uniform(0, 2 * math.pi) for i in range(count))
+    return [(math.cos(a) * r, math.sin(a) * r) 
+        for a, r in ((a, rand.uniform(1, 10)) for a in angles)]
+
+
+def large_hull_points(count, seed=0):
+    import random
+    rand = random.Random(seed)
+    points = []
+    while len(points) < count:
+        x, y = rand.uniform(-40, 40), rand.uniform(-40, 40)
+        if x * x + y * y < 1600:
+            points.append((x, y))
+    # Surround them with a diamond, repeating its leftmost and rightmost
+    # points, and putting points in the middle of its edges
+    points.extend([(-100, 0), (100, 0)] * 5)
+    points.extend([(-100, 0), (0, 60), (100, 0), (0, -60)])
+    points.extend([(-50, 30), (50, 30), (50, -30), (-50, -30), (25, 45)])
+    rand.shuffle(points)
+    return points
+
+
 class PolygonBaseTestCase(object):
 
     @raises(TypeError)
@@ -136,7 +187,62 @@ class PolygonBaseTestCase(object):
         assert not poly.is_simple
         assert poly.is_simple_known
         assert not poly.is_simple # test cached value
-    
+
+    def test_not_is_simple_doubling_back_vertically(self):
+        # Adjacent edges doubling back along the same vertical line
+        for verts in ([(1,1), (7,9), (3,6), (3,0), (3,10), (0,3)],
+            [(1,0), (1,4), (1,1), (0,4), (3,2)]):
+            poly = self.Polygon(verts)
+            assert not poly.is_convex
+            assert not poly.is_simple
+            assert_equal(poly.intersecting_edges(), [(0, 2), (0, 3), (1, 3)])
+            self.assertRaises(ValueError, poly.prepare)
+            self.assertRaises(ValueError, poly.triangulate)
+
+    def test_intersecting_edges(self):
+        poly = self.Polygon([(0,0), (-1,-1), (-2, 0), (-1, 1)])
+        assert_equal(poly.intersecting_edges(), [])
+        assert poly.is_simple_known
+        assert poly.is_simple
+        # Pentagram
+        pentagon = self.Polygon.regular(5, 2)
+        poly = self.Polygon([pentagon[i] for i in (0, 2, 4, 1, 3)])
+        assert_equal(poly.intersecting_edges(), 
+            [(0, 2), (0, 3), (1, 3), (1, 4), (2, 4)])
+        assert poly.is_simple_known
+        assert not poly.is_simple
+
+    def test_intersecting_edges_touching(self):
+        # A vertex touching a non-adjacent edge
+        poly = self.Polygon([(0,0), (4,0), (4,4), (2,0), (0,4)])
+        assert_equal(poly.intersecting_edges(), [(0, 2), (0, 3)])
+        assert not poly.is_simple
+
+    def test_intersecting_edges_random(self):
+        import random
+        rand = random.Random(0)
+        for count in (4, 8, 30):
+            for i in range(40):
+                verts = [(rand.randint(0, 6), rand.randint(0, 6)) 
+                    for j in range(count)]
+                if len(set(verts)) < count:
+                    continue
+                expected = brute_force_intersecting_edges(verts)
+                poly = self.Polygon(verts)
+                assert_equal(poly.is_simple, not expected)
+                assert_equal(poly.intersecting_edges(), expected)
+
+    def test_not_convex_repeated_first_vert(self):
+        poly = self.Polygon([(0,1), (0,0), (0,2), (2,3), (3,3), (0,1)])
+        assert not poly.is_convex
+        assert not poly.is_simple
+
+    def test_not_convex_repeated_last_vert(self):
+        poly = self.Polygon([(0,1), (3,0), (2,3), (2,1), (2,1)])
+        assert not poly.is_convex
+        assert poly.contains_point((2.2, 1.5))
+        assert not poly.contains_point((1.5, 1.5))
+
     def test_mutation_invalidates_cached_properties(self):
         poly = self.Polygon([(0.5,0.5), (0.5,-0.5), (-0.5,-0.5), (-0.5,0.5)])
         assert poly.is_convex
@@ -144,12 +250,11 @@ class PolygonBaseTestCase(object):
         assert poly.is_convex_known
         assert poly.is_simple_known
         poly[0] = (0, 0.6)
-        assert not poly.is_convex_known
-        assert not poly.is_simple_known
-        assert poly.is_convex
-        assert poly.is_simple
+        # Still convex, so updated in place
         assert poly.is_convex_known
         assert poly.is_simple_known
+        assert poly.is_convex
+        assert poly.is_simple
         poly[-1] = (0, 0)
         assert not poly.is_convex_known
         assert not poly.is_simple_known
@@ -175,6 +280,60 @@ class PolygonBaseTestCase(object):
         assert poly.is_convex_known
         assert poly.is_simple_known
 
+    def test_mutation_updates_cached_properties(self):
+        poly = self.Polygon.regular(12, 2, angle=7)
+        assert poly.is_convex
+        assert poly.bounding_box is not None
+        assert poly.centroid is not None
+        # Grow then shrink the bounding box keeping the polygon convex,
+        # then make it concave, and not simple
+        for i, vert in ((0, (2.2, 0.25)), (0, (1.9, 0.25)), (3, (0.5, 0.5)), 
+            (0, (3, 1)), (-1, (0, 0)), (5, (-4, -4)), (6, (1, -0.5)), 
+            (11, (5, 5)), (2, (0, 2.5))):
+            convex = poly.is_convex
+            poly[i] = vert
+            expected = self.Polygon(poly)
+            assert_equal(poly.is_convex_known, convex and expected.is_convex)
+            assert_equal(poly.is_convex, expected.is_convex)
+            assert_equal(poly.is_simple, expected.is_simple)
+            assert_equal(poly.bounding_box.min_point, 
+                expected.bounding_box.min_point)
+            assert_equal(poly.bounding_box.max_point, 
+                expected.bounding_box.max_point)
+            if expected.centroid is None:
+                assert_equal(poly.centroid, None)
+            else:
+                assert_almost_equal(poly.centroid.x, expected.centroid.x)
+                assert_almost_equal(poly.centroid.y, expected.centroid.y)
+            for x in range(-5, 6):
+                for y in range(-5, 6):
+                    assert_equal(poly.contains_point((x * 0.7, y * 0.7)),
+                        expected.contains_point((x * 0.7, y * 0.7)))
+
+    def test_mutation_keeps_convex_classification(self):
+        poly = self.Polygon([(0, 0), (0, 2), (1, 3), (2, 2), (2, 0)])
+        assert poly.is_convex
+        poly[2] = (1, 4)
+        assert poly.is_convex_known
+        assert poly.is_convex
+        assert poly.contains_point((1, 3.5))
+        poly[-1] = (3, -1)
+        assert poly.is_convex_known
+        assert poly.is_convex
+        assert poly.contains_point((2.5, -0.2))
+        # Collinear with its neighbors
+        poly[1] = (0, -1)
+        assert not poly.is_convex_known
+        # Concave
+        poly[1] = (1, 1)
+        assert not poly.is_convex_known
+        assert not poly.is_convex
+        assert poly.is_simple
+        assert not poly.contains_point((0.5, 1.5))
+        poly[1] = (0, 2)
+        assert not poly.is_convex_known
+        assert poly.is_convex
+
     def test_regular(self):
         import planar
         poly = self.Polygon.regular(5, 1.5)
@@ -665,6 +824,416 @@ class PolygonBaseTestCase(object):
         assert_contains_point(polys, None, (5, 1.5))
         assert_contains_point(polys, None, (5, 1))
 
+    def contains_points_polygons(self):
+        return [self.Polygon([(0,0), (2,0), (1,2)]),
+            self.Polygon([(0,0), (0,2), (2,2), (2,0)]),
+            self.Polygon([(0,0), (0,2), (2,2), (1,1)]),
+            self.Polygon.regular(7, 2, angle=10),
+            self.Polygon.star(5, 1, 2),
+            self.Polygon([(0,0), (2,2), (2,0), (0,2), (1,3)]),
+            self.Polygon([(0,0), (0,2), (1,2), (1,1), (2,1), (2,2), (3,2), 
+                (3,0)])]
+
+    def test_contains_points(self):
+        import planar
+        grid = [(x / 4.0, y / 4.0) for x in range(-10, 14) 
+            for y in range(-10, 14)]
+        for poly in self.contains_points_polygons():
+            for points in (grid[:20], grid, planar.Vec2Array(grid), 
+                iter(grid)):
+                result = poly.contains_points(points)
+                assert isinstance(result, bytearray)
+                assert_equal(list(result), 
+                    [poly.contains_point(p) for p in grid][:len(result)])
+            # Again with the centroid and radii cached
+            poly.centroid
+            assert_equal(list(poly.contains_points(grid)),
+                [poly.contains_point(p) for p in grid])
+
+    def test_contains_points_empty(self):
+        poly = self.Polygon([(0,0), (0,2), (2,2), (2,0)])
+        assert_equal(poly.contains_points([]), bytearray())
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_contains_points_numpy(self):
+        grid = numpy.array([(x / 4.0, y / 4.0) for x in range(-10, 14) 
+            for y in range(-10, 14)])
+        for poly in self.contains_points_polygons():
+            expected = [poly.contains_point(p) for p in grid.tolist()]
+            result = poly.contains_points(grid)
+            assert_equal(list(result), expected)
+            assert_equal(list(numpy.frombuffer(result, dtype=bool)), 
+                expected)
+            # Buffers that cannot be shared are copied
+            assert_equal(list(poly.contains_points(grid[::3])), 
+                expected[::3])
+            assert_equal(list(poly.contains_points(
+                grid.astype(numpy.float32))), expected)
+
+    def test_prepare_contains_point_unchanged(self):
+        grid = [(x / 2.0, y / 2.0) for x in range(-1, 11) for y in range(-1, 9)]
+        for verts in [[(2,1), (1,0), (0,3)], [(0,0), (3,0), (3,3), (1,1)],
+            [(0,0), (0,1), (1,1), (2,2), (3,2), (3,0)],
+            [(2,4), (4,1), (2,0), (3,1), (2,3)]]:
+            poly = self.Polygon(verts)
+            expected = [poly.contains_point(p) for p in grid]
+            assert not poly.is_prepared
+            assert poly.prepare() > 0
+            assert poly.is_prepared
+            assert_equal([poly.contains_point(p) for p in grid], expected)
+            assert_equal(list(poly.contains_points(grid)), expected)
+
+    def test_prepare_exclusive_concave(self):
+        polys = [
+            self.Polygon([(0,0), (0,1), (1,1), (2,2), (3,2), (3,0)]),
+            self.Polygon([(2,2), (1,1), (0,1), (1,2), (0,3), (1,3)]),
+        ]
+        for poly in polys:
+            poly.prepare()
+        assert_contains_point(polys, 0, (0, 1))
+        assert_contains_point(polys, 0, (1.5, 1.5))
+        assert_contains_point(polys, 0, (2.5, 2))
+        assert_contains_point(polys, 1, (0, 3))
+        assert_contains_point(polys, 1, (1, 2))
+        assert_contains_point(polys, 1, (0.5, 1.5))
+        assert_contains_point(polys, None, (0, 0))
+        assert_contains_point(polys, None, (3, 0))
+        assert_contains_point(polys, None, (5, 5))
+
+    def test_prepare_discarded_by_mutation(self):
+        poly = self.Polygon([(0,0), (0,1), (1,1), (2,2), (3,2), (3,0)])
+        poly.prepare()
+        assert poly.contains_point((2.5, 1))
+        poly[4] = (2, 0.5)
+        assert not poly.is_prepared
+        assert not poly.contains_point((2.5, 1))
+
+    @raises(ValueError)
+    def test_prepare_not_simple(self):
+        self.Polygon([(0,0), (1,1), (1,0), (0,1), (-1,2)]).prepare()
+
+    @raises(ValueError)
+    def test_prepare_zero_area(self):
+        poly = self.Polygon([(0,0), (2,0), (4,0), (1,0)])
+        try:
+            poly.prepare()
+        finally:
+            assert not poly.is_prepared
+            assert not poly.contains_point((3.5, -1))
+
+    def assert_triangulation(self, poly):
+        verts = [tuple(v) for v in poly]
+        triangles = poly.triangulate()
+        assert_equal(len(triangles), (len(verts) - 2) * 3)
+        assert all(0 <= i < len(verts) for i in triangles)
+        area = signed_area(verts)
+        total = 0.0
+        for i in range(0, len(triangles), 3):
+            tri = [verts[j] for j in triangles[i:i + 3]]
+            assert_equal(len(set(triangles[i:i + 3])), 3)
+            tri_area = signed_area(tri)
+            # Wound the same way as the polygon
+            assert tri_area * area >= 0
+            total += tri_area
+            centroid = (sum(x for x, y in tri) / 3, sum(y for x, y in tri) / 3)
+            if tri_area:
+                assert poly.contains_point(centroid)
+        assert_almost_equal(total, area)
+
+    def triangulate_polygons(self):
+        return [self.Polygon([(0,0), (2,0), (1,2)]),
+            self.Polygon.regular(7, 2, angle=10),
+            self.Polygon.star(5, 1, 2),
+            self.Polygon.star(9, 1, 4, angle=3),
+            self.Polygon([(0,0), (1,1), (2,0), (2,2), (0,2)]),
+            self.Polygon([(0,0), (0,2), (1,2), (1,1), (2,1), (2,2), (3,2), 
+                (3,0)]),
+            self.Polygon([(0,0), (1,0), (2,0), (2,2)]),
+            self.Polygon(random_radial_verts(60)),
+            self.Polygon(random_radial_verts(200, seed=1)),
+            # Repeated vertex on a straight run
+            self.Polygon([(10,0), (1,2), (1,3), (1,3), (1,4), (-1,1), (-6,5),
+                (-7,5), (-3,0), (-3,-1), (-1,-2), (2,-7)]),
+            self.Polygon([(1,0), (2,0), (2,2), (1,1), (0,2), (0,0), (1,0)])]
+
+    def test_triangulate(self):
+        for poly in self.triangulate_polygons():
+            self.assert_triangulation(poly)
+            # Wound the other way
+            self.assert_triangulation(self.Polygon(list(poly)[::-1]))
+
+    def test_triangulate_convex_fan(self):
+        poly = self.Polygon.regular(6, 2)
+        assert_equal(list(poly.triangulate()), 
+            [0, 1, 2, 0, 2, 3, 0, 3, 4, 0, 4, 5])
+
+    def test_triangulate_cached(self):
+        poly = self.Polygon([(0,0), (0,2), (1,2), (1,1), (2,1), (2,2), 
+            (3,2), (3,0)])
+        triangles = poly.triangulate()
+        assert_equal(poly.triangulate(), triangles)
+        # The cached triangles are not shared
+        triangles[0] = 7
+        assert poly.triangulate()[0] != 7
+        poly[3] = (1.5, 0.5)
+        assert poly.triangulate() != triangles
+        self.assert_triangulation(poly)
+        copy = poly.__copy__()
+        assert_equal(copy.triangulate(), poly.triangulate())
+
+    @raises(ValueError)
+    def test_triangulate_not_simple(self):
+        self.Polygon([(0,0), (1,1), (1,0), (0,1), (-1,2)]).triangulate()
+
+    def test_triangulate_not_simple_after_mutation(self):
+        poly = self.Polygon([(0,0), (0,1), (1,1), (2,2), (3,2), (3,0)])
+        self.assert_triangulation(poly)
+        poly[2] = (4, 1)
+        self.assertRaises(ValueError, poly.triangulate)
+
+    def boolean_pairs(self):
+        square = [(0,0), (2,0), (2,2), (0,2)]
+        cup = [(0,0), (3,0), (3,3), (2,3), (2,1), (1,1), (1,3), (0,3)]
+        return [
+            (self.Polygon(square), [(1,1), (3,1), (3,3), (1,3)]),
+            (self.Polygon([(0,0), (4,0), (4,4), (0,4)]), square),
+            (self.Polygon(square), [(5,5), (6,5), (6,6)]),
+            (self.Polygon(square), list(reversed(square))),
+            (self.Polygon(cup), [(-0.5,2), (3.5,2), (3.5,2.5), (-0.5,2.5)]),
+            (self.Polygon.regular(7, 2), self.Polygon.star(5, 1, 2.5)),
+            (self.Polygon.star(6, 1, 3), 
+                self.Polygon.star(6, 1, 3, center=(0.5, 0.2), angle=15)),
+            (self.Polygon(random_radial_verts(40)), 
+                self.Polygon(random_radial_verts(40, seed=1))),
+        ]
+
+    def assert_boolean(self, poly, other, operation, inside):
+        result = getattr(poly, operation)(other)
+        assert isinstance(result, list)
+        for piece in result:
+            assert isinstance(piece, self.Polygon)
+            assert piece.is_simple
+        # Outer boundaries are wound counter-clockwise and holes
+        # clockwise, so a point is in the result if it is in more
+        # outer boundaries than holes
+        def region_contains(point):
+            return sum(signed_area(piece) > 0 and 1 or -1 
+                for piece in result if piece.contains_point(point)) > 0
+        other = self.Polygon(other)
+        for x in range(-24, 24):
+            for y in range(-24, 24):
+                point = (x / 4.0 + 0.0123, y / 4.0 + 0.0371)
+                assert_equal(region_contains(point), inside(
+                    poly.contains_point(point), other.contains_point(point)))
+        return sum(signed_area(piece) for piece in result)
+
+    def test_booleans(self):
+        for poly, other in self.boolean_pairs():
+            area = abs(signed_area(poly))
+            other_area = abs(signed_area(other))
+            union = self.assert_boolean(poly, other, 'union', 
+                lambda a, b: a or b)
+            intersection = self.assert_boolean(poly, other, 'intersection', 
+                lambda a, b: a and b)
+            difference = self.assert_boolean(poly, other, 'difference', 
+                lambda a, b: a and not b)
+            xor = self.assert_boolean(poly, other, 'xor', 
+                lambda a, b: a != b)
+            assert_almost_equal(union + intersection, area + other_area)
+            assert_almost_equal(difference, area - intersection)
+            assert_almost_equal(xor, union - intersection)
+
+    def test_booleans_overlapping_squares(self):
+        import planar
+        poly = self.Polygon([(0,0), (2,0), (2,2), (0,2)])
+        other = planar.Vec2Array([(1,1), (3,1), (3,3), (1,3)])
+        assert_equal(poly.union(other), [self.Polygon([(0,0), (2,0), 
+            (2,1), (3,1), (3,3), (1,3), (1,2), (0,2)])])
+        assert_equal(poly.intersection(other), 
+            [self.Polygon([(1,1), (2,1), (2,2), (1,2)])])
+        assert_equal(poly.difference(other), [self.Polygon([(0,0), (2,0), 
+            (2,1), (1,1), (1,2), (0,2)])])
+        assert_equal(len(poly.xor(other)), 2)
+
+    def test_booleans_hole(self):
+        poly = self.Polygon([(0,0), (4,0), (4,4), (0,4)])
+        hole = [(1,1), (2,1), (2,2), (1,2)]
+        outer, inner = poly.difference(hole)
+        assert_equal(outer, poly)
+        assert_equal(inner, self.Polygon(hole))
+        assert signed_area(outer) > 0
+        assert signed_area(inner) < 0
+        assert_equal(poly.union(hole), [poly])
+        assert_equal(poly.intersection(hole), [self.Polygon(hole)])
+
+    def test_booleans_disjoint(self):
+        poly = self.Polygon([(0,0), (2,0), (2,2), (0,2)])
+        other = self.Polygon([(5,5), (6,5), (6,6)])
+        assert_equal(poly.union(other), [poly, other])
+        assert_equal(poly.intersection(other), [])
+        assert_equal(poly.difference(other), [poly])
+        assert_equal(poly.xor(other), [poly, other])
+
+    def test_intersection_convex(self):
+        poly = self.Polygon.regular(5, 2)
+        result = poly.intersection(self.Polygon.regular(5, 2, angle=36))
+        assert_equal(len(result), 1)
+        assert result[0].is_convex_known
+        assert result[0].is_convex
+        assert_equal(len(result[0]), 10)
+
+    def test_booleans_not_simple(self):
+        poly = self.Polygon([(0,0), (2,0), (2,2), (0,2)])
+        bowtie = [(0,0), (1,1), (1,0), (0,1)]
+        for operation in ('union', 'intersection', 'difference', 'xor'):
+            self.assertRaises(ValueError, getattr(poly, operation), bowtie)
+            self.assertRaises(ValueError, 
+                getattr(self.Polygon(bowtie), operation), poly)
+
+    def test_simplify_mask_collinear(self):
+        poly = self.Polygon([(0,0), (1,0), (2,0), (2,1), (2,2), (1,2), 
+            (0,2), (0,1)])
+        for method in ('douglas-peucker', 'visvalingam'):
+            mask = poly.simplify_mask(method=method)
+            assert isinstance(mask, bytearray)
+            assert_equal(list(mask), [1, 0, 1, 0, 1, 0, 1, 0])
+
+    def test_simplify_mask_keeps_triangle(self):
+        poly = self.Polygon.regular(40, 2)
+        for method in ('douglas-peucker', 'visvalingam'):
+            mask = poly.simplify_mask(100, method)
+            assert_equal(sum(mask), 3)
+            triangle = self.Polygon([v for v, k in zip(poly, mask) if k])
+            assert abs(signed_area(triangle)) > 1
+        assert_equal(list(self.Polygon([(0,0), (1,0), (1,1)]).simplify_mask(
+            100)), [1, 1, 1])
+
+    def test_simplify_mask_douglas_peucker(self):
+        from planar import LineSegment
+        poly = self.Polygon(random_radial_verts(100))
+        verts = [tuple(v) for v in poly]
+        for tolerance in (0, 0.5, 2, 5):
+            mask = poly.simplify_mask(tolerance)
+            assert_equal(len(mask), len(verts))
+            kept = [i for i, k in enumerate(mask) if k]
+            assert len(kept) >= 3
+            # Every removed vertex lies near the edge replacing it
+            for first, end in zip(kept, kept[1:] + [kept[0] + len(verts)]):
+                edge = LineSegment.from_points(
+                    [verts[first], verts[end % len(verts)]])
+                for i in range(first + 1, end):
+                    assert edge.distance_to(verts[i % len(verts)]) <= tolerance
+        assert_equal(sum(poly.simplify_mask(0)), len(verts))
+
+    def test_simplify_mask_preserve_simple(self):
+        # Removing the vertex at (5, 0.6) makes the bottom edge cross
+        # the notch below it
+        poly = self.Polygon([(0,0), (5,0.6), (10,0), (10,-2), (5,0.3), 
+            (5,-3), (12,-3), (12,2), (0,2)])
+        assert poly.is_simple
+        for method in ('douglas-peucker', 'visvalingam'):
+            mask = poly.simplify_mask(1.9, method)
+            assert_equal(list(mask), [1, 0, 1, 1, 1, 1, 1, 1, 1])
+            assert not self.Polygon(
+                [v for v, k in zip(poly, mask) if k]).is_simple
+            assert_equal(list(poly.simplify_mask(
+                1.9, method, preserve_simple=True)), [1] * 9)
+
+    def test_simplify_mask_bad_args(self):
+        poly = self.Polygon.regular(5, 2)
+        self.assertRaises(ValueError, poly.simplify_mask, -1)
+        self.assertRaises(ValueError, poly.simplify_mask, 1, 'nearest')
+
+    def lod_polygons(self):
+        return [self.Polygon.star(30, 2, 2.5),
+            self.Polygon.regular(50, 3),
+            self.Polygon([(0,0), (5,0.6), (10,0), (10,-2), (5,0.3), (5,-3), 
+                (12,-3), (12,2), (0,2)]),
+            self.Polygon(random_radial_verts(100))]
+
+    def test_level_of_detail(self):
+        from planar import LineSegment
+        for poly in self.lod_polygons():
+            for tolerance in (0.1, 0.7, 3):
+                level = poly.level_of_detail(tolerance)
+                assert isinstance(level, self.Polygon)
+                assert 3 <= len(level) <= len(poly)
+                assert level.is_simple
+                # The level's vertices are a subset of the polygon's, in
+                # the same order
+                verts = [tuple(v) for v in poly]
+                indices = [verts.index(tuple(v)) for v in level]
+                start = indices.index(min(indices))
+                assert_equal(indices[start:] + indices[:start], 
+                    sorted(indices))
+                edges = [LineSegment.from_points([level[i - 1], level[i]]) 
+                    for i in range(len(level))]
+                for vert in verts:
+                    assert min(edge.distance_to(vert) 
+                        for edge in edges) <= tolerance
+
+    def test_level_of_detail_cached(self):
+        poly = self.Polygon.star(30, 2, 2.5)
+        level = poly.level_of_detail(0.6)
+        assert len(level) < len(poly)
+        # Tolerances rounding down to the same power of two share a level
+        assert poly.level_of_detail(0.6) is level
+        assert poly.level_of_detail(0.5) is level
+        assert poly.level_of_detail(0.99) is level
+        assert poly.level_of_detail(1.0) is not level
+        assert poly.level_of_detail(0.49) is not level
+
+    def test_level_of_detail_cache_evicts_least_recent(self):
+        import planar.lod
+        poly = self.Polygon.star(30, 2, 2.5)
+        first = poly.level_of_detail(1)
+        second = poly.level_of_detail(2)
+        for i in range(planar.lod._lod_cache_size - 2):
+            poly.level_of_detail(2 ** -i / 4.0)
+        # Using the first level again evicts the second
+        assert poly.level_of_detail(1) is first
+        poly.level_of_detail(64)
+        assert poly.level_of_detail(1) is first
+        assert poly.level_of_detail(2) is not second
+
+    def test_level_of_detail_cleared_by_mutation(self):
+        poly = self.Polygon.star(30, 2, 2.5)
+        level = poly.level_of_detail(0.6)
+        poly[0] = (3, 0)
+        new_level = poly.level_of_detail(0.6)
+        assert new_level is not level
+        assert_equal(new_level, self.Polygon(
+            poly).level_of_detail(0.6))
+        poly *= self.Affine.scale(2)
+        assert_equal(poly.level_of_detail(0.6), self.Polygon(
+            poly).level_of_detail(0.6))
+        assert poly.level_of_detail(0.6) != new_level
+
+    def test_level_of_detail_bad_tolerance(self):
+        poly = self.Polygon.star(30, 2, 2.5)
+        for tolerance in (0, -1):
+            self.assertRaises(ValueError, poly.level_of_detail, tolerance)
+            self.assertRaises(ValueError, 
+                poly.contains_point_lod, (0, 0), tolerance)
+
+    def test_contains_point_lod(self):
+        grid = [(x / 4.0, y / 4.0) for x in range(-20, 50) 
+            for y in range(-20, 20)]
+        for poly in self.lod_polygons():
+            expected = [poly.contains_point(p) for p in grid]
+            for tolerance in (0.1, 0.7, 3):
+                assert_equal([poly.contains_point_lod(p, tolerance) 
+                    for p in grid], expected)
+                assert_equal([poly.contains_point_lod(self.Vec2(*p), 
+                    tolerance) for p in grid[::7]], expected[::7])
+
+    def test_contains_point_lod_after_mutation(self):
+        poly = self.Polygon.star(30, 2, 2.5)
+        assert not poly.contains_point_lod((2.9, 0), 0.5)
+        poly[0] = (3, 0)
+        assert poly.contains_point_lod((2.9, 0), 0.5)
+        assert not poly.contains_point_lod((2.9, 0.3), 0.5)
+
     def test_tangents_to_point_convex(self):
         poly = self.Polygon.regular(30, 2)
         assert_equal(poly.tangents_to_point((0,10)), 
@@ -767,6 +1336,39 @@ class PolygonBaseTestCase(object):
         hull = self.Polygon.convex_hull(points)
         self.confirm_hull(points, hull)
 
+    def assert_hull_of_points(self, points, hull):
+        points = [tuple(p) for p in points]
+        assert self.Polygon(list(hull)).is_convex
+        assert set(map(tuple, hull)) <= set(points)
+        # Every point is on the inside of, or on, each clockwise edge
+        for i in range(len(hull)):
+            (ax, ay), (bx, by) = hull[i - 1], hull[i]
+            assert max((bx - ax) * (py - ay) - (by - ay) * (px - ax) 
+                for px, py in points) <= 1e-9
+
+    def test_convex_hull_large(self):
+        from planar.hull import _merge_hulls
+        import planar
+        points = large_hull_points(3000)
+        expected = set(_merge_hulls(points))
+        assert_equal(expected, set([(-100, 0), (0, 60), (100, 0), (0, -60)]))
+        for source in (points, iter(points), planar.Vec2Array(points)):
+            hull = self.Polygon.convex_hull(source)
+            assert set(map(tuple, hull)) >= expected
+            self.assert_hull_of_points(points, hull)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_convex_hull_large_numpy(self):
+        from planar.hull import _merge_hulls
+        points = numpy.array(large_hull_points(3000)).round()
+        expected = set(_merge_hulls(map(tuple, points.tolist())))
+        for array in (points, points.astype(numpy.int64), 
+            numpy.asfortranarray(points), 
+            numpy.repeat(points, 2, axis=0)[::2]):
+            hull = self.Polygon.convex_hull(array)
+            assert set(map(tuple, hull)) >= expected
+            self.assert_hull_of_points(points.tolist(), hull)
+
     def test_convex_hull_convex_input_ordered(self):
         points = self.Polygon.regular(33, 5)
         hull = self.Polygon.convex_hull(points)
@@ -800,6 +1402,118 @@ class PolygonBaseTestCase(object):
             assert pt[1] == 1, pt
             assert 0 <= pt[0] <= 12, pt
 
+    def test_farthest_pair(self):
+        poly = self.Polygon([(0,0), (4,0), (4,2), (0,2)])
+        assert_equal(sorted(poly.farthest_pair()), [(0, 0), (4, 2)])
+        poly = self.Polygon([(0,0), (3,4), (-1,1)])
+        assert_equal(sorted(poly.farthest_pair()), [(0, 0), (3, 4)])
+        # Concave, measured around its hull
+        poly = self.Polygon([(0,0), (4,0), (4,4), (3,4), (3,1), (1,1),
+            (1,4), (0,4)])
+        assert_equal(sorted(poly.farthest_pair()), [(0, 4), (4, 0)])
+
+    def test_min_width(self):
+        width, direction = self.Polygon([(0,0), (4,0), (4,2), (0,2)]).min_width()
+        assert_almost_equal(width, 2)
+        assert_almost_equal(abs(direction.x), 1)
+        assert_almost_equal(direction.y, 0)
+        width, direction = self.Polygon([(0,0), (3,4), (-1,1)]).min_width()
+        assert_almost_equal(width, 1.4)
+        assert_almost_equal(abs(direction.x), 0.8)
+        assert_almost_equal(abs(direction.y), 0.6)
+        width, direction = self.Polygon(
+            [(0,0), (2,-1), (4,0), (2,1)]).min_width()
+        assert_almost_equal(width, 4 / math.sqrt(5))
+
+    def test_min_area_rectangle(self):
+        rect = self.Polygon([(0,0), (2,-1), (4,0), (2,1),
+            (2,0.5)]).min_area_rectangle()
+        assert_equal(len(rect), 4)
+        assert rect.is_convex
+        for corner, expected in zip(sorted(rect),
+            [(0,0), (0.8,1.6), (3.2,-1.6), (4,0)]):
+            assert_almost_equal(corner.x, expected[0])
+            assert_almost_equal(corner.y, expected[1])
+
+    def test_min_perimeter_rectangle(self):
+        rect = self.Polygon([(0,0), (4,0), (4,4), (3,4), (3,1), (1,1),
+            (1,4), (0,4)]).min_perimeter_rectangle()
+        assert_equal(sorted(rect), [(0,0), (0,4), (4,0), (4,4)])
+
+    def edge_frames(self, verts):
+        """Yield the extents of the vertices along and across each edge
+        direction of their hull, for brute force caliper measurements
+        """
+        hull = self.Polygon.convex_hull(verts)
+        for i in range(len(hull)):
+            (ax, ay), (bx, by) = hull[i - 1], hull[i]
+            length = math.hypot(bx - ax, by - ay)
+            ux, uy = (bx - ax) / length, (by - ay) / length
+            along = [x * ux + y * uy for x, y in verts]
+            across = [y * ux - x * uy for x, y in verts]
+            yield (max(along) - min(along), max(across) - min(across))
+
+    def assert_rectangle_encloses(self, rect, verts, area=None, 
+        perimeter=None):
+        rect = list(rect)
+        assert_equal(len(rect), 4)
+        if area is not None:
+            assert_almost_equal(abs(signed_area(rect)), area)
+        if perimeter is not None:
+            assert_almost_equal(sum(math.hypot(rect[i][0] - rect[i - 1][0], 
+                rect[i][1] - rect[i - 1][1]) for i in range(4)), perimeter)
+        # Wound counter-clockwise, with every vertex left of each side
+        assert signed_area(rect) > 0
+        for i in range(4):
+            (ax, ay), (bx, by) = rect[i - 1], rect[i]
+            for x, y in verts:
+                assert (bx - ax) * (y - ay) - (by - ay) * (x - ax) >= -1e-9
+
+    def test_calipers_random(self):
+        import random
+        rand = random.Random(0)
+        for count in (3, 10, 100):
+            for poly in (self.Polygon(random_radial_verts(count, seed=count)),
+                self.Polygon.convex_hull([(rand.uniform(-5, 5), 
+                    rand.uniform(-2, 2)) for i in range(count)])):
+                verts = [tuple(v) for v in poly]
+                a, b = poly.farthest_pair()
+                assert tuple(a) in verts and tuple(b) in verts
+                assert_almost_equal((a - b).length, max(
+                    math.hypot(x1 - x0, y1 - y0) 
+                    for x0, y0 in verts for x1, y1 in verts))
+                frames = list(self.edge_frames(verts))
+                width, direction = poly.min_width()
+                assert_almost_equal(width, min(h for w, h in frames))
+                assert_almost_equal(direction.length, 1)
+                # The direction is along the enclosing lines
+                across = [y * direction.x - x * direction.y 
+                    for x, y in verts]
+                assert_almost_equal(max(across) - min(across), width)
+                self.assert_rectangle_encloses(poly.min_area_rectangle(), 
+                    verts, area=min(w * h for w, h in frames))
+                self.assert_rectangle_encloses(
+                    poly.min_perimeter_rectangle(), verts, 
+                    perimeter=min(2 * (w + h) for w, h in frames))
+
+    def test_calipers_collinear(self):
+        poly = self.Polygon([(0,0), (1,1), (2,2)])
+        assert_equal(sorted(poly.farthest_pair()), [(0, 0), (2, 2)])
+        width, direction = poly.min_width()
+        assert_equal(width, 0)
+        assert_almost_equal(direction.x, direction.y)
+        assert_equal(sorted(poly.min_area_rectangle()),
+            [(0, 0), (0, 0), (2, 2), (2, 2)])
+
+    def test_calipers_single_point(self):
+        poly = self.Polygon([(1,1), (1,1), (1,1), (1,1)])
+        assert_equal(poly.farthest_pair(), ((1, 1), (1, 1)))
+        width, direction = poly.min_width()
+        assert_equal(width, 0)
+        assert_equal(direction, (1, 0))
+        assert_equal(tuple(poly.min_area_rectangle()), ((1, 1),) * 4)
+        assert_equal(tuple(poly.min_perimeter_rectangle()), ((1, 1),) * 4)
+
     def test_str_and_repr(self):
         poly = self.Polygon([(0.25,3.5), (1.3,4.25), (0.16,2.25), (-0.5,0.16)])
         assert_equal(repr(poly), 
@@ -886,6 +1600,27 @@ class PolygonBaseTestCase(object):
         V = self.Vec2
         assert_equal(tuple(a), (V(6, -2), V(8, 0), V(10, 2)))
 
+    def test_itransform_clears_cached_properties(self):
+        poly = self.Polygon([(0,0), (0,1), (1,1), (2,2), (3,2), (3,0)])
+        assert_equal(poly.bounding_box.min_point, (0, 0))
+        centroid = poly.centroid
+        poly.prepare()
+        assert poly.contains_point((2.5, 1))
+        self.Affine.translation((10, 0)).itransform(poly)
+        assert not poly.is_prepared
+        assert_equal(poly.bounding_box.min_point, (10, 0))
+        assert_equal(poly.centroid, centroid + (10, 0))
+        assert poly.contains_point((12.5, 1))
+        assert not poly.contains_point((2.5, 1))
+
+    def test_itransform_updates_dynamic_rtree(self):
+        from planar import DynamicRTree
+        poly = self.Polygon([(0,0), (0,1), (1,1), (2,2), (3,2), (3,0)])
+        tree = DynamicRTree([poly])
+        self.Affine.translation((10, 0)).itransform(poly)
+        assert_equal(tree.query_point((2.5, 1)), [])
+        assert_equal(tree.query_point((12.5, 1)), [poly])
+
     @raises(TypeError)
     def test_imul_incompatible(self):
         a = self.Polygon([(1,2), (3,4), (5,6)])
@@ -920,25 +1655,81 @@ class PyPolygonWhiteBoxTestCase(unittest.TestCase):
     from planar.vector import Vec2, Seq2
     from planar.polygon import Polygon
 
-    def test_split_y_polylines_convex(self):
-        poly = self.Polygon([(-1,0), (-1,1), (-0.5,2), (0,2), 
-            (0.5,1.5), (0.5,-1), (-0.8, -0.5)])
-        assert poly._y_polylines is None
-        assert poly.is_convex
-        assert_equal(poly._y_polylines, (
-            [(-1,0.5), (-0.5,-0.8), (0,-1), (1,-1), (2,-0.5)],
-            [(-1,0.5), (1.5,0.5), (2,0), (2,-0.5)]))
-
-    def test_split_y_polylines_straight_edge(self):
-        poly = self.Polygon([(0,0), (0,3), (1,2), (1,1)], is_convex=True)
-        assert_equal(poly._y_polylines, (
-            [(0,0), (3,0)],
-            [(0,0), (1,1), (2,1), (3,0)]))
-        poly = self.Polygon([(2,0), (2,3), (1,2), (1,1)], is_convex=True)
-        assert_equal(poly._y_polylines, (
-            [(0,2), (1,1), (2,1), (3,2)],
-            [(0,2), (3,2)]))
-
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_convex_hull_without_numpy(self):
+        import planar.polygon
+        points = large_hull_points(3000)
+        hull = self.Polygon.convex_hull(points)
+        try:
+            planar.polygon.numpy = None
+            assert_equal(self.Polygon.convex_hull(points), hull)
+        finally:
+            planar.polygon.numpy = numpy
+
+    def test_convex_fan_bounds(self):
+        poly = self.Polygon([(0,0), (0,1), (1,1), (1,0)])
+        assert_equal(poly._convex_fan_bounds(), (1, 3))
+        poly = self.Polygon([(0,0), (0,0), (0,1), (1,1), (1,0), (0,0)])
+        assert_equal(poly._convex_fan_bounds(), (2, 4))
+
+    def test_perturbed_side(self):
+        from planar.polygon import _perturbed_side
+        assert _perturbed_side(0,0, 2,0, 1,1) > 0
+        assert _perturbed_side(0,0, 2,0, 1,-1) < 0
+        # Points on the line are moved right, then down
+        assert _perturbed_side(0,0, 2,0, 1,0) < 0
+        assert _perturbed_side(2,0, 0,0, 1,0) > 0
+        assert _perturbed_side(0,0, 0,2, 0,1) < 0
+        assert _perturbed_side(0,2, 0,0, 0,1) > 0
+        assert _perturbed_side(0,0, 1,1, 5,5) < 0
+        assert _perturbed_side(1,1, 0,0, 5,5) > 0
+        assert_equal(_perturbed_side(1,1, 1,1, 1,1), 0)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_perturbed_side_array(self):
+        from planar.polygon import _perturbed_side
+        px = numpy.array([1.0, 1.0, 1.0, 3.0])
+        py = numpy.array([1.0, -1.0, 0.0, 0.0])
+        assert_equal(list(numpy.sign(_perturbed_side(0,0, 2,0, px, py))),
+            [1, -1, -1, -1])
+        assert_equal(list(numpy.sign(_perturbed_side(2,0, 0,0, px, py))),
+            [-1, 1, 1, 1])
+
+    def grid_points(self, lo, hi, step):
+        count = int(round((hi - lo) / step)) + 1
+        return [(lo + i * step, lo + j * step) 
+            for i in range(count) for j in range(count)]
+
+    def test_pnp_convex_test_matches_winding_test(self):
+        for poly in (self.Polygon.regular(7, 2, angle=10),
+            self.Polygon(list(self.Polygon.regular(7, 2, angle=10))[::-1]),
+            self.Polygon([(0,0), (0,0), (0,2), (1,3), (2,2), (2,0), (0,0)])):
+            assert poly.is_convex
+            for point in self.grid_points(-3, 3, 0.25):
+                assert_equal(poly._pnp_convex_test(point), 
+                    poly._pnp_winding_test(point), point)
+
+    def test_pnp_convex_test_shared_edges(self):
+        # Four squares around the origin, wound both ways, contain 
+        # each point on their shared edges exactly once
+        polys = [self.Polygon([(0,0), (0,1), (1,1), (1,0)]),
+            self.Polygon([(0,0), (-1,0), (-1,1), (0,1)]),
+            self.Polygon([(0,0), (0,-1), (-1,-1), (-1,0)]),
+            self.Polygon([(0,0), (1,0), (1,-1), (0,-1)])]
+        for point in self.grid_points(-0.5, 0.5, 0.25):
+            assert_equal(
+                sum(poly._pnp_convex_test(point) for poly in polys), 1)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_pnp_convex_test_array(self):
+        points = self.grid_points(-3, 3, 0.25)
+        px = numpy.array([x for x, y in points])
+        py = numpy.array([y for x, y in points])
+        for poly in (self.Polygon.regular(7, 2, angle=10),
+            self.Polygon(list(self.Polygon.regular(7, 2, angle=10))[::-1]),
+            self.Polygon([(0,0), (0,1), (1,1), (1,0)])):
+            assert_equal(list(poly._pnp_convex_test_array(px, py)),
+                [poly._pnp_convex_test(point) for point in points])
 
 if __name__ == '__main__':
     unittest.main()
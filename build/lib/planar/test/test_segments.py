@@ -0,0 +1,299 @@
+"""SegmentArray unit tests"""
+
+from __future__ import division
+import sys
+import math
+import random
+import unittest
+from nose.tools import assert_equal, assert_almost_equal, raises
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_endpoints(count, seed=0):
+    rand = random.Random(seed)
+    return [(rand.uniform(-5, 5), rand.uniform(-5, 5))
+        for i in range(count * 2)]
+
+
+class SegmentArrayBaseTestCase(object):
+
+    # Queries are answered with numpy from 32 segments up
+    sizes = (5, 40)
+
+    def segments(self, count, seed=0):
+        endpoints = random_endpoints(count, seed)
+        segments = [self.LineSegment.from_points(endpoints[i:i + 2])
+            for i in range(0, len(endpoints), 2)]
+        # Include a degenerate and axis-aligned segments
+        segments[0] = self.LineSegment((1, 1), (0, 0))
+        segments[1] = self.LineSegment((-1, 2), (3, 0))
+        segments[2] = self.LineSegment((1, 0), (0, 4))
+        return segments
+
+    def query_points(self, segments):
+        rand = random.Random(1)
+        points = [(rand.uniform(-6, 6), rand.uniform(-6, 6))
+            for seg in segments]
+        # Include points on the segments
+        for i in range(0, len(segments), 2):
+            points[i] = segments[i].anchor + segments[i].vector * 0.5
+        return points
+
+    def assert_segments_equal(self, array, segments):
+        assert_equal(len(array), len(segments))
+        for seg, expected in zip(array, segments):
+            assert_equal(tuple(seg.anchor), tuple(expected.anchor))
+            assert_equal(tuple(seg.vector), tuple(expected.vector))
+
+    def test_init_empty(self):
+        from planar import SegmentArray
+        array = SegmentArray()
+        assert_equal(len(array), 0)
+        assert_equal(list(array), [])
+        assert_equal(repr(array), 'SegmentArray([])')
+
+    def test_init_segments(self):
+        from planar import SegmentArray
+        segments = self.segments(5)
+        array = SegmentArray(segments)
+        self.assert_segments_equal(array, segments)
+        assert_equal(tuple(array[-1].anchor), tuple(segments[-1].anchor))
+        assert_equal(tuple(array[3].vector), tuple(segments[3].vector))
+
+    def test_repr(self):
+        from planar import SegmentArray
+        array = SegmentArray([self.LineSegment((0, 0), (1, 1)),
+            self.LineSegment((2, 3), (0, -1))])
+        assert_equal(repr(array), 
+            'SegmentArray([%r, %r])' % (array[0], array[1]))
+
+    @raises(IndexError)
+    def test_index_out_of_range(self):
+        from planar import SegmentArray
+        SegmentArray(self.segments(5))[5]
+
+    @raises(IndexError)
+    def test_negative_index_out_of_range(self):
+        from planar import SegmentArray
+        SegmentArray(self.segments(5))[-6]
+
+    @raises(TypeError)
+    def test_slice(self):
+        from planar import SegmentArray
+        SegmentArray(self.segments(5))[1:3]
+
+    def test_from_points(self):
+        from planar import SegmentArray
+        endpoints = random_endpoints(5)
+        array = SegmentArray.from_points(endpoints)
+        self.assert_segments_equal(array,
+            [self.LineSegment.from_points(endpoints[i:i + 2])
+                for i in range(0, len(endpoints), 2)])
+        self.assert_segments_equal(
+            SegmentArray.from_points(self.Vec2Array(endpoints)), list(array))
+
+    @raises(ValueError)
+    def test_from_points_not_in_pairs(self):
+        from planar import SegmentArray
+        SegmentArray.from_points([(0, 0), (1, 1), (2, 2)])
+
+    def test_anchors_and_vectors(self):
+        from planar import SegmentArray
+        segments = self.segments(5)
+        array = SegmentArray(segments)
+        assert_equal([tuple(a) for a in array.anchors],
+            [tuple(seg.anchor) for seg in segments])
+        assert_equal([tuple(v) for v in array.vectors],
+            [tuple(seg.vector) for seg in segments])
+
+    def test_from_buffers_shares_memory(self):
+        from planar import SegmentArray
+        anchors = self.Vec2Array([(0, 0), (1, 1)])
+        vectors = self.Vec2Array([(2, 0), (0, 2)])
+        array = SegmentArray.from_buffers(anchors, vectors)
+        self.assert_segments_equal(array, [
+            self.LineSegment((0, 0), (2, 0)),
+            self.LineSegment((1, 1), (0, 2))])
+        anchors[1] = (5, 5)
+        vectors[0] = (3, 4)
+        self.assert_segments_equal(array, [
+            self.LineSegment((0, 0), (3, 4)),
+            self.LineSegment((5, 5), (0, 2))])
+
+    def test_from_buffers_copy(self):
+        from planar import SegmentArray
+        anchors = self.Vec2Array([(0, 0), (1, 1)])
+        vectors = self.Vec2Array([(2, 0), (0, 2)])
+        array = SegmentArray.from_buffers(anchors, vectors, copy=True)
+        anchors[1] = (5, 5)
+        vectors[0] = (3, 4)
+        self.assert_segments_equal(array, [
+            self.LineSegment((0, 0), (2, 0)),
+            self.LineSegment((1, 1), (0, 2))])
+
+    def test_from_buffers_sequences(self):
+        from planar import SegmentArray
+        array = SegmentArray.from_buffers(
+            [(0, 0), (1, 1)], iter([(2, 0), (0, 2)]))
+        self.assert_segments_equal(array, [
+            self.LineSegment((0, 0), (2, 0)),
+            self.LineSegment((1, 1), (0, 2))])
+
+    @raises(ValueError)
+    def test_from_buffers_length_mismatch(self):
+        from planar import SegmentArray
+        SegmentArray.from_buffers([(0, 0), (1, 1)], [(2, 0)])
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_from_buffers_numpy(self):
+        from planar import SegmentArray
+        anchors = numpy.array([(0, 0), (1, 1), (2, 2)], dtype=float)
+        vectors = numpy.array([(2, 0), (0, 2), (1, 1)], dtype=float)
+        expected = [self.LineSegment(a, v)
+            for a, v in zip(anchors.tolist(), vectors.tolist())]
+        array = SegmentArray.from_buffers(anchors, vectors)
+        self.assert_segments_equal(array, expected)
+        anchors[0] = (4, 4)
+        assert_equal(tuple(array[0].anchor), (4, 4))
+        anchors[0] = (0, 0)
+        # Buffers of other types, or not contiguous, are copied
+        for a, v in ((anchors.astype(numpy.int64), vectors.astype(numpy.int64)),
+            (anchors.astype(numpy.float32), vectors.astype(numpy.float32)),
+            (numpy.asfortranarray(anchors), numpy.asfortranarray(vectors)),
+            (numpy.repeat(anchors, 2, axis=0)[::2],
+                numpy.repeat(vectors, 2, axis=0)[::2])):
+            self.assert_segments_equal(
+                SegmentArray.from_buffers(a, v), expected)
+            self.assert_segments_equal(SegmentArray.from_points(
+                numpy.column_stack((a, a + v)).reshape(-1, 2)), expected)
+
+    def assert_query(self, method, compare=assert_equal):
+        from planar import SegmentArray
+        for count in self.sizes:
+            segments = self.segments(count)
+            array = SegmentArray(segments)
+            points = self.query_points(segments)
+            results = getattr(array, method)(points)
+            assert_equal(len(results), count)
+            for seg, point, result in zip(segments, points, results):
+                compare(result, getattr(seg, method)(point))
+            point = (0.5, 1.0)
+            results = getattr(array, method)(self.Vec2(*point))
+            assert_equal(len(results), count)
+            for seg, result in zip(segments, results):
+                compare(result, getattr(seg, method)(point))
+
+    def test_distance_to(self):
+        self.assert_query('distance_to', assert_almost_equal)
+
+    def test_contains_point(self):
+        self.assert_query('contains_point')
+
+    def test_point_ahead(self):
+        self.assert_query('point_ahead')
+
+    def test_point_behind(self):
+        self.assert_query('point_behind')
+
+    def test_point_left(self):
+        self.assert_query('point_left')
+
+    def test_point_right(self):
+        self.assert_query('point_right')
+
+    def test_project(self):
+        def assert_vec_almost_equal(result, expected):
+            assert_almost_equal(result.x, expected.x)
+            assert_almost_equal(result.y, expected.y)
+        self.assert_query('project', assert_vec_almost_equal)
+
+    def test_query_empty(self):
+        from planar import SegmentArray
+        assert_equal(len(SegmentArray().distance_to((1, 1))), 0)
+        assert_equal(len(SegmentArray().point_left([])), 0)
+
+    @raises(ValueError)
+    def test_query_points_wrong_length(self):
+        from planar import SegmentArray
+        SegmentArray(self.segments(5)).distance_to([(0, 0)] * 4)
+
+    def test_intersects(self):
+        from planar import SegmentArray
+        from planar.intersect import _segments_intersect
+        def intersect(s, t):
+            return _segments_intersect(s.start.x, s.start.y, s.end.x, s.end.y,
+                t.start.x, t.start.y, t.end.x, t.end.y)
+        for count in self.sizes:
+            segments = self.segments(count)
+            others = self.segments(count, seed=2)
+            array = SegmentArray(segments)
+            results = array.intersects(SegmentArray(others))
+            assert_equal(list(results),
+                [intersect(s, t) for s, t in zip(segments, others)])
+            other = self.LineSegment.from_points([(-4, -3), (4, 3)])
+            results = array.intersects(other)
+            assert_equal(list(results),
+                [intersect(s, other) for s in segments])
+            assert any(results)
+            assert not all(results)
+
+    def test_intersects_touching_and_collinear(self):
+        from planar import SegmentArray
+        array = SegmentArray([
+            self.LineSegment.from_points([(0, 0), (2, 0)]),
+            self.LineSegment.from_points([(2, 0), (2, 2)]),
+            self.LineSegment.from_points([(1, 0), (3, 0)]),
+            self.LineSegment.from_points([(3, 1), (4, 1)])])
+        other = self.LineSegment.from_points([(1, 0), (2, 0)])
+        assert_equal(list(array.intersects(other)), [0, 1, 0, 0])
+
+    @raises(ValueError)
+    def test_intersects_wrong_length(self):
+        from planar import SegmentArray
+        SegmentArray(self.segments(5)).intersects(
+            SegmentArray(self.segments(4)))
+
+    def test_intersections(self):
+        from planar import SegmentArray
+        from planar.intersect import _segments_intersect
+        for count in self.sizes:
+            segments = self.segments(count)
+            expected = sorted((i, j)
+                for i in range(count) for j in range(i + 1, count)
+                if _segments_intersect(
+                    segments[i].start.x, segments[i].start.y,
+                    segments[i].end.x, segments[i].end.y,
+                    segments[j].start.x, segments[j].start.y,
+                    segments[j].end.x, segments[j].end.y))
+            assert expected
+            array = SegmentArray(segments)
+            for cell_size in (None, 2.5):
+                found = list(array.intersections(cell_size))
+                assert_equal(sorted((i, j) for p, i, j in found), expected)
+                for point, i, j in found:
+                    assert_almost_equal(segments[i].distance_to(point), 0)
+                    assert_almost_equal(segments[j].distance_to(point), 0)
+
+    def test_intersections_empty(self):
+        from planar import SegmentArray
+        assert_equal(list(SegmentArray().intersections()), [])
+
+
+class PySegmentArrayTestCase(SegmentArrayBaseTestCase, unittest.TestCase):
+    from planar.line import LineSegment
+    from planar.vector import Vec2, Vec2Array
+
+
+class CSegmentArrayTestCase(SegmentArrayBaseTestCase, unittest.TestCase):
+    from planar.c import LineSegment, Vec2, Vec2Array
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
@@ -0,0 +1,416 @@
+"""Spatial index unit tests"""
+
+from __future__ import division
+import sys
+import math
+import random
+import unittest
+from nose.tools import assert_equal, assert_almost_equal, raises
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_boxes(count, seed=0):
+    from planar import BoundingBox
+    rand = random.Random(seed)
+    boxes = []
+    for i in range(count):
+        x = rand.uniform(-50, 50)
+        y = rand.uniform(-50, 50)
+        boxes.append(BoundingBox([(x, y),
+            (x + rand.uniform(0, 5), y + rand.uniform(0, 5))]))
+    return boxes
+
+
+def random_points(count, seed=0):
+    rand = random.Random(seed)
+    return [(rand.uniform(-55, 55), rand.uniform(-55, 55))
+        for i in range(count)]
+
+
+def box_tuple(shape):
+    from planar.spatial import _shape_box
+    return _shape_box(shape)
+
+
+def boxes_intersect(a, b):
+    return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+
+def box_distance(box, point):
+    from planar.spatial import _box_distance2
+    return math.sqrt(_box_distance2(box_tuple(box), point[0], point[1]))
+
+
+class SpatialIndexBaseTestCase(object):
+    """Tests common to RTree and DynamicRTree"""
+
+    def test_empty(self):
+        index = self.SpatialIndex([])
+        assert_equal(len(index), 0)
+        assert_equal(index.query_point((0, 0)), [])
+        assert_equal(index.query_box(random_boxes(1)[0]), [])
+        assert_equal(index.nearest((0, 0)), [])
+
+    def test_query_point(self):
+        boxes = random_boxes(300)
+        index = self.SpatialIndex(boxes)
+        assert_equal(len(index), 300)
+        points = random_points(200, seed=1)
+        points.append(boxes[0].min_point)
+        points.append(boxes[1].max_point)
+        for point in points:
+            assert_equal(index.query_point(point), [b for b in boxes
+                if boxes_intersect(box_tuple(b), tuple(point) * 2)])
+        assert_equal(index.query_points(points),
+            [index.query_point(p) for p in points])
+
+    def test_query_box(self):
+        boxes = random_boxes(300)
+        index = self.SpatialIndex(boxes)
+        queries = random_boxes(100, seed=2)
+        # Touching boxes intersect
+        queries.append(self.box_at(boxes[3].max_point, (1, 1)))
+        for query in queries:
+            found = index.query_box(query)
+            assert_equal(found, [b for b in boxes
+                if boxes_intersect(box_tuple(b), box_tuple(query))])
+        assert boxes[3] in index.query_box(queries[-1])
+        assert_equal(index.query_boxes(queries),
+            [index.query_box(q) for q in queries])
+
+    def box_at(self, point, size):
+        from planar import BoundingBox
+        return BoundingBox([point, (point[0] + size[0], point[1] + size[1])])
+
+    def test_nearest(self):
+        boxes = random_boxes(300)
+        index = self.SpatialIndex(boxes)
+        for point in random_points(50, seed=3):
+            distances = sorted(box_distance(b, point) for b in boxes)
+            for k in (1, 5, 20):
+                found = index.nearest(point, k)
+                assert_equal(len(found), k)
+                assert_equal(len(set(map(id, found))), k)
+                for shape, distance in zip(found, distances):
+                    assert_almost_equal(box_distance(shape, point), distance)
+        assert_equal(len(index.nearest((0, 0), 500)), 300)
+        assert_equal(index.nearest((0, 0), 0), [])
+        points = random_points(10, seed=4)
+        assert_equal(index.nearest_points(points, 3),
+            [index.nearest(p, 3) for p in points])
+
+    def test_shape_types(self):
+        import planar
+        square = planar.Polygon([(0, 0), (0, 1), (1, 1), (1, 0)])
+        triangle = planar.Polygon([(3, 3), (5, 3), (4, 6)])
+        segment = planar.LineSegment.from_points([(-2, 4), (-1, 2)])
+        box = planar.BoundingBox([(10, 10), (12, 11)])
+        index = self.SpatialIndex([square, triangle, segment, box])
+        assert_equal(index.query_point((0.5, 0.5)), [square])
+        assert_equal(index.query_point((4, 3)), [triangle])
+        assert_equal(index.query_point((-1.5, 3)), [segment])
+        assert_equal(index.query_point((11, 11)), [box])
+        assert_equal(index.query_point((2, 2)), [])
+        assert_equal(index.query_box(self.box_at((-1, 0), (5, 3))),
+            [square, triangle, segment])
+        assert_equal(index.nearest((9, 9), 2), [box, triangle])
+
+
+class RTreeTestCase(SpatialIndexBaseTestCase, unittest.TestCase):
+    from planar import RTree as SpatialIndex
+
+    def test_max_entries(self):
+        from planar import RTree
+        boxes = random_boxes(200)
+        points = random_points(50, seed=1)
+        expected = RTree(boxes).query_points(points)
+        for max_entries in (2, 3, 7, 300):
+            assert_equal(
+                RTree(boxes, max_entries).query_points(points), expected)
+
+    def test_iterator(self):
+        from planar import RTree
+        boxes = random_boxes(50)
+        index = RTree(iter(boxes))
+        assert_equal(len(index), 50)
+        assert_equal(index.query_box(self.box_at((-60, -60), (120, 120))),
+            boxes)
+
+    @raises(ValueError)
+    def test_too_few_max_entries(self):
+        from planar import RTree
+        RTree(random_boxes(10), 1)
+
+
+
+class DynamicRTreeTestCase(SpatialIndexBaseTestCase, unittest.TestCase):
+    from planar import DynamicRTree as SpatialIndex
+
+    def assert_index_matches(self, index, shapes):
+        assert_equal(len(index), len(shapes))
+        assert_equal(list(index), shapes)
+        for shape in shapes:
+            assert shape in index
+        for query in random_boxes(30, seed=5):
+            assert_equal(index.query_box(query), [s for s in shapes
+                if boxes_intersect(box_tuple(s), box_tuple(query))])
+
+    def test_insert_and_remove(self):
+        from planar import DynamicRTree
+        boxes = random_boxes(300)
+        index = DynamicRTree()
+        for box in boxes:
+            index.insert(box)
+        self.assert_index_matches(index, boxes)
+        rand = random.Random(6)
+        removed = rand.sample(boxes, 150)
+        for box in removed:
+            index.remove(box)
+            assert box not in index
+        boxes = [b for b in boxes if b not in removed]
+        self.assert_index_matches(index, boxes)
+        # Reinserted shapes are ordered last
+        for box in removed[:50]:
+            index.insert(box)
+        self.assert_index_matches(index, boxes + removed[:50])
+
+    def test_remove_all(self):
+        from planar import DynamicRTree
+        boxes = random_boxes(20)
+        index = DynamicRTree(boxes)
+        for box in boxes:
+            index.remove(box)
+        self.assert_index_matches(index, [])
+        assert_equal(index.nearest((0, 0)), [])
+        index.insert(boxes[0])
+        self.assert_index_matches(index, [boxes[0]])
+
+    def test_update(self):
+        import planar
+        segments = [planar.LineSegment((x, y), (1, 1))
+            for x, y in random_points(100)]
+        for margin in (0, 0.5):
+            index = planar.DynamicRTree(segments, margin=margin)
+            rand = random.Random(7)
+            for segment in segments[::3]:
+                segment.anchor = (rand.uniform(-55, 55), rand.uniform(-55, 55))
+                index.update(segment)
+            # Small moves within the margin
+            for segment in segments[1::3]:
+                segment.anchor += (0.1, -0.1)
+                index.update(segment)
+            self.assert_index_matches(index, segments)
+
+    def test_polygons_reindexed_on_mutation(self):
+        import planar
+        polys = [planar.Polygon.regular(5, 1, center=p)
+            for p in random_points(50)]
+        index = planar.DynamicRTree(polys)
+        polys[0][0] = (100, 100)
+        polys[1] *= planar.Affine.translation((-200, 0))
+        self.assert_index_matches(index, polys)
+        assert_equal(index.query_point((100, 100)), [polys[0]])
+        index.remove(polys[0])
+        # Removed polygons are no longer observed
+        polys[0][1] = (-100, -100)
+        self.assert_index_matches(index, polys[1:])
+
+    @raises(ValueError)
+    def test_insert_twice(self):
+        from planar import DynamicRTree
+        box = random_boxes(1)[0]
+        DynamicRTree([box]).insert(box)
+
+    @raises(KeyError)
+    def test_remove_missing(self):
+        from planar import DynamicRTree
+        boxes = random_boxes(2)
+        DynamicRTree(boxes[:1]).remove(boxes[1])
+
+    @raises(KeyError)
+    def test_update_missing(self):
+        from planar import DynamicRTree
+        boxes = random_boxes(2)
+        DynamicRTree(boxes[:1]).update(boxes[1])
+
+    @raises(ValueError)
+    def test_negative_margin(self):
+        from planar import DynamicRTree
+        DynamicRTree(margin=-1)
+
+
+def within(points, point, radius):
+    px, py = point
+    return [i for i, (x, y) in enumerate(points)
+        if (x - px)**2 + (y - py)**2 <= radius * radius]
+
+
+class PointGridTestCase(unittest.TestCase):
+
+    # Grids of 32 points or more are built with NumPy, when installed
+    sizes = (20, 500)
+
+    def test_query_radius(self):
+        from planar import PointGrid
+        for count in self.sizes:
+            points = random_points(count)
+            queries = random_points(30, seed=1) + points[:5]
+            for cell_size in (3, 10, 200):
+                grid = PointGrid(points, cell_size)
+                assert_equal(len(grid), count)
+                for radius in (0, 2.5, 10, 30, 200):
+                    for query in queries:
+                        assert_equal(grid.query_radius(query, radius), 
+                            within(points, query, radius))
+                assert_equal(grid.query_radius_points(queries, 5),
+                    [within(points, q, 5) for q in queries])
+
+    def test_query_radius_inclusive(self):
+        from planar import PointGrid
+        grid = PointGrid([(0, 0), (3, 4), (6, 8), (3, 4)], 1)
+        assert_equal(grid.query_radius((0, 0), 5), [0, 1, 3])
+        assert_equal(grid.query_radius((3, 4), 0), [1, 3])
+        assert_equal(grid.query_radius((0, 0), -1), [])
+
+    def test_pairs(self):
+        from planar import PointGrid
+        for count in self.sizes:
+            points = random_points(count)
+            for cell_size in (2, 10):
+                grid = PointGrid(points, cell_size)
+                for radius in (None, 0.5, cell_size):
+                    r = cell_size if radius is None else radius
+                    expected = sorted((i, j) for i in range(count)
+                        for j in within(points, points[i], r) if j > i)
+                    assert_equal(sorted(grid.pairs(radius)), expected)
+
+    def test_pairs_duplicates(self):
+        from planar import PointGrid
+        for count in self.sizes:
+            grid = PointGrid([(1, 1)] * count, 1)
+            assert_equal(len(list(grid.pairs(0))), count * (count - 1) // 2)
+
+    def test_empty(self):
+        from planar import PointGrid
+        grid = PointGrid([], 1)
+        assert_equal(len(grid), 0)
+        assert_equal(grid.query_radius((0, 0), 10), [])
+        assert_equal(list(grid.pairs()), [])
+
+    def test_points_copied(self):
+        from planar import PointGrid, Vec2Array
+        points = Vec2Array(random_points(100))
+        grid = PointGrid(points, 5)
+        expected = within(points, (0, 0), 20)
+        points[expected[0]] = (100, 100)
+        assert_equal(grid.query_radius((0, 0), 20), expected)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_points(self):
+        from planar import PointGrid
+        points = numpy.array(random_points(200)).round()
+        for array in (points, points[::2], points.astype(numpy.int64)):
+            grid = PointGrid(array, 5)
+            expected = within(array.tolist(), (0, 0), 20)
+            assert_equal(grid.query_radius((0, 0), 20), expected)
+
+    @raises(ValueError)
+    def test_pairs_radius_too_large(self):
+        from planar import PointGrid
+        list(PointGrid(random_points(10), 1).pairs(1.5))
+
+    @raises(ValueError)
+    def test_bad_cell_size(self):
+        from planar import PointGrid
+        PointGrid(random_points(10), 0)
+
+
+def nearest(points, point, k):
+    px, py = point
+    return sorted(range(len(points)), key=lambda i:
+        ((points[i][0] - px)**2 + (points[i][1] - py)**2, i))[:k]
+
+
+class KDTreeTestCase(unittest.TestCase):
+
+    # Trees of 32 points or more are built with NumPy, when installed
+    sizes = (20, 500)
+
+    def test_nearest(self):
+        from planar import KDTree
+        for count in self.sizes:
+            points = random_points(count)
+            queries = random_points(30, seed=1) + points[:5]
+            for leaf_size in (1, 8, 1000):
+                tree = KDTree(points, leaf_size)
+                assert_equal(len(tree), count)
+                for k in (1, 3, 50):
+                    for query in queries:
+                        assert_equal(tree.nearest(query, k),
+                            nearest(points, query, k))
+                assert_equal(tree.nearest_points(queries, 2),
+                    [nearest(points, q, 2) for q in queries])
+            assert_equal(tree.nearest((0, 0), 0), [])
+
+    def test_nearest_ties_by_index(self):
+        from planar import KDTree
+        points = [(1, 0), (0, 1), (-1, 0), (0, -1), (0, 0), (0, 1)]
+        tree = KDTree(points, leaf_size=1)
+        assert_equal(tree.nearest((0, 0), 3), [4, 0, 1])
+        assert_equal(tree.nearest((0, 1), 2), [1, 5])
+
+    def test_query_radius(self):
+        from planar import KDTree
+        for count in self.sizes:
+            points = random_points(count)
+            queries = random_points(30, seed=1) + points[:5]
+            for leaf_size in (1, 8):
+                tree = KDTree(points, leaf_size)
+                for radius in (0, 2.5, 30, 200):
+                    for query in queries:
+                        assert_equal(tree.query_radius(query, radius),
+                            within(points, query, radius))
+                assert_equal(tree.query_radius_points(queries, 5),
+                    [within(points, q, 5) for q in queries])
+            assert_equal(tree.query_radius((0, 0), -1), [])
+
+    def test_empty(self):
+        from planar import KDTree
+        tree = KDTree([])
+        assert_equal(len(tree), 0)
+        assert_equal(tree.nearest((0, 0)), [])
+        assert_equal(tree.query_radius((0, 0), 10), [])
+
+    def test_point_types(self):
+        import planar
+        poly = planar.Polygon.regular(40, 10)
+        tree = planar.KDTree(poly)
+        assert_equal(tree.nearest(poly[7] * 1.1), [7])
+        points = planar.Vec2Array(poly)
+        tree = planar.KDTree(points)
+        points[7] = (0, 0)
+        assert_equal(tree.nearest((0, 0), 40), nearest(poly, (0, 0), 40))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_points(self):
+        from planar import KDTree
+        points = numpy.array(random_points(200)).round()
+        for array in (points, points[::2], points.astype(numpy.int64)):
+            tree = KDTree(array)
+            assert_equal(tree.nearest((0, 0), 5), 
+                nearest(array.tolist(), (0, 0), 5))
+
+    @raises(ValueError)
+    def test_bad_leaf_size(self):
+        from planar import KDTree
+        KDTree(random_points(10), 0)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
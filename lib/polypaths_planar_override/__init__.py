@@ -32,18 +32,30 @@
 __all__ = ('TransformNotInvertibleError', 'set_epsilon', 
     'Vec2', 'Point', 'Vec2Array', 'Seq2', 
     'Line', 'Ray', 'LineSegment',
-    'Affine', 'BoundingBox', 'Polygon')
+    'Affine', 'BoundingBox', 'Polygon',
+    'RTree', 'DynamicRTree', 'PointGrid', 'KDTree',
+    'segment_intersections', 'ConvexHullBuilder', 'SegmentArray')
 
 __versioninfo__ = (0, 4, 0)
 __version__ = '.'.join(str(n) for n in __versioninfo__)
 
+import os
+import logging
+
+# Set this environment variable to a non-empty value to disable
+# the C extension, both when building and when importing
+_PURE_PYTHON_ENV = 'POLYPATHS_PLANAR_OVERRIDE_PURE_PYTHON'
+
 try: # pragma: no cover
+    if os.environ.get(_PURE_PYTHON_ENV):
+        raise ImportError("C extension disabled by $%s" % _PURE_PYTHON_ENV)
     # Default to C implementation
     from polypaths_planar_override.c import _set_epsilon, Vec2, Vec2Array, Seq2, Affine, \
-        BoundingBox, Polygon, TransformNotInvertibleError
+        Line, Ray, LineSegment, BoundingBox, Polygon, TransformNotInvertibleError
 
     __implementation__ = 'C'
-except ImportError: # pragma: no cover
+    _fallback_reason = None
+except ImportError as err: # pragma: no cover
     # Fall-back to Python implementation
     from polypaths_planar_override.vector import Vec2, Vec2Array, Seq2
     from polypaths_planar_override.transform import Affine
@@ -57,6 +69,19 @@ except ImportError: # pragma: no cover
     def _set_epsilon(e): pass
 
     __implementation__ = 'Python'
+    _fallback_reason = str(err)
+
+if _fallback_reason is None:
+    logging.getLogger(__name__).debug("using C implementation")
+else:
+    logging.getLogger(__name__).debug(
+        "using Python implementation (%s)", _fallback_reason)
+
+from polypaths_planar_override.spatial import RTree, DynamicRTree, PointGrid, \
+    KDTree
+from polypaths_planar_override.intersect import segment_intersections
+from polypaths_planar_override.hull import ConvexHullBuilder
+from polypaths_planar_override.segments import SegmentArray
 
 Point = Vec2
 """``Point`` is an alias for ``Vec2``. 
@@ -0,0 +1,201 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Rotating calipers measurements of convex polygons"""
+
+from __future__ import division
+
+import math
+import polypaths_planar_override
+from polypaths_planar_override.vector import _point_coords
+
+
+def _hull_loop(poly):
+    """Return the corners of the convex hull of a polygon as a list of
+    (x, y) tuples wound counter-clockwise, without repeated or collinear
+    vertices. The polygon itself is used if it is convex.
+    """
+    if not poly.is_convex:
+        poly = polypaths_planar_override.Polygon.convex_hull(poly)
+    coords = _point_coords(poly)
+    points = list(zip(coords[0::2], coords[1::2]))
+    corners = [p for p, q in zip(points, points[-1:] + points[:-1]) if p != q]
+    if not corners:
+        # All the vertices are the same point
+        return points[:1] * 2
+    points = corners
+    area2 = 0.0
+    x0, y0 = points[-1]
+    for x1, y1 in points:
+        area2 += x0 * y1 - x1 * y0
+        x0, y0 = x1, y1
+    if not area2:
+        # The hull is a line segment or a point, keep its ends
+        return [min(points), max(points)]
+    if area2 < 0.0:
+        points.reverse()
+    corners = []
+    (ax, ay), (bx, by) = points[-2:]
+    for cx, cy in points:
+        if (bx - ax) * (cy - by) - (by - ay) * (cx - bx):
+            corners.append((bx, by))
+        ax, ay, bx, by = bx, by, cx, cy
+    # Rotate the first corner back to the start
+    return corners[-1:] + corners[:-1]
+
+
+def _antipodal_vertices(points):
+    """Return, for each edge i of a counter-clockwise convex loop from 
+    vertex i to i + 1, the index of a vertex farthest from the edge's
+    line. The caliper index only moves forward, so this takes O(n) time.
+    """
+    count = len(points)
+    farthest = []
+    j = 1
+    for i in range(count):
+        ax, ay = points[i]
+        bx, by = points[(i + 1) % count]
+        ex = bx - ax
+        ey = by - ay
+        # Advance while the next vertex is farther from the edge
+        while True:
+            x0, y0 = points[j]
+            x1, y1 = points[(j + 1) % count]
+            if ex * (y1 - y0) - ey * (x1 - x0) <= 0.0:
+                break
+            j = (j + 1) % count
+        farthest.append(j)
+    return farthest
+
+
+def _farthest_pair(poly):
+    """Return the pair of vertices of the polygon farthest apart, using
+    rotating calipers around its convex hull in O(h) time
+    """
+    Vec2 = polypaths_planar_override.Vec2
+    points = _hull_loop(poly)
+    count = len(points)
+    if count < 3:
+        return Vec2(*points[0]), Vec2(*points[-1])
+    best = -1.0
+    pair = None
+    for i, j in enumerate(_antipodal_vertices(points)):
+        # Both ends of the edge, and the vertex after the antipodal 
+        # vertex for parallel edges, are candidates
+        for a in (i, (i + 1) % count):
+            for b in (j, (j + 1) % count):
+                ax, ay = points[a]
+                bx, by = points[b]
+                dist2 = (bx - ax)**2 + (by - ay)**2
+                if dist2 > best:
+                    best = dist2
+                    pair = (a, b)
+    return Vec2(*points[pair[0]]), Vec2(*points[pair[1]])
+
+
+def _min_width(poly):
+    """Return the minimum width of the polygon, the smallest distance
+    between two parallel lines enclosing it, and the unit direction of
+    the lines. One line lies along an edge of the convex hull, so each
+    edge and its antipodal vertex are measured, in O(h) time.
+    """
+    Vec2 = polypaths_planar_override.Vec2
+    points = _hull_loop(poly)
+    count = len(points)
+    if count < 3:
+        (ax, ay), (bx, by) = points[0], points[-1]
+        length = math.hypot(bx - ax, by - ay)
+        if not length:
+            return 0.0, Vec2(1.0, 0.0)
+        return 0.0, Vec2((bx - ax) / length, (by - ay) / length)
+    width = None
+    for i, j in enumerate(_antipodal_vertices(points)):
+        ax, ay = points[i]
+        bx, by = points[(i + 1) % count]
+        px, py = points[j]
+        ex = bx - ax
+        ey = by - ay
+        length = math.hypot(ex, ey)
+        height = (ex * (py - ay) - ey * (px - ax)) / length
+        if width is None or height < width:
+            width = height
+            direction = Vec2(ex / length, ey / length)
+    return width, direction
+
+
+def _min_rectangle(poly, perimeter=False):
+    """Return the rectangle enclosing the polygon with the minimum area, 
+    or minimum perimeter, as a counter-clockwise polygon. One side of the
+    rectangle lies along an edge of the convex hull. For each edge, the
+    hull's extreme vertices along and away from the edge are found by
+    three calipers, which only move forward, in O(h) time overall.
+    """
+    Polygon = polypaths_planar_override.Polygon
+    points = _hull_loop(poly)
+    count = len(points)
+    if count < 3:
+        a, b = points[0], points[-1]
+        return Polygon([a, b, b, a])
+    farthest = _antipodal_vertices(points)
+    best = None
+    right = 1
+    left = None
+    for i in range(count):
+        ax, ay = points[i]
+        bx, by = points[(i + 1) % count]
+        length = math.hypot(bx - ax, by - ay)
+        ux = (bx - ax) / length
+        uy = (by - ay) / length
+
+        def along(k):
+            x, y = points[k % count]
+            return (x - ax) * ux + (y - ay) * uy
+
+        while along(right + 1) > along(right):
+            right = (right + 1) % count
+        if left is None:
+            left = farthest[i]
+        while along(left + 1) < along(left):
+            left = (left + 1) % count
+        px, py = points[farthest[i]]
+        height = ux * (py - ay) - uy * (px - ax)
+        min_u = along(left)
+        max_u = along(right)
+        width = max_u - min_u
+        measure = width + height if perimeter else width * height
+        if best is None or measure < best:
+            best = measure
+            corners = (ax, ay, ux, uy, min_u, max_u, height)
+    ax, ay, ux, uy, min_u, max_u, height = corners
+    x0 = ax + ux * min_u
+    y0 = ay + uy * min_u
+    x1 = ax + ux * max_u
+    y1 = ay + uy * max_u
+    vx = -uy * height
+    vy = ux * height
+    return Polygon([(x0, y0), (x1, y1), (x1 + vx, y1 + vy), (x0 + vx, y0 + vy)], 
+        is_convex=True)
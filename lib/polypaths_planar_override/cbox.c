@@ -11,7 +11,7 @@
 #include "Python.h"
 #include <float.h>
 #include <string.h>
-#include "polypaths_planar_override.h"
+#include "planar.h"
 
 #define BBOX_FREE_MAX 200
 static PyObject *bbox_free_list = NULL;
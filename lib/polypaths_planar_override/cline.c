@@ -12,7 +12,7 @@
 #include <structmember.h>
 #include <float.h>
 #include <string.h>
-#include "polypaths_planar_override.h"
+#include "planar.h"
 
 /* Property descriptors */
 
@@ -0,0 +1,376 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Polygon boolean operations by splitting and classifying edges"""
+
+from __future__ import division
+
+import math
+from array import array
+from copy import copy
+import polypaths_planar_override
+from polypaths_planar_override.vector import _point_coords
+from polypaths_planar_override.intersect import _sweep_intersections, \
+    _segments_intersect, _intersection_point
+
+_DROPPED, _FORWARD, _REVERSED = range(3)
+
+# How each operation keeps the edges of operands a and b, split where
+# they meet, that lie outside and inside of the other operand. The last 
+# item is the direction, same (True) or opposite (False), of the edges
+# shared by both operands that are kept once, or None to drop them all.
+_EDGE_RULES = {
+    'union': (_FORWARD, _DROPPED, _FORWARD, _DROPPED, True),
+    'intersection': (_DROPPED, _FORWARD, _DROPPED, _FORWARD, True),
+    'difference': (_FORWARD, _DROPPED, _DROPPED, _REVERSED, False),
+    'xor': (_FORWARD, _REVERSED, _FORWARD, _REVERSED, None),
+}
+
+# Convex polygons are intersected by Sutherland-Hodgman clipping,
+# which takes O(n * m) time, when the product of their vertex counts
+# is no larger than this. Larger polygons take the O(n log n) sweep.
+_clip_convex_max_work = 4096
+
+# Polygons that are not convex are prepared for point location when
+# more than this many points are tested against them
+_prepare_min_points = 4096
+
+
+def _as_polygon(shape):
+    """Return shape as a polygon, converting other point sequences"""
+    if isinstance(shape, polypaths_planar_override.Polygon):
+        return shape
+    return polypaths_planar_override.Polygon(shape)
+
+
+def _ccw_points(poly):
+    """Return the vertices of a polygon as a list of (x, y) tuples
+    wound counter-clockwise, without repeated consecutive points, 
+    and whether the order was reversed.
+    """
+    coords = _point_coords(poly)
+    points = list(zip(coords[0::2], coords[1::2]))
+    points = [p for p, q in zip(points, points[-1:] + points[:-1]) if p != q]
+    if _signed_area2(points) < 0.0:
+        points.reverse()
+        return points, True
+    return points, False
+
+
+def _signed_area2(points):
+    """Return twice the signed area of a closed loop of (x, y) tuples"""
+    area2 = 0.0
+    if points:
+        x0, y0 = points[-1]
+        for x1, y1 in points:
+            area2 += x0 * y1 - x1 * y0
+            x0, y0 = x1, y1
+    return area2
+
+
+def _ccw_polygon(cls, poly, points, reversed_):
+    """Return the operand polygon as a cls wound counter-clockwise, 
+    copying it with its cached properties if it already is one
+    """
+    if not reversed_ and type(poly) is cls:
+        return copy(poly)
+    return cls(points, is_convex=poly.is_convex or None, is_simple=True)
+
+
+def _clip_convex(subject, clip):
+    """Clip a convex loop of (x, y) tuples to the half-plane left of each
+    edge of a counter-clockwise convex loop, by the Sutherland-Hodgman 
+    algorithm, and return the clipped loop.
+    """
+    output = subject
+    cx0, cy0 = clip[-1]
+    for cx1, cy1 in clip:
+        if not output:
+            break
+        loop = output
+        output = []
+        ex = cx1 - cx0
+        ey = cy1 - cy0
+        px, py = loop[-1]
+        p_side = ex * (py - cy0) - (px - cx0) * ey
+        for qx, qy in loop:
+            q_side = ex * (qy - cy0) - (qx - cx0) * ey
+            if (p_side < 0.0 and q_side > 0.0) or (
+                p_side > 0.0 and q_side < 0.0):
+                t = p_side / (p_side - q_side)
+                output.append((px + (qx - px) * t, py + (qy - py) * t))
+            if q_side >= 0.0:
+                output.append((qx, qy))
+            px, py, p_side = qx, qy, q_side
+        cx0, cy0 = cx1, cy1
+    return [p for p, q in zip(output, output[-1:] + output[:-1]) if p != q]
+
+
+def _split_edges(loops, window):
+    """Split the edges of two counter-clockwise loops of (x, y) tuples
+    where they cross or touch each other. Return the directed sub-edges
+    of each loop as lists of ((x0, y0), (x1, y1)) tuples, and the set
+    of points where the loops touch.
+    Only edges overlapping the window (min_x, min_y, max_x, max_y),
+    where the loops' bounding boxes overlap, can meet the other loop.
+    """
+    min_x, min_y, max_x, max_y = window
+    segments = []
+    owners = []
+    for owner, loop in enumerate(loops):
+        p0 = loop[-1]
+        for i, p1 in enumerate(loop):
+            if not (max(p0[0], p1[0]) < min_x or min(p0[0], p1[0]) > max_x
+                or max(p0[1], p1[1]) < min_y or min(p0[1], p1[1]) > max_y):
+                segments.append(p0 + p1 if p0 <= p1 else p1 + p0)
+                owners.append((owner, i))
+            p0 = p1
+    splits = [{} for loop in loops]
+    contacts = set()
+
+    def add_split(seg, point):
+        owner, i = owners[seg]
+        splits[owner].setdefault(i, []).append(point)
+        contacts.add(point)
+
+    def intersects(i, j):
+        if owners[i][0] == owners[j][0]:
+            return False
+        ax, ay, bx, by = segments[i]
+        cx, cy, dx, dy = segments[j]
+        if not ((bx - ax)*(cy - ay) - (cx - ax)*(by - ay) 
+            or (bx - ax)*(dy - ay) - (dx - ax)*(by - ay)):
+            # Collinear segments overlap where each has an end point 
+            # on the other, ordered lexicographically along the line
+            for seg, (p0, p1), points in (
+                (i, ((ax, ay), (bx, by)), ((cx, cy), (dx, dy))),
+                (j, ((cx, cy), (dx, dy)), ((ax, ay), (bx, by)))):
+                for point in points:
+                    if p0 <= point <= p1:
+                        add_split(seg, point)
+        elif _segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+            point = _intersection_point(ax, ay, bx, by, cx, cy, dx, dy)
+            add_split(i, point)
+            add_split(j, point)
+        return False
+
+    for pair in _sweep_intersections(segments, intersects):
+        pass
+
+    all_edges = []
+    for loop, loop_splits in zip(loops, splits):
+        edges = []
+        p0 = loop[-1]
+        for i, p1 in enumerate(loop):
+            if i in loop_splits:
+                x0, y0 = p0
+                ex = p1[0] - x0
+                ey = p1[1] - y0
+                points = sorted(loop_splits[i], 
+                    key=lambda p: (p[0] - x0) * ex + (p[1] - y0) * ey)
+                start = p0
+                for point in points + [p1]:
+                    if point != start:
+                        edges.append((start, point))
+                        start = point
+            else:
+                edges.append((p0, p1))
+            p0 = p1
+        all_edges.append(edges)
+    return all_edges, contacts
+
+
+def _inside_flags(edges, poly, contacts):
+    """Return a list of flags, True for each edge inside the polygon. 
+    The edges are in order around their loop, and their inside state
+    can only change at points of contact with the polygon, so one 
+    midpoint is tested for each run of edges between contacts. Edges
+    outside of the polygon's bounding box are not tested.
+    """
+    bbox = poly.bounding_box
+    (min_x, min_y), (max_x, max_y) = bbox.min_point, bbox.max_point
+    runs = []
+    tested = []
+    midpoints = array('d')
+    end = None
+    for (x0, y0), (x1, y1) in edges:
+        if (x0, y0) != end or end in contacts:
+            mx = (x0 + x1) * 0.5
+            my = (y0 + y1) * 0.5
+            if min_x <= mx <= max_x and min_y <= my <= max_y:
+                tested.append(len(runs))
+                midpoints.append(mx)
+                midpoints.append(my)
+            runs.append(False)
+        end = (x1, y1)
+    if tested:
+        if (len(tested) > _prepare_min_points and not poly.is_convex
+            and not poly.is_prepared):
+            poly.prepare()
+        for run, inside in zip(tested, poly.contains_points(midpoints)):
+            runs[run] = bool(inside)
+    flags = []
+    run = -1
+    end = None
+    for start, next_end in edges:
+        if start != end or end in contacts:
+            run += 1
+        flags.append(runs[run])
+        end = next_end
+    return flags
+
+
+def _select_edges(operation, edges_a, edges_b, contacts, poly_a, poly_b):
+    """Return the directed edges bounding the result of the operation,
+    with the result's interior on their left
+    """
+    directions = {}
+    for p0, p1 in edges_b:
+        directions[(p0, p1) if p0 < p1 else (p1, p0)] = p0 < p1
+    shared = {}
+    unshared_a = []
+    for p0, p1 in edges_a:
+        key = (p0, p1) if p0 < p1 else (p1, p0)
+        if key in directions:
+            shared[key] = directions[key] == (p0 < p1)
+        else:
+            unshared_a.append((p0, p1))
+    unshared_b = [(p0, p1) for p0, p1 in edges_b 
+        if ((p0, p1) if p0 < p1 else (p1, p0)) not in shared]
+
+    keep_a_out, keep_a_in, keep_b_out, keep_b_in, keep_shared = (
+        _EDGE_RULES[operation])
+    selected = []
+    for edges, poly, keep_out, keep_in in (
+        (unshared_a, poly_b, keep_a_out, keep_a_in),
+        (unshared_b, poly_a, keep_b_out, keep_b_in)):
+        inside = _inside_flags(edges, poly, contacts)
+        for (p0, p1), is_inside in zip(edges, inside):
+            keep = keep_in if is_inside else keep_out
+            if keep == _FORWARD:
+                selected.append((p0, p1))
+            elif keep == _REVERSED:
+                selected.append((p1, p0))
+    for p0, p1 in edges_a:
+        key = (p0, p1) if p0 < p1 else (p1, p0)
+        if key in shared and shared[key] == keep_shared:
+            selected.append((p0, p1))
+    return selected
+
+
+def _link_loops(edges):
+    """Link directed edges into closed loops of (x, y) tuples. Where 
+    several edges leave a vertex, the loop turns most sharply left, so
+    that loops touching at a vertex are kept apart.
+    """
+    outgoing = {}
+    for p0, p1 in edges:
+        outgoing.setdefault(p0, []).append(p1)
+    loops = []
+    for start, _ in edges:
+        while outgoing[start]:
+            loop = [start]
+            prev = start
+            point = outgoing[start].pop()
+            while point != start:
+                loop.append(point)
+                ends = outgoing.get(point)
+                if not ends:
+                    break
+                index = 0
+                if len(ends) > 1:
+                    # Measure the counter-clockwise angle from each
+                    # edge leaving the point back to the arriving edge
+                    x, y = point
+                    rx = prev[0] - x
+                    ry = prev[1] - y
+                    best = None
+                    for i, (ex, ey) in enumerate(ends):
+                        ex -= x
+                        ey -= y
+                        angle = math.atan2(ex * ry - ey * rx, ex * rx + ey * ry)
+                        if angle <= 0.0:
+                            angle += 2.0 * math.pi
+                        if best is None or angle < best:
+                            index = i
+                            best = angle
+                prev = point
+                point = ends.pop(index)
+            else:
+                loops.append(loop)
+    return loops
+
+
+def _polygon_boolean(poly, other, operation):
+    """Return a list of polygons covering the result of a boolean
+    operation between two simple polygons. The outer boundaries of the
+    result are wound counter-clockwise, and the boundaries of holes in 
+    them clockwise. The polygons are of the same type as poly.
+
+    :param operation: One of ``'union'``, ``'intersection'``, 
+        ``'difference'`` or ``'xor'``.
+    """
+    if operation not in _EDGE_RULES:
+        raise ValueError("Unknown polygon boolean operation: %r" 
+            % (operation,))
+    other = _as_polygon(other)
+    if not (poly.is_simple and other.is_simple):
+        raise ValueError("Polygon boolean operations require simple polygons")
+    Polygon = type(poly)
+    points_a, reversed_a = _ccw_points(poly)
+    points_b, reversed_b = _ccw_points(other)
+    empty_a = len(points_a) < 3 or not _signed_area2(points_a)
+    empty_b = len(points_b) < 3 or not _signed_area2(points_b)
+    bbox_a = poly.bounding_box
+    bbox_b = other.bounding_box
+    (min_xa, min_ya), (max_xa, max_ya) = bbox_a.min_point, bbox_a.max_point
+    (min_xb, min_yb), (max_xb, max_yb) = bbox_b.min_point, bbox_b.max_point
+    window = (max(min_xa, min_xb), max(min_ya, min_yb), 
+        min(max_xa, max_xb), min(max_ya, max_yb))
+    if (empty_a or empty_b 
+        or window[0] > window[2] or window[1] > window[3]):
+        # The operands cannot overlap
+        results = []
+        if not empty_a and operation != 'intersection':
+            results.append(_ccw_polygon(Polygon, poly, points_a, reversed_a))
+        if not empty_b and operation in ('union', 'xor'):
+            results.append(
+                _ccw_polygon(Polygon, other, points_b, reversed_b))
+        return results
+
+    convex = poly.is_convex and other.is_convex
+    if (operation == 'intersection' and convex
+        and len(points_a) * len(points_b) <= _clip_convex_max_work):
+        loops = [_clip_convex(points_a, points_b)]
+    else:
+        (edges_a, edges_b), contacts = _split_edges(
+            (points_a, points_b), window)
+        loops = _link_loops(_select_edges(
+            operation, edges_a, edges_b, contacts, poly, other))
+    is_convex = (operation == 'intersection' and convex) or None
+    return [Polygon(loop, is_convex=is_convex) for loop in loops 
+        if len(loop) >= 3 and _signed_area2(loop)]
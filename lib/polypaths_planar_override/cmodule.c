@@ -9,7 +9,7 @@
 * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
 ****************************************************************************/
 #include "Python.h"
-#include "polypaths_planar_override.h"
+#include "planar.h"
 
 double polypaths_planar_override_EPSILON = 1e-5;
 double polypaths_planar_override_EPSILON2 = 1e-5 * 1e-5;
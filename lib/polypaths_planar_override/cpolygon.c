@@ -11,7 +11,7 @@
 #include "Python.h"
 #include <float.h>
 #include <string.h>
-#include "polypaths_planar_override.h"
+#include "planar.h"
 
 static polypaths_planar_overridePolygonObject *
 Poly_create_new(PyTypeObject *type, PyObject *args, PyObject *kwargs)
@@ -79,11 +79,10 @@ static void
 Poly_dealloc(polypaths_planar_overridePolygonObject *self) {
 	Py_XDECREF(self->bbox);
 	self->bbox = NULL;
-	if (self->lt_y_poly != NULL) {
-		PyMem_Free(self->lt_y_poly);
-		self->lt_y_poly = NULL;
-		self->rt_y_poly = NULL;
-	}
+	Py_CLEAR(self->observers);
+	Py_CLEAR(self->triangles);
+	Py_CLEAR(self->trapezoids);
+	Py_CLEAR(self->lod);
     Py_TYPE(self)->tp_free((PyObject *)self);
 }
 
@@ -103,20 +102,15 @@ Poly_copy(polypaths_planar_overridePolygonObject *self, PyObject *args)
 		poly->flags = self->flags;
 		poly->centroid.x = self->centroid.x;
 		poly->centroid.y = self->centroid.y;
+		poly->area2 = self->area2;
+		poly->moment.x = self->moment.x;
+		poly->moment.y = self->moment.y;
 		poly->min_r2 = self->min_r2;
 		poly->max_r2 = self->max_r2;
-		if (self->lt_y_poly != NULL) {
-			poly->lt_y_poly = (polypaths_planar_override_vec2_t *)PyMem_Malloc(
-				sizeof(polypaths_planar_override_vec2_t) * (Py_SIZE(self) + 2));
-			if (poly == NULL) {
-				Py_DECREF(poly);
-				return PyErr_NoMemory();
-			}
-			memcpy(poly->lt_y_poly, self->lt_y_poly, 
-				sizeof(polypaths_planar_override_vec2_t) * (Py_SIZE(self) + 2));
-			poly->rt_y_poly = poly->lt_y_poly + (
-				self->rt_y_poly - self->lt_y_poly);
-		}
+		Py_XINCREF(self->triangles);
+		poly->triangles = self->triangles;
+		Py_XINCREF(self->trapezoids);
+		poly->trapezoids = self->trapezoids;
 		return (PyObject *)poly;
 	} else {
 		result = call_from_points((PyObject *)self, (PyObject *)poly);
@@ -472,22 +466,28 @@ Poly_classify(polypaths_planar_overridePolygonObject *self)
 	double side = 0.0;
 	double last_side = 0.0;
 	int last_dir, this_dir;
+	Py_ssize_t j, first;
 	DUP_FIRST_VERT(self);
 
 	for (i = 1; i <= size && !last_dx && !last_dy; ++i) {
 		last_dx = vert[i].x - vert[i - 1].x;
 		last_dy = vert[i].y - vert[i - 1].y;
 	}
+	/* The first edge used ends at vertex first. When the last vertex 
+	 * repeats the first, the edges wrap around past the end, so that 
+	 * the turn onto this edge is checked too */
+	first = i - 1;
 
 	last_dir = last_dx ? (last_dx < 0.0) - (last_dx > 0.0) 
 		: (last_dy < 0.0) - (last_dy > 0.0);
 
-	for (; i <= size && same_turns && dir_changes <= 2; ++i) {
-		dx = vert[i].x - vert[i - 1].x;
-		dy = vert[i].y - vert[i - 1].y;
+	for (; i <= size + first && same_turns && dir_changes <= 2; ++i) {
+		j = i > size ? i - size : i;
+		dx = vert[j].x - vert[j - 1].x;
+		dy = vert[j].y - vert[j - 1].y;
 		if (dx != 0.0 || dy != 0.0) {
 			this_dir = (dx < 0.0) - (dx > 0.0) ;
-			this_dir += (!this_dir) & ((dy < 0.0) - (dy > 0.0));
+			this_dir += (!this_dir) * ((dy < 0.0) - (dy > 0.0));
 			dir_changes += (this_dir == -last_dir);
 			last_dir = this_dir;
 			side = last_dx * dy - last_dy * dx;
@@ -498,7 +498,7 @@ Poly_classify(polypaths_planar_overridePolygonObject *self)
 			}
 			last_dx = dx;
 			last_dy = dy;
-			++count;
+			count += (i <= size);
 		}
 	}
 	if (same_turns && dir_changes <= 2) {
@@ -522,67 +522,380 @@ Poly_classify(polypaths_planar_overridePolygonObject *self)
 	}
 }
 
-/* Check the polygon for self-intersection */
+/* Plane sweep state for checking polygon simplicity. Edge i runs from
+ * vertex i to vertex i + 1, with its end points stored left to right in
+ * seg. The edges crossing the sweep line are kept ordered from bottom to
+ * top in a treap, a binary tree balanced by random node priorities, whose
+ * nodes are indexed by edge.
+ */
+typedef struct {
+	double x, y;
+	int kind; /* 0 for an edge start, 1 for an edge end */
+	Py_ssize_t edge;
+} polypaths_planar_override_sweep_event_t;
+
+typedef struct {
+	const polypaths_planar_override_vec2_t *vert;
+	Py_ssize_t size;
+	double *seg;
+	Py_ssize_t *left;
+	Py_ssize_t *right;
+	Py_ssize_t *parent;
+	unsigned long *priority;
+	char *in_tree;
+	char *mark;
+	Py_ssize_t root;
+	unsigned long random;
+} polypaths_planar_override_sweep_t;
+
+static int
+compare_sweep_events(const void *a, const void *b)
+{
+	const polypaths_planar_override_sweep_event_t *ea = 
+		(polypaths_planar_override_sweep_event_t *)a;
+	const polypaths_planar_override_sweep_event_t *eb = 
+		(polypaths_planar_override_sweep_event_t *)b;
+	int result = (ea->x > eb->x) - (ea->x < eb->x);
+	if (!result) {
+		result = (ea->y > eb->y) - (ea->y < eb->y);
+	}
+	if (!result) {
+		result = (ea->kind > eb->kind) - (ea->kind < eb->kind);
+	}
+	if (!result) {
+		result = (ea->edge > eb->edge) - (ea->edge < eb->edge);
+	}
+	return result;
+}
+
+/* Return positive if the point is above the edge's line, negative if 
+ * below, zero if on it 
+ */
+static double
+sweep_side(polypaths_planar_override_sweep_t *sweep, Py_ssize_t edge, double px, double py)
+{
+	const double *s = sweep->seg + edge * 4;
+	return (s[2] - s[0])*(py - s[1]) - (px - s[0])*(s[3] - s[1]);
+}
+
+/* Return true if two non-adjacent edges intersect */
+static int
+sweep_test(polypaths_planar_override_sweep_t *sweep, Py_ssize_t a, Py_ssize_t b)
+{
+	const Py_ssize_t d = a > b ? a - b : b - a;
+	if (a == -1 || b == -1 || d <= 1 || d == sweep->size - 1) {
+		return 0;
+	}
+	return segments_intersect(sweep->vert + a, sweep->vert + a + 1, 
+		sweep->vert + b, sweep->vert + b + 1);
+}
+
+static void
+sweep_rotate_up(polypaths_planar_override_sweep_t *sweep, Py_ssize_t node)
+{
+	Py_ssize_t *left = sweep->left;
+	Py_ssize_t *right = sweep->right;
+	Py_ssize_t *parent = sweep->parent;
+	const Py_ssize_t up = parent[node];
+	const Py_ssize_t grand_parent = parent[up];
+	Py_ssize_t child;
+
+	if (left[up] == node) {
+		child = right[node];
+		left[up] = child;
+		right[node] = up;
+	} else {
+		child = left[node];
+		right[up] = child;
+		left[node] = up;
+	}
+	if (child != -1) {
+		parent[child] = up;
+	}
+	parent[up] = node;
+	parent[node] = grand_parent;
+	if (grand_parent == -1) {
+		sweep->root = node;
+	} else if (left[grand_parent] == up) {
+		left[grand_parent] = node;
+	} else {
+		right[grand_parent] = node;
+	}
+}
+
+/* Insert an edge starting at its left end point, ordering it by the side
+ * of each edge it starts on, then by its direction, then by index.
+ */
+static void
+sweep_insert(polypaths_planar_override_sweep_t *sweep, Py_ssize_t edge)
+{
+	const double *s = sweep->seg + edge * 4;
+	Py_ssize_t current = sweep->root;
+	Py_ssize_t *child;
+	double side;
+
+	sweep->random ^= sweep->random << 13;
+	sweep->random ^= sweep->random >> 17;
+	sweep->random ^= sweep->random << 5;
+	sweep->random &= 0xffffffffUL;
+	sweep->priority[edge] = sweep->random;
+	sweep->left[edge] = sweep->right[edge] = sweep->parent[edge] = -1;
+	sweep->in_tree[edge] = 1;
+	if (current == -1) {
+		sweep->root = edge;
+		return;
+	}
+	for (;;) {
+		side = sweep_side(sweep, current, s[0], s[1]);
+		if (side == 0.0) {
+			side = sweep_side(sweep, current, s[2], s[3]);
+			if (side == 0.0) {
+				side = (double)(edge - current);
+			}
+		}
+		child = side < 0.0 ? sweep->left + current : sweep->right + current;
+		if (*child == -1) {
+			*child = edge;
+			break;
+		}
+		current = *child;
+	}
+	sweep->parent[edge] = current;
+	while (sweep->parent[edge] != -1 
+		&& sweep->priority[edge] > sweep->priority[sweep->parent[edge]]) {
+		sweep_rotate_up(sweep, edge);
+	}
+}
+
+static void
+sweep_remove(polypaths_planar_override_sweep_t *sweep, Py_ssize_t edge)
+{
+	Py_ssize_t *left = sweep->left;
+	Py_ssize_t *right = sweep->right;
+	Py_ssize_t child, up;
+
+	/* Rotate the node down until it has at most one child */
+	while (left[edge] != -1 && right[edge] != -1) {
+		if (sweep->priority[left[edge]] > sweep->priority[right[edge]]) {
+			sweep_rotate_up(sweep, left[edge]);
+		} else {
+			sweep_rotate_up(sweep, right[edge]);
+		}
+	}
+	child = left[edge] != -1 ? left[edge] : right[edge];
+	up = sweep->parent[edge];
+	if (child != -1) {
+		sweep->parent[child] = up;
+	}
+	if (up == -1) {
+		sweep->root = child;
+	} else if (left[up] == edge) {
+		left[up] = child;
+	} else {
+		right[up] = child;
+	}
+	sweep->in_tree[edge] = 0;
+}
+
+/* Return the edge next to the given edge in the sweep line, below it 
+ * if down is true, otherwise above it, or -1 if there is none.
+ */
+static Py_ssize_t
+sweep_next(polypaths_planar_override_sweep_t *sweep, Py_ssize_t edge, int down)
+{
+	Py_ssize_t *toward = down ? sweep->left : sweep->right;
+	Py_ssize_t *away = down ? sweep->right : sweep->left;
+	Py_ssize_t *parent = sweep->parent;
+
+	if (toward[edge] != -1) {
+		edge = toward[edge];
+		while (away[edge] != -1) {
+			edge = away[edge];
+		}
+		return edge;
+	}
+	while (parent[edge] != -1 && toward[parent[edge]] == edge) {
+		edge = parent[edge];
+	}
+	return parent[edge];
+}
+
+/* Return an edge in the sweep line containing the point, or -1 */
+static Py_ssize_t
+sweep_find(polypaths_planar_override_sweep_t *sweep, double px, double py)
+{
+	Py_ssize_t node = sweep->root;
+	double side;
+
+	while (node != -1) {
+		side = sweep_side(sweep, node, px, py);
+		if (side == 0.0) {
+			break;
+		}
+		node = side < 0.0 ? sweep->left[node] : sweep->right[node];
+	}
+	return node;
+}
+
+/* Check the polygon for self-intersection using a Shamos-Hoey plane 
+ * sweep, stopping at the first intersection between non-adjacent edges. 
+ * All events at a point are handled together. The edges passing through
+ * the point are tested pairwise with the edges starting there, the edges
+ * ending there are removed, then the edges starting there are inserted, 
+ * testing each edge against its new neighbors.
+ */
 static int
 Poly_check_is_simple(polypaths_planar_overridePolygonObject *self)
 {
-	polypaths_planar_override_vec2_t **points, **p, *v;
-	polypaths_planar_override_vec2_t **open = NULL;
-	polypaths_planar_override_vec2_t **o, **next_open;
 	const Py_ssize_t size = Py_SIZE(self);
-	const Py_ssize_t last_index = size - 1;
-	int result = 1;
+	polypaths_planar_override_sweep_t sweep;
+	polypaths_planar_override_sweep_event_t *events = NULL;
+	polypaths_planar_override_sweep_event_t *group, *group_end, *e;
+	Py_ssize_t *touching = NULL;
+	Py_ssize_t i, j, touch_count, through_count, edge, seed;
+	const polypaths_planar_override_vec2_t *a, *b;
+	double px, py;
+	int down, simple = 1;
+	char *block = NULL;
 
-	points = (polypaths_planar_override_vec2_t **)PyMem_Malloc(
-		sizeof(polypaths_planar_override_vec2_t *) * size);
-	if (points == NULL) {
-		PyErr_NoMemory();
-		result = 0;
-		goto finish;
-	}
 	DUP_FIRST_VERT(self);
-	p = points;
-	for (v = self->vert; v < self->vert + size; ++v) {
-		*(p++) = v;
-	}
-	qsort(points, size, sizeof(polypaths_planar_override_vec2_t *), compare_vec_lexi);	
-	open = (polypaths_planar_override_vec2_t **)PyMem_Malloc(
-		sizeof(polypaths_planar_override_vec2_t *) * (size + 1));
-	if (open == NULL) {
+	block = (char *)PyMem_Malloc(size * (4 * sizeof(double) 
+		+ 2 * sizeof(polypaths_planar_override_sweep_event_t)
+		+ 4 * sizeof(Py_ssize_t) + sizeof(unsigned long) + 2));
+	if (block == NULL) {
 		PyErr_NoMemory();
-		result = 0;
-		goto finish;
-	}
-
-	next_open = open;
-	for (p = points; p < points + size; ++p) {
-		for (o = open; o < next_open; ++o) {
-			if ((*p == (*o)+1) | (*o - *p == last_index)) {
-				/* Segment end point */ 
-				--next_open;
-				if (o < next_open && *o != *next_open) {
-					*o = *next_open;
-					--o;
+		return 0;
+	}
+	sweep.seg = (double *)block;
+	events = (polypaths_planar_override_sweep_event_t *)(sweep.seg + size * 4);
+	sweep.left = (Py_ssize_t *)(events + size * 2);
+	sweep.right = sweep.left + size;
+	sweep.parent = sweep.right + size;
+	touching = sweep.parent + size;
+	sweep.priority = (unsigned long *)(touching + size);
+	sweep.in_tree = (char *)(sweep.priority + size);
+	sweep.mark = sweep.in_tree + size;
+	memset(sweep.mark, 0, size);
+	sweep.vert = self->vert;
+	sweep.size = size;
+	sweep.root = -1;
+	sweep.random = 2463534242UL;
+
+	/* Zero length edges intersect nothing, and never enter the sweep */
+	e = events;
+	for (i = 0; i < size; ++i) {
+		a = self->vert + i;
+		b = a + 1;
+		if (a->x > b->x || (a->x == b->x && a->y > b->y)) {
+			a = b;
+			b = self->vert + i;
+		}
+		sweep.seg[i*4] = a->x;
+		sweep.seg[i*4 + 1] = a->y;
+		sweep.seg[i*4 + 2] = b->x;
+		sweep.seg[i*4 + 3] = b->y;
+		sweep.in_tree[i] = 0;
+		if (a->x != b->x || a->y != b->y) {
+			e->x = a->x;
+			e->y = a->y;
+			e->kind = 0;
+			e->edge = i;
+			++e;
+			e->x = b->x;
+			e->y = b->y;
+			e->kind = 1;
+			e->edge = i;
+			++e;
+		}
+	}
+	group_end = e;
+	qsort(events, group_end - events, 
+		sizeof(polypaths_planar_override_sweep_event_t), compare_sweep_events);
+
+	for (group = events; group < group_end && simple; group = e) {
+		px = group->x;
+		py = group->y;
+		for (e = group; e < group_end && e->x == px && e->y == py; ++e);
+
+		/* Gather the edges through the point, which are adjacent in the
+		 * sweep line, seeded by those ending there */
+		touch_count = 0;
+		seed = -1;
+		if (e[-1].kind == 0) {
+			seed = sweep_find(&sweep, px, py);
+		}
+		for (j = 0; j < e - group; ++j) {
+			if (group[j].kind == 1) {
+				seed = group[j].edge;
+			}
+			if (seed == -1 || sweep.mark[seed]) {
+				continue;
+			}
+			touching[touch_count++] = seed;
+			sweep.mark[seed] = 1;
+			for (down = 0; down < 2; ++down) {
+				edge = sweep_next(&sweep, seed, down);
+				while (edge != -1 && sweep_side(&sweep, edge, px, py) == 0.0) {
+					touching[touch_count++] = edge;
+					sweep.mark[edge] = 1;
+					edge = sweep_next(&sweep, edge, down);
 				}
-			} else if (abs(*p - *o) > 1 && abs(*p - *o) < last_index 
-				/* ignore adjacent edges */
-				&& segments_intersect(*p, (*p)+1, *o, (*o)+1)) {
-				self->flags |= POLY_SIMPLE_KNOWN_FLAG;
-				self->flags &= ~POLY_SIMPLE_FLAG;
-				goto finish;
 			}
 		}
-		*(next_open++) = *p;
-	}
-	self->flags |= POLY_SIMPLE_KNOWN_FLAG | POLY_SIMPLE_FLAG;
-finish:
-	if (open != NULL) {
-		PyMem_Free(open);
+		through_count = touch_count;
+		for (j = 0; j < e - group && group[j].kind == 0; ++j) {
+			touching[touch_count++] = group[j].edge;
+		}
+		for (i = 0; i < touch_count && simple; ++i) {
+			for (j = i + 1; j < touch_count && simple; ++j) {
+				simple = !sweep_test(&sweep, touching[i], touching[j]);
+			}
+		}
+		for (i = 0; i < through_count; ++i) {
+			sweep.mark[touching[i]] = 0;
+		}
+		if (!simple) {
+			break;
+		}
+
+		/* Remove the edges ending here, then test the edges that 
+		 * become neighbors */
+		touch_count = 0;
+		for (j = 0; j < e - group; ++j) {
+			if (group[j].kind == 1) {
+				touching[touch_count++] = sweep_next(&sweep, group[j].edge, 1);
+			}
+		}
+		for (j = 0; j < e - group; ++j) {
+			if (group[j].kind == 1) {
+				sweep_remove(&sweep, group[j].edge);
+			}
+		}
+		for (i = 0; i < touch_count && simple; ++i) {
+			edge = touching[i];
+			if (edge != -1 && sweep.in_tree[edge]) {
+				simple = !sweep_test(&sweep, edge, sweep_next(&sweep, edge, 0));
+			}
+		}
+
+		/* Insert the edges starting here, testing their neighbors */
+		for (j = 0; j < e - group && group[j].kind == 0; ++j) {
+			sweep_insert(&sweep, group[j].edge);
+		}
+		for (j = 0; j < e - group && group[j].kind == 0 && simple; ++j) {
+			edge = group[j].edge;
+			simple = !sweep_test(&sweep, edge, sweep_next(&sweep, edge, 1))
+				&& !sweep_test(&sweep, edge, sweep_next(&sweep, edge, 0));
+		}
 	}
-	if (points != NULL) {
-		PyMem_Free(points);
+	self->flags |= POLY_SIMPLE_KNOWN_FLAG;
+	if (simple) {
+		self->flags |= POLY_SIMPLE_FLAG;
+	} else {
+		self->flags &= ~POLY_SIMPLE_FLAG;
 	}
-	return result;
+	PyMem_Free(block);
+	return 1;
 }
 
 static PyObject *
@@ -633,12 +946,43 @@ Poly_get_is_centroid_known(polypaths_planar_overridePolygonObject *self) {
 }
 
 static PyObject *
-Poly_get_centroid(polypaths_planar_overridePolygonObject *self)
+Poly_get_is_prepared(polypaths_planar_overridePolygonObject *self) {
+	return Py_BOOL(self->trapezoids != NULL);
+}
+
+/* Compute twice the signed area of the polygon and six times its 
+   first moment, by summing the triangles made from each edge with the 
+   first vertex, if they are not already known. The sums are kept, so 
+   they can be updated when a vertex is moved */
+static void
+poly_moments(polypaths_planar_overridePolygonObject *self)
 {
 	Py_ssize_t i;
 	double area, total_area;
 	polypaths_planar_override_vec2_t *a, *b, *c;
 
+	if (!(self->flags & POLY_MOMENTS_KNOWN_FLAG)) {
+		total_area = 0.0;
+		self->moment.x = self->moment.y = 0.0;
+		a = self->vert;
+		b = self->vert + 1;
+		for (i = 2; i < Py_SIZE(self); ++i) {
+			c = self->vert + i;
+			area = ((b->x - a->x) * (c->y - a->y)
+				- (c->x - a->x) * (b->y - a->y));
+			self->moment.x += (a->x + b->x + c->x) * area;
+			self->moment.y += (a->y + b->y + c->y) * area;
+			total_area += area;
+			b = c;
+		}
+		self->area2 = total_area;
+		self->flags |= POLY_MOMENTS_KNOWN_FLAG;
+	}
+}
+
+static PyObject *
+Poly_get_centroid(polypaths_planar_overridePolygonObject *self)
+{
 	if (!(self->flags & POLY_CENTROID_KNOWN_FLAG) 
 		|| !(self->flags & POLY_SIMPLE_KNOWN_FLAG)) {
 		if (!(self->flags & POLY_CONVEX_KNOWN_FLAG)) {
@@ -650,22 +994,9 @@ Poly_get_centroid(polypaths_planar_overridePolygonObject *self)
 			}
 		}
 		if (self->flags & POLY_SIMPLE_FLAG) {
-			DUP_FIRST_VERT(self);
-			total_area = 0.0;
-			self->centroid.x = self->centroid.y = 0.0;
-			a = self->vert;
-			b = self->vert + 1;
-			for (i = 2; i < Py_SIZE(self); ++i) {
-				c = self->vert + i;
-				area = ((b->x - a->x) * (c->y - a->y)
-					- (c->x - a->x) * (b->y - a->y));
-				self->centroid.x += (a->x + b->x + c->x) * area;
-				self->centroid.y += (a->y + b->y + c->y) * area;
-				total_area += area;
-				b = c;
-			}
-			self->centroid.x /= 3.0 * total_area;
-			self->centroid.y /= 3.0 * total_area;
+			poly_moments(self);
+			self->centroid.x = self->moment.x / (3.0 * self->area2);
+			self->centroid.y = self->moment.y / (3.0 * self->area2);
 		}
 		self->flags |= POLY_CENTROID_KNOWN_FLAG;
 	}
@@ -689,6 +1020,18 @@ Poly_get_bbox(polypaths_planar_overridePolygonObject *self) {
 	return self->bbox;
 }
 
+static PyObject *
+Poly_get_observers(polypaths_planar_overridePolygonObject *self) {
+	if (self->observers == NULL) {
+		self->observers = PyList_New(0);
+		if (self->observers == NULL) {
+			return NULL;
+		}
+	}
+	Py_INCREF(self->observers);
+	return self->observers;
+}
+
 static PyGetSetDef Poly_getset[] = {
     {"is_convex_known", (getter)Poly_get_is_convex_known, NULL, 
 		"True if the polygon is already known to be convex or not.", NULL},
@@ -701,6 +1044,8 @@ static PyGetSetDef Poly_getset[] = {
     {"is_centroid_known", (getter)Poly_get_is_centroid_known, NULL, 
 		"True if the polygon's centroid has been pre-calculated and cached.",
 		NULL},
+    {"is_prepared", (getter)Poly_get_is_prepared, NULL, 
+		"True if the polygon has a trapezoidal map from prepare().", NULL},
     {"centroid", (getter)Poly_get_centroid, NULL, 
 		"The geometric center point of the polygon. This point only exists "
         "for simple polygons. For non-simple polygons it is None. Note "
@@ -708,6 +1053,7 @@ static PyGetSetDef Poly_getset[] = {
 		"itself.", NULL},
     {"bounding_box", (getter)Poly_get_bbox, NULL, 
 		"The bounding box of the polygon", NULL},
+    {"_observers", (getter)Poly_get_observers, NULL, NULL, NULL},
     {NULL}
 };
 
@@ -730,17 +1076,149 @@ clear_cached_properties(polypaths_planar_overridePolygonObject *self)
 	self->flags = 0;
 	Py_XDECREF(self->bbox);
 	self->bbox = NULL;
-	if (self->lt_y_poly != NULL) {
-		PyMem_Free(self->lt_y_poly);
-		self->lt_y_poly = NULL;
-		self->rt_y_poly = NULL;
+	Py_CLEAR(self->triangles);
+	Py_CLEAR(self->trapezoids);
+	Py_CLEAR(self->lod);
+}
+
+/* Update the cached properties after the vertex at index is moved from
+   old, rather than clearing them. The bounding box and area moments are
+   adjusted in O(1) time, unless the vertex was on the bounding box and
+   moved inward. A convex polygon stays convex if it still turns the same
+   way at the vertex and its neighbors. Return -1 on error */
+static int
+update_cached_properties(polypaths_planar_overridePolygonObject *self, 
+	Py_ssize_t index, const polypaths_planar_override_vec2_t *old)
+{
+	const Py_ssize_t size = Py_SIZE(self);
+	const polypaths_planar_override_vec2_t *v = self->vert + index;
+	const polypaths_planar_override_vec2_t *p = self->vert + (index + size - 1) % size;
+	const polypaths_planar_override_vec2_t *q = self->vert + (index + 1) % size;
+	const polypaths_planar_override_vec2_t *r = self->vert + (index + size - 2) % size;
+	const polypaths_planar_override_vec2_t *s = self->vert + (index + 2) % size;
+	polypaths_planar_overrideBBoxObject *bbox = self->bbox;
+	double old_p, old_q, new_p, new_q, winding;
+	const unsigned long convex_flags = POLY_CONVEX_KNOWN_FLAG | POLY_CONVEX_FLAG;
+
+	if (size <= 3) {
+		clear_cached_properties(self);
+		return 0;
 	}
+	if (bbox != NULL) {
+		if ((old->x > bbox->min.x || v->x <= bbox->min.x)
+			&& (old->x < bbox->max.x || v->x >= bbox->max.x)
+			&& (old->y > bbox->min.y || v->y <= bbox->min.y)
+			&& (old->y < bbox->max.y || v->y >= bbox->max.y)) {
+			if (Py_REFCNT(bbox) > 1 && (v->x < bbox->min.x 
+				|| v->x > bbox->max.x || v->y < bbox->min.y 
+				|| v->y > bbox->max.y)) {
+				/* The box is shared, so grow a new one */
+				self->bbox = (polypaths_planar_overrideBBoxObject *)
+					polypaths_planar_overrideBBoxType.tp_alloc(
+					&polypaths_planar_overrideBBoxType, 0);
+				if (self->bbox == NULL) {
+					Py_DECREF(bbox);
+					return -1;
+				}
+				self->bbox->min = bbox->min;
+				self->bbox->max = bbox->max;
+				Py_DECREF(bbox);
+				bbox = self->bbox;
+			}
+			bbox->min.x = v->x < bbox->min.x ? v->x : bbox->min.x;
+			bbox->min.y = v->y < bbox->min.y ? v->y : bbox->min.y;
+			bbox->max.x = v->x > bbox->max.x ? v->x : bbox->max.x;
+			bbox->max.y = v->y > bbox->max.y ? v->y : bbox->max.y;
+		} else {
+			/* The box may shrink, recompute it when needed */
+			Py_CLEAR(self->bbox);
+		}
+	}
+
+	if (self->flags & POLY_MOMENTS_KNOWN_FLAG) {
+		/* Replace the terms of the two edges at the vertex */
+		old_p = p->x * old->y - old->x * p->y;
+		old_q = old->x * q->y - q->x * old->y;
+		new_p = p->x * v->y - v->x * p->y;
+		new_q = v->x * q->y - q->x * v->y;
+		self->area2 += new_p + new_q - old_p - old_q;
+		self->moment.x += (p->x + v->x) * new_p + (v->x + q->x) * new_q
+			- (p->x + old->x) * old_p - (old->x + q->x) * old_q;
+		self->moment.y += (p->y + v->y) * new_p + (v->y + q->y) * new_q
+			- (p->y + old->y) * old_p - (old->y + q->y) * old_q;
+	}
+	self->flags &= ~(POLY_CENTROID_KNOWN_FLAG | POLY_RADIUS_KNOWN_FLAG);
+	Py_CLEAR(self->triangles);
+	Py_CLEAR(self->trapezoids);
+	Py_CLEAR(self->lod);
+
+	if ((self->flags & convex_flags) == convex_flags) {
+		winding = (old->x - p->x) * (q->y - old->y) 
+			- (old->y - p->y) * (q->x - old->x);
+		if ((winding > 0.0 && SIDE(r, p, v) > 0.0 && SIDE(p, v, q) > 0.0
+				&& SIDE(v, q, s) > 0.0) 
+			|| (winding < 0.0 && SIDE(r, p, v) < 0.0 && SIDE(p, v, q) < 0.0
+				&& SIDE(v, q, s) < 0.0)) {
+			self->flags |= POLY_DEGEN_KNOWN_FLAG;
+			self->flags &= ~POLY_DEGEN_FLAG;
+			if (self->flags & POLY_DUP_VERTS_FLAG) {
+				self->flags &= ~POLY_DUP_VERTS_KNOWN_FLAG;
+			}
+			return 0;
+		}
+	}
+	self->flags &= POLY_MOMENTS_KNOWN_FLAG;
+	return 0;
+}
+
+/* Call the _shape_changed() method of each live observer weakly
+   referenced by the polygon, dropping references to dead observers.
+   Return 0 on success, -1 if an observer raised an exception */
+static int
+notify_observers(polypaths_planar_overridePolygonObject *self)
+{
+	PyObject *observers, *ref, *observer, *result;
+	Py_ssize_t i, size;
+	int status = 0;
+
+	if (self->observers == NULL || PyList_GET_SIZE(self->observers) == 0) {
+		return 0;
+	}
+	/* Iterate a copy, since observers may add or remove themselves */
+	observers = PyList_GetSlice(self->observers, 0, 
+		PyList_GET_SIZE(self->observers));
+	if (observers == NULL) {
+		return -1;
+	}
+	size = PyList_GET_SIZE(observers);
+	for (i = 0; i < size && status == 0; i++) {
+		ref = PyList_GET_ITEM(observers, i);
+		observer = PyObject_CallObject(ref, NULL);
+		if (observer == NULL) {
+			status = -1;
+		} else if (observer == Py_None) {
+			Py_DECREF(observer);
+			status = PySequence_DelItem(self->observers, 
+				PySequence_Index(self->observers, ref));
+		} else {
+			result = PyObject_CallMethod(
+				observer, "_shape_changed", "O", (PyObject *)self);
+			Py_DECREF(observer);
+			if (result == NULL) {
+				status = -1;
+			}
+			Py_XDECREF(result);
+		}
+	}
+	Py_DECREF(observers);
+	return status;
 }
 
 static int
 Poly_assitem(polypaths_planar_overridePolygonObject *self, Py_ssize_t index, PyObject *v)
 {
     double x, y;
+    polypaths_planar_override_vec2_t old;
     Py_ssize_t size = Py_SIZE(self);
     if (index >= 0 && index < size) {
 		if (!polypaths_planar_overrideVec2_Parse(v, &x, &y)) {
@@ -751,16 +1229,91 @@ Poly_assitem(polypaths_planar_overridePolygonObject *self, Py_ssize_t index, PyO
 			}
 			return -1;
 		}
+		old = self->vert[index];
         self->vert[index].x = x;
         self->vert[index].y = y;
-		clear_cached_properties(self);
-        return 0;
+		if (update_cached_properties(self, index, &old) == -1) {
+			return -1;
+		}
+        return notify_observers(self);
     }
     PyErr_Format(PyExc_IndexError, 
 		"assignment index %d out of range", (int)index);
     return -1;
 }
 
+static PyObject *
+Poly__imul__(PyObject *a, PyObject *b)
+{
+	PyObject *result;
+
+	/* Transform the vertices in place as a Seq2, then invalidate */
+	result = polypaths_planar_overrideSeq2Type.tp_as_number->nb_inplace_multiply(a, b);
+	if (result != NULL && polypaths_planar_overridePolygon_Check(result)) {
+		clear_cached_properties((polypaths_planar_overridePolygonObject *)result);
+		if (notify_observers(
+			(polypaths_planar_overridePolygonObject *)result) < 0) {
+			Py_DECREF(result);
+			return NULL;
+		}
+	}
+	return result;
+}
+
+/* Slots left empty are inherited from Seq2 */
+static PyNumberMethods Poly_as_number = {
+    0,       /* binaryfunc nb_add */
+    0,       /* binaryfunc nb_subtract */
+    0,       /* binaryfunc nb_multiply */
+#if PY_MAJOR_VERSION < 3
+    0,       /* binaryfunc nb_div */
+#endif
+    0,       /* binaryfunc nb_remainder */
+    0,       /* binaryfunc nb_divmod */
+    0,       /* ternaryfunc nb_power */
+    0,       /* unaryfunc nb_negative */
+    0,       /* unaryfunc nb_positive */
+    0,       /* unaryfunc nb_absolute */
+    0,       /* inquiry nb_bool */
+    0,       /* unaryfunc nb_invert */
+    0,       /* binaryfunc nb_lshift */
+    0,       /* binaryfunc nb_rshift */
+    0,       /* binaryfunc nb_and */
+    0,       /* binaryfunc nb_xor */
+    0,       /* binaryfunc nb_or */
+#if PY_MAJOR_VERSION < 3
+    0,       /* coercion nb_coerce */
+#endif
+    0,       /* unaryfunc nb_int */
+    0,       /* void *nb_reserved */
+    0,       /* unaryfunc nb_float */
+#if PY_MAJOR_VERSION < 3
+    0,       /* binaryfunc nb_oct */
+    0,       /* binaryfunc nb_hex */
+#endif
+
+    0,       /* binaryfunc nb_inplace_add */
+    0,       /* binaryfunc nb_inplace_subtract */
+    (binaryfunc)Poly__imul__,       /* binaryfunc nb_inplace_multiply */
+#if PY_MAJOR_VERSION < 3
+    0,       /* binaryfunc nb_inplace_divide */
+#endif
+    0,       /* binaryfunc nb_inplace_remainder */
+    0,       /* ternaryfunc nb_inplace_power */
+    0,       /* binaryfunc nb_inplace_lshift */
+    0,       /* binaryfunc nb_inplace_rshift */
+    0,       /* binaryfunc nb_inplace_and */
+    0,       /* binaryfunc nb_inplace_xor */
+    0,       /* binaryfunc nb_inplace_or */
+
+    0,       /* binaryfunc nb_floor_divide */
+    0,       /* binaryfunc nb_true_divide */
+    0,       /* binaryfunc nb_inplace_floor_divide */
+    0,       /* binaryfunc nb_inplace_true_divide */
+
+    0,       /* unaryfunc nb_index */
+};
+
 static Py_ssize_t
 Poly_length(polypaths_planar_overridePolygonObject *self)
 {
@@ -921,131 +1474,170 @@ pnp_winding_test(polypaths_planar_overridePolygonObject *self, polypaths_planar_
 	return winding_no != 0;
 }
 
+/* Return the sign of the side of the line from a to b that pt is on,
+   positive on the left. Points on the line are moved right by a tiny
+   amount, then down by a tinier one, so the result is only zero if a 
+   and b are the same point */
+static int
+perturbed_side(const polypaths_planar_override_vec2_t *a, 
+	const polypaths_planar_override_vec2_t *b, 
+	const polypaths_planar_override_vec2_t *pt)
+{
+	double side = SIDE(a, b, pt);
+
+	if (side == 0.0) {
+		side = a->y - b->y;
+		if (side == 0.0) {
+			side = a->x - b->x;
+		}
+	}
+	return (side > 0.0) - (side < 0.0);
+}
+
+/* Return 1 if the point is in the convex polygon, otherwise 0, using 
+   a binary search of the fan of triangles around the first vertex to 
+   find the edge facing the point. The moments must be known for the 
+   winding direction. Points on the boundary are perturbed as in 
+   perturbed_side(), so a point on an edge shared by two polygons is
+   in only one */
 static int 
-split_y_polylines(polypaths_planar_overridePolygonObject *self) 
+pnp_convex_test(polypaths_planar_overridePolygonObject *self, 
+	polypaths_planar_override_vec2_t *pt)
 {
-	double min_x, max_x, min_y, max_y;	
-	polypaths_planar_override_vec2_t *v, *v_end, *p, *pl1, *pl2;
-	polypaths_planar_override_vec2_t *min, *max, *left, *right;
+	const polypaths_planar_override_vec2_t *v = self->vert;
+	const int winding = self->area2 > 0.0 ? 1 : -1;
+	Py_ssize_t lo = 1;
+	Py_ssize_t hi = Py_SIZE(self) - 1;
+	Py_ssize_t mid;
 
-	self->lt_y_poly = (polypaths_planar_override_vec2_t *)PyMem_Malloc(
-		sizeof(polypaths_planar_override_vec2_t) * (Py_SIZE(self) + 2));
-	if (self->lt_y_poly == NULL) {
-		return -1;
+	/* Skip duplicates of the first vertex */
+	while (lo < hi && v[lo].x == v[0].x && v[lo].y == v[0].y) {
+		++lo;
 	}
-	min = max = left = right = self->vert;
-	min_y = max_y = self->vert[0].y;
-	min_x = max_x = self->vert[0].x;
-	v_end = self->vert + Py_SIZE(self) - 1;
-	for (v = self->vert + 1; v <= v_end; ++v) {
-		if (v->y < min_y) {
-			min_y = v->y;
-			min = v;
-		}
-		if (v->y > max_y) {
-			max_y = v->y;
-			max = v;
-		}
-		if (v->x < min_x) {
-			min_x = v->x;
-			left = v;
-		}
-		if (v->x > max_x) {
-			max_x = v->x;
-			right = v;
-		}
+	while (hi > lo && v[hi].x == v[0].x && v[hi].y == v[0].y) {
+		--hi;
 	}
-	if (min < max) {
-		if ((min <= left && left < max) || right < min || right > max) {
-			pl1 = self->lt_y_poly;
-			pl2 = self->rt_y_poly = pl1 + (max - min) + 1;
+	if (perturbed_side(v, v + lo, pt) != winding
+		|| perturbed_side(v, v + hi, pt) != -winding) {
+		return 0;
+	}
+	while (hi - lo > 1) {
+		mid = lo + (hi - lo) / 2;
+		if (perturbed_side(v, v + mid, pt) == winding) {
+			lo = mid;
 		} else {
-			pl2 = self->lt_y_poly;
-			pl1 = self->rt_y_poly = pl2 + (Py_SIZE(self) - (max - min)) + 1;
-		}
-		for (v = min, p = pl1; v <= max; ++v, ++p) {
-			p->x = v->x;
-			p->y = v->y;
+			hi = mid;
 		}
-		for (v = min, p = pl2; v >= self->vert; --v, ++p) {
-			p->x = v->x;
-			p->y = v->y;
-		}
-		for (v = v_end; v >= max; --v, ++p) {
-			p->x = v->x;
-			p->y = v->y;
-		}
-	} else {
-		if ((min >= left && left > max) || right > min || right < max) {
-			pl1 = self->lt_y_poly;
-			pl2 = self->rt_y_poly = pl1 + (min - max) + 1;
+	}
+	return perturbed_side(v + lo, v + hi, pt) == winding;
+}
+
+/* Return 1 if the point is in the polygon by descending the search
+   array of its trapezoidal map, built by prepare(), otherwise 0. The
+   array holds key, left, right triples, see locate._build_trapezoids().
+   Points on the boundary are moved right then down by a vanishing 
+   amount, to agree with pnp_winding_test() */
+static int
+pnp_trapezoid_test(polypaths_planar_overridePolygonObject *self, 
+	Py_buffer *dag, polypaths_planar_override_vec2_t *pt)
+{
+	const long *node = (const long *)dag->buf;
+	polypaths_planar_override_vec2_t *a, *b, *t;
+	Py_ssize_t i = 0;
+	double side;
+	int is_left;
+
+	if (dag->len == 0) {
+		return 0;
+	}
+	while (i >= 0) {
+		a = self->vert + (node[i * 3] >> 1);
+		if (node[i * 3] & 1) {
+			b = (a == self->vert + Py_SIZE(self) - 1) ? self->vert : a + 1;
+			/* direct the edge left to right */
+			if (a->x > b->x || (a->x == b->x && a->y > b->y)) {
+				t = a;
+				a = b;
+				b = t;
+			}
+			side = SIDE(a, b, pt);
+			is_left = side > 0.0 || (side == 0.0 && b->y < a->y);
 		} else {
-			pl2 = self->lt_y_poly;
-			pl1 = self->rt_y_poly = pl2 + (Py_SIZE(self) - (min - max)) + 1;
+			is_left = pt->x < a->x;
 		}
-		for (v = min, p = pl1; v >= max; --v, ++p) {
-			p->x = v->x;
-			p->y = v->y;
+		i = node[i * 3 + (is_left ? 1 : 2)];
+	}
+	return i == -2;
+}
+
+/* Select the point in poly strategy for the polygon. Return 1 if the
+   convex test should be used, or 2 if the polygon has more than four
+   sides and is prepared, and its trapezoidal map should be used, with 
+   its search array stored in *dag. Otherwise return 0, and store a new 
+   reference to the bounding box in *bbox if it should be checked first
+   (or NULL). Return -1 on error.
+*/
+static int
+pnp_prepare(polypaths_planar_overridePolygonObject *self, 
+	polypaths_planar_overrideBBoxObject **bbox, Py_buffer *dag)
+{
+	*bbox = NULL;
+	if (poly_is_convex(self) && Py_SIZE(self) > 5) {
+		poly_moments(self);
+		if (self->area2 != 0.0) {
+			return 1;
 		}
-		for (v = min, p = pl2; v <= v_end; ++v, ++p) {
-			p->x = v->x;
-			p->y = v->y;
+	}
+	if (self->trapezoids != NULL && Py_SIZE(self) > 4) {
+		if (PyObject_GetBuffer(self->trapezoids, dag, PyBUF_SIMPLE) == -1) {
+			return -1;
 		}
-		for (v = self->vert; v <= max; ++v, ++p) {
-			p->x = v->x;
-			p->y = v->y;
+		return 2;
+	}
+	if (Py_SIZE(self) > 4) {
+		*bbox = Poly_get_bbox(self);
+		if (*bbox == NULL) {
+			return -1;
 		}
 	}
 	return 0;
 }
 
-static int pnp_y_monotone_test(polypaths_planar_overridePolygonObject *self, polypaths_planar_override_vec2_t *pt)
+/* Return 1 if the point is in the polygon, 0 if not, or -1 on error.
+   strategy, bbox and dag are selected by pnp_prepare() */
+static int
+pnp_test(polypaths_planar_overridePolygonObject *self, int strategy, 
+	polypaths_planar_overrideBBoxObject *bbox, Py_buffer *dag,
+	polypaths_planar_override_vec2_t *pt)
 {
-	polypaths_planar_override_vec2_t *v, *lo, *hi;
-	double pt_y = pt->y;
+	double d2;
 
-	if (self->lt_y_poly == NULL) {
-		if (split_y_polylines(self) == -1) {
-			return -1;
-		}
+	if ((self->flags & (POLY_RADIUS_KNOWN_FLAG | POLY_CENTROID_KNOWN_FLAG))
+		== (POLY_RADIUS_KNOWN_FLAG | POLY_CENTROID_KNOWN_FLAG)) {
+		d2 = (pt->x - self->centroid.x)*(pt->x - self->centroid.x)
+			+ (pt->y - self->centroid.y)*(pt->y - self->centroid.y);
+		if (d2 < self->min_r2) return 1;
+		if (d2 > self->max_r2) return 0;
 	}
-	lo = self->lt_y_poly;
-	hi = self->rt_y_poly - 1;
-	if ((pt_y < lo->y) | (pt_y > hi->y)) {
-		return 0;
+	if (strategy == 1) {
+		return pnp_convex_test(self, pt);
 	}
-	while (lo < hi) {
-		v = lo + (hi - lo) / 2;
-		if (pt_y < v->y) {
-			hi = v;
-		} else {
-			lo = v + 1;
-		}
+	if (strategy == 2) {
+		return pnp_trapezoid_test(self, dag, pt);
 	}
-	if (SIDE(lo - 1, lo, pt) > 0.0) {
-		/* pt too far left */
+	if (bbox != NULL && !polypaths_planar_overrideBBox_contains_point(bbox, pt)) {
 		return 0;
 	}
-	lo = self->rt_y_poly;
-	hi = self->lt_y_poly + Py_SIZE(self) + 1;
-	while (lo < hi) {
-		v = lo + (hi - lo) / 2;
-		if (pt_y < v->y) {
-			hi = v;
-		} else {
-			lo = v + 1;
-		}
-	}
-	return SIDE(lo - 1, lo, pt) > 0.0;
+	return pnp_winding_test(self, pt);
 }
 
 static PyObject *
 Poly_contains_point(polypaths_planar_overridePolygonObject *self, PyObject *point)
 {
 	polypaths_planar_override_vec2_t pt;
-	int result = 0;
-	double d2;
+	int result, strategy;
 	polypaths_planar_overrideBBoxObject *bbox;
+	Py_buffer dag;
 	
 	if (!polypaths_planar_overrideVec2_Parse(point, &pt.x, &pt.y)) {
 		PyErr_SetString(PyExc_TypeError,
@@ -1053,28 +1645,14 @@ Poly_contains_point(polypaths_planar_overridePolygonObject *self, PyObject *poin
 			"expected Vec2 object for argument");
 		return NULL;
 	}
-	if ((self->flags & (POLY_RADIUS_KNOWN_FLAG | POLY_CENTROID_KNOWN_FLAG))
-		== (POLY_RADIUS_KNOWN_FLAG | POLY_CENTROID_KNOWN_FLAG)) {
-		d2 = (pt.x - self->centroid.x)*(pt.x - self->centroid.x)
-			+ (pt.y - self->centroid.y)*(pt.y - self->centroid.y);
-		if (d2 < self->min_r2) return Py_BOOL(1);
-		if (d2 > self->max_r2) return Py_BOOL(0);
+	strategy = pnp_prepare(self, &bbox, &dag);
+	if (strategy == -1) {
+		return NULL;
 	}
-	if (poly_is_convex(self) && Py_SIZE(self) > 5) {
-		result = pnp_y_monotone_test(self, &pt);
-	} else {
-		if (Py_SIZE(self) > 4) {
-			bbox = Poly_get_bbox(self);
-			if (bbox == NULL) {
-				return NULL;
-			}
-			if (!polypaths_planar_overrideBBox_contains_point(bbox, &pt)) {
-				Py_DECREF(bbox);
-				return Py_BOOL(0);
-			}
-			Py_DECREF(bbox);
-		}
-		result = pnp_winding_test(self, &pt);
+	result = pnp_test(self, strategy, bbox, &dag, &pt);
+	Py_XDECREF(bbox);
+	if (strategy == 2) {
+		PyBuffer_Release(&dag);
 	}
 	if (result != -1) {
 		return Py_BOOL(result);
@@ -1084,10 +1662,304 @@ Poly_contains_point(polypaths_planar_overridePolygonObject *self, PyObject *poin
 }
 
 static PyObject *
-Poly_pnp_y_monotone_test(polypaths_planar_overridePolygonObject *self, PyObject *point)
+Poly_contains_points(polypaths_planar_overridePolygonObject *self, PyObject *points)
+{
+	PyObject *seq = NULL;
+	PyObject *result = NULL;
+	polypaths_planar_overrideBBoxObject *bbox;
+	polypaths_planar_override_vec2_t *pt;
+	Py_buffer view, dag;
+	Py_ssize_t i, size;
+	char *inside;
+	int strategy = 0, r;
+
+	if (!PyObject_CheckBuffer(points)) {
+		/* General point sequence */
+		seq = PyObject_CallFunctionObjArgs(
+			(PyObject *)&polypaths_planar_overrideVec2ArrayType, points, NULL);
+		if (seq == NULL) {
+			return NULL;
+		}
+		points = seq;
+	}
+	if (!polypaths_planar_override_GetVec2Buffer(points, &view, 0)) {
+		if (seq != NULL || !(PyErr_ExceptionMatches(PyExc_ValueError)
+			|| PyErr_ExceptionMatches(PyExc_BufferError))) {
+			Py_XDECREF(seq);
+			return NULL;
+		}
+		/* Buffers of other types, or not contiguous, are copied */
+		PyErr_Clear();
+		seq = PyObject_CallFunctionObjArgs(
+			(PyObject *)&polypaths_planar_overrideVec2ArrayType, points, NULL);
+		if (seq == NULL
+			|| !polypaths_planar_override_GetVec2Buffer(seq, &view, 0)) {
+			Py_XDECREF(seq);
+			return NULL;
+		}
+	}
+	size = view.len / sizeof(polypaths_planar_override_vec2_t);
+	strategy = pnp_prepare(self, &bbox, &dag);
+	if (strategy == -1) {
+		goto done;
+	}
+	result = PyByteArray_FromStringAndSize(NULL, size);
+	if (result == NULL) {
+		goto done;
+	}
+	inside = PyByteArray_AS_STRING(result);
+	pt = (polypaths_planar_override_vec2_t *)view.buf;
+	for (i = 0; i < size; ++i) {
+		r = pnp_test(self, strategy, bbox, &dag, pt + i);
+		if (r == -1) {
+			Py_CLEAR(result);
+			PyErr_NoMemory();
+			goto done;
+		}
+		inside[i] = (char)r;
+	}
+done:
+	Py_XDECREF(bbox);
+	if (strategy == 2) {
+		PyBuffer_Release(&dag);
+	}
+	PyBuffer_Release(&view);
+	Py_XDECREF(seq);
+	return result;
+}
+
+static PyObject *
+Poly_triangulate(polypaths_planar_overridePolygonObject *self)
+{
+	PyObject *triangulate;
+
+	if (self->triangles == NULL) {
+		triangulate = PyImport_ImportModule(
+			"polypaths_planar_override.triangulate");
+		if (triangulate == NULL) {
+			return NULL;
+		}
+		self->triangles = PyObject_CallMethod(triangulate, 
+			"_triangulate_polygon", "O", (PyObject *)self);
+		Py_DECREF(triangulate);
+		if (self->triangles == NULL) {
+			return NULL;
+		}
+	}
+	/* Return a copy, so the cached array cannot be changed */
+	return PyObject_CallMethod(self->triangles, "__copy__", NULL);
+}
+
+static PyObject *
+Poly_prepare(polypaths_planar_overridePolygonObject *self)
+{
+	PyObject *locate, *prepared;
+	Py_buffer dag;
+	Py_ssize_t size;
+
+	locate = PyImport_ImportModule("polypaths_planar_override.locate");
+	if (locate == NULL) {
+		return NULL;
+	}
+	prepared = PyObject_CallMethod(locate, 
+		"_prepare_polygon", "O", (PyObject *)self);
+	Py_DECREF(locate);
+	if (prepared == NULL) {
+		return NULL;
+	}
+	Py_CLEAR(self->trapezoids);
+	self->trapezoids = PyTuple_GET_ITEM(prepared, 0);
+	Py_INCREF(self->trapezoids);
+	Py_DECREF(prepared);
+	if (PyObject_GetBuffer(self->trapezoids, &dag, PyBUF_SIMPLE) == -1) {
+		return NULL;
+	}
+	size = dag.len;
+	PyBuffer_Release(&dag);
+	return PyLong_FromSsize_t(size);
+}
+
+static PyObject *
+Poly_intersecting_edges(polypaths_planar_overridePolygonObject *self)
+{
+	PyObject *intersect, *pairs;
+
+	intersect = PyImport_ImportModule("polypaths_planar_override.intersect");
+	if (intersect == NULL) {
+		return NULL;
+	}
+	pairs = PyObject_CallMethod(intersect, 
+		"_polygon_intersecting_edges", "O", (PyObject *)self);
+	Py_DECREF(intersect);
+	if (pairs == NULL) {
+		return NULL;
+	}
+	self->flags |= POLY_SIMPLE_KNOWN_FLAG;
+	if (PyList_GET_SIZE(pairs)) {
+		self->flags &= ~POLY_SIMPLE_FLAG;
+	} else {
+		self->flags |= POLY_SIMPLE_FLAG;
+	}
+	return pairs;
+}
+
+static PyObject *
+Poly_simplify_mask(polypaths_planar_overridePolygonObject *self, 
+	PyObject *args, PyObject *kwargs)
+{
+	return call_simplify_mask((PyObject *)self, 1, args, kwargs);
+}
+
+/* Return the polygon's level of detail cache, creating it if needed */
+static PyObject *
+poly_lod_cache(polypaths_planar_overridePolygonObject *self)
+{
+	PyObject *lod;
+
+	if (self->lod == NULL) {
+		lod = PyImport_ImportModule("polypaths_planar_override.lod");
+		if (lod == NULL) {
+			return NULL;
+		}
+		self->lod = PyObject_CallMethod(lod, "_LevelCache", NULL);
+		Py_DECREF(lod);
+	}
+	return self->lod;
+}
+
+static PyObject *
+Poly_level_of_detail(polypaths_planar_overridePolygonObject *self, 
+	PyObject *tolerance)
+{
+	PyObject *cache, *result, *level;
+
+	cache = poly_lod_cache(self);
+	if (cache == NULL) {
+		return NULL;
+	}
+	/* Hold the cache, in case the polygon is mutated during the call */
+	Py_INCREF(cache);
+	result = PyObject_CallMethod(cache, "level", "OO", 
+		(PyObject *)self, tolerance);
+	Py_DECREF(cache);
+	if (result == NULL) {
+		return NULL;
+	}
+	level = PyTuple_GET_ITEM(result, 0);
+	Py_INCREF(level);
+	Py_DECREF(result);
+	return level;
+}
+
+static PyObject *
+Poly_contains_point_lod(polypaths_planar_overridePolygonObject *self, 
+	PyObject *args)
+{
+	PyObject *cache, *point, *tolerance, *result;
+
+	if (!PyArg_ParseTuple(args, "OO:Polygon.contains_point_lod", 
+		&point, &tolerance)) {
+		return NULL;
+	}
+	cache = poly_lod_cache(self);
+	if (cache == NULL) {
+		return NULL;
+	}
+	Py_INCREF(cache);
+	result = PyObject_CallMethod(cache, "contains_point", "OOO", 
+		(PyObject *)self, point, tolerance);
+	Py_DECREF(cache);
+	return result;
+}
+
+static PyObject *
+poly_calipers(polypaths_planar_overridePolygonObject *self, const char *name,
+	int perimeter)
+{
+	PyObject *calipers, *result;
+
+	calipers = PyImport_ImportModule("polypaths_planar_override.calipers");
+	if (calipers == NULL) {
+		return NULL;
+	}
+	if (perimeter) {
+		result = PyObject_CallMethod(calipers, name, "OO", 
+			(PyObject *)self, Py_True);
+	} else {
+		result = PyObject_CallMethod(calipers, name, "O", (PyObject *)self);
+	}
+	Py_DECREF(calipers);
+	return result;
+}
+
+static PyObject *
+Poly_farthest_pair(polypaths_planar_overridePolygonObject *self)
+{
+	return poly_calipers(self, "_farthest_pair", 0);
+}
+
+static PyObject *
+Poly_min_width(polypaths_planar_overridePolygonObject *self)
+{
+	return poly_calipers(self, "_min_width", 0);
+}
+
+static PyObject *
+Poly_min_area_rectangle(polypaths_planar_overridePolygonObject *self)
+{
+	return poly_calipers(self, "_min_rectangle", 0);
+}
+
+static PyObject *
+Poly_min_perimeter_rectangle(polypaths_planar_overridePolygonObject *self)
+{
+	return poly_calipers(self, "_min_rectangle", 1);
+}
+
+static PyObject *
+poly_boolean(polypaths_planar_overridePolygonObject *self, PyObject *other,
+	const char *operation)
+{
+	PyObject *clip, *result;
+
+	clip = PyImport_ImportModule("polypaths_planar_override.clip");
+	if (clip == NULL) {
+		return NULL;
+	}
+	result = PyObject_CallMethod(clip, 
+		"_polygon_boolean", "OOs", (PyObject *)self, other, operation);
+	Py_DECREF(clip);
+	return result;
+}
+
+static PyObject *
+Poly_union(polypaths_planar_overridePolygonObject *self, PyObject *other)
+{
+	return poly_boolean(self, other, "union");
+}
+
+static PyObject *
+Poly_intersection(polypaths_planar_overridePolygonObject *self, PyObject *other)
+{
+	return poly_boolean(self, other, "intersection");
+}
+
+static PyObject *
+Poly_difference(polypaths_planar_overridePolygonObject *self, PyObject *other)
+{
+	return poly_boolean(self, other, "difference");
+}
+
+static PyObject *
+Poly_xor(polypaths_planar_overridePolygonObject *self, PyObject *other)
+{
+	return poly_boolean(self, other, "xor");
+}
+
+static PyObject *
+Poly_pnp_convex_test(polypaths_planar_overridePolygonObject *self, PyObject *point)
 {
 	polypaths_planar_override_vec2_t pt;
-	int result;
 	
 	if (!polypaths_planar_overrideVec2_Parse(point, &pt.x, &pt.y)) {
 		PyErr_SetString(PyExc_TypeError,
@@ -1095,12 +1967,8 @@ Poly_pnp_y_monotone_test(polypaths_planar_overridePolygonObject *self, PyObject
 			"expected Vec2 object for argument");
 		return NULL;
 	}
-	result = pnp_y_monotone_test(self, &pt);
-	if (result != -1) {
-		return Py_BOOL(result);
-	} else {
-		return PyErr_NoMemory();
-	}
+	poly_moments(self);
+	return Py_BOOL(pnp_convex_test(self, &pt));
 }
 
 static PyObject *
@@ -1316,7 +2184,7 @@ error:
 }
 
 static polypaths_planar_overridePolygonObject *
-Poly_convex_hull(PyTypeObject *type, PyObject *points) 
+poly_convex_hull(PyTypeObject *type, PyObject *points) 
 {
 	polypaths_planar_override_vec2_t *pts;
 	polypaths_planar_override_vec2_t *hull_pts = NULL;
@@ -1355,6 +2223,30 @@ error:
 	return NULL;
 }
 
+static PyObject *
+Poly_convex_hull(PyTypeObject *type, PyObject *args, PyObject *kwargs)
+{
+	PyObject *points, *workers = Py_None;
+	PyObject *hull, *result;
+	static char *kwlist[] = {"points", "workers", NULL};
+
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, 
+		"O|O:Polygon.convex_hull", kwlist, &points, &workers)) {
+		return NULL;
+	}
+	if (workers == Py_None) {
+		return (PyObject *)poly_convex_hull(type, points);
+	}
+	hull = PyImport_ImportModule("polypaths_planar_override.hull");
+	if (hull == NULL) {
+		return NULL;
+	}
+	result = PyObject_CallMethod(hull, "_parallel_convex_hull", "OOO", 
+		(PyObject *)type, points, workers);
+	Py_DECREF(hull);
+	return result;
+}
+
 static PyMethodDef Poly_methods[] = {
     {"regular", (PyCFunction)Poly_create_new_regular, 
 		METH_CLASS | METH_VARARGS | METH_KEYWORDS, 
@@ -1365,7 +2257,8 @@ static PyMethodDef Poly_methods[] = {
 		METH_CLASS | METH_VARARGS | METH_KEYWORDS, 
 		"Create a circular pointed star polygon with the specified number "
         "of peaks."},
-	{"convex_hull", (PyCFunction)Poly_convex_hull, METH_CLASS | METH_O,
+	{"convex_hull", (PyCFunction)Poly_convex_hull, 
+		METH_CLASS | METH_VARARGS | METH_KEYWORDS,
 		"Return a new polygon that is the convex hull of the supplied "
         "sequence of points."},
 	{"tangents_to_point", (PyCFunction)Poly_pt_tangents, METH_O,
@@ -1374,11 +2267,59 @@ static PyMethodDef Poly_methods[] = {
 		"the specified point."},
     {"from_points", (PyCFunction)Poly_create_new_from_points, METH_CLASS | METH_O, 
 		"Create a new Polygon from an iterable of points"},
+	{"contains_points", (PyCFunction)Poly_contains_points, METH_O,
+		"Return a bytearray with a 1 for each of the points inside "
+		"the polygon and a 0 for each outside."},
 	{"contains_point", (PyCFunction)Poly_contains_point, METH_O,
 		"Return True if the specified point is inside the polygon."},
+	{"triangulate", (PyCFunction)Poly_triangulate, METH_NOARGS,
+		"Divide the polygon into triangles, returning an array of unsigned "
+		"32 bit vertex indices, three for each triangle."},
+	{"prepare", (PyCFunction)Poly_prepare, METH_NOARGS,
+		"Build a trapezoidal map of the simple polygon, so points can be "
+		"located in O(log n) expected time. Return its size in bytes."},
+	{"simplify_mask", (PyCFunction)Poly_simplify_mask, 
+		METH_VARARGS | METH_KEYWORDS, 
+		"Simplify the polygon, returning a bytearray with a 1 for each "
+		"vertex kept."},
+	{"farthest_pair", (PyCFunction)Poly_farthest_pair, METH_NOARGS,
+		"Return the two vertices of the polygon farthest apart."},
+	{"min_width", (PyCFunction)Poly_min_width, METH_NOARGS,
+		"Return the minimum width of the polygon, and the unit direction "
+		"of the parallel lines enclosing it."},
+	{"min_area_rectangle", (PyCFunction)Poly_min_area_rectangle, 
+		METH_NOARGS,
+		"Return the rectangle with the smallest area enclosing the "
+		"polygon."},
+	{"min_perimeter_rectangle", (PyCFunction)Poly_min_perimeter_rectangle, 
+		METH_NOARGS,
+		"Return the rectangle with the smallest perimeter enclosing the "
+		"polygon."},
+	{"level_of_detail", (PyCFunction)Poly_level_of_detail, METH_O,
+		"Return a cached simplified copy of the polygon, whose outline is "
+		"within tolerance of this polygon's."},
+	{"contains_point_lod", (PyCFunction)Poly_contains_point_lod, 
+		METH_VARARGS,
+		"Return True if the specified point is inside the polygon, testing "
+		"the level of detail for tolerance first."},
+	{"union", (PyCFunction)Poly_union, METH_O,
+		"Return a list of polygons covering the region in either this "
+		"polygon or another."},
+	{"intersection", (PyCFunction)Poly_intersection, METH_O,
+		"Return a list of polygons covering the region in both this "
+		"polygon and another."},
+	{"difference", (PyCFunction)Poly_difference, METH_O,
+		"Return a list of polygons covering the region in this polygon "
+		"and not another."},
+	{"xor", (PyCFunction)Poly_xor, METH_O,
+		"Return a list of polygons covering the region in exactly one "
+		"of this polygon and another."},
+	{"intersecting_edges", (PyCFunction)Poly_intersecting_edges, METH_NOARGS,
+		"Return a sorted list of the (i, j) index pairs of the intersecting "
+		"non-adjacent edges, where edge i runs from vertex i to vertex i + 1."},
     {"__copy__", (PyCFunction)Poly_copy, METH_NOARGS, NULL}, 
     {"__deepcopy__", (PyCFunction)Poly_copy, METH_O, NULL}, 
-	{"_pnp_y_monotone_test", (PyCFunction)Poly_pnp_y_monotone_test, METH_O, NULL},
+	{"_pnp_convex_test", (PyCFunction)Poly_pnp_convex_test, METH_O, NULL},
 	{"_pnp_winding_test", (PyCFunction)Poly_pnp_winding_test, METH_O, NULL},
     {NULL, NULL}
 };
@@ -1400,7 +2341,7 @@ PyTypeObject polypaths_planar_overridePolygonType = {
 	0,                      /*tp_setattr*/
 	0,		        /*tp_compare*/
 	(reprfunc)Poly__repr__, /*tp_repr*/
-	0, //&Vec2Array_as_number,        /*tp_as_number*/
+	&Poly_as_number,        /*tp_as_number*/
 	&Poly_as_sequence,      /*tp_as_sequence*/
 	0, //&Vec2Array_as_mapping,	     /*tp_as_mapping*/
 	0,	                /*tp_hash*/
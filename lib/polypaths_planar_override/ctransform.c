@@ -10,7 +10,7 @@
 ****************************************************************************/
 #include "Python.h"
 #include <float.h>
-#include "polypaths_planar_override.h"
+#include "planar.h"
 
 #define AFFINE_FREE_MAX 200
 static PyObject *affine_free_list = NULL;
@@ -452,8 +452,9 @@ Affine_itransform(polypaths_planar_overrideAffineObject *self, PyObject *seq)
 {
     Py_ssize_t i;
     Py_ssize_t len;
-    PyObject *point;
+    PyObject *point, *result;
     polypaths_planar_overrideSeq2Object *varray;
+    Py_buffer view;
     double x, y, a, b, c, d, e, f;
 
     a = self->a;
@@ -463,15 +464,27 @@ Affine_itransform(polypaths_planar_overrideAffineObject *self, PyObject *seq)
     e = self->e;
     f = self->f;
     assert(polypaths_planar_overrideAffine_Check(self));
-    if (polypaths_planar_overrideSeq2_Check(seq)) {
-	/* Optimized code path for Seq2s */
-	varray = (polypaths_planar_overrideSeq2Object *)seq;
-	for (i = 0; i < Py_SIZE(seq); i++) {
-	    x = varray->vec[i].x;
-	    y = varray->vec[i].y;
-	    varray->vec[i].x = x*a + y*d + c;
-	    varray->vec[i].y = x*b + y*e + f;
-	}
+    if (polypaths_planar_overridePolygon_Check(seq)) {
+		/* Polygons must also discard their cached properties and
+		   notify their observers, as when multiplied in place */
+		result = PyNumber_InPlaceMultiply(seq, (PyObject *)self);
+		if (result == NULL) {
+			return NULL;
+		}
+		Py_DECREF(result);
+    } else if (polypaths_planar_overrideSeq2_Check(seq)) {
+		/* Optimized code path for Seq2s */
+		varray = (polypaths_planar_overrideSeq2Object *)seq;
+		polypaths_planar_overrideAffine_TransformVec2s(
+			self, varray->vec, varray->vec, Py_SIZE(seq));
+    } else if (PyObject_CheckBuffer(seq)) {
+		/* Contiguous buffer of coordinates */
+		if (!polypaths_planar_override_GetVec2Buffer(seq, &view, 1)) {
+			return NULL;
+		}
+		polypaths_planar_overrideAffine_TransformVec2s(self, view.buf, view.buf,
+			view.len / sizeof(polypaths_planar_override_vec2_t));
+		PyBuffer_Release(&view);
     } else {
 		/* General vector sequence */
 		len = PySequence_Length(seq);
@@ -508,6 +521,59 @@ Affine_itransform(polypaths_planar_overrideAffineObject *self, PyObject *seq)
     return Py_None;
 }
 
+static PyObject *
+Affine_transform(polypaths_planar_overrideAffineObject *self, 
+	PyObject *args, PyObject *kwargs)
+{
+    PyObject *points;
+    PyObject *out = Py_None;
+    PyObject *result;
+    Py_buffer src, dst;
+    Py_ssize_t size;
+
+    static char *kwlist[] = {"points", "out", NULL};
+
+    assert(polypaths_planar_overrideAffine_Check(self));
+    if (!PyArg_ParseTupleAndKeywords(
+        args, kwargs, "O|O:Affine.transform", kwlist, &points, &out)) {
+        return NULL;
+    }
+    if (!polypaths_planar_override_GetVec2Buffer(points, &src, 0)) {
+		return NULL;
+    }
+    size = src.len / sizeof(polypaths_planar_override_vec2_t);
+    if (out == Py_None) {
+		result = (PyObject *)Seq2_New(
+			&polypaths_planar_overrideVec2ArrayType, size);
+		if (result == NULL) {
+			PyBuffer_Release(&src);
+			return NULL;
+		}
+		polypaths_planar_overrideAffine_TransformVec2s(self, src.buf, 
+			((polypaths_planar_overrideSeq2Object *)result)->vec, size);
+    } else {
+		if (!polypaths_planar_override_GetVec2Buffer(out, &dst, 1)) {
+			PyBuffer_Release(&src);
+			return NULL;
+		}
+		if (dst.len != src.len) {
+			PyErr_SetString(PyExc_ValueError,
+				"Affine.transform(): out must have the same number "
+				"of points as the input");
+			PyBuffer_Release(&dst);
+			PyBuffer_Release(&src);
+			return NULL;
+		}
+		polypaths_planar_overrideAffine_TransformVec2s(
+			self, src.buf, dst.buf, size);
+		PyBuffer_Release(&dst);
+		Py_INCREF(out);
+		result = out;
+    }
+    PyBuffer_Release(&src);
+    return result;
+}
+
 static PyMethodDef Affine_methods[] = {
     {"identity", (PyCFunction)Affine_new_identity, 
         METH_CLASS | METH_NOARGS, 
@@ -531,6 +597,10 @@ static PyMethodDef Affine_methods[] = {
         "Compare transforms for approximate equality."},
     {"itransform", (PyCFunction)Affine_itransform, METH_O, 
         "Transform a sequence of points or vectors in place."},
+    {"transform", (PyCFunction)Affine_transform, 
+        METH_VARARGS | METH_KEYWORDS, 
+        "Transform a contiguous array of points in a single pass, "
+        "optionally storing the result in out."},
     {NULL, NULL}
 };
 
@@ -11,7 +11,7 @@
 #include "Python.h"
 #include <float.h>
 #include <string.h>
-#include "polypaths_planar_override.h"
+#include "planar.h"
 
 #define VEC2_FREE_MAX 1000
 static PyObject *vec2_free_list = NULL;
@@ -877,8 +877,13 @@ static void
 Seq2_dealloc(polypaths_planar_overrideSeq2Object *self)
 {
 	if (self->vec != NULL && self->vec != self->data) {
-		/* Free externally allocated vector array */
-		PyMem_Free(self->vec);
+		if (self->base != NULL) {
+			/* Release the wrapped buffer */
+			Py_CLEAR(self->base);
+		} else {
+			/* Free externally allocated vector array */
+			PyMem_Free(self->vec);
+		}
 		self->vec = NULL;
 	}
     Py_TYPE(self)->tp_free((PyObject *)self);
@@ -1053,6 +1058,84 @@ static PyMethodDef Seq2_methods[] = {
     {NULL, NULL}
 };
 
+/* Buffer Interface */
+
+/* Export the vectors as a C-contiguous 2D buffer of doubles, with
+   shape (n, 2). Polygons are exported read-only since writing into
+   them directly would bypass the invalidation of their cached
+   properties.
+*/
+static int
+Seq2_getbuffer(polypaths_planar_overrideSeq2Object *self, Py_buffer *view, int flags)
+{
+	Py_ssize_t *shape;
+	const int readonly = polypaths_planar_overridePolygon_Check(self);
+
+	if (readonly && (flags & PyBUF_WRITABLE) == PyBUF_WRITABLE) {
+		PyErr_Format(PyExc_BufferError, 
+			"%.200s does not export writable buffers", 
+			Py_TYPE(self)->tp_name);
+		view->obj = NULL;
+		return -1;
+	}
+	if ((flags & PyBUF_F_CONTIGUOUS) == PyBUF_F_CONTIGUOUS 
+		&& Py_SIZE(self) > 1) {
+		PyErr_Format(PyExc_BufferError,
+			"%.200s buffer is not Fortran contiguous",
+			Py_TYPE(self)->tp_name);
+		view->obj = NULL;
+		return -1;
+	}
+	/* shape[0:2] is the shape, shape[2:4] the strides */
+	shape = PyMem_Malloc(4 * sizeof(Py_ssize_t));
+	if (shape == NULL) {
+		PyErr_NoMemory();
+		view->obj = NULL;
+		return -1;
+	}
+	shape[0] = Py_SIZE(self);
+	shape[1] = 2;
+	shape[2] = sizeof(polypaths_planar_override_vec2_t);
+	shape[3] = sizeof(double);
+
+	view->buf = self->vec;
+	view->obj = (PyObject *)self;
+	Py_INCREF(self);
+	view->len = Py_SIZE(self) * sizeof(polypaths_planar_override_vec2_t);
+	view->readonly = readonly;
+	view->itemsize = sizeof(double);
+	view->format = (flags & PyBUF_FORMAT) == PyBUF_FORMAT ? "d" : NULL;
+	if ((flags & PyBUF_ND) == PyBUF_ND) {
+		view->ndim = 2;
+		view->shape = shape;
+	} else {
+		view->ndim = 1;
+		view->shape = NULL;
+	}
+	view->strides = (flags & PyBUF_STRIDES) == PyBUF_STRIDES ? shape + 2 : NULL;
+	view->suboffsets = NULL;
+	view->internal = shape;
+	return 0;
+}
+
+static void
+Seq2_releasebuffer(polypaths_planar_overrideSeq2Object *self, Py_buffer *view)
+{
+	PyMem_Free(view->internal);
+	view->internal = NULL;
+}
+
+static PyBufferProcs Seq2_as_buffer = {
+#if PY_MAJOR_VERSION < 3
+	0,		/* bf_getreadbuffer */
+	0,		/* bf_getwritebuffer */
+	0,		/* bf_getsegcount */
+	0,		/* bf_getcharbuffer */
+#endif
+	(getbufferproc)Seq2_getbuffer,		/* bf_getbuffer */
+	(releasebufferproc)Seq2_releasebuffer,	/* bf_releasebuffer */
+};
+
 /* Arithmetic Operations */
 
 static PyObject *
@@ -1060,9 +1143,7 @@ Seq2__mul__(PyObject *a, PyObject *b)
 {
     polypaths_planar_overrideSeq2Object *src, *dst;
     polypaths_planar_overrideAffineObject *t;
-    polypaths_planar_override_vec2_t *srcv, *dstv;
     Py_ssize_t size;
-    double ta, tb, tc, td, te, tf;
 
     if (polypaths_planar_overrideSeq2_Check(a) && polypaths_planar_overrideAffine_Check(b)) {
 		src = (polypaths_planar_overrideSeq2Object *)a;
@@ -1075,12 +1156,6 @@ Seq2__mul__(PyObject *a, PyObject *b)
 		Py_INCREF(Py_NotImplemented);
 		return Py_NotImplemented;
     }
-    ta = t->a;
-    tb = t->b;
-    tc = t->c;
-    td = t->d;
-    te = t->e;
-    tf = t->f;
 
     size = PySequence_Size((PyObject *)src);
     if (size == -1) {
@@ -1091,14 +1166,7 @@ Seq2__mul__(PyObject *a, PyObject *b)
     if (dst == NULL) {
 		return NULL;
     }
-	srcv = src->vec;
-    dstv = dst->vec;
-    while (size--) {
-		dstv->x = srcv->x*ta + srcv->y*td + tc;
-		dstv->y = srcv->x*tb + srcv->y*te + tf;
-		++srcv;
-		++dstv;
-    }
+	polypaths_planar_overrideAffine_TransformVec2s(t, src->vec, dst->vec, size);
     return (PyObject *)dst;
 }
 
@@ -1107,9 +1175,7 @@ Seq2__imul__(PyObject *a, PyObject *b)
 {
     polypaths_planar_overrideSeq2Object *s;
     polypaths_planar_overrideAffineObject *t;
-    polypaths_planar_override_vec2_t *sv;
     Py_ssize_t size;
-    double ta, tb, tc, td, te, tf, x, y;
 
     if (polypaths_planar_overrideSeq2_Check(a) && polypaths_planar_overrideAffine_Check(b)) {
 		s = (polypaths_planar_overrideSeq2Object *)a;
@@ -1121,25 +1187,12 @@ Seq2__imul__(PyObject *a, PyObject *b)
 		/* We support only transform operations */
 		RETURN_NOT_IMPLEMENTED;
     }
-    ta = t->a;
-    tb = t->b;
-    tc = t->c;
-    td = t->d;
-    te = t->e;
-    tf = t->f;
 
     size = PySequence_Size((PyObject *)s);
     if (size == -1) {
 		return NULL;
     }
-    sv = s->vec;
-    while (size--) {
-		x = sv->x*ta + sv->y*td + tc;
-		y = sv->x*tb + sv->y*te + tf;
-		sv->x = x;
-		sv->y = y;
-		++sv;
-    }
+	polypaths_planar_overrideAffine_TransformVec2s(t, s->vec, s->vec, size);
     Py_INCREF(s);
     return (PyObject *)s;
 }
@@ -1220,8 +1273,9 @@ PyTypeObject polypaths_planar_overrideSeq2Type = {
 	0,                      /*tp_str*/
 	0,                      /*tp_getattro*/
 	0,                      /*tp_setattro*/
-	0,                      /*tp_as_buffer*/
-	Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_CHECKTYPES,     /*tp_flags*/
+	&Seq2_as_buffer,        /*tp_as_buffer*/
+	Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_CHECKTYPES 
+		| Py_TPFLAGS_HAVE_NEWBUFFER,     /*tp_flags*/
 	Seq2__doc__,            /*tp_doc*/
 	0,                      /*tp_traverse*/
 	0,                      /*tp_clear*/
@@ -1256,6 +1310,27 @@ Vec2Array_new(PyTypeObject *type, PyObject *args, PyObject *kwargs)
 	}
 }
 
+/* Return 1 if the array may be resized, otherwise
+   set an exception and return 0
+*/
+static int
+Vec2Array_check_resizable(polypaths_planar_overrideSeq2Object *self)
+{
+	if (self->exports > 0) {
+		PyErr_Format(PyExc_BufferError,
+			"cannot resize a %.200s that is exporting buffers",
+			Py_TYPE(self)->tp_name);
+		return 0;
+	}
+	if (self->base != NULL) {
+		PyErr_Format(PyExc_BufferError,
+			"cannot resize a %.200s that wraps an external buffer",
+			Py_TYPE(self)->tp_name);
+		return 0;
+	}
+	return 1;
+}
+
 static int
 Vec2Array_resize(polypaths_planar_overrideSeq2Object *self, Py_ssize_t newsize) 
 {
@@ -1263,12 +1338,16 @@ Vec2Array_resize(polypaths_planar_overrideSeq2Object *self, Py_ssize_t newsize)
 	Py_ssize_t allocated = self->allocated;
 	void *realloc_vec;
 
+	if (newsize != Py_SIZE(self) && !Vec2Array_check_resizable(self)) {
+		return -1;
+	}
+
 	/* Bypass realloc() when a previous overallocation is large enough
 	   to accommodate the newsize.  If the newsize falls lower than half
 	   the allocated size, then proceed with the realloc() to shrink the array.
 	*/
 	if (allocated >= newsize && newsize >= (allocated >> 1)) {
-		Py_SIZE(self) = newsize;
+		Py_SET_SIZE(self, newsize);
 		return 0;
 	}
 
@@ -1296,7 +1375,7 @@ Vec2Array_resize(polypaths_planar_overrideSeq2Object *self, Py_ssize_t newsize)
 	}
 	self->vec = (polypaths_planar_override_vec2_t *)realloc_vec;
 	self->allocated = new_allocated;
-	Py_SIZE(self) = newsize;
+	Py_SET_SIZE(self, newsize);
 	return 0;
 }
 
@@ -1477,6 +1556,9 @@ Vec2Array_ass_slice(polypaths_planar_overrideSeq2Object *self,
 	norig = ihigh - ilow;
 	assert(norig >= 0);
 	d = n - norig;
+	if (d != 0 && !Vec2Array_check_resizable(self)) {
+		goto error;
+	}
 	if (Py_SIZE(self) + d == 0) {
 		Py_XDECREF(seq);
 		return Vec2Array_resize(self, 0);
@@ -1547,7 +1629,7 @@ Vec2Array_subscript(polypaths_planar_overrideSeq2Object* self, PyObject* item)
 		polypaths_planar_overrideSeq2Object* result;
 		polypaths_planar_override_vec2_t *src, *dest;
 
-		if (PySlice_GetIndicesEx((PySliceObject*)item, Py_SIZE(self),
+		if (PySlice_GetIndicesEx(SLICE_ARG(item), Py_SIZE(self),
 				 &start, &stop, &step, &slicelength) < 0) {
 			return NULL;
 		}
@@ -1600,7 +1682,7 @@ Vec2Array_ass_subscript(polypaths_planar_overrideSeq2Object* self,
 	else if (PySlice_Check(item)) {
 		Py_ssize_t start, stop, step, slicelength;
 
-		if (PySlice_GetIndicesEx((PySliceObject*)item, Py_SIZE(self),
+		if (PySlice_GetIndicesEx(SLICE_ARG(item), Py_SIZE(self),
 				 &start, &stop, &step, &slicelength) < 0) {
 			return -1;
 		}
@@ -1624,6 +1706,9 @@ Vec2Array_ass_subscript(polypaths_planar_overrideSeq2Object* self,
 			if (slicelength <= 0) {
 				return 0;
 			}
+			if (!Vec2Array_check_resizable(self)) {
+				return -1;
+			}
 
 			if (step < 0) {
 				stop = start + 1;
@@ -1659,7 +1744,7 @@ Vec2Array_ass_subscript(polypaths_planar_overrideSeq2Object* self,
 					 sizeof(polypaths_planar_override_vec2_t));
 			}
 
-			Py_SIZE(self) -= slicelength;
+			Py_SET_SIZE(self, Py_SIZE(self) - slicelength);
 			Vec2Array_resize(self, Py_SIZE(self));
 
 			return 0;
@@ -1863,6 +1948,13 @@ Vec2Array_clamped(polypaths_planar_overrideSeq2Object *self, PyObject *args, PyO
 	return varray;
 }
 
+static PyObject *
+Vec2Array_simplify_mask(polypaths_planar_overrideSeq2Object *self, 
+	PyObject *args, PyObject *kwargs)
+{
+	return call_simplify_mask((PyObject *)self, 0, args, kwargs);
+}
+
 static PyObject *
 Vec2Array_clamp(polypaths_planar_overrideSeq2Object *self, PyObject *args, PyObject *kwargs)
 {
@@ -1908,6 +2000,152 @@ Vec2Array_clamp(polypaths_planar_overrideSeq2Object *self, PyObject *args, PyObj
 	Py_RETURN_NONE;
 }
 
+/* Buffer Interface */
+
+/* Vec2Array buffers are tracked so that the array cannot be
+   resized, and its storage reallocated, while they are exported
+*/
+static int
+Vec2Array_getbuffer(polypaths_planar_overrideSeq2Object *self, Py_buffer *view, int flags)
+{
+	if (Seq2_getbuffer(self, view, flags) < 0) {
+		return -1;
+	}
+	++self->exports;
+	return 0;
+}
+
+static void
+Vec2Array_releasebuffer(polypaths_planar_overrideSeq2Object *self, Py_buffer *view)
+{
+	--self->exports;
+	Seq2_releasebuffer(self, view);
+}
+
+static PyBufferProcs Vec2Array_as_buffer = {
+#if PY_MAJOR_VERSION < 3
+	0,		/* bf_getreadbuffer */
+	0,		/* bf_getwritebuffer */
+	0,		/* bf_getsegcount */
+	0,		/* bf_getcharbuffer */
+#endif
+	(getbufferproc)Vec2Array_getbuffer,		/* bf_getbuffer */
+	(releasebufferproc)Vec2Array_releasebuffer,	/* bf_releasebuffer */
+};
+
+/* Create a Vec2Array from an object supporting the buffer protocol.
+   Unless copy is true, the array shares memory with the buffer, which
+   must be writable and C-contiguous. If pairs is true, the buffer 
+   must be an (n, 2) array of doubles, otherwise any buffer of doubles
+   or bytes of a suitable length is accepted.
+*/
+static PyObject *
+Vec2Array_new_from_buffer(PyTypeObject *type, PyObject *source, 
+	int copy, int pairs)
+{
+	polypaths_planar_overrideSeq2Object *varray;
+	PyObject *base;
+	Py_buffer *view;
+	Py_ssize_t size;
+	int kind;
+
+	base = PyMemoryView_FromObject(source);
+	if (base == NULL) {
+		return NULL;
+	}
+	view = PyMemoryView_GET_BUFFER(base);
+	kind = buffer_format_kind(view->format);
+	if (pairs && (kind != 1 || view->ndim != 2 || view->shape[1] != 2)) {
+		PyErr_Format(PyExc_ValueError,
+			"%.200s: expected an (n, 2) array of float64", type->tp_name);
+		goto error;
+	}
+	if (kind == 0) {
+		PyErr_Format(PyExc_ValueError,
+			"%.200s: expected a buffer of float64, got format '%.20s'", 
+			type->tp_name, view->format);
+		goto error;
+	}
+	if (view->len % sizeof(polypaths_planar_override_vec2_t) != 0) {
+		PyErr_Format(PyExc_ValueError,
+			"%.200s: buffer size must be a multiple of %d bytes", 
+			type->tp_name, (int)sizeof(polypaths_planar_override_vec2_t));
+		goto error;
+	}
+	size = view->len / sizeof(polypaths_planar_override_vec2_t);
+
+	if (copy) {
+		varray = Seq2_New(type, size);
+		if (varray == NULL) {
+			goto error;
+		}
+		if (PyBuffer_ToContiguous(varray->vec, view, view->len, 'C') < 0) {
+			Py_DECREF(varray);
+			goto error;
+		}
+		Py_DECREF(base);
+		return (PyObject *)varray;
+	}
+	if (view->readonly) {
+		PyErr_Format(PyExc_ValueError,
+			"%.200s: cannot wrap a read-only buffer, use copy=True", 
+			type->tp_name);
+		goto error;
+	}
+	if (!PyBuffer_IsContiguous(view, 'C')) {
+		PyErr_Format(PyExc_ValueError,
+			"%.200s: cannot wrap a non-contiguous buffer, use copy=True", 
+			type->tp_name);
+		goto error;
+	}
+	varray = (polypaths_planar_overrideSeq2Object *)type->tp_alloc(type, 0);
+	if (varray == NULL) {
+		goto error;
+	}
+	Py_SET_SIZE(varray, size);
+	varray->vec = (polypaths_planar_override_vec2_t *)view->buf;
+	varray->allocated = size;
+	varray->exports = 0;
+	/* Steals the reference to the memoryview, which keeps the
+	   source buffer exported for the lifetime of the array */
+	varray->base = base;
+	return (PyObject *)varray;
+
+error:
+	Py_DECREF(base);
+	return NULL;
+}
+
+static PyObject *
+Vec2Array_from_buffer(PyTypeObject *type, PyObject *args, PyObject *kwargs)
+{
+	PyObject *source;
+	int copy = 0;
+
+    static char *kwlist[] = {"buffer", "copy", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(
+        args, kwargs, "O|i:Vec2Array.from_buffer", kwlist, &source, &copy)) {
+        return NULL;
+    }
+	return Vec2Array_new_from_buffer(type, source, copy, 0);
+}
+
+static PyObject *
+Vec2Array_from_numpy(PyTypeObject *type, PyObject *args, PyObject *kwargs)
+{
+	PyObject *source;
+	int copy = 0;
+
+    static char *kwlist[] = {"array", "copy", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(
+        args, kwargs, "O|i:Vec2Array.from_numpy", kwlist, &source, &copy)) {
+        return NULL;
+    }
+	return Vec2Array_new_from_buffer(type, source, copy, 1);
+}
+
 static PyMethodDef Vec2Array_methods[] = {
     {"append", (PyCFunction)Vec2Array_append, METH_O, 
 		"Append all vectors in iterable to the end of the array."},
@@ -1915,6 +2153,12 @@ static PyMethodDef Vec2Array_methods[] = {
 		"Insert a vector at the specified index."},
     {"extend", (PyCFunction)Vec2Array_extend, METH_O, 
 		"Extend an array appending vectors from the given sequence."},
+    {"from_buffer", (PyCFunction)Vec2Array_from_buffer, 
+		METH_CLASS | METH_VARARGS | METH_KEYWORDS, 
+		"Create an array sharing memory with a buffer of float64 values."},
+    {"from_numpy", (PyCFunction)Vec2Array_from_numpy, 
+		METH_CLASS | METH_VARARGS | METH_KEYWORDS, 
+		"Create an array sharing memory with an (n, 2) float64 NumPy array."},
     {"longest", (PyCFunction)Vec2Array_longest, METH_NOARGS, 
 		"Return the vector in the array with the maximum length."},
     {"shortest", (PyCFunction)Vec2Array_shortest, METH_NOARGS, 
@@ -1930,6 +2174,10 @@ static PyMethodDef Vec2Array_methods[] = {
     {"clamped", (PyCFunction)Vec2Array_clamped, METH_VARARGS | METH_KEYWORDS, 
         "Create a new array of vectors with lengths clamped between "
         "min_length and max_length."},
+    {"simplify_mask", (PyCFunction)Vec2Array_simplify_mask, 
+		METH_VARARGS | METH_KEYWORDS, 
+		"Simplify the array as a polyline, returning a bytearray with a 1 "
+		"for each vertex kept."},
     {NULL, NULL}
 };
 
@@ -2477,8 +2725,9 @@ PyTypeObject polypaths_planar_overrideVec2ArrayType = {
 	(reprfunc)Vec2Array__repr__, /*tp_str*/
 	0,                      /*tp_getattro*/
 	0,                      /*tp_setattro*/
-	0,                      /*tp_as_buffer*/
-	Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_CHECKTYPES,     /*tp_flags*/
+	&Vec2Array_as_buffer,   /*tp_as_buffer*/
+	Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_CHECKTYPES
+		| Py_TPFLAGS_HAVE_NEWBUFFER,     /*tp_flags*/
 	Vec2Array__doc__,       /*tp_doc*/
 	0,                      /*tp_traverse*/
 	0,                      /*tp_clear*/
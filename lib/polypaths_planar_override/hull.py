@@ -0,0 +1,227 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Convex hulls of points arriving in chunks, or split across processes"""
+
+from __future__ import division
+
+import polypaths_planar_override
+from polypaths_planar_override.vector import _point_coords
+
+try:
+    from multiprocessing import shared_memory
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError: # pragma: no cover
+    shared_memory = None
+
+# Inputs with fewer points than this are not worth splitting across 
+# processes, their hulls are found in the calling process
+_parallel_min_points = 100000
+
+# Size in bytes of each x, y pair of float64 coordinates
+_POINT_SIZE = 16
+
+
+def _chunk_array(chunk):
+    """Return a chunk of points as a Seq2, sharing memory with
+    buffers where possible
+    """
+    Vec2Array = polypaths_planar_override.Vec2Array
+    if isinstance(chunk, polypaths_planar_override.Seq2):
+        return chunk
+    try:
+        memoryview(chunk)
+    except TypeError:
+        return Vec2Array(chunk)
+    try:
+        return Vec2Array.from_buffer(chunk)
+    except (TypeError, ValueError):
+        pass
+    try:
+        # Read-only or non-contiguous buffers must be copied
+        return Vec2Array.from_buffer(chunk, copy=True)
+    except ValueError:
+        # Buffers of other types are converted point by point
+        return Vec2Array(chunk)
+
+
+def _cross(o, a, b):
+    """Return the cross product of the vectors o->a and o->b"""
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _merge_hulls(points):
+    """Return the convex hull of a list of (x, y) tuples, using the 
+    monotone chain algorithm, wound clockwise from the leftmost point
+    like :meth:`Polygon.convex_hull`. Collinear points are dropped,
+    where the serial hull may keep some.
+    """
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+    lower = []
+    for p in points:
+        while len(lower) > 1 and _cross(lower[-2], lower[-1], p) <= 0.0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(points):
+        while len(upper) > 1 and _cross(upper[-2], upper[-1], p) <= 0.0:
+            upper.pop()
+        upper.append(p)
+    ccw = lower[:-1] + upper[:-1]
+    return ccw[:1] + ccw[:0:-1]
+
+
+class ConvexHullBuilder(object):
+    """Convex hull of a stream of points, folded in one chunk at a time,
+    so that only the hull and the current chunk are held in memory. 
+    Each chunk's hull is found with :meth:`Polygon.convex_hull`, then 
+    merged with the running hull by the monotone chain algorithm in 
+    O(h log h) time, for hulls with h vertices.
+
+    Points lying in the middle of a straight side of the hull are
+    dropped, where :meth:`Polygon.convex_hull` may keep some of them,
+    so the hull can have fewer vertices, covering the same area.
+
+    :param chunks: An optional iterable of chunks of points to add.
+        Each chunk may be a :class:`~polypaths_planar_override.Vec2Array`,
+        an iterable of points, or an object supporting the buffer protocol
+        containing float64 ``x, y`` pairs, such as an ``(n, 2)`` NumPy 
+        array or memory map.
+    """
+
+    def __init__(self, chunks=()):
+        self._hull = []
+        self.extend(chunks)
+
+    def add(self, points):
+        """Fold a chunk of points into the hull.
+
+        :param points: The points to add, see :class:`ConvexHullBuilder`.
+        """
+        points = _chunk_array(points)
+        if len(points) >= 3:
+            try:
+                points = polypaths_planar_override.Polygon.convex_hull(points)
+            except ValueError:
+                # Fewer than three distinct points
+                pass
+        self._hull = _merge_hulls(
+            self._hull + [(x, y) for x, y in points])
+
+    def extend(self, chunks):
+        """Fold each of an iterable of chunks of points into the hull.
+
+        :param chunks: Iterable of chunks, see :class:`ConvexHullBuilder`.
+        """
+        for chunk in chunks:
+            self.add(chunk)
+
+    def __len__(self):
+        """The number of vertices in the hull so far"""
+        return len(self._hull)
+
+    def polygon(self):
+        """Return the hull of the points added so far as a convex polygon,
+        wound clockwise.
+
+        :rtype: Polygon
+        :raises ValueError: If the points added so far do not span an
+            area, giving a hull of fewer than three vertices.
+        """
+        if len(self._hull) < 3:
+            raise ValueError(
+                "ConvexHullBuilder: at least 3 points not in a line required")
+        return polypaths_planar_override.Polygon(self._hull, is_convex=True)
+
+
+def _shared_slice_hull(args):
+    """Return the convex hull of a slice of the points in a shared memory
+    block as a list of (x, y) tuples. Runs in a worker process.
+    """
+    name, start, stop = args
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf[start * _POINT_SIZE:stop * _POINT_SIZE]
+        points = polypaths_planar_override.Vec2Array.from_buffer(view)
+        try:
+            hull = [(x, y) for x, y in 
+                polypaths_planar_override.Polygon.convex_hull(points)]
+        except ValueError:
+            # Fewer than three distinct points
+            hull = [(x, y) for x, y in points]
+        # Release the views of the block before closing it
+        del points
+        view.release()
+    finally:
+        shm.close()
+    return hull
+
+
+def _parallel_convex_hull(cls, points, workers):
+    """Return the convex hull of the points as a polygon of type cls,
+    finding the hulls of slices of the points in worker processes, and
+    merging them. The coordinates are copied once into shared memory, 
+    which the workers read without copying, so only the slice bounds 
+    and the partial hulls pass between processes.
+    """
+    workers = int(workers)
+    if workers < 1:
+        raise ValueError("Polygon.convex_hull: expected workers >= 1")
+    # Buffers that cannot be shared, such as integer or non-contiguous
+    # arrays, and iterables are copied, so points are read only once
+    coords = _point_coords(points)
+    count = len(coords) // 2
+
+    def serial_hull():
+        # Read-only buffers are copied to wrap them
+        Vec2Array = polypaths_planar_override.Vec2Array
+        return cls.convex_hull(Vec2Array.from_buffer(
+            coords, copy=memoryview(coords).readonly))
+
+    if workers == 1 or count < _parallel_min_points or shared_memory is None:
+        return serial_hull()
+    shm = shared_memory.SharedMemory(create=True, size=count * _POINT_SIZE)
+    try:
+        source = memoryview(coords).cast('B')
+        shm.buf[:len(source)] = source
+        source.release()
+        step = -(-count // workers)
+        slices = [(shm.name, start, min(start + step, count))
+            for start in range(0, count, step)]
+        with ProcessPoolExecutor(workers) as pool:
+            partial = list(pool.map(_shared_slice_hull, slices))
+    finally:
+        shm.close()
+        shm.unlink()
+    hull = _merge_hulls([p for hull in partial for p in hull])
+    if len(hull) < 3:
+        # The points lie on a line, give the same degenerate hull as 
+        # the serial path
+        return serial_hull()
+    return cls(hull, is_convex=True)
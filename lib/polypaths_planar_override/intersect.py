@@ -0,0 +1,597 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Line segment intersection using a Bentley-Ottmann plane sweep"""
+
+from __future__ import division
+
+import math
+import heapq
+import random
+from array import array
+import polypaths_planar_override
+from polypaths_planar_override.vector import _point_coords
+
+# Fraction of a grid cell that segments are widened by when finding the
+# cells they pass through, so that rounding cannot leave an intersection
+# outside the cells shared by its segments
+_CELL_PAD = 1e-6
+
+
+def _segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+    """Return True if the line segment a->b intersects with
+    line segment c->d. Collinear segments are not considered to intersect.
+    """
+    dir1 = (bx - ax)*(cy - ay) - (cx - ax)*(by - ay)
+    dir2 = (bx - ax)*(dy - ay) - (dx - ax)*(by - ay)
+    if (dir1 > 0.0) != (dir2 > 0.0) or (not dir1) != (not dir2):
+        dir1 = (dx - cx)*(ay - cy) - (ax - cx)*(dy - cy)
+        dir2 = (dx - cx)*(by - cy) - (bx - cx)*(dy - cy)
+        return ((dir1 > 0.0) != (dir2 > 0.0)
+            or (not dir1) != (not dir2))
+    return False
+
+
+class _SweepStatus(object):
+    """The segments crossing the sweep line, ordered from bottom to top.
+    The segments are kept in a treap, a binary search tree balanced by
+    random node priorities, so that insertion and removal take O(log n)
+    expected time. Nodes are referenced by index into flat lists, and
+    have parent links so that segments can be removed, and their
+    neighbors found, without comparing them to other segments.
+    """
+
+    def __init__(self, count):
+        self.root = -1
+        self.left = []
+        self.right = []
+        self.parent = []
+        self.priority = []
+        self.segment = []
+        self.node = [-1] * count
+        self.free = []
+        self.random = random.Random(count).random
+
+    def insert(self, seg, below):
+        """Insert a segment, below(other) returns True if the segment
+        belongs below the other segment
+        """
+        left = self.left
+        right = self.right
+        parent = self.parent
+        segment = self.segment
+        if self.free:
+            node = self.free.pop()
+            left[node] = right[node] = -1
+            self.priority[node] = self.random()
+            segment[node] = seg
+        else:
+            node = len(segment)
+            left.append(-1)
+            right.append(-1)
+            parent.append(-1)
+            self.priority.append(self.random())
+            segment.append(seg)
+        self.node[seg] = node
+        if self.root == -1:
+            self.root = node
+            parent[node] = -1
+            return
+        current = self.root
+        while True:
+            if below(segment[current]):
+                if left[current] == -1:
+                    left[current] = node
+                    break
+                current = left[current]
+            else:
+                if right[current] == -1:
+                    right[current] = node
+                    break
+                current = right[current]
+        parent[node] = current
+        priority = self.priority
+        while parent[node] != -1 and priority[node] > priority[parent[node]]:
+            self._rotate_up(node)
+
+    def _rotate_up(self, node):
+        left = self.left
+        right = self.right
+        parent = self.parent
+        up = parent[node]
+        grand_parent = parent[up]
+        if left[up] == node:
+            child = right[node]
+            left[up] = child
+            right[node] = up
+        else:
+            child = left[node]
+            right[up] = child
+            left[node] = up
+        if child != -1:
+            parent[child] = up
+        parent[up] = node
+        parent[node] = grand_parent
+        if grand_parent == -1:
+            self.root = node
+        elif left[grand_parent] == up:
+            left[grand_parent] = node
+        else:
+            right[grand_parent] = node
+
+    def remove(self, seg):
+        left = self.left
+        right = self.right
+        parent = self.parent
+        priority = self.priority
+        node = self.node[seg]
+        # Rotate the node down until it has at most one child
+        while left[node] != -1 and right[node] != -1:
+            if priority[left[node]] > priority[right[node]]:
+                self._rotate_up(left[node])
+            else:
+                self._rotate_up(right[node])
+        child = left[node] if left[node] != -1 else right[node]
+        up = parent[node]
+        if child != -1:
+            parent[child] = up
+        if up == -1:
+            self.root = child
+        elif left[up] == node:
+            left[up] = child
+        else:
+            right[up] = child
+        self.node[seg] = -1
+        self.free.append(node)
+
+    def find(self, below):
+        """Return the highest segment for which below(seg) returns True,
+        or -1 if there is none. below must return True for all segments
+        beneath some position in the sweep line, and False for all above.
+        """
+        node = self.root
+        found = -1
+        while node != -1:
+            seg = self.segment[node]
+            if below(seg):
+                found = seg
+                node = self.right[node]
+            else:
+                node = self.left[node]
+        return found
+
+    def below(self, seg):
+        """Return the segment immediately below the segment, or -1"""
+        left = self.left
+        parent = self.parent
+        node = self.node[seg]
+        if left[node] != -1:
+            node = left[node]
+            while self.right[node] != -1:
+                node = self.right[node]
+            return self.segment[node]
+        while parent[node] != -1 and left[parent[node]] == node:
+            node = parent[node]
+        node = parent[node]
+        return self.segment[node] if node != -1 else -1
+
+    def above(self, seg):
+        """Return the segment immediately above the segment, or -1"""
+        right = self.right
+        parent = self.parent
+        node = self.node[seg]
+        if right[node] != -1:
+            node = right[node]
+            while self.left[node] != -1:
+                node = self.left[node]
+            return self.segment[node]
+        while parent[node] != -1 and right[parent[node]] == node:
+            node = parent[node]
+        node = parent[node]
+        return self.segment[node] if node != -1 else -1
+
+    def swap(self, a, b):
+        """Exchange the positions of two segments"""
+        node_a = self.node[a]
+        node_b = self.node[b]
+        self.segment[node_a] = b
+        self.segment[node_b] = a
+        self.node[a] = node_b
+        self.node[b] = node_a
+
+
+def _sweep_intersections(segments, intersects):
+    """Generate the (i, j) index pairs, where i < j, of the intersecting
+    segments, each pair once, in sweep order.
+
+    :param segments: List of (x0, y0, x1, y1) tuples, where
+        (x0, y0) <= (x1, y1) lexicographically.
+    :param intersects: Function called with a pair of segment indices
+        that returns True if they intersect. Only pairs of segments that
+        are neighbors in the sweep, or touch at a sweep event point, are
+        tested.
+    """
+    count = len(segments)
+    status = _SweepStatus(count)
+    # Events are (x, y, kind, a, b) tuples, where kind is 0 for the
+    # crossing of segments a and b, 1 for the start of segment a and
+    # 2 for its end. All events at the same point are handled together.
+    events = []
+    for i, (x0, y0, x1, y1) in enumerate(segments):
+        events.append((x0, y0, 1, i, -1))
+        events.append((x1, y1, 2, i, -1))
+    heapq.heapify(events)
+    found = []
+    tested = set()
+    partners = {}
+
+    def test(a, b):
+        """Test a pair of segments for intersection, once"""
+        pair = (a, b) if a < b else (b, a)
+        if pair not in tested:
+            tested.add(pair)
+            partners.setdefault(a, []).append(pair)
+            partners.setdefault(b, []).append(pair)
+            if intersects(*pair):
+                found.append(pair)
+
+    def side(seg, px, py):
+        """Return a positive number if the point is above the segment's
+        line, negative if it is below, or zero if it is on the line
+        """
+        ax, ay, bx, by = segments[seg]
+        return (bx - ax)*(py - ay) - (px - ax)*(by - ay)
+
+    def neighbors(a, b, px, py):
+        """Test a segment a immediately below segment b, and schedule
+        the point where they cross, if it is ahead of the sweep
+        """
+        if a == -1 or b == -1:
+            return
+        test(a, b)
+        ax, ay, bx, by = segments[a]
+        # a crosses b ahead if its left end is below b and its right
+        # end is above b, and b's ends are on opposite sides of a
+        dir1 = side(b, bx, by)
+        dir2 = side(b, ax, ay)
+        if dir1 > 0.0 and dir2 < 0.0:
+            cx, cy, dx, dy = segments[b]
+            dir3 = side(a, cx, cy)
+            dir4 = side(a, dx, dy)
+            if (dir3 > 0.0) != (dir4 > 0.0) and dir3 and dir4:
+                t = dir2 / (dir2 - dir1)
+                x = ax + (bx - ax) * t
+                y = ay + (by - ay) * t
+                if (x, y) > (px, py):
+                    heapq.heappush(events, (x, y, 0, a, b))
+                else:
+                    # Rounded onto or behind the sweep, cross now
+                    cross(a, b, px, py)
+
+    def cross(a, b, px, py):
+        status.swap(a, b)
+        neighbors(status.below(b), b, px, py)
+        neighbors(a, status.above(a), px, py)
+
+    def find(px, py):
+        """Return a segment in the sweep status containing the point,
+        or -1 if there is none
+        """
+        node = status.root
+        while node != -1:
+            seg = status.segment[node]
+            on_side = side(seg, px, py)
+            if not on_side:
+                return seg
+            node = (status.left if on_side < 0.0 else status.right)[node]
+        return -1
+
+    while events:
+        px, py = events[0][:2]
+        crossings = []
+        starts = []
+        ends = []
+        while events and events[0][0] == px and events[0][1] == py:
+            _, _, kind, a, b = heapq.heappop(events)
+            if kind == 0:
+                crossings.append((a, b))
+            elif kind == 1:
+                starts.append(a)
+            else:
+                ends.append(a)
+        for a, b in crossings:
+            # Cross, if the segments are still neighbors in order
+            if status.node[a] != -1 and status.above(a) == b:
+                cross(a, b, px, py)
+        # Zero length segments are tested, but never enter the status
+        points = [seg for seg in starts if segments[seg][:2] 
+            == segments[seg][2:]]
+        if points:
+            starts = [seg for seg in starts if seg not in points]
+            ends = [seg for seg in ends if seg not in points]
+
+        # Find the segments through the point, including those ending
+        # at it, which are together in the sweep status. All pairs of
+        # these and the segments starting at the point are tested.
+        through = []
+        seeds = ends or [find(px, py)]
+        for seed in seeds:
+            if seed == -1 or seed in through:
+                continue
+            through.append(seed)
+            for step in (status.below, status.above):
+                seg = step(seed)
+                while seg != -1 and not side(seg, px, py):
+                    through.append(seg)
+                    seg = step(seg)
+        touching = through + starts + points
+        for i, seg in enumerate(touching):
+            for other in touching[i + 1:]:
+                test(seg, other)
+
+        below_ends = [status.below(seg) for seg in ends]
+        for seg in ends:
+            status.remove(seg)
+        for seg in ends + points:
+            # Pairs with a removed segment are never tested again
+            for pair in partners.pop(seg, ()):
+                tested.discard(pair)
+        for seg in below_ends:
+            if seg != -1 and status.node[seg] != -1:
+                neighbors(seg, status.above(seg), px, py)
+
+        for seg in starts:
+            qx, qy = segments[seg][2:]
+
+            def below(other):
+                on_side = side(other, px, py)
+                if not on_side:
+                    # Starts on the other segment, compare directions
+                    on_side = side(other, qx, qy)
+                    if not on_side:
+                        return seg < other
+                return on_side < 0.0
+
+            status.insert(seg, below)
+        for seg in starts:
+            neighbors(status.below(seg), seg, px, py)
+            neighbors(seg, status.above(seg), px, py)
+        if found:
+            for pair in found:
+                yield pair
+            del found[:]
+
+
+def _polygon_edges(poly):
+    """Return the edges of a polygon as a list of (x0, y0, x1, y1)
+    tuples ordered for the sweep, where edge i runs between vertex i
+    and vertex i + 1
+    """
+    coords = _point_coords(poly)
+    points = list(zip(coords[0::2], coords[1::2]))
+    points.append(points[0])
+    return [p0 + p1 if p0 <= p1 else p1 + p0
+        for p0, p1 in zip(points, points[1:])]
+
+
+def _iter_polygon_intersections(poly):
+    """Generate the (i, j) index pairs of the intersecting non-adjacent
+    edges of a polygon, where edge i runs from vertex i to vertex i + 1
+    """
+    edges = _polygon_edges(poly)
+    last_index = len(edges) - 1
+
+    def intersects(i, j):
+        # ignore adjacent edges
+        return (last_index > j - i > 1
+            and _segments_intersect(*(edges[i] + edges[j])))
+
+    return _sweep_intersections(edges, intersects)
+
+
+def _polygon_intersecting_edges(poly):
+    """Return a sorted list of the index pairs of the intersecting
+    non-adjacent edges of a polygon
+    """
+    return sorted(_iter_polygon_intersections(poly))
+
+
+def _intersection_point(ax, ay, bx, by, cx, cy, dx, dy):
+    """Return the point where the intersecting, non-collinear line segments
+    a->b and c->d meet. An end point lying on the other segment is
+    returned exactly.
+    """
+    dir1 = (bx - ax)*(cy - ay) - (cx - ax)*(by - ay)
+    if not dir1:
+        return cx, cy
+    dir2 = (bx - ax)*(dy - ay) - (dx - ax)*(by - ay)
+    if not dir2:
+        return dx, dy
+    dir3 = (dx - cx)*(ay - cy) - (ax - cx)*(dy - cy)
+    if not dir3:
+        return ax, ay
+    dir4 = (dx - cx)*(by - cy) - (bx - cx)*(dy - cy)
+    if not dir4:
+        return bx, by
+    t = dir3 / (dir3 - dir4)
+    return ax + (bx - ax) * t, ay + (by - ay) * t
+
+
+def _endpoint_segments(endpoints):
+    """Return the segments for an even length sequence of end points as
+    a list of (x0, y0, x1, y1) tuples ordered for the sweep
+    """
+    coords = _point_coords(endpoints)
+    if len(coords) % 4:
+        raise ValueError("Segment end points must be in pairs")
+    it = iter(coords)
+    segments = list(zip(it, it, it, it))
+    for i, (x0, y0, x1, y1) in enumerate(segments):
+        if (x1, y1) < (x0, y0):
+            segments[i] = (x1, y1, x0, y0)
+    return segments
+
+
+def segment_intersections(endpoints, cell_size=None):
+    """Find the intersections among a set of line segments using a
+    Bentley-Ottmann plane sweep, generating them in sweep order, so the
+    results need not be held in memory. Segments that touch intersect,
+    collinear segments do not. Runtime complexity: O((n + k) log n) for
+    ``k`` intersections.
+
+    Large sets of segments can optionally be bucketed first into a grid of
+    square cells, each of which is swept separately. Each segment is 
+    added to the cells it passes through. This bounds the size of each
+    sweep, and is faster when most segments are short relative to the 
+    cell size, as in road networks or contour lines. Each intersection is
+    reported once, by a single cell.
+
+    :param endpoints: The segment end points, a 
+        :class:`~polypaths_planar_override.Vec2Array` or other sequence
+        of points, where segment ``i`` runs from ``endpoints[2 * i]`` to
+        ``endpoints[2 * i + 1]``.
+    :param cell_size: The side length of the grid cells. If omitted, all
+        of the segments are swept together.
+    :type cell_size: float
+    :return: An iterator of ``(point, i, j)`` tuples, where ``point`` is
+        the :class:`~polypaths_planar_override.Vec2` intersection of 
+        segments ``i`` and ``j``, and ``i < j``.
+    """
+    segments = _endpoint_segments(endpoints)
+    if cell_size is None:
+        return _iter_intersections(segments, range(len(segments)))
+    cell_size = float(cell_size)
+    if not cell_size > 0.0:
+        raise ValueError("Grid cell_size must be positive")
+    return _iter_grid_intersections(segments, cell_size)
+
+
+def _iter_intersections(segments, indices, owns=None):
+    """Generate the (point, i, j) intersections of segments, where
+    indices maps the segments to their indices in the results. If owns is
+    specified, only intersections where owns(x, y, i, j) is true are
+    generated.
+    """
+    Vec2 = polypaths_planar_override.Vec2
+
+    def intersects(i, j):
+        return _segments_intersect(*(segments[i] + segments[j]))
+
+    for i, j in _sweep_intersections(segments, intersects):
+        x, y = _intersection_point(*(segments[i] + segments[j]))
+        i = indices[i]
+        j = indices[j]
+        if owns is None or owns(x, y, i, j):
+            yield Vec2(x, y), i, j
+
+
+def _segment_columns(segment, cell_size):
+    """Return the first and last grid columns crossed by a segment"""
+    x0, y0, x1, y1 = segment
+    pad = cell_size * _CELL_PAD
+    return (int(math.floor((x0 - pad) / cell_size)), 
+        int(math.floor((x1 + pad) / cell_size)))
+
+
+def _column_rows(segment, ix, cell_size):
+    """Return the first and last grid rows crossed by a segment within 
+    grid column ix
+    """
+    x0, y0, x1, y1 = segment
+    pad = cell_size * _CELL_PAD
+    dx = x1 - x0
+    if dx:
+        slope = (y1 - y0) / dx
+        ya = y0 + (max(ix * cell_size - pad, x0) - x0) * slope
+        yb = y0 + (min((ix + 1) * cell_size + pad, x1) - x0) * slope
+    else:
+        ya, yb = y0, y1
+    if ya > yb:
+        ya, yb = yb, ya
+    return (int(math.floor((ya - pad) / cell_size)), 
+        int(math.floor((yb + pad) / cell_size)))
+
+
+def _segment_cells(segment, cell_size):
+    """Generate the (ix, iy) grid cells that a segment passes through, 
+    a column at a time, including cells it only touches. This visits
+    O(length / cell_size) cells, where the segment's bounding box may 
+    cover O((length / cell_size)**2).
+    """
+    ix0, ix1 = _segment_columns(segment, cell_size)
+    for ix in range(ix0, ix1 + 1):
+        iy0, iy1 = _column_rows(segment, ix, cell_size)
+        for iy in range(iy0, iy1 + 1):
+            yield ix, iy
+
+
+def _in_segment_cells(segment, ix, iy, cell_size):
+    """Return True if the segment passes through the grid cell (ix, iy)"""
+    ix0, ix1 = _segment_columns(segment, cell_size)
+    if not ix0 <= ix <= ix1:
+        return False
+    iy0, iy1 = _column_rows(segment, ix, cell_size)
+    return iy0 <= iy <= iy1
+
+
+def _iter_grid_intersections(segments, cell_size):
+    """Generate the (point, i, j) segment intersections, sweeping each
+    grid cell that segments pass through separately
+    """
+    floor = math.floor
+    cells = {}
+    for i, segment in enumerate(segments):
+        for key in _segment_cells(segment, cell_size):
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = array('l')
+            cell.append(i)
+
+    def owner(x, y, i, j):
+        # The owning cell contains the point, if both segments pass
+        # through it, otherwise rounding has moved the point, and the
+        # first cell shared by both segments owns it
+        seg_i = segments[i]
+        seg_j = segments[j]
+        ix = int(floor(x / cell_size))
+        iy = int(floor(y / cell_size))
+        if (_in_segment_cells(seg_i, ix, iy, cell_size) 
+            and _in_segment_cells(seg_j, ix, iy, cell_size)):
+            return ix, iy
+        return min(set(_segment_cells(seg_i, cell_size)).intersection(
+            _segment_cells(seg_j, cell_size)))
+
+    for key in sorted(cells):
+        indices = cells.pop(key)
+        if len(indices) > 1:
+            for result in _iter_intersections(
+                [segments[i] for i in indices], indices, 
+                lambda x, y, i, j: owner(x, y, i, j) == key):
+                yield result
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
@@ -91,9 +91,9 @@ class Line(_LinearGeometry):
         """
         points = iter(points)
         try:
-            start = end = polypaths_planar_override.Vec2(*points.next())
+            start = end = polypaths_planar_override.Vec2(*next(points))
             while end == start:
-                end = polypaths_planar_override.Vec2(*points.next())
+                end = polypaths_planar_override.Vec2(*next(points))
         except StopIteration:
             raise ValueError("Expected iterable of 2 or more distinct points")
         line = _LinearGeometry.__new__(cls)
@@ -260,9 +260,9 @@ class Ray(_LinearGeometry):
         """
         points = iter(points)
         try:
-            start = end = polypaths_planar_override.Vec2(*points.next())
+            start = end = polypaths_planar_override.Vec2(*next(points))
             while end == start:
-                end = polypaths_planar_override.Vec2(*points.next())
+                end = polypaths_planar_override.Vec2(*next(points))
         except StopIteration:
             raise ValueError("Expected iterable of 2 or more distinct points")
         ray = _LinearGeometry.__new__(cls)
@@ -414,7 +414,7 @@ class LineSegment(_LinearGeometry):
         """
         points = iter(points)
         try:
-            start = end = polypaths_planar_override.Vec2(*points.next())
+            start = end = polypaths_planar_override.Vec2(*next(points))
         except StopIteration:
             raise ValueError("Expected iterable of 1 or more points")
         furthest = 0.0
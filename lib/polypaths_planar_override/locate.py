@@ -0,0 +1,347 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Point location in simple polygons using a trapezoidal map"""
+
+from __future__ import division
+
+import random
+from array import array
+from polypaths_planar_override.vector import _flatten
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
+
+# Leaf values in the flattened search structure
+_OUTSIDE = -1
+_INSIDE = -2
+
+
+class _Trapezoid(object):
+    """Trapezoid in the map, bounded by top and bottom segments, and 
+    vertical walls through the leftp and right points. None denotes an 
+    unbounded side. The neighbors across the left and right walls are
+    stored for the parts of the walls above (ul, ur) and below (ll, lr)
+    the points. The node is the leaf of the search structure for the 
+    trapezoid.
+    """
+
+    __slots__ = ('top', 'bottom', 'leftp', 'rightp', 
+        'ul', 'll', 'ur', 'lr', 'node')
+
+    def __init__(self, top, bottom, leftp, rightp):
+        self.top = top
+        self.bottom = bottom
+        self.leftp = leftp
+        self.rightp = rightp
+        self.ul = self.ll = self.ur = self.lr = None
+        self.node = _Node(None, None, None, self)
+
+
+class _Node(object):
+    """Node of the search structure. A point node has a vertex index key
+    and children left and right of the point. A segment node has a 
+    segment key and children above (left) and below (right) the segment.
+    A leaf node has no key and refers to a trapezoid.
+    """
+
+    __slots__ = ('key', 'left', 'right', 'trap')
+
+    def __init__(self, key, left, right, trap=None):
+        self.key = key
+        self.left = left
+        self.right = right
+        self.trap = trap
+
+
+def _replace_neighbor(trap, old, new):
+    if trap is not None:
+        if trap.ul is old: trap.ul = new
+        if trap.ll is old: trap.ll = new
+        if trap.ur is old: trap.ur = new
+        if trap.lr is old: trap.lr = new
+
+
+def _build_trapezoids(coords):
+    """Build a trapezoidal map of a simple polygon with the flat vertex 
+    coordinates given, by inserting its edges in random order. Vertices 
+    with the same x coordinate are ordered by y, as if the plane were 
+    sheared slightly, so no two vertices share a vertical wall.
+
+    Return the search structure as a flat array of ``key, left, right``
+    triples, rooted at the first. Keys ``2 * i`` are tested against 
+    vertex ``i``, and keys ``2 * i + 1`` against the edge from vertex 
+    ``i`` to the next. Negative children are leaves, either 
+    ``_INSIDE`` or ``_OUTSIDE`` the polygon.
+
+    Expected time: O(n log n), expected size: O(n)
+    """
+    count = len(coords) // 2
+    vx = coords[0::2]
+    vy = coords[1::2]
+    points = {}
+    pid = [points.setdefault((vx[i], vy[i]), i) for i in range(count)]
+    area2 = 0.0
+    segments = []
+    for i in range(count):
+        j = (i + 1) % count
+        area2 += vx[i] * vy[j] - vx[j] * vy[i]
+        p, q = pid[i], pid[j]
+        if p != q:
+            if (vx[p], vy[p]) > (vx[q], vy[q]):
+                p, q = q, p
+            segments.append((i, p, q))
+    random.Random(count).shuffle(segments)
+
+    def above(seg, k):
+        e, p, q = seg
+        return ((vx[q] - vx[p]) * (vy[k] - vy[p]) 
+            - (vx[k] - vx[p]) * (vy[q] - vy[p]) > 0.0)
+
+    root = _Trapezoid(None, None, None, None).node
+    for seg in segments:
+        e, p, q = seg
+        # Find the trapezoid containing the segment start
+        node = root
+        while node.trap is None:
+            if isinstance(node.key, tuple):
+                if node.key[1] == p:
+                    # segments share a left end, compare the slopes
+                    is_left = above(node.key, q)
+                else:
+                    is_left = above(node.key, p)
+            else:
+                is_left = (vx[p], vy[p]) < (vx[node.key], vy[node.key])
+            node = node.left if is_left else node.right
+        # Walk right along the segment through the trapezoids it crosses
+        crossed = [node.trap]
+        trap = node.trap
+        while (trap.rightp is not None 
+            and (vx[trap.rightp], vy[trap.rightp]) < (vx[q], vy[q])):
+            trap = trap.lr if above(seg, trap.rightp) else trap.ur
+            if trap is None:
+                raise ValueError(
+                    "Cannot prepare a polygon with overlapping edges")
+            crossed.append(trap)
+
+        first = crossed[0]
+        last = crossed[-1]
+        upper = _Trapezoid(first.top, seg, p, None)
+        lower = _Trapezoid(seg, first.bottom, p, None)
+        if first.leftp != p:
+            left = _Trapezoid(first.top, first.bottom, first.leftp, p)
+            left.ul = first.ul
+            left.ll = first.ll
+            _replace_neighbor(first.ul, first, left)
+            _replace_neighbor(first.ll, first, left)
+            left.ur = upper
+            left.lr = lower
+            upper.ul = lower.ll = left
+        else:
+            left = None
+            upper.ul = first.ul
+            lower.ll = first.ll
+            _replace_neighbor(first.ul, first, upper)
+            _replace_neighbor(first.ll, first, lower)
+        for i, trap in enumerate(crossed):
+            node = trap.node
+            node.key = seg
+            node.left = upper.node
+            node.right = lower.node
+            node.trap = None
+            if trap is last:
+                break
+            r = trap.rightp
+            next_trap = crossed[i + 1]
+            if above(seg, r):
+                # The wall below r is cut off by the segment, 
+                # the trapezoids below it merge
+                upper.rightp = r
+                upper.ur = trap.ur
+                _replace_neighbor(trap.ur, trap, upper)
+                new_upper = _Trapezoid(next_trap.top, seg, r, None)
+                upper.lr = new_upper
+                new_upper.ll = upper
+                new_upper.ul = next_trap.ul
+                _replace_neighbor(next_trap.ul, next_trap, new_upper)
+                upper = new_upper
+            else:
+                lower.rightp = r
+                lower.lr = trap.lr
+                _replace_neighbor(trap.lr, trap, lower)
+                new_lower = _Trapezoid(seg, next_trap.bottom, r, None)
+                lower.ur = new_lower
+                new_lower.ul = lower
+                new_lower.ll = next_trap.ll
+                _replace_neighbor(next_trap.ll, next_trap, new_lower)
+                lower = new_lower
+        upper.rightp = lower.rightp = q
+        if last.rightp != q:
+            right = _Trapezoid(last.top, last.bottom, q, last.rightp)
+            right.ur = last.ur
+            right.lr = last.lr
+            _replace_neighbor(last.ur, last, right)
+            _replace_neighbor(last.lr, last, right)
+            right.ul = upper
+            right.ll = lower
+            upper.ur = lower.lr = right
+            # Split off the right part in the last trapezoid's node
+            node = last.node
+            node.left = _Node(node.key, node.left, node.right)
+            node.key = q
+            node.right = right.node
+        else:
+            upper.ur = last.ur
+            lower.lr = last.lr
+            _replace_neighbor(last.ur, last, upper)
+            _replace_neighbor(last.lr, last, lower)
+        if left is not None:
+            node = first.node
+            node.right = _Node(node.key, node.left, node.right)
+            node.key = p
+            node.left = left.node
+
+    # Flatten the search structure, the trapezoids are inside the 
+    # polygon when its interior is below their top segment
+    dag = array('l')
+    index = {}
+    stack = [root]
+    order = []
+    while stack:
+        node = stack.pop()
+        if node.trap is None and id(node) not in index:
+            index[id(node)] = len(order)
+            order.append(node)
+            stack.append(node.right)
+            stack.append(node.left)
+    def child(node):
+        trap = node.trap
+        if trap is None:
+            return index[id(node)]
+        if trap.top is None:
+            return _OUTSIDE
+        e, p, q = trap.top
+        # Interior is left of the edges of a counter-clockwise polygon
+        if (pid[e] == p) == (area2 > 0.0):
+            return _OUTSIDE
+        return _INSIDE
+    for node in order:
+        if isinstance(node.key, tuple):
+            key = node.key[0] * 2 + 1
+        else:
+            key = node.key * 2
+        dag.extend((key, child(node.left), child(node.right)))
+    return dag
+
+
+def _prepare_polygon(poly):
+    """Return the search structure of the trapezoidal map of a polygon,
+    and the vertex coordinates it refers to.
+
+    :raises ValueError: If the polygon is not simple, or has no area.
+    """
+    if not poly.is_simple:
+        raise ValueError("Cannot prepare a polygon that is not simple")
+    coords = array('d', _flatten(poly))
+    xs = coords[0::2]
+    ys = coords[1::2]
+    area2 = sum(x0 * y1 - x1 * y0 
+        for x0, y0, x1, y1 in zip(xs, ys, xs[1:] + xs[:1], ys[1:] + ys[:1]))
+    if not area2:
+        # Degenerate polygons would leave no inside trapezoids to 
+        # separate the outside ones, and mislabel points around them
+        raise ValueError("Cannot prepare a polygon with zero area")
+    return _build_trapezoids(coords), coords
+
+
+def _trapezoid_contains_point(dag, coords, px, py):
+    """Return True if the point is inside the polygon, by descending
+    its search structure from :func:`_build_trapezoids` to the 
+    trapezoid containing the point. 
+
+    Points on the boundary are located as if moved right, then down 
+    by a vanishing amount, so they get the same answer as the winding
+    number test in :meth:`Polygon.contains_point`.
+
+    Expected complexity: O(log n)
+    """
+    if not dag:
+        return False
+    count = len(coords) // 2
+    i = 0
+    while i >= 0:
+        key, left, right = dag[i * 3:i * 3 + 3]
+        v = key >> 1
+        x0 = coords[v * 2]
+        y0 = coords[v * 2 + 1]
+        if key & 1:
+            w = (v + 1) % count
+            x1 = coords[w * 2]
+            y1 = coords[w * 2 + 1]
+            if (x0, y0) > (x1, y1):
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            side = (x1 - x0) * (py - y0) - (px - x0) * (y1 - y0)
+            is_left = side > 0.0 or (side == 0.0 and y1 < y0)
+        else:
+            is_left = px < x0
+        i = left if is_left else right
+    return i == _INSIDE
+
+
+def _trapezoid_contains_array(dag, coords, px, py):
+    """Vectorized :func:`_trapezoid_contains_point` for NumPy arrays of 
+    point x and y coordinates, returning a boolean array. The points
+    descend the search structure in lock step.
+    """
+    if not dag:
+        return numpy.zeros(len(px), dtype=bool)
+    nodes = numpy.frombuffer(dag, dtype=dag.typecode).reshape(-1, 3)
+    vert = numpy.frombuffer(coords, dtype=numpy.float64).reshape(-1, 2)
+    i = numpy.zeros(len(px), dtype=nodes.dtype)
+    active = numpy.arange(len(px))
+    while len(active):
+        key, left, right = nodes[i[active]].T
+        x, y = px[active], py[active]
+        vx, vy = vert[key >> 1].T
+        wx, wy = vert[((key >> 1) + 1) % len(vert)].T
+        # direct the edges left to right
+        swap = (vx > wx) | ((vx == wx) & (vy > wy))
+        x0, x1 = numpy.where(swap, wx, vx), numpy.where(swap, vx, wx)
+        y0, y1 = numpy.where(swap, wy, vy), numpy.where(swap, vy, wy)
+        side = (x1 - x0) * (y - y0) - (x - x0) * (y1 - y0)
+        is_left = numpy.where(key & 1, 
+            (side > 0.0) | ((side == 0.0) & (y1 < y0)), x < vx)
+        i[active] = numpy.where(is_left, left, right)
+        active = active[i[active] >= 0]
+    return i == _INSIDE
+
+
+def _trapezoids_size(dag):
+    """Return the memory used by the search structure in bytes"""
+    return len(dag) * dag.itemsize
@@ -0,0 +1,121 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Cached levels of detail for polygons"""
+
+from __future__ import division
+
+import math
+from collections import OrderedDict
+from polypaths_planar_override.simplify import _simplify_mask
+
+# The number of levels of detail cached for each polygon
+_lod_cache_size = 8
+
+
+def _level_tolerance(tolerance):
+    """Return the largest power of two no larger than the tolerance, so
+    that nearby tolerances share a level, and every level is within the
+    tolerance asked for
+    """
+    if not tolerance > 0.0:
+        raise ValueError("Level of detail tolerance must be > 0")
+    mantissa, exponent = math.frexp(tolerance)
+    return math.ldexp(0.5, exponent)
+
+
+class _LevelCache(OrderedDict):
+    """Simplified copies of a polygon, keyed by tolerance, with the least
+    recently used level evicted once there are more than 
+    ``_lod_cache_size``
+    """
+
+    def level(self, poly, tolerance):
+        """Return the simplified polygon for the level of detail within
+        the tolerance, and the level's own tolerance
+        """
+        key = _level_tolerance(tolerance)
+        level = self.pop(key, None)
+        if level is None:
+            mask = _simplify_mask(poly, True, key, preserve_simple=True)
+            level = type(poly)(
+                [vertex for vertex, keep in zip(poly, mask) if keep], 
+                is_convex=poly.is_convex or None)
+            if len(self) >= _lod_cache_size:
+                self.popitem(last=False)
+        # Reinsert the level as the most recently used
+        self[key] = level
+        return level, key
+
+    def contains_point(self, poly, point, tolerance):
+        """Test the point against the level of detail within the 
+        tolerance, falling back to the full polygon for points closer
+        to the level's outline than the level's tolerance
+        """
+        level, level_tolerance = self.level(poly, tolerance)
+        if len(level) < len(poly):
+            px, py = point
+            limit2 = level_tolerance * level_tolerance
+            (min_x, min_y), (max_x, max_y) = (
+                level.bounding_box.min_point, level.bounding_box.max_point)
+            if (px < min_x - level_tolerance or px > max_x + level_tolerance
+                or py < min_y - level_tolerance 
+                or py > max_y + level_tolerance):
+                return False
+            if _outline_distance2(level, px, py, limit2) > limit2:
+                return level.contains_point(point)
+        return poly.contains_point(point)
+
+
+def _outline_distance2(poly, px, py, limit2):
+    """Return the squared distance from a point to the polygon's
+    outline, stopping early once it is no more than limit2
+    """
+    nearest2 = float('inf')
+    ax, ay = poly[-1]
+    for bx, by in poly:
+        dx = bx - ax
+        dy = by - ay
+        qx = px - ax
+        qy = py - ay
+        length2 = dx*dx + dy*dy
+        if length2:
+            t = (qx * dx + qy * dy) / length2
+            if t > 1.0:
+                t = 1.0
+            elif t < 0.0:
+                t = 0.0
+            qx -= t * dx
+            qy -= t * dy
+        dist2 = qx*qx + qy*qy
+        if dist2 < nearest2:
+            nearest2 = dist2
+            if nearest2 <= limit2:
+                break
+        ax = bx
+        ay = by
+    return nearest2
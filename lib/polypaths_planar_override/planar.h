@@ -23,6 +23,20 @@
 #define Py_TPFLAGS_CHECKTYPES 0
 #endif
 
+#ifndef Py_TPFLAGS_HAVE_NEWBUFFER /* not in Py 3 */
+#define Py_TPFLAGS_HAVE_NEWBUFFER 0
+#endif
+
+#ifndef Py_SET_SIZE /* added in Py 3.9, Py_SIZE() is no longer an lvalue */
+#define Py_SET_SIZE(o, size) (Py_SIZE(o) = (size))
+#endif
+
+#if PY_VERSION_HEX < 0x03020000 /* slice APIs accept PyObject * in 3.2+ */
+#define SLICE_ARG(o) ((PySliceObject *)(o))
+#else
+#define SLICE_ARG(o) (o)
+#endif
+
 #if PY_MAJOR_VERSION >= 3
 #define RETURN_NOT_IMPLEMENTED {  \
     Py_INCREF(Py_NotImplemented); \
@@ -116,7 +130,11 @@ typedef struct {
        be positioned differently in memory in subtypes */
 	union {
 		polypaths_planar_override_vec2_t data[1]; /* Used for fixed-length types */
-		Py_ssize_t allocated; /* Used for variable-length types */
+		struct { /* Used for variable-length types */
+			Py_ssize_t allocated;
+			Py_ssize_t exports; /* Number of active buffer exports */
+			PyObject *base; /* Owner of vec when wrapping an external buffer */
+		};
 	};
 } polypaths_planar_overrideSeq2Object;
 
@@ -143,9 +161,16 @@ typedef struct {
 	unsigned long flags;
 	polypaths_planar_overrideBBoxObject *bbox;
 	polypaths_planar_override_vec2_t centroid;
+	/* Twice the signed area and six times its first moment, which
+	   are updated when a vertex is moved */
+	double area2;
+	polypaths_planar_override_vec2_t moment;
 	double max_r2;
 	double min_r2;
-	polypaths_planar_override_vec2_t *lt_y_poly, *rt_y_poly;
+	PyObject *observers; /* List of weakrefs notified of mutation */
+	PyObject *triangles; /* Cached triangle index array */
+	PyObject *trapezoids; /* Trapezoidal map search array from prepare() */
+	PyObject *lod; /* Cache of simplified levels of detail */
 	polypaths_planar_override_vec2_t data[1];
 } polypaths_planar_overridePolygonObject;
 
@@ -159,6 +184,7 @@ typedef struct {
 #define POLY_DUP_VERTS_FLAG 0x80
 #define POLY_CENTROID_KNOWN_FLAG 0x100
 #define POLY_RADIUS_KNOWN_FLAG 0x200
+#define POLY_MOMENTS_KNOWN_FLAG 0x400
 
 typedef struct {
     PyObject_HEAD
@@ -275,6 +301,41 @@ call_from_points(PyObject *obj, PyObject *points)
 	return PyObject_CallMethodObjArgs(obj, from_points_str, points, NULL);
 }
 
+/* Call simplify._simplify_mask(obj, closed, *args, **kwargs), to
+   simplify a polyline or polygon in Python
+*/
+static PyObject *
+call_simplify_mask(PyObject *obj, int closed, PyObject *args, PyObject *kwargs)
+{
+	PyObject *simplify, *func, *func_args, *item, *result = NULL;
+	Py_ssize_t i;
+
+	simplify = PyImport_ImportModule("polypaths_planar_override.simplify");
+	if (simplify == NULL) {
+		return NULL;
+	}
+	func = PyObject_GetAttrString(simplify, "_simplify_mask");
+	Py_DECREF(simplify);
+	if (func == NULL) {
+		return NULL;
+	}
+	func_args = PyTuple_New(PyTuple_GET_SIZE(args) + 2);
+	if (func_args != NULL) {
+		Py_INCREF(obj);
+		PyTuple_SET_ITEM(func_args, 0, obj);
+		PyTuple_SET_ITEM(func_args, 1, Py_BOOL(closed));
+		for (i = 0; i < PyTuple_GET_SIZE(args); ++i) {
+			item = PyTuple_GET_ITEM(args, i);
+			Py_INCREF(item);
+			PyTuple_SET_ITEM(func_args, i + 2, item);
+		}
+		result = PyObject_Call(func, func_args, kwargs);
+		Py_DECREF(func_args);
+	}
+	Py_DECREF(func);
+	return result;
+}
+
 /***************************************************************************/
 
 extern double polypaths_planar_override_EPSILON;
@@ -452,7 +513,7 @@ Seq2_New(PyTypeObject *type, Py_ssize_t size)
     if (varray == NULL) {
 		return NULL;
     }
-	Py_SIZE(varray) = size;
+	Py_SET_SIZE(varray, size);
 	if (type->tp_itemsize == 0) {
 		/* We assume this means that the items are
 		   externally allocated */
@@ -462,6 +523,8 @@ Seq2_New(PyTypeObject *type, Py_ssize_t size)
 			return (polypaths_planar_overrideSeq2Object *)PyErr_NoMemory();
 		}
 		varray->allocated = size;
+		varray->exports = 0;
+		varray->base = NULL;
     } else {
 		/* Items allocated inline */
 		varray->vec = varray->data;
@@ -469,6 +532,75 @@ Seq2_New(PyTypeObject *type, Py_ssize_t size)
     return varray;
 }
 
+/* Buffer utils */
+
+#ifdef WORDS_BIGENDIAN
+#define NATIVE_BYTE_ORDER '>'
+#else
+#define NATIVE_BYTE_ORDER '<'
+#endif
+
+/* Return 1 if the buffer format describes native doubles,
+   2 if it describes raw bytes, otherwise 0 */
+static int
+buffer_format_kind(const char *format)
+{
+	if (format == NULL) {
+		return 2;
+	}
+	if (*format == '@' || *format == '=' || *format == NATIVE_BYTE_ORDER) {
+		++format;
+	}
+	if (format[0] == '\0' || format[1] != '\0') {
+		return 0;
+	}
+	switch (format[0]) {
+		case 'd':
+			return 1;
+		case 'B':
+		case 'b':
+		case 'c':
+			return 2;
+	}
+	return 0;
+}
+
+/* Get a C-contiguous view of the vectors in a buffer of doubles, 
+   or raw bytes, containing consecutive x, y pairs. Return 1 on success,
+   or 0 and set an exception on failure.
+*/
+static int
+polypaths_planar_override_GetVec2Buffer(PyObject *obj, Py_buffer *view, int writable)
+{
+	/* Writability is checked below, since exporters raise different 
+	   exceptions for read-only buffers */
+	if (PyObject_GetBuffer(obj, view, 
+		PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) < 0) {
+		return 0;
+	}
+	if (writable && view->readonly) {
+		PyErr_SetString(PyExc_BufferError, 
+			"cannot write to a read-only buffer");
+		PyBuffer_Release(view);
+		return 0;
+	}
+	if (!buffer_format_kind(view->format)) {
+		PyErr_Format(PyExc_ValueError,
+			"expected a buffer of float64, got format '%.20s'", 
+			view->format);
+		PyBuffer_Release(view);
+		return 0;
+	}
+	if (view->len % sizeof(polypaths_planar_override_vec2_t) != 0) {
+		PyErr_Format(PyExc_ValueError,
+			"buffer size must be a multiple of %d bytes", 
+			(int)sizeof(polypaths_planar_override_vec2_t));
+		PyBuffer_Release(view);
+		return 0;
+	}
+	return 1;
+}
+
 /* Vec2Array utils */
 
 #define polypaths_planar_overrideVec2Array_Check(op) PyObject_TypeCheck(op, &polypaths_planar_overrideVec2ArrayType)
@@ -498,6 +630,29 @@ polypaths_planar_overrideAffine_FromDoubles(
 	return t;
 }
 
+/* Apply the transform to n vectors from src in a single pass, storing
+   the results in dst. dst may be the same array as src, but they must
+   not otherwise overlap.
+*/
+static void
+polypaths_planar_overrideAffine_TransformVec2s(polypaths_planar_overrideAffineObject *t,
+	const polypaths_planar_override_vec2_t *src, 
+	polypaths_planar_override_vec2_t *dst, Py_ssize_t n)
+{
+	const double ta = t->a, tb = t->b, tc = t->c;
+	const double td = t->d, te = t->e, tf = t->f;
+	double x, y;
+
+	while (n--) {
+		x = src->x;
+		y = src->y;
+		dst->x = x*ta + y*td + tc;
+		dst->y = x*tb + y*te + tf;
+		++src;
+		++dst;
+	}
+}
+
 /* BoundingBox utils */
 
 #define polypaths_planar_overrideBBox_Check(op) PyObject_TypeCheck(op, &polypaths_planar_overrideBBoxType)
@@ -553,7 +708,7 @@ Poly_new(PyTypeObject *type, Py_ssize_t size)
 	 * and last vert at either end to simplify many operations */
 	poly = (polypaths_planar_overridePolygonObject *)type->tp_alloc(type, size + 2);
 	if (poly != NULL) {
-		Py_SIZE(poly) = size;
+		Py_SET_SIZE(poly, size);
 		poly->vert = poly->data + 1;
 	}
 	return poly;
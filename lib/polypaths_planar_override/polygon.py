@@ -30,10 +30,27 @@ from __future__ import division
 
 import sys
 import math
-import itertools
-import bisect
+from array import array
 import polypaths_planar_override
 from polypaths_planar_override.util import cached_property, assert_unorderable, cos_sin_deg
+from polypaths_planar_override.vector import _vec2_coords, \
+    _numpy_min_size, _point_coords
+from polypaths_planar_override.intersect import _iter_polygon_intersections, \
+    _polygon_intersecting_edges
+from polypaths_planar_override.triangulate import _triangulate_polygon
+from polypaths_planar_override.locate import _prepare_polygon, \
+    _trapezoids_size, _trapezoid_contains_point, _trapezoid_contains_array
+from polypaths_planar_override.clip import _polygon_boolean
+from polypaths_planar_override.simplify import _simplify_mask
+from polypaths_planar_override.lod import _LevelCache
+from polypaths_planar_override.calipers import _farthest_pair, _min_width, \
+    _min_rectangle
+from polypaths_planar_override.hull import _parallel_convex_hull
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
 
 class Polygon(polypaths_planar_override.Seq2):
     """Arbitrary polygon represented as a list of vertices. 
@@ -72,19 +89,21 @@ class Polygon(polypaths_planar_override.Seq2):
 
     .. note::
         If the polygon is mutated, the cached values of ``is_convex`` and 
-        ``is_simple`` will be invalidated.
+        ``is_simple`` will be invalidated, except when a single vertex of a
+        convex polygon is moved and the polygon remains convex.
     """
 
     def __init__(self, vertices, is_convex=None, is_simple=None):
-        #super(Polygon, self).__init__(vertices)
+        if Polygon.__base__.__init__ is not object.__init__:
+            # The C Seq2 base is populated by __new__, the
+            # Python base must be initialized explicitly
+            super(Polygon, self).__init__(vertices)
         if len(self) < 3:
             raise ValueError("Polygon(): minimum of 3 vertices required")
         self._clear_cached_properties()
         if is_convex is not None and self._convex is _unknown:
             self._convex = bool(is_convex)
             self._simple = self._convex or _unknown
-            if self._convex and len(self) > 3:
-                self._split_y_polylines()
         if is_simple is not None and self._simple is _unknown:
             self._simple = bool(is_simple)
 
@@ -189,14 +208,109 @@ class Polygon(polypaths_planar_override.Seq2):
             if '_pnp_triangle_test' in self.__dict__:
                 # clear cached closure
                 del self.__dict__['_pnp_triangle_test']
-        self._y_polylines = None
         self._dupe_verts = _unknown
         self._degenerate = _unknown
         self._bbox = None
         self._centroid = _unknown
+        self._moments = None
+        self._triangles = None
+        self._trapezoids = None
+        self._lod = None
         self._max_r = self._max_r2 = None
         self._min_r = self._min_r2 = None
 
+    def _update_cached_properties(self, index, old):
+        """Update the cached properties after the vertex at index is moved
+        from the point old, rather than clearing them. The bounding box and
+        area moments are adjusted in O(1) time, unless the vertex was on
+        the bounding box and moved inward. A convex polygon stays convex if
+        it still turns the same way at the vertex and its neighbors.
+        """
+        size = len(self)
+        if size <= 3:
+            self._clear_cached_properties()
+            return
+        ox, oy = old
+        nx, ny = self[index]
+        px, py = self[index - 1]
+        qx, qy = self[(index + 1) % size]
+
+        if self._bbox is not None:
+            min_x, min_y = self._bbox.min_point
+            max_x, max_y = self._bbox.max_point
+            if ((ox > min_x or nx <= min_x) and (ox < max_x or nx >= max_x)
+                and (oy > min_y or ny <= min_y) 
+                and (oy < max_y or ny >= max_y)):
+                if not (min_x <= nx <= max_x and min_y <= ny <= max_y):
+                    self._bbox = polypaths_planar_override.BoundingBox(
+                        [(min(min_x, nx), min(min_y, ny)), 
+                         (max(max_x, nx), max(max_y, ny))])
+            else:
+                # The box may shrink, recompute it when needed
+                self._bbox = None
+
+        if self._moments is not None:
+            # Replace the terms of the two edges at the vertex
+            area, mx, my = self._moments
+            old_p = px*oy - ox*py
+            old_q = ox*qy - qx*oy
+            new_p = px*ny - nx*py
+            new_q = nx*qy - qx*ny
+            area += new_p + new_q - old_p - old_q
+            mx += ((px + nx)*new_p + (nx + qx)*new_q 
+                - (px + ox)*old_p - (ox + qx)*old_q)
+            my += ((py + ny)*new_p + (ny + qy)*new_q 
+                - (py + oy)*old_p - (oy + qy)*old_q)
+            self._moments = (area, mx, my)
+        self._centroid = _unknown
+        self._triangles = None
+        self._trapezoids = None
+        self._lod = None
+        self._max_r = self._max_r2 = None
+        self._min_r = self._min_r2 = None
+
+        if self._convex is True:
+            rx, ry = self[index - 2]
+            sx, sy = self[(index + 2) % size]
+            winding = (ox - px)*(qy - oy) - (oy - py)*(qx - ox)
+            for turn in ((px - rx)*(ny - py) - (py - ry)*(nx - px),
+                (nx - px)*(qy - ny) - (ny - py)*(qx - nx),
+                (qx - nx)*(sy - qy) - (qy - ny)*(sx - qx)):
+                if not turn or (turn > 0.0) != (winding > 0.0):
+                    break
+            else:
+                if winding:
+                    self._degenerate = False
+                    if self._dupe_verts is not False:
+                        self._dupe_verts = _unknown
+                    return
+        self._convex = _unknown
+        self._simple = _unknown
+        self._dupe_verts = _unknown
+        self._degenerate = _unknown
+
+    @property
+    def _observers(self):
+        """List of weak references to objects, such as spatial indexes,
+        whose ``_shape_changed()`` method is called when the polygon is
+        mutated.
+        """
+        observers = self.__dict__.get('_observer_refs')
+        if observers is None:
+            observers = self._observer_refs = []
+        return observers
+
+    def _notify_observers(self):
+        observers = self.__dict__.get('_observer_refs')
+        if observers:
+            # Iterate a copy, since observers may add or remove themselves
+            for ref in list(observers):
+                observer = ref()
+                if observer is not None:
+                    observer._shape_changed(self)
+                else:
+                    observers.remove(ref)
+
     @property
     def bounding_box(self):
         """The bounding box of the polygon"""
@@ -242,14 +356,19 @@ class Polygon(polypaths_planar_override.Seq2):
         count = 0
         self._convex = True
         self._winding = 0
-        last_delta = self[-1] - self[-2]
+        # Start from the last edge with length, so the closing turn is
+        # checked when the last vertices repeat
+        i = len(self) - 1
+        last_delta = self[i] - self[i - 1]
+        while not last_delta and i > 0:
+            i -= 1
+            last_delta = self[i] - self[i - 1]
         last_dir = (
             (last_delta.x > 0) * -1 or
             (last_delta.x < 0) * 1 or
             (last_delta.y > 0) * -1 or
             (last_delta.y < 0) * 1) or 0
-        for delta in itertools.ifilter(
-            lambda v: v, self._iter_edge_vectors()):
+        for delta in (v for v in self._iter_edge_vectors() if v):
             count += 1
             this_dir = (
                 (delta.x > 0) * -1 or
@@ -278,49 +397,7 @@ class Polygon(polypaths_planar_override.Seq2):
         self._degenerate = not count or not angle_sign
         if self._convex and not self._degenerate:
             self._dupe_verts = (count < len(self))
-            self._split_y_polylines()
     
-    def _split_y_polylines(self):
-        """Split the polygon into left and right y-monotone polylines.
-        This optimizes operations on y-monotone polygons.
-        """
-        min_y = max_y = self[0].y
-        min_x = max_x = self[0].x
-        min_i = max_i = left_i = right_i = 0
-        for i, vert in enumerate(self):
-            if vert.y < min_y:
-                min_y = vert.y
-                min_i = i
-            if vert.y > max_y:
-                max_y = vert.y
-                max_i = i
-            if vert.x < min_x:
-                min_x = vert.x
-                left_i = i
-            if vert.x > max_x:
-                max_x = vert.x
-                right_i = i
-
-        verts_yx = [(y, x) for x, y in self]
-        if min_i < max_i:
-            pl1 = verts_yx[min_i:max_i+1]
-            pl2 = verts_yx[max_i:] + verts_yx[:min_i+1]
-            if min_i <= left_i < max_i or right_i < min_i or right_i > max_i:
-                self._y_polylines = pl1, pl2
-            else:
-                self._y_polylines = pl2, pl1
-        else:
-            pl1 = verts_yx[max_i:min_i+1]
-            pl2 = verts_yx[min_i:] + verts_yx[:max_i+1]
-            if min_i >= left_i > max_i or right_i > min_i or right_i < max_i:
-                self._y_polylines = pl1, pl2
-            else:
-                self._y_polylines = pl2, pl1
-        if pl1[0][0] > pl1[-1][0]:
-            pl1.reverse()
-        if pl2[0][0] > pl2[-1][0]:
-            pl2.reverse()
-
     @property
     def is_simple(self):
         """True if the polygon is simple, i.e., it has no self-intersections.
@@ -328,8 +405,7 @@ class Polygon(polypaths_planar_override.Seq2):
         If this is unknown then it is calculated from the vertices
         of the polygon and cached. 
         Runtime complexity: O(n) convex,
-        O(n log n) expected for most non-convex cases, 
-        O(n^2) worst case non-convex
+        O(n log n) non-convex
         """
         if self._simple is _unknown:
             if self._convex is _unknown:
@@ -348,53 +424,161 @@ class Polygon(polypaths_planar_override.Seq2):
         """
         return self._simple is not _unknown
 
-    def _segments_intersect(self, a, b, c, d):
-        """Return True if the line segment a->b intersects with
-        line segment c->d
-        """
-        dir1 = (b[0] - a[0])*(c[1] - a[1]) - (c[0] - a[0])*(b[1] - a[1])
-        dir2 = (b[0] - a[0])*(d[1] - a[1]) - (d[0] - a[0])*(b[1] - a[1])
-        if (dir1 > 0.0) != (dir2 > 0.0) or (not dir1) != (not dir2): 
-            dir1 = (d[0] - c[0])*(a[1] - c[1]) - (a[0] - c[0])*(d[1] - c[1])
-            dir2 = (d[0] - c[0])*(b[1] - c[1]) - (b[0] - c[0])*(d[1] - c[1])
-            return ((dir1 > 0.0) != (dir2 > 0.0) 
-                or (not dir1) != (not dir2))
-        return False
-
     def _check_is_simple(self):
         """Check the polygon for self-intersection and cache the result
 
-        We use a simplified plane sweep algorithm. Worst case, it still takes
-        O(n^2) time like a brute force intersection test, but it will typically
-        be O(n log n) for common simple non-convex polygons. It should
-        also quickly identify self-intersecting polygons in most cases,
-        although it is slower for severely self-intersecting cases due to
-        its startup cost.
+        We use a plane sweep, which stops at the first intersection
+        found, so it is typically faster for self-intersecting polygons.
         """
-        intersects = self._segments_intersect
-        last_index = len(self) - 1
-        indices = range(len(self))
-        points = ([(tuple(self[i - 1]), tuple(self[i]), i) for i in indices] 
-            + [(tuple(self[i]), tuple(self[i - 1]), i) for i in indices])
-        points.sort() # lexicographical sort
-        open_segments = {}
-
-        for point in points:
-            seg_start, seg_end, index = point
-            if index not in open_segments:
-                # Segment start point
-                for open_start, open_end, open_index in open_segments.values():
-                    # ignore adjacent edges
-                    if (last_index > abs(index - open_index) > 1
-                        and intersects(seg_start, seg_end, open_start, open_end)):
-                        self._simple = False
-                        return False
-                open_segments[index] = point
-            else:
-                # Segment end point
-                del open_segments[index]
-        self._simple = True
-        return True
+        self._simple = next(_iter_polygon_intersections(self), None) is None
+        return self._simple
+
+    def intersecting_edges(self):
+        """Return the pairs of non-adjacent polygon edges that intersect,
+        which are empty if the polygon is simple. Edges are numbered by
+        their first vertex, i.e., edge ``i`` runs from vertex ``i`` to
+        vertex ``i + 1``. Runtime complexity: O((n + k) log n) for
+        ``k`` intersecting pairs.
+
+        :return: A sorted list of ``(i, j)`` edge index tuples, where
+            ``i < j``.
+        """
+        pairs = _polygon_intersecting_edges(self)
+        self._simple = not pairs
+        return pairs
+
+    def triangulate(self):
+        """Divide the polygon into triangles, without adding vertices.
+        Convex polygons are divided into a fan of triangles from the first
+        vertex in O(n) time. Other simple polygons are divided into 
+        y-monotone pieces by a plane sweep, which are then triangulated, 
+        in O(n log n) time. The triangulation is cached until the polygon
+        is mutated.
+
+        :return: An array of unsigned 32 bit vertex indices, three for each
+            of the ``n - 2`` triangles, wound in the same direction as the
+            polygon.
+        :rtype: array.array
+        :raises ValueError: If the polygon is not simple.
+        """
+        if self._triangles is None:
+            self._triangles = _triangulate_polygon(self)
+        return array('I', self._triangles)
+
+    def prepare(self):
+        """Build a trapezoidal map of the polygon to speed up 
+        :meth:`contains_point` and :meth:`contains_points` for polygons 
+        that are not convex. The plane is divided into trapezoids by
+        vertical walls through each vertex, and a search structure is
+        built to find the trapezoid containing a point in O(log n) 
+        expected time, for any simple polygon. 
+
+        The map is built by inserting the edges in random order, in 
+        O(n log n) expected time, and takes O(n) expected space. 
+        It is discarded when the polygon is mutated. Triangles and
+        quadrilaterals keep using their exact tests once prepared.
+
+        :return: The memory used by the map in bytes, so it can be
+            weighed against the speedup.
+        :rtype: int
+        :raises ValueError: If the polygon is not simple, or has zero
+            area.
+        """
+        dag, coords = self._trapezoids = _prepare_polygon(self)
+        return _trapezoids_size(dag) + len(coords) * coords.itemsize
+
+    @property
+    def is_prepared(self):
+        """True if the polygon has a trapezoidal map from :meth:`prepare`.
+
+        Mutating the polygon will discard the map.
+        """
+        return self._trapezoids is not None
+
+    def simplify_mask(self, tolerance=None, method='douglas-peucker',
+        preserve_simple=False):
+        """Simplify the polygon, choosing the vertices to keep without
+        copying them. At least three vertices are always kept. See 
+        :meth:`~polypaths_planar_override.Vec2Array.simplify_mask` for the
+        parameters.
+
+        :param preserve_simple: If True, restore removed vertices until
+            the simplified polygon has no intersecting edges.
+        :return: A ``bytearray`` with a 1 for each vertex kept, and a 0
+            for each removed.
+        :rtype: bytearray
+        """
+        return _simplify_mask(self, True, tolerance, method, preserve_simple)
+
+    def level_of_detail(self, tolerance):
+        """Return a simplified copy of the polygon, whose outline lies
+        within ``tolerance`` of this polygon's, for drawing or testing
+        at a coarser scale. Levels are made with the Douglas-Peucker
+        method, keeping them simple, for tolerances rounded down to a
+        power of two. The most recently used levels are cached, and the 
+        cache is cleared when the polygon is mutated.
+
+        :param tolerance: The largest distance allowed between the 
+            outlines, which must be > 0.
+        :type tolerance: float
+        :rtype: Polygon
+        """
+        if self._lod is None:
+            self._lod = _LevelCache()
+        return self._lod.level(self, tolerance)[0]
+
+    def contains_point_lod(self, point, tolerance):
+        """Return True if the specified point is inside the polygon, the
+        same as :meth:`contains_point`, but test it against the 
+        :meth:`level_of_detail` for ``tolerance`` first. Points farther 
+        from the level's outline than its tolerance are inside it exactly
+        when they are inside this polygon, so only points near the
+        outline are tested against the full polygon.
+
+        :param point: The point to test.
+        :type point: Vec2
+        :param tolerance: The tolerance of the level of detail to use.
+        :type tolerance: float
+        """
+        if self._lod is None:
+            self._lod = _LevelCache()
+        return self._lod.contains_point(self, point, tolerance)
+
+    def union(self, other):
+        """Return the region covered by either this polygon or another.
+        The edges of both polygons are split where they meet by a plane
+        sweep, and those bounding the result are linked into polygons,
+        in O((n + k) log n) time for ``k`` edge crossings. Polygons with
+        disjoint bounding boxes are returned without a sweep.
+
+        :param other: A simple polygon, or a
+            :class:`~polypaths_planar_override.Vec2Array` or sequence of
+            its vertices.
+        :return: A list of polygons of the same type as this one.
+            Outer boundaries are wound counter-clockwise, and holes are 
+            separate polygons wound clockwise.
+        :raises ValueError: If either polygon is not simple.
+        """
+        return _polygon_boolean(self, other, 'union')
+
+    def intersection(self, other):
+        """Return the region covered by both this polygon and another.
+        Two convex polygons are clipped one against the other, giving
+        a single convex polygon, or none. See :meth:`union`.
+        """
+        return _polygon_boolean(self, other, 'intersection')
+
+    def difference(self, other):
+        """Return the region covered by this polygon and not another.
+        See :meth:`union`.
+        """
+        return _polygon_boolean(self, other, 'difference')
+
+    def xor(self, other):
+        """Return the region covered by exactly one of this polygon and
+        another, their symmetric difference. See :meth:`union`.
+        """
+        return _polygon_boolean(self, other, 'xor')
 
     @property
     def centroid(self):
@@ -405,29 +589,41 @@ class Polygon(polypaths_planar_override.Seq2):
         If the centroid is unknown, it is calculated from the vertices and
         cached. If the polygon is known to be simple, this takes O(n) time. If
         not, then the simple polygon check is also performed, which has an
-        expected complexity of O(n log n).
+        expected complexity of O(n log n). After a vertex is moved, the
+        centroid is updated in O(1) time once the polygon is known to be
+        simple.
         """
         if self._centroid is _unknown:
             if self.is_simple:
-                # Compute the centroid using by summing the centroids
-                # of triangles made from each edge with vertex[0] weighted
-                # (positively or negatively) by each triangle's area
-                a = self[0]
-                b = self[1]
-                total_area = 0.0
-                centroid = polypaths_planar_override.Vec2(0, 0)
-                for i in range(2, len(self)):
-                    c = self[i]
-                    area = ((b[0] - a[0]) * (c[1] - a[1]) 
-                        - (c[0] - a[0]) * (b[1] - a[1]))
-                    centroid += (a + b + c) * area
-                    total_area += area
-                    b = c
-                self._centroid = centroid / (3.0 * total_area)
+                total_area, mx, my = self._area_moments()
+                self._centroid = polypaths_planar_override.Vec2(mx, my) / (
+                    3.0 * total_area)
             else:
                 self._centroid = None
         return self._centroid
 
+    def _area_moments(self):
+        """Return twice the signed area of the polygon, and six times 
+        its first moments of area about the y and x axes. The sums are 
+        cached so that they can be updated when a vertex is moved.
+        """
+        if self._moments is None:
+            # Sum the triangles made from each edge with vertex[0],
+            # weighted (positively or negatively) by each triangle's area
+            a = self[0]
+            b = self[1]
+            total_area = 0.0
+            centroid = polypaths_planar_override.Vec2(0, 0)
+            for i in range(2, len(self)):
+                c = self[i]
+                area = ((b[0] - a[0]) * (c[1] - a[1]) 
+                    - (c[0] - a[0]) * (b[1] - a[1]))
+                centroid += (a + b + c) * area
+                total_area += area
+                b = c
+            self._moments = (total_area, centroid.x, centroid.y)
+        return self._moments
+
     @property
     def is_centroid_known(self):
         """True if the polygon's centroid has been pre-calculated and cached.
@@ -437,8 +633,10 @@ class Polygon(polypaths_planar_override.Seq2):
         return self._centroid is not _unknown
 
     def __setitem__(self, index, vert):
+        old = self[index]
         super(Polygon, self).__setitem__(index, vert)
-        self._clear_cached_properties()
+        self._update_cached_properties(index % len(self), old)
+        self._notify_observers()
 
     def __eq__(self, other):
         """Return True if other is the same shape as self, irrespective
@@ -516,8 +714,15 @@ class Polygon(polypaths_planar_override.Seq2):
 
     def __imul__(self, other):
         try:
-           other.itransform(self)
+           # Transform the Python base's vertex list, or the C base's
+           # vertex buffer directly, bypassing __setitem__ so that 
+           # observers are notified only once
+           vertices = getattr(self, '_vectors', None)
+           if vertices is None:
+               vertices = memoryview(self)
+           other.itransform(vertices)
            self._clear_cached_properties()
+           self._notify_observers()
            return self
         except AttributeError:
             raise TypeError("Cannot multiply %s with %s"
@@ -527,11 +732,13 @@ class Polygon(polypaths_planar_override.Seq2):
         copy = self.from_points(self)
         copy._convex = self._convex
         copy._simple = self._simple
-        copy._y_polylines = self._y_polylines
         copy._dupe_verts = self._dupe_verts
         copy._degenerate = self._degenerate
         copy._bbox = self._bbox
         copy._centroid = self._centroid
+        copy._moments = self._moments
+        copy._triangles = self._triangles
+        copy._trapezoids = self._trapezoids
         copy._max_r = self._max_r
         copy._max_r2 = self._max_r2
         copy._min_r = self._min_r
@@ -540,7 +747,6 @@ class Polygon(polypaths_planar_override.Seq2):
 
     def __deepcopy__(self, memo):
         copy = self.__copy__()
-        copy._y_polylines = None
         copy._bbox = None
         return copy
 
@@ -583,30 +789,69 @@ class Polygon(polypaths_planar_override.Seq2):
             v0_y = v1_y
         return winding_no != 0
     
-    def _pnp_y_monotone_test(self, point):
-        """Return True if the point is in the polygon using a
-        binary search of the polygon's 2 y-monotone edge polylines.
-        This algorithm works only with convex or simple y-montone
-        polygons.
+    def _convex_fan_bounds(self):
+        """Return the indices of the first and last vertices of the 
+        fan of triangles around vertex 0 of the convex polygon, 
+        skipping duplicates of vertex 0.
+        """
+        x0, y0 = self[0]
+        lo = 1
+        hi = len(self) - 1
+        while lo < hi and self[lo][0] == x0 and self[lo][1] == y0:
+            lo += 1
+        while hi > lo and self[hi][0] == x0 and self[hi][1] == y0:
+            hi -= 1
+        return lo, hi
+
+    def _pnp_convex_test(self, point):
+        """Return True if the point is in the convex polygon using a
+        binary search of the fan of triangles around the first vertex
+        to find the edge facing the point. Points on the boundary are
+        tested as if moved right a tiny amount, then down a tinier one,
+        so a point on an edge shared by two polygons is in only one.
 
         Complexity: O(log n)
         """
         px, py = point
-        pt_y_tuple = (py,)
-        lpline, rpline = self._y_polylines
-        i = bisect.bisect_right(lpline, pt_y_tuple)
-        if i == 0 or i == len(lpline):
-            return False # Point above or below
-        v0_y, v0_x = lpline[i-1]
-        v1_y, v1_x = lpline[i]
-        if ((v1_x - v0_x) * (py - v0_y)
-            - (px - v0_x) * (v1_y - v0_y) > 0):
-            return False # Point too far left
-        i = bisect.bisect_right(rpline, pt_y_tuple)
-        v0_y, v0_x = rpline[i-1]
-        v1_y, v1_x = rpline[i]
-        return ((v1_x - v0_x) * (py - v0_y)
-            - (px - v0_x) * (v1_y - v0_y) > 0)
+        ccw = self._area_moments()[0] > 0.0
+        lo, hi = self._convex_fan_bounds()
+        x0, y0 = self[0]
+        x1, y1 = self[lo]
+        if (_perturbed_side(x0, y0, x1, y1, px, py) > 0.0) != ccw:
+            return False # Point outside the first edge
+        x1, y1 = self[hi]
+        if (_perturbed_side(x0, y0, x1, y1, px, py) < 0.0) != ccw:
+            return False # Point outside the last edge
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            x1, y1 = self[mid]
+            if (_perturbed_side(x0, y0, x1, y1, px, py) > 0.0) == ccw:
+                lo = mid
+            else:
+                hi = mid
+        x0, y0 = self[lo]
+        x1, y1 = self[hi]
+        return (_perturbed_side(x0, y0, x1, y1, px, py) > 0.0) == ccw
+
+    def _pnp_triangle_params(self):
+        """Return the values used to test points against the triangle
+        polygon using barycentric coordinates, or None if the
+        triangle is degenerate.
+        """
+        lo, mid, hi = sorted(self, key=lambda xy: (xy[1], xy[0]))
+        v0 = lo - mid
+        v1 = hi - mid
+        if v0.is_null or v1.is_null:
+            return None
+        dot01 = v0.dot(v1)
+        dot00 = v0.length2
+        dot11 = v1.length2
+        denom = (dot00 * dot11 - dot01 * dot01)
+        if not denom:
+            return None
+        two_leading = ((hi[0] - lo[0])*(mid[1] - lo[1]) 
+            - (mid[0] - lo[0])*(hi[1] - lo[1]) > 0.0)
+        return mid, v0, v1, dot00, dot01, dot11, 1.0 / denom, two_leading
 
     def _pnp_triangle_test(self, point):
         """Return True if the point is in the triangle polygon using
@@ -618,22 +863,13 @@ class Polygon(polypaths_planar_override.Seq2):
 
         Complexity: O(1)
         """
-        lo, mid, hi = sorted(self, key=lambda xy: (xy[1], xy[0]))
-        v0 = lo - mid
-        v1 = hi - mid
-        if v0.is_null or v1.is_null:
-            return False
-        dot01 = v0.dot(v1)
-        dot00 = v0.length2
-        dot11 = v1.length2
-        denom = (dot00 * dot11 - dot01 * dot01)
-        if not denom:
+        params = self._pnp_triangle_params()
+        if params is None:
             return False # degenerate triangle
-        inv_denom = 1.0 / denom
+        mid, v0, v1, dot00, dot01, dot11, inv_denom, two_leading = params
         # The above vars are cached in the closure defined below
 
-        if ((hi[0] - lo[0])*(mid[1] - lo[1]) 
-            - (mid[0] - lo[0])*(hi[1] - lo[1]) > 0.0):
+        if two_leading:
             # Triangle has 2 inclusive leading edges
             def _pnp_triangle_test(point):
                 v2 = point - mid
@@ -662,12 +898,12 @@ class Polygon(polypaths_planar_override.Seq2):
 
         This test can use various strategies depending on the
         classification of the polygon, i.e., triangular, radial, 
-        y-monotone, convex, or other. 
+        convex, prepared, or other. 
 
         The runtime complexity will depend on the polygon:
 
         Triangle or best-case radial: O(1)
-        y-monotone, convex: O(log n)
+        convex, prepared: O(log n)
         other: O(n)
 
         :param point: A point vector.
@@ -677,18 +913,154 @@ class Polygon(polypaths_planar_override.Seq2):
         sides = len(self)
         if sides == 3:
             return self._pnp_triangle_test(point)
-        if self._centroid is not _unknown and sides > 4:
+        if (self._centroid is not _unknown and self._centroid is not None
+            and sides > 4):
             d2 = (self._centroid - point).length2
             if self._min_r2 is not None and d2 < self._min_r2:
                 return True
             if self._max_r2 is not None and d2 > self._max_r2:
                 return False
-        if self._y_polylines is not None:
-            return self._pnp_y_monotone_test(point)
+        if self._convex is True and self._area_moments()[0]:
+            return self._pnp_convex_test(point)
+        if sides > 4 and self._trapezoids is not None:
+            px, py = point
+            return _trapezoid_contains_point(
+                self._trapezoids[0], self._trapezoids[1], px, py)
         if sides == 4 or self.bounding_box.contains_point(point):
             return self._pnp_winding_test(point)
         return False
 
+    def contains_points(self, points):
+        """Test a batch of points for containment in the polygon. The
+        result is the same as calling :meth:`contains_point` for each
+        point, but the polygon's classification is done once, and the 
+        tests are run over whole arrays with NumPy, if available.
+
+        :param points: The points to test, a
+            :class:`~polypaths_planar_override.Vec2Array`, iterable of 
+            points, or object supporting the buffer protocol containing 
+            float64 ``x, y`` pairs, such as an ``(n, 2)`` NumPy array.
+            Buffers of other types, or not contiguous, are copied.
+        :return: A ``bytearray`` with a 1 for each point inside the 
+            polygon, and a 0 for each outside. Use 
+            ``numpy.frombuffer(result, dtype=bool)`` to view it as a 
+            boolean array.
+        :rtype: bytearray
+        """
+        coords = _point_coords(points)
+        if numpy is None or len(coords) < 2 * _numpy_min_size:
+            Vec2 = polypaths_planar_override.Vec2
+            contains_point = self.contains_point
+            return bytearray(
+                contains_point(Vec2(coords[i], coords[i + 1]))
+                for i in range(0, len(coords), 2))
+        xy = numpy.frombuffer(coords, dtype=numpy.float64).reshape(-1, 2)
+        px = xy[:, 0]
+        py = xy[:, 1]
+        sides = len(self)
+        if sides == 3:
+            return bytearray(self._pnp_triangle_test_array(px, py).tobytes())
+        inside = numpy.zeros(len(px), dtype=bool)
+        undecided = numpy.ones(len(px), dtype=bool)
+        if (self._centroid is not _unknown and self._centroid is not None
+            and sides > 4):
+            cx, cy = self._centroid
+            dx = cx - px
+            dy = cy - py
+            d2 = dx*dx + dy*dy
+            if self._min_r2 is not None:
+                inside |= d2 < self._min_r2
+                undecided &= ~inside
+            if self._max_r2 is not None:
+                undecided &= ~(d2 > self._max_r2)
+        px = px[undecided]
+        py = py[undecided]
+        if self._convex is True and self._area_moments()[0]:
+            inside[undecided] = self._pnp_convex_test_array(px, py)
+        elif sides == 4:
+            inside[undecided] = self._pnp_winding_test_array(px, py)
+        elif self._trapezoids is not None:
+            inside[undecided] = _trapezoid_contains_array(
+                self._trapezoids[0], self._trapezoids[1], px, py)
+        else:
+            bbox = self.bounding_box
+            (min_x, min_y), (max_x, max_y) = bbox.min_point, bbox.max_point
+            in_bbox = ((min_x <= px) & (px < max_x) 
+                & (min_y < py) & (py <= max_y))
+            in_poly = numpy.zeros(len(px), dtype=bool)
+            in_poly[in_bbox] = self._pnp_winding_test_array(
+                px[in_bbox], py[in_bbox])
+            inside[undecided] = in_poly
+        return bytearray(inside.tobytes())
+
+    def _pnp_winding_test_array(self, px, py):
+        """Vectorized :meth:`_pnp_winding_test` for arrays of point 
+        x and y coordinates, returning a boolean array.
+        """
+        winding_no = numpy.zeros(len(px), dtype=numpy.intp)
+        v0_x, v0_y = self[-1]
+        v0_above = (v0_y >= py)
+        for v1_x, v1_y in self:
+            v1_above = (v1_y >= py)
+            side = ((v1_x - v0_x) * (py - v0_y)
+                - (px - v0_x) * (v1_y - v0_y))
+            # upward crossings with the point right of the edge, and
+            # downward crossings with the point left of the edge
+            winding_no += v1_above & ~v0_above & (side <= 0)
+            winding_no -= v0_above & ~v1_above & (side >= 0)
+            v0_above = v1_above
+            v0_x = v1_x
+            v0_y = v1_y
+        return winding_no != 0
+
+    def _pnp_convex_test_array(self, px, py):
+        """Vectorized :meth:`_pnp_convex_test` for arrays of point 
+        x and y coordinates, returning a boolean array. The binary 
+        searches of the fan are run in lock step.
+        """
+        ccw = self._area_moments()[0] > 0.0
+        lo, hi = self._convex_fan_bounds()
+        vert = numpy.frombuffer(_vec2_coords(self), 
+            dtype=numpy.float64).reshape(-1, 2)
+        x0, y0 = vert[0]
+        x, y = vert[lo]
+        inside = (_perturbed_side(x0, y0, x, y, px, py) > 0.0) == ccw
+        x, y = vert[hi]
+        inside &= (_perturbed_side(x0, y0, x, y, px, py) < 0.0) == ccw
+        lo = numpy.full(len(px), lo)
+        hi = numpy.full(len(px), hi)
+        while True:
+            searching = hi - lo > 1
+            if not searching.any():
+                break
+            mid = (lo + hi) // 2
+            x, y = vert[mid].T
+            left = (_perturbed_side(x0, y0, x, y, px, py) > 0.0) == ccw
+            lo = numpy.where(searching & left, mid, lo)
+            hi = numpy.where(searching & ~left, mid, hi)
+        (x0, y0), (x, y) = vert[lo].T, vert[hi].T
+        inside &= (_perturbed_side(x0, y0, x, y, px, py) > 0.0) == ccw
+        return inside
+
+    def _pnp_triangle_test_array(self, px, py):
+        """Vectorized :meth:`_pnp_triangle_test` for arrays of point 
+        x and y coordinates, returning a boolean array.
+        """
+        params = self._pnp_triangle_params()
+        if params is None:
+            return numpy.zeros(len(px), dtype=bool)
+        mid, v0, v1, dot00, dot01, dot11, inv_denom, two_leading = params
+        v2_x = px - mid[0]
+        v2_y = py - mid[1]
+        dot02 = v0[0] * v2_x + v0[1] * v2_y
+        dot12 = v1[0] * v2_x + v1[1] * v2_y
+        u = (dot11 * dot02 - dot01 * dot12) * inv_denom
+        v = (dot00 * dot12 - dot01 * dot02) * inv_denom
+        if two_leading:
+            return (u >= 0.0) & (v >= 0.0) & (u + v < 1.0)
+        else:
+            return (u > 0.0) & (v > 0.0) & (u + v <= 1.0)
+
     ## Tangent methods ##
     # See: http://softsurfer.com/Archive/algorithm_0201/algorithm_0201.htm
 
@@ -818,10 +1190,55 @@ class Polygon(polypaths_planar_override.Seq2):
         else:
             return self._pt_tangents(point)
 
+    ## Rotating Calipers ##
+
+    def farthest_pair(self):
+        """Return the two vertices of the polygon farthest apart, whose
+        distance is the polygon's diameter. The vertices are found by 
+        rotating a pair of parallel calipers around the convex hull.
+
+        Runtime complexity: O(n) convex, O(n log n) other, to find the hull
+
+        :rtype: tuple of :class:`~polypaths_planar_override.Vec2`
+        """
+        return _farthest_pair(self)
+
+    def min_width(self):
+        """Return the minimum width of the polygon, the smallest distance
+        between a pair of parallel lines enclosing it, and the direction
+        of the lines as a unit vector. One of the lines lies along an
+        edge of the convex hull.
+
+        Runtime complexity: O(n) convex, O(n log n) other
+
+        :rtype: tuple of float and :class:`~polypaths_planar_override.Vec2`
+        """
+        return _min_width(self)
+
+    def min_area_rectangle(self):
+        """Return the rectangle with the smallest area enclosing the 
+        polygon, which may be rotated, as a polygon wound 
+        counter-clockwise. One side of the rectangle lies along an 
+        edge of the convex hull.
+
+        Runtime complexity: O(n) convex, O(n log n) other
+
+        :rtype: Polygon
+        """
+        return _min_rectangle(self)
+
+    def min_perimeter_rectangle(self):
+        """Return the rectangle with the smallest perimeter enclosing the 
+        polygon. See :meth:`min_area_rectangle`.
+
+        :rtype: Polygon
+        """
+        return _min_rectangle(self, perimeter=True)
+
     ## Convex Hull ##
 
     @classmethod
-    def convex_hull(cls, points):
+    def convex_hull(cls, points, workers=None):
         """Return a new polygon that is the convex hull of the supplied
         sequence of points. 
 
@@ -836,8 +1253,18 @@ class Polygon(polypaths_planar_override.Seq2):
         resulting hull.
 
         :param points: A sequence of points.
+        :param workers: If greater than 1, split large inputs between 
+            this many worker processes, which find the hulls of their
+            share of the points in shared memory, then merge them.
+            The merged hull drops points in the middle of a straight 
+            side of the hull, which the serial hull may keep.
+            Points that all lie on a line give the same degenerate
+            hull as the serial path.
+        :type workers: int
         :rtype: Polygon
         """
+        if workers is not None:
+            return _parallel_convex_hull(cls, points, workers)
         if isinstance(points, Polygon):
             if points.is_convex_known and points.is_convex:
                 return points.__copy__()
@@ -847,61 +1274,92 @@ class Polygon(polypaths_planar_override.Seq2):
 def _adaptive_quick_hull(points):
     """Compute the convex hull from an arbitrary collection of points
     using an adaptive quick hull algorithm. Return the points of the hull
-    as a list in radial sequence.
+    as a list of (x, y) tuples in radial sequence.
 
     The adaptive algorithm paritions the points as in quick-hull unless
     the paritioning fails to cull enough points to remain efficient.
     If this occurs then the algorithm changes to a monotone chain
     (A simplified variant of Graham's scan) for the partition to avoid
     the worst-case quick-hull behavior.
+
+    Like the C implementation, the points are partitioned as lists of
+    indices into flat x and y coordinate sequences, rather than as
+    point objects. Large partitions are split with NumPy, if available.
     """
-    leftmost = rightmost = points[0]
-    for p in points:
-        if p[0] < leftmost[0]:
-            leftmost = p
-        elif p[0] > rightmost[0]:
-            rightmost = p
-    upper_points = set()
-    lower_points = set()
-    add_upper = upper_points.add
-    add_lower = lower_points.add
-    lx, ly = leftmost
-    line_w = rightmost[0] - leftmost[0]
-    line_h = rightmost[1] - leftmost[1]
-    for p in points:
-        if line_w * (p[1] - ly) - (p[0] - lx) * line_h > 0.0:
-            add_upper(p)
-        else:
-            add_lower(p)
-    upper_points.discard(leftmost)
-    upper_points.discard(rightmost)
-    lower_points.discard(leftmost)
-    lower_points.discard(rightmost)
+    coords = _point_coords(points)
+    count = len(coords) // 2
+    if not count:
+        return []
+    xs = coords[0::2]
+    ys = coords[1::2]
+    if numpy is not None and count >= _numpy_min_size:
+        xy = numpy.frombuffer(coords, dtype=numpy.float64).reshape(-1, 2)
+        x = xy[:, 0]
+        y = xy[:, 1]
+        leftmost = int(x.argmin())
+        rightmost = int(x.argmax())
+    else:
+        x = y = None
+        leftmost = min(range(count), key=xs.__getitem__)
+        rightmost = max(range(count), key=xs.__getitem__)
+    lx = xs[leftmost]
+    ly = ys[leftmost]
+    rx = xs[rightmost]
+    ry = ys[rightmost]
+    line_w = rx - lx
+    line_h = ry - ly
+    # Points equal to the leftmost or rightmost are left out of both sets
+    if x is not None:
+        side = line_w * (y - ly) - (x - lx) * line_h
+        keep = ~(((x == lx) & (y == ly)) | ((x == rx) & (y == ry)))
+        upper_points = numpy.flatnonzero(keep & (side > 0.0))
+        lower_points = numpy.flatnonzero(keep & ~(side > 0.0))
+        partition = _ahull_partition_array
+    else:
+        upper_points = []
+        lower_points = []
+        add_upper = upper_points.append
+        add_lower = lower_points.append
+        for i in range(count):
+            px = xs[i]
+            py = ys[i]
+            if (px == lx and py == ly) or (px == rx and py == ry):
+                continue
+            if line_w * (py - ly) - (px - lx) * line_h > 0.0:
+                add_upper(i)
+            else:
+                add_lower(i)
+        partition = _ahull_partition_points
     hull = []
-    if upper_points:
-        _ahull_partition_points(hull, upper_points, leftmost, rightmost)
+    if len(upper_points):
+        partition(hull, xs, ys, upper_points, leftmost, rightmost, x, y)
     else:
         hull.append(leftmost)
-    if lower_points:
-        _ahull_partition_points(hull, lower_points, rightmost, leftmost)
+    if len(lower_points):
+        partition(hull, xs, ys, lower_points, rightmost, leftmost, x, y)
     else:
         hull.append(rightmost)
-    return hull
-
-def _ahull_partition_points(hull, points, p0, p1):
-    """Partition the points 'above' p0->p1 to compute the sub-hull"""
+    return [(xs[i], ys[i]) for i in hull]
 
+def _ahull_partition_points(hull, xs, ys, points, p0, p1, x=None, y=None):
+    """Partition the points 'above' p0->p1 to compute the sub-hull.
+    points is a list of indices into the coordinate sequences xs and ys,
+    p0 and p1 are the indices of the line end points. The indices of
+    the sub-hull are appended to hull.
+    """
     # Find point furthest from line p0->p1 as partition point
     furthest = -1.0
-    p0_x, p0_y = p0
-    pline_dx = p1[0] - p0[0]
-    pline_dy = p1[1] - p0[1]
-    for p in points:
-        dist = pline_dx * (p[1] - p0_y) - (p[0] - p0_x) * pline_dy
+    p0_x = xs[p0]
+    p0_y = ys[p0]
+    pline_dx = xs[p1] - p0_x
+    pline_dy = ys[p1] - p0_y
+    for i in points:
+        dist = pline_dx * (ys[i] - p0_y) - (xs[i] - p0_x) * pline_dy
         if dist > furthest:
             furthest = dist
-            partition_point = p
-    partition_point = polypaths_planar_override.Vec2(*partition_point)
+            partition_point = i
+    part_x = xs[partition_point]
+    part_y = ys[partition_point]
     
     # Compute the triangle partition_point->p0->p1
     # in barycentric coordinates
@@ -911,31 +1369,83 @@ def _ahull_partition_points(hull, points, p0, p1):
     right_points = []
     add_left = left_points.append
     add_right = right_points.append
-    v0 = p0 - partition_point
-    v1 = p1 - partition_point
-    dot00 = v0.length2
-    dot01 = v0.dot(v1)
-    dot11 = v1.length2
+    v0_x = p0_x - part_x
+    v0_y = p0_y - part_y
+    v1_x = xs[p1] - part_x
+    v1_y = ys[p1] - part_y
+    dot00 = v0_x * v0_x + v0_y * v0_y
+    dot01 = v0_x * v1_x + v0_y * v1_y
+    dot11 = v1_x * v1_x + v1_y * v1_y
     denom = (dot00 * dot11 - dot01 * dot01)
     # If denom is zero, the triangle has no area and
     # all points lie on the partition line 
     # and thus can be culled
     if denom:
         inv_denom = 1.0 / denom
-        for p in points:
-            v2 = p - partition_point
-            dot02 = v0.dot(v2)
-            dot12 = v1.dot(v2)
+        for i in points:
+            v2_x = xs[i] - part_x
+            v2_y = ys[i] - part_y
+            dot02 = v0_x * v2_x + v0_y * v2_y
+            dot12 = v1_x * v2_x + v1_y * v2_y
             u = (dot11 * dot02 - dot01 * dot12) * inv_denom
             v = (dot00 * dot12 - dot01 * dot02) * inv_denom
             # Since the partition point is the furthest from p0->p1
             # u and v cannot both be negative
             # Note the partition point is discarded here
             if v < 0.0:
-                add_left(p)
+                add_left(i)
             elif u < 0.0:
-                add_right(p)
+                add_right(i)
+    _ahull_recurse(hull, xs, ys, len(points), left_points, right_points, 
+        p0, partition_point, p1, _ahull_partition_points, None, None)
+
+def _ahull_partition_array(hull, xs, ys, points, p0, p1, x, y):
+    """Partition the points 'above' p0->p1 to compute the sub-hull, 
+    as _ahull_partition_points(), with points as an array of indices
+    into the NumPy coordinate arrays x and y. Small partitions are 
+    passed on to _ahull_partition_points().
+    """
+    if len(points) < _numpy_min_size:
+        _ahull_partition_points(hull, xs, ys, points.tolist(), p0, p1)
+        return
+    p0_x = xs[p0]
+    p0_y = ys[p0]
+    pts_x = x[points]
+    pts_y = y[points]
+    dist = (xs[p1] - p0_x) * (pts_y - p0_y) - (pts_x - p0_x) * (ys[p1] - p0_y)
+    partition_point = int(points[dist.argmax()])
+    part_x = xs[partition_point]
+    part_y = ys[partition_point]
+
+    # Barycentric coordinates in triangle partition_point->p0->p1,
+    # as in _ahull_partition_points()
+    v0_x = p0_x - part_x
+    v0_y = p0_y - part_y
+    v1_x = xs[p1] - part_x
+    v1_y = ys[p1] - part_y
+    dot00 = v0_x * v0_x + v0_y * v0_y
+    dot01 = v0_x * v1_x + v0_y * v1_y
+    dot11 = v1_x * v1_x + v1_y * v1_y
+    denom = (dot00 * dot11 - dot01 * dot01)
+    if denom:
+        inv_denom = 1.0 / denom
+        v2_x = pts_x - part_x
+        v2_y = pts_y - part_y
+        dot02 = v0_x * v2_x + v0_y * v2_y
+        dot12 = v1_x * v2_x + v1_y * v2_y
+        u = (dot11 * dot02 - dot01 * dot12) * inv_denom
+        v = (dot00 * dot12 - dot01 * dot02) * inv_denom
+        is_left = v < 0.0
+        left_points = points[is_left]
+        right_points = points[~is_left & (u < 0.0)]
+    else:
+        left_points = right_points = points[:0]
+    _ahull_recurse(hull, xs, ys, len(points), left_points, right_points, 
+        p0, partition_point, p1, _ahull_partition_array, x, y)
 
+def _ahull_recurse(hull, xs, ys, count, left_points, right_points,
+    p0, partition_point, p1, partition, x, y):
+    """Complete the sub-hulls either side of the partition point"""
     left_count = len(left_points)
     right_count = len(right_points)
     # Heuristic to determine if we should continue to partition
@@ -945,47 +1455,55 @@ def _ahull_partition_points(hull, points, p0, p1):
     # culled few points, it is likely that a sorted scan
     # will be the more efficient algorithm. Note the scaling
     # factor here is not particularly sensitive.
-    max_partition = (len(points) - left_count - right_count) * 4
+    max_partition = (count - left_count - right_count) * 4
 
     if left_count <= 1:
         # Trivial partition
         hull.append(p0)
         hull.extend(left_points)
     elif left_count <= max_partition:
-        _ahull_partition_points(hull, left_points, p0, partition_point)
+        partition(hull, xs, ys, left_points, p0, partition_point, x, y)
     else:
-        _ahull_sort_points(hull, left_points, p0, partition_point)
+        _ahull_sort_points(hull, xs, ys, left_points, p0, partition_point)
 
     if right_count <= 1:
         # Trivial partition
         hull.append(partition_point)
         hull.extend(right_points)
     elif right_count <= max_partition:
-        _ahull_partition_points(hull, right_points, partition_point, p1)
+        partition(hull, xs, ys, right_points, partition_point, p1, x, y)
     else:
-        _ahull_sort_points(hull, right_points, partition_point, p1)
+        _ahull_sort_points(hull, xs, ys, right_points, partition_point, p1)
 
-def _ahull_sort_points(hull, points, p0, p1):
+def _ahull_sort_points(hull, xs, ys, points, p0, p1):
     """Compute the sub-hull using a sorted chain-hull algorithm"""
-    dx, dy = p1 - p0
-    p0_x, p0_y = p0
-    def line_order(pt):
-        return dx * (pt[0] - p0_x) + dy * (pt[1] - p0_y)
+    p0_x = xs[p0]
+    p0_y = ys[p0]
+    dx = xs[p1] - p0_x
+    dy = ys[p1] - p0_y
+    if not isinstance(points, list):
+        points = points.tolist()
+    def line_order(i):
+        return dx * (xs[i] - p0_x) + dy * (ys[i] - p0_y)
     points.sort(key=line_order)
     points.append(p1)
     stack = [p0]
     push = stack.append
     pop = stack.pop
-    for p in points:
+    for i in points:
+        px = xs[i]
+        py = ys[i]
         while len(stack) >= 2:
             v0 = stack[-2]
             v1 = stack[-1]
-            if ((v1[0] - v0[0])*(p[1] - v0[1]) 
-                - (p[0] - v0[0])*(v1[1] - v0[1]) >= 0.0):
+            v0_x = xs[v0]
+            v0_y = ys[v0]
+            if ((xs[v1] - v0_x)*(py - v0_y) 
+                - (px - v0_x)*(ys[v1] - v0_y) >= 0.0):
                 pop()
             else:
                 break
-        push(p)
+        push(i)
     pop()
     hull.extend(stack)
 
@@ -993,4 +1511,18 @@ def _ahull_sort_points(hull, points, p0, p1):
 _unknown = object()
 
 
+def _perturbed_side(ax, ay, bx, by, px, py):
+    """Return a value whose sign is the side of the line from a to b 
+    that the point p is on, positive on the left. Points on the line
+    are moved right by a tiny amount, then down by a tinier one, so the
+    result is only zero if a and b are the same point. This works 
+    elementwise with NumPy arrays too.
+    """
+    side = (bx - ax) * (py - ay) - (px - ax) * (by - ay)
+    if numpy is not None and isinstance(side, numpy.ndarray):
+        side = numpy.where(side == 0.0, ay - by, side)
+        return numpy.where(side == 0.0, ax - bx, side)
+    return side or (ay - by) or (ax - bx)
+
+
 # vim: ai ts=4 sts=4 et sw=4 tw=78
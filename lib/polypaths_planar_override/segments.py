@@ -0,0 +1,480 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Arrays of line segments for batch queries"""
+
+from __future__ import division
+
+import math
+from array import array
+import polypaths_planar_override
+from polypaths_planar_override.vector import _point_coords, \
+    _numpy_min_size
+from polypaths_planar_override.intersect import _segments_intersect, \
+    segment_intersections
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
+
+
+def _share_coords(points, copy):
+    """Return a flat sequence of the x, y coordinates of points, sharing 
+    memory with Vec2Arrays and float64 buffers unless copy is true
+    """
+    coords = _point_coords(points, copy)
+    if copy:
+        return coords
+    # Held as a view, so that shared Vec2Arrays cannot be resized
+    return memoryview(coords)
+
+
+def _numpy_vectors(coords):
+    """Return the x and y coordinate arrays sharing memory with coords"""
+    xy = numpy.frombuffer(coords, dtype=numpy.float64).reshape(-1, 2)
+    return xy[:, 0], xy[:, 1]
+
+
+def _intersect_array(ax, ay, bx, by, cx, cy, dx, dy):
+    """Elementwise :func:`_segments_intersect` for NumPy arrays"""
+    dir1 = (bx - ax)*(cy - ay) - (cx - ax)*(by - ay)
+    dir2 = (bx - ax)*(dy - ay) - (dx - ax)*(by - ay)
+    straddle = ((dir1 > 0.0) != (dir2 > 0.0)) | ((dir1 == 0.0) != (dir2 == 0.0))
+    dir1 = (dx - cx)*(ay - cy) - (ax - cx)*(dy - cy)
+    dir2 = (dx - cx)*(by - cy) - (bx - cx)*(dy - cy)
+    return straddle & (
+        ((dir1 > 0.0) != (dir2 > 0.0)) | ((dir1 == 0.0) != (dir2 == 0.0)))
+
+
+class SegmentArray(object):
+    """Fixed size array of directed line segments for batch operations.
+
+    The anchors and vectors of the segments are stored in two contiguous
+    arrays of double precision ``x, y`` pairs, so no
+    :class:`~polypaths_planar_override.LineSegment` objects are created.
+    The query methods mirror those of
+    :class:`~polypaths_planar_override.LineSegment`, and are run over 
+    whole arrays with NumPy, if available. Each takes either a single
+    point, which is tested against every segment, or a sequence of points 
+    of the same length as the array, where point ``i`` is tested against
+    segment ``i``.
+
+    :param segments: An optional iterable of 
+        :class:`~polypaths_planar_override.LineSegment` objects.
+    """
+
+    def __init__(self, segments=()):
+        self._anchors = array('d')
+        self._vectors = array('d')
+        for segment in segments:
+            self._anchors.extend(segment.anchor)
+            self._vectors.extend(segment.vector)
+
+    @classmethod
+    def from_points(cls, endpoints):
+        """Create an array of segments from pairs of end points, where 
+        segment ``i`` runs from ``endpoints[2 * i]`` to 
+        ``endpoints[2 * i + 1]``, as for
+        :func:`~polypaths_planar_override.segment_intersections`.
+
+        :param endpoints: A :class:`~polypaths_planar_override.Vec2Array`,
+            sequence of points, or object supporting the buffer protocol
+            containing float64 ``x, y`` pairs.
+        :rtype: SegmentArray
+        """
+        coords = _share_coords(endpoints, False)
+        if len(coords) % 4:
+            raise ValueError("Segment end points must be in pairs")
+        self = cls.__new__(cls)
+        if numpy is not None and len(coords) >= 4 * _numpy_min_size:
+            ends = numpy.frombuffer(coords, dtype=numpy.float64
+                ).reshape(-1, 2, 2)
+            self._anchors = array('d', ends[:, 0].tobytes())
+            self._vectors = array('d', (ends[:, 1] - ends[:, 0]).tobytes())
+        else:
+            self._anchors = anchors = array('d')
+            self._vectors = vectors = array('d')
+            for i in range(0, len(coords), 4):
+                x0, y0, x1, y1 = coords[i:i + 4]
+                anchors.extend((x0, y0))
+                vectors.extend((x1 - x0, y1 - y0))
+        return self
+
+    @classmethod
+    def from_buffers(cls, anchors, vectors, copy=False):
+        """Create an array of segments from their anchors and vectors.
+
+        Unless ``copy`` is true, the array shares memory with any
+        :class:`~polypaths_planar_override.Vec2Array` or buffer given, 
+        such as an ``(n, 2)`` NumPy array or memory map, so changes to 
+        the coordinates are seen by the segment array.
+
+        :param anchors: The anchor, or starting point of each segment, as
+            a :class:`~polypaths_planar_override.Vec2Array`, sequence of 
+            points, or object supporting the buffer protocol containing 
+            float64 ``x, y`` pairs.
+        :param vectors: The vector from the anchor to the end of each 
+            segment, of the same length and types as ``anchors``.
+        :param copy: If true, copy the coordinates.
+        :type copy: bool
+        :rtype: SegmentArray
+        """
+        self = cls.__new__(cls)
+        self._anchors = _share_coords(anchors, copy)
+        self._vectors = _share_coords(vectors, copy)
+        if len(self._anchors) != len(self._vectors):
+            raise ValueError(
+                "SegmentArray: expected the same number of anchors "
+                "and vectors")
+        return self
+
+    @property
+    def anchors(self):
+        """The anchor, or starting point of each segment, as a
+        :class:`~polypaths_planar_override.Vec2Array` sharing memory 
+        with the segment array where possible.
+        """
+        return self._vec2_array(self._anchors)
+
+    @property
+    def vectors(self):
+        """The vector from the anchor to the end of each segment, as a
+        :class:`~polypaths_planar_override.Vec2Array` sharing memory 
+        with the segment array where possible.
+        """
+        return self._vec2_array(self._vectors)
+
+    @staticmethod
+    def _vec2_array(coords):
+        view = memoryview(coords)
+        return polypaths_planar_override.Vec2Array.from_buffer(
+            view, copy=view.readonly)
+
+    def __len__(self):
+        return len(self._anchors) // 2
+
+    def __getitem__(self, index):
+        """Return the segment at an index as a 
+        :class:`~polypaths_planar_override.LineSegment`
+        """
+        if isinstance(index, slice):
+            raise TypeError("SegmentArray does not support slicing, "
+                "use an integer index")
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("SegmentArray index out of range")
+        i = index * 2
+        return polypaths_planar_override.LineSegment(
+            self._anchors[i:i + 2], self._vectors[i:i + 2])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "SegmentArray([%s])" % ", ".join(
+            repr(segment) for segment in self)
+
+    def _use_numpy(self):
+        return numpy is not None and len(self) >= _numpy_min_size
+
+    def _query_points(self, points):
+        """Return the query points as a pair of x, y floats if they are
+        a single point, otherwise as a flat sequence of coordinates with
+        one point per segment, and None.
+        """
+        try:
+            x, y = points
+            return float(x), float(y)
+        except (TypeError, ValueError):
+            pass
+        coords = _share_coords(points, False)
+        if len(coords) != len(self._anchors):
+            raise ValueError(
+                "SegmentArray: expected a single point, or one point "
+                "per segment")
+        return coords, None
+
+    def _frames(self, points):
+        """Return NumPy arrays of the segment anchors, unit directions
+        and lengths, the vectors from the anchors to the query points, 
+        and their distances along the segments. Null segments point 
+        along the x-axis, like a null 
+        :class:`~polypaths_planar_override.LineSegment`.
+        """
+        ax, ay = _numpy_vectors(self._anchors)
+        vx, vy = _numpy_vectors(self._vectors)
+        length = numpy.hypot(vx, vy)
+        nonzero = length > 0.0
+        scale = numpy.where(nonzero, length, 1.0)
+        dx = numpy.where(nonzero, vx / scale, 1.0)
+        dy = numpy.where(nonzero, vy / scale, 0.0)
+        px, py = self._query_points(points)
+        if py is None:
+            px, py = _numpy_vectors(px)
+        tx = px - ax
+        ty = py - ay
+        return ax, ay, dx, dy, length, tx, ty, dx * tx + dy * ty
+
+    def _iter_frames(self, points):
+        """Generate the values of :meth:`_frames` for each segment, 
+        as floats
+        """
+        anchors = self._anchors
+        vectors = self._vectors
+        px, py = self._query_points(points)
+        for i in range(0, len(anchors), 2):
+            ax, ay = anchors[i:i + 2]
+            vx, vy = vectors[i:i + 2]
+            if py is None:
+                tx = px[i] - ax
+                ty = px[i + 1] - ay
+            else:
+                tx = px - ax
+                ty = py - ay
+            length = math.hypot(vx, vy)
+            if length:
+                dx = vx / length
+                dy = vy / length
+            else:
+                dx = 1.0
+                dy = 0.0
+            yield ax, ay, dx, dy, length, tx, ty, dx * tx + dy * ty
+
+    def _distance_array(self, points):
+        """Return a NumPy array of the distances between the points and 
+        the segments
+        """
+        ax, ay, dx, dy, length, tx, ty, along = self._frames(points)
+        # Points "beside"
+        dist = numpy.abs(tx * dy - ty * dx)
+        behind = along < 0.0
+        dist[behind] = numpy.hypot(tx, ty)[behind]
+        ahead = along > length
+        dist[ahead] = numpy.hypot(tx - dx * length, ty - dy * length)[ahead]
+        return dist
+
+    def distance_to(self, points):
+        """Return the distances between the points and the segments.
+
+        :param points: A single point, or one point per segment.
+        :return: An ``array('d')`` of distances, one per segment.
+        """
+        if self._use_numpy():
+            return array('d', self._distance_array(points).tobytes())
+        hypot = math.hypot
+        distances = array('d')
+        add = distances.append
+        for ax, ay, dx, dy, length, tx, ty, along in \
+            self._iter_frames(points):
+            if along < 0.0:
+                add(hypot(tx, ty))
+            elif along > length:
+                add(hypot(tx - dx * length, ty - dy * length))
+            else:
+                add(abs(tx * dy - ty * dx))
+        return distances
+
+    def contains_point(self, points):
+        """Test if the points lie on the segments.
+
+        :param points: A single point, or one point per segment.
+        :return: A ``bytearray`` with a 1 for each segment containing its
+            point, and a 0 for each that does not.
+        :rtype: bytearray
+        """
+        epsilon = polypaths_planar_override.EPSILON
+        if self._use_numpy():
+            return bytearray(
+                (self._distance_array(points) < epsilon).tobytes())
+        return bytearray(
+            dist < epsilon for dist in self.distance_to(points))
+
+    def _flags(self, points, test):
+        """Return a bytearray of test(dx, dy, length, tx, ty, along) for
+        each segment, which works elementwise on NumPy arrays too
+        """
+        if self._use_numpy():
+            ax, ay, dx, dy, length, tx, ty, along = self._frames(points)
+            return bytearray(test(dx, dy, length, tx, ty, along).tobytes())
+        return bytearray(bool(test(dx, dy, length, tx, ty, along))
+            for ax, ay, dx, dy, length, tx, ty, along 
+            in self._iter_frames(points))
+
+    def point_ahead(self, points):
+        """Test if the points are ahead of the end points of the segments
+        with respect to their directions.
+
+        :param points: A single point, or one point per segment.
+        :rtype: bytearray
+        """
+        epsilon = polypaths_planar_override.EPSILON
+        return self._flags(points, 
+            lambda dx, dy, length, tx, ty, along: 
+                along >= length + epsilon)
+
+    def point_behind(self, points):
+        """Test if the points are behind the anchor points with respect
+        to the directions of the segments.
+
+        :param points: A single point, or one point per segment.
+        :rtype: bytearray
+        """
+        epsilon = polypaths_planar_override.EPSILON
+        return self._flags(points, 
+            lambda dx, dy, length, tx, ty, along: along <= -epsilon)
+
+    def point_left(self, points):
+        """Test if the points are in the space to the left of, but not
+        behind the segments.
+
+        :param points: A single point, or one point per segment.
+        :rtype: bytearray
+        """
+        epsilon = polypaths_planar_override.EPSILON
+        return self._flags(points, 
+            lambda dx, dy, length, tx, ty, along: 
+                (length + epsilon > along) & (along > -epsilon)
+                & (tx * dy - ty * dx <= -epsilon))
+
+    def point_right(self, points):
+        """Test if the points are in the space to the right of, but not
+        behind the segments.
+
+        :param points: A single point, or one point per segment.
+        :rtype: bytearray
+        """
+        epsilon = polypaths_planar_override.EPSILON
+        return self._flags(points, 
+            lambda dx, dy, length, tx, ty, along: 
+                (length + epsilon > along) & (along > -epsilon)
+                & (tx * dy - ty * dx >= epsilon))
+
+    def project(self, points):
+        """Compute the projections of the points onto the segments. These
+        are the closest points on the segments to the points specified.
+
+        :param points: A single point, or one point per segment.
+        :return: The projected points, one per segment.
+        :rtype: :class:`~polypaths_planar_override.Vec2Array`
+        """
+        epsilon = polypaths_planar_override.EPSILON
+        if self._use_numpy():
+            ax, ay, dx, dy, length, tx, ty, along = self._frames(points)
+            # Points "behind" project to the anchor, and points "ahead" 
+            # to the end
+            along = numpy.where(along <= -epsilon, 0.0, 
+                numpy.where(along >= length + epsilon, length, along))
+            projected = numpy.column_stack(
+                (ax + dx * along, ay + dy * along))
+        else:
+            projected = array('d')
+            add = projected.extend
+            for ax, ay, dx, dy, length, tx, ty, along in \
+                self._iter_frames(points):
+                if along <= -epsilon:
+                    add((ax, ay))
+                else:
+                    if along >= length + epsilon:
+                        along = length
+                    add((ax + dx * along, ay + dy * along))
+        return polypaths_planar_override.Vec2Array.from_buffer(
+            projected, copy=True)
+
+    def intersects(self, segments):
+        """Test if the segments in the array intersect with other 
+        segments. Segments that touch intersect, collinear segments do
+        not, as for :func:`~polypaths_planar_override.segment_intersections`.
+
+        :param segments: A single 
+            :class:`~polypaths_planar_override.LineSegment`, tested 
+            against every segment in the array, or a :class:`SegmentArray`
+            of the same length, where segment ``i`` is tested against
+            segment ``i`` of this array.
+        :rtype: bytearray
+        """
+        if isinstance(segments, SegmentArray):
+            if len(segments) != len(self):
+                raise ValueError(
+                    "SegmentArray.intersects: expected a segment, or a "
+                    "SegmentArray of the same length")
+            others = segments
+        else:
+            (cx, cy), (vx, vy) = segments.anchor, segments.vector
+            others = None
+        if self._use_numpy():
+            ax, ay = _numpy_vectors(self._anchors)
+            bx, by = _numpy_vectors(self._vectors)
+            if others is not None:
+                cx, cy = _numpy_vectors(others._anchors)
+                vx, vy = _numpy_vectors(others._vectors)
+            return bytearray(_intersect_array(
+                ax, ay, ax + bx, ay + by, cx, cy, cx + vx, cy + vy
+                ).tobytes())
+        anchors = self._anchors
+        vectors = self._vectors
+        flags = bytearray(len(self))
+        for i in range(0, len(anchors), 2):
+            ax, ay = anchors[i:i + 2]
+            bx, by = vectors[i:i + 2]
+            if others is not None:
+                cx, cy = others._anchors[i:i + 2]
+                vx, vy = others._vectors[i:i + 2]
+            flags[i // 2] = _segments_intersect(
+                ax, ay, ax + bx, ay + by, cx, cy, cx + vx, cy + vy)
+        return flags
+
+    def intersections(self, cell_size=None):
+        """Find the intersections among the segments in the array, with
+        :func:`~polypaths_planar_override.segment_intersections`.
+
+        :param cell_size: The side length of the grid cells to bucket the
+            segments into, see 
+            :func:`~polypaths_planar_override.segment_intersections`.
+        :type cell_size: float
+        :return: An iterator of ``(point, i, j)`` tuples, where ``point`` 
+            is the :class:`~polypaths_planar_override.Vec2` intersection 
+            of segments ``i`` and ``j``, and ``i < j``.
+        """
+        if self._use_numpy():
+            ax, ay = _numpy_vectors(self._anchors)
+            vx, vy = _numpy_vectors(self._vectors)
+            endpoints = numpy.column_stack((ax, ay, ax + vx, ay + vy))
+        else:
+            endpoints = array('d')
+            add = endpoints.extend
+            for i in range(0, len(self._anchors), 2):
+                ax, ay = self._anchors[i:i + 2]
+                vx, vy = self._vectors[i:i + 2]
+                add((ax, ay, ax + vx, ay + vy))
+        return segment_intersections(endpoints, cell_size)
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
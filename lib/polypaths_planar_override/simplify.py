@@ -0,0 +1,266 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Polyline and polygon simplification"""
+
+from __future__ import division
+
+import heapq
+import polypaths_planar_override
+from polypaths_planar_override.vector import _point_coords, \
+    _numpy_min_size
+from polypaths_planar_override.intersect import _sweep_intersections, \
+    _segments_intersect
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
+
+_METHODS = ('douglas-peucker', 'visvalingam')
+
+
+class _Path(object):
+    """The coordinates of a polyline or polygon, with the first point 
+    repeated at the end of a closed path, so that index ``len(self)`` 
+    refers to vertex 0
+    """
+
+    def __init__(self, points, closed):
+        coords = _point_coords(points)
+        self.count = count = len(coords) // 2
+        self.closed = closed
+        self.xs = list(coords[0::2])
+        self.ys = list(coords[1::2])
+        if closed and count:
+            self.xs.append(self.xs[0])
+            self.ys.append(self.ys[0])
+        self.nx = self.ny = None
+        if numpy is not None and count >= _numpy_min_size:
+            self.nx = numpy.array(self.xs)
+            self.ny = numpy.array(self.ys)
+
+    def farthest(self, first, last):
+        """Return the index of the vertex between first and last farthest 
+        from the segment joining them, and its squared distance
+        """
+        ax = self.xs[first]
+        ay = self.ys[first]
+        dx = self.xs[last] - ax
+        dy = self.ys[last] - ay
+        length2 = dx*dx + dy*dy
+        if self.nx is not None and last - first > _numpy_min_size:
+            px = self.nx[first + 1:last] - ax
+            py = self.ny[first + 1:last] - ay
+            if length2:
+                t = numpy.clip((px * dx + py * dy) / length2, 0.0, 1.0)
+                px = px - t * dx
+                py = py - t * dy
+            dist2 = px*px + py*py
+            i = int(dist2.argmax())
+            return first + 1 + i, float(dist2[i])
+        xs = self.xs
+        ys = self.ys
+        index = first
+        max_dist2 = -1.0
+        for i in range(first + 1, last):
+            px = xs[i] - ax
+            py = ys[i] - ay
+            if length2:
+                t = (px * dx + py * dy) / length2
+                if t > 1.0:
+                    t = 1.0
+                elif t < 0.0:
+                    t = 0.0
+                px -= t * dx
+                py -= t * dy
+            dist2 = px*px + py*py
+            if dist2 > max_dist2:
+                index = i
+                max_dist2 = dist2
+        return index, max_dist2
+
+    def spans(self, keep):
+        """Return the (first, last) index pairs of the edges joining
+        consecutive kept vertices
+        """
+        kept = [i for i in range(self.count) if keep[i]]
+        if self.closed:
+            kept.append(self.count)
+        return list(zip(kept, kept[1:]))
+
+
+def _douglas_peucker(path, tolerance2, keep):
+    """Keep the vertices of the path chosen by the Douglas-Peucker 
+    algorithm, splitting spans at their farthest vertex until every 
+    vertex is within tolerance of its span. A stack of spans replaces 
+    recursion, so long paths cannot exhaust the call stack.
+    """
+    if path.closed:
+        # Split the ring at vertex 0 and the vertex farthest from it
+        far = path.farthest(0, path.count)[0]
+        keep[far] = 1
+        stack = [(0, far), (far, path.count)]
+    else:
+        keep[path.count - 1] = 1
+        stack = [(0, path.count - 1)]
+    keep[0] = 1
+    while stack:
+        first, last = stack.pop()
+        if last - first > 1:
+            index, dist2 = path.farthest(first, last)
+            if dist2 > tolerance2:
+                keep[index] = 1
+                stack.append((first, index))
+                stack.append((index, last))
+
+
+def _visvalingam(path, tolerance2, keep):
+    """Keep the vertices of the path chosen by the Visvalingam-Whyatt
+    algorithm, repeatedly removing the vertex whose triangle with its
+    neighbors has the smallest area, from a heap, until every triangle's
+    area exceeds the tolerance squared. A vertex's area is never less 
+    than that of a vertex removed before it.
+    """
+    count = path.count
+    xs = path.xs
+    ys = path.ys
+    closed = path.closed
+    before = list(range(-1, count - 1))
+    after = list(range(1, count + 1))
+    if closed:
+        before[0] = count - 1
+        after[count - 1] = 0
+
+    def area(i):
+        a = before[i]
+        b = after[i]
+        return abs((xs[a] - xs[i]) * (ys[b] - ys[i]) 
+            - (xs[b] - xs[i]) * (ys[a] - ys[i])) * 0.5
+
+    removable = range(count) if closed else range(1, count - 1)
+    areas = [0.0] * count
+    heap = []
+    for i in removable:
+        areas[i] = area(i)
+        heap.append((areas[i], i))
+    heapq.heapify(heap)
+    for i in range(count):
+        keep[i] = 1
+    remaining = count
+    min_count = 3 if closed else 2
+    while heap and remaining > min_count:
+        removed_area, i = heapq.heappop(heap)
+        if not keep[i] or removed_area != areas[i]:
+            # Stale entry for a removed or recomputed vertex
+            continue
+        if removed_area > tolerance2:
+            break
+        keep[i] = 0
+        remaining -= 1
+        a = before[i]
+        b = after[i]
+        after[a] = b
+        before[b] = a
+        for j in (a, b):
+            if closed or 0 < j < count - 1:
+                areas[j] = max(area(j), removed_area)
+                heapq.heappush(heap, (areas[j], j))
+
+
+def _crossing_spans(path, spans):
+    """Return the set of indices of the non-adjacent spans that cross
+    or touch, using a plane sweep
+    """
+    xs = path.xs
+    ys = path.ys
+    segments = []
+    for first, last in spans:
+        p0 = (xs[first], ys[first])
+        p1 = (xs[last], ys[last])
+        segments.append(p0 + p1 if p0 <= p1 else p1 + p0)
+    last_index = len(spans) - 1 if path.closed else len(spans)
+
+    def intersects(i, j):
+        return (last_index > j - i > 1 
+            and _segments_intersect(*(segments[i] + segments[j])))
+
+    crossing = set()
+    for i, j in _sweep_intersections(segments, intersects):
+        crossing.add(i)
+        crossing.add(j)
+    return crossing
+
+
+def _restore_simplicity(path, keep):
+    """Keep the farthest removed vertex of each span that crosses
+    another, until no spans cross. Spans of the original edges are never
+    split, so this ends even if the original path is not simple.
+    """
+    while True:
+        spans = path.spans(keep)
+        split = False
+        for i in _crossing_spans(path, spans):
+            first, last = spans[i]
+            if last - first > 1:
+                keep[path.farthest(first, last)[0] % path.count] = 1
+                split = True
+        if not split:
+            return
+
+
+def _simplify_mask(points, closed, tolerance=None, 
+    method='douglas-peucker', preserve_simple=False):
+    """Return a bytearray with a 1 for each vertex kept by simplifying 
+    the points as a polyline, or a polygon if closed is True.
+    """
+    if method not in _METHODS:
+        raise ValueError("Unknown simplification method: %r" % (method,))
+    if tolerance is None:
+        tolerance = polypaths_planar_override.EPSILON
+    elif tolerance < 0.0:
+        raise ValueError("Simplification tolerance must be >= 0")
+    path = _Path(points, closed)
+    keep = bytearray(path.count)
+    if path.count <= (3 if closed else 2):
+        return bytearray(b'\x01') * path.count
+    if method == 'visvalingam':
+        _visvalingam(path, tolerance * tolerance, keep)
+    else:
+        _douglas_peucker(path, tolerance * tolerance, keep)
+        kept = sum(keep)
+        while closed and kept < 3:
+            # Keep a triangle of the farthest vertices from a ring 
+            # too small to split
+            index = max((path.farthest(first, last) 
+                for first, last in path.spans(keep) if last - first > 1),
+                key=lambda farthest: farthest[1])[0]
+            keep[index % path.count] = 1
+            kept += 1
+    if preserve_simple:
+        _restore_simplicity(path, keep)
+    return keep
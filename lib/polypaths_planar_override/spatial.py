@@ -0,0 +1,1094 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Spatial indexes for fast queries over large collections of shapes"""
+
+from __future__ import division
+
+import math
+import heapq
+import weakref
+from array import array
+from polypaths_planar_override.vector import _point_coords, _numpy_min_size
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
+
+
+def _shape_box(shape):
+    """Return the bounding box of a shape as a
+    (min_x, min_y, max_x, max_y) tuple
+    """
+    try:
+        bbox = shape.bounding_box
+    except AttributeError:
+        # Line segments are finite, but have no bounding box attribute
+        (x0, y0), (x1, y1) = shape.start, shape.end
+        return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+    min_x, min_y = bbox.min_point
+    max_x, max_y = bbox.max_point
+    return (min_x, min_y, max_x, max_y)
+
+
+def _box_distance2(box, px, py):
+    """Return the square of the distance from a point to a
+    (min_x, min_y, max_x, max_y) box, zero if the point is inside
+    """
+    min_x, min_y, max_x, max_y = box
+    dx = max(min_x - px, 0.0, px - max_x)
+    dy = max(min_y - py, 0.0, py - max_y)
+    return dx*dx + dy*dy
+
+
+def _union(a, b):
+    """Return the smallest box containing the boxes a and b"""
+    return (min(a[0], b[0]), min(a[1], b[1]),
+        max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _perimeter(box):
+    """Return the half perimeter of a box, a measure of its size that,
+    unlike area, is non-zero for boxes with zero width or height
+    """
+    return (box[2] - box[0]) + (box[3] - box[1])
+
+
+def _str_order(ids, boxes, max_entries):
+    """Return the ids ordered by Sort-Tile-Recursive packing, so that
+    each consecutive run of max_entries ids forms a compact tile.
+    """
+    count = len(ids)
+    slice_count = int(math.ceil(math.sqrt(math.ceil(count / max_entries))))
+    slice_size = max(max_entries * slice_count, 1)
+    ids = sorted(ids, key=lambda i: boxes[i][0] + boxes[i][2])
+    ordered = []
+    for start in range(0, count, slice_size):
+        ordered.extend(sorted(ids[start:start + slice_size],
+            key=lambda i: boxes[i][1] + boxes[i][3]))
+    return ordered
+
+
+class _SpatialIndex(object):
+    """Abstract base class for spatial indexes of shapes"""
+
+    def _search(self, min_x, min_y, max_x, max_y):
+        """Return the shapes whose bounding boxes intersect the box"""
+        raise NotImplementedError
+
+    def query_point(self, point):
+        """Return the shapes whose bounding boxes contain the point,
+        including those with the point on their boundary. These are the
+        candidates for, e.g., a :meth:`Polygon.contains_point` test.
+
+        :param point: The point to query.
+        :type point: :class:`~polypaths_planar_override.Vec2`
+        :rtype: list
+        """
+        x, y = point
+        return self._search(x, y, x, y)
+
+    def query_box(self, box):
+        """Return the shapes whose bounding boxes intersect the
+        bounding box of the shape specified, including boxes that only
+        touch at their boundaries.
+
+        :param box: A :class:`~polypaths_planar_override.BoundingBox`, or
+            other shape with a ``bounding_box`` attribute.
+        :rtype: list
+        """
+        return self._search(*_shape_box(box))
+
+    def query_points(self, points):
+        """Batch version of :meth:`query_point`.
+
+        :param points: Iterable of points, e.g., a
+            :class:`~polypaths_planar_override.Vec2Array`.
+        :return: A list containing a list of shapes for each point.
+        """
+        search = self._search
+        return [search(x, y, x, y) for x, y in points]
+
+    def query_boxes(self, boxes):
+        """Batch version of :meth:`query_box`.
+
+        :param boxes: Iterable of bounding boxes, or shapes.
+        :return: A list containing a list of shapes for each box.
+        """
+        search = self._search
+        return [search(*_shape_box(box)) for box in boxes]
+
+    def nearest_points(self, points, k=1):
+        """Batch version of :meth:`nearest`.
+
+        :param points: Iterable of points, e.g., a
+            :class:`~polypaths_planar_override.Vec2Array`.
+        :param k: The maximum number of shapes to return for each point.
+        :type k: int
+        :return: A list containing a list of shapes for each point.
+        """
+        nearest = self.nearest
+        return [nearest(point, k) for point in points]
+
+
+class RTree(_SpatialIndex):
+    """Static R-tree spatial index over a collection of shapes, bulk loaded
+    using Sort-Tile-Recursive (STR) packing. Queries find the shapes
+    whose bounding boxes contain a point, intersect a box, or are nearest
+    to a point in O(log n) time, rather than scanning every shape.
+
+    The tree is immutable, the shapes are indexed by their bounding boxes
+    at construction time. If the shapes change, a new tree must be built.
+
+    :param shapes: Iterable of objects with a ``bounding_box`` attribute,
+        such as :class:`~polypaths_planar_override.Polygon` or
+        :class:`~polypaths_planar_override.BoundingBox` objects, or
+        :class:`~polypaths_planar_override.LineSegment` objects.
+    :param max_entries: The maximum number of children of each tree node.
+    :type max_entries: int
+    """
+
+    def __init__(self, shapes, max_entries=16):
+        if max_entries < 2:
+            raise ValueError("RTree: expected max_entries >= 2")
+        self._shapes = list(shapes)
+        self._max_entries = max_entries
+        self._build([_shape_box(shape) for shape in self._shapes])
+
+    def _build(self, shape_boxes):
+        """Pack the tree nodes into flat arrays. Nodes 0 to n-1 are the
+        shapes' boxes in STR order, followed by the internal nodes
+        level by level, ending with the root. The children of internal
+        node i are the nodes from _start[i - n] up to _end[i - n].
+        """
+        max_entries = self._max_entries
+        count = len(shape_boxes)
+        order = _str_order(range(count), shape_boxes, max_entries)
+        self._shape_index = array('l', order)
+        boxes = [shape_boxes[i] for i in order]
+        self._start = array('l')
+        self._end = array('l')
+        self._root = None
+        lo, hi = 0, count
+        while hi - lo > 1 or (count and self._root is None):
+            # Group consecutive nodes of the level below, then order the
+            # new nodes by STR so that they in turn tile compactly
+            level_boxes = []
+            spans = []
+            for start in range(lo, hi, max_entries):
+                end = min(start + max_entries, hi)
+                children = boxes[start:end]
+                level_boxes.append((
+                    min(b[0] for b in children), min(b[1] for b in children),
+                    max(b[2] for b in children), max(b[3] for b in children)))
+                spans.append((start, end))
+            for i in _str_order(range(len(spans)), level_boxes, max_entries):
+                boxes.append(level_boxes[i])
+                self._start.append(spans[i][0])
+                self._end.append(spans[i][1])
+            lo, hi = hi, len(boxes)
+            self._root = hi - 1
+        self._boxes = array('d', [c for box in boxes for c in box])
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def _search(self, min_x, min_y, max_x, max_y):
+        """Return the shapes whose bounding boxes intersect the box,
+        in the order they were given.
+        """
+        if self._root is None:
+            return []
+        boxes = self._boxes
+        start = self._start
+        end = self._end
+        count = len(self._shapes)
+        shape_index = self._shape_index
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop() - count
+            for child in range(start[node], end[node]):
+                j = child * 4
+                if (boxes[j] <= max_x and boxes[j + 2] >= min_x
+                    and boxes[j + 1] <= max_y and boxes[j + 3] >= min_y):
+                    if child < count:
+                        found.append(shape_index[child])
+                    else:
+                        stack.append(child)
+        found.sort()
+        shapes = self._shapes
+        return [shapes[i] for i in found]
+
+    def nearest(self, point, k=1):
+        """Return the ``k`` shapes whose bounding boxes are nearest to the
+        point, nearest first. Shapes whose bounding boxes contain the point
+        are at distance zero.
+
+        :param point: The point to query.
+        :type point: :class:`~polypaths_planar_override.Vec2`
+        :param k: The maximum number of shapes to return.
+        :type k: int
+        :rtype: list
+        """
+        if self._root is None or k < 1:
+            return []
+        px, py = point
+        boxes = self._boxes
+        start = self._start
+        end = self._end
+        count = len(self._shapes)
+        shapes = self._shapes
+        shape_index = self._shape_index
+        nearest = []
+        # Best-first search, the heap holds (distance2, kind, node) where
+        # shapes (kind 0) are popped before nodes at an equal distance
+        queue = [(0.0, -1, self._root)]
+        while queue and len(nearest) < k:
+            dist2, _, node = heapq.heappop(queue)
+            if node < count:
+                nearest.append(shapes[shape_index[node]])
+                continue
+            node -= count
+            for child in range(start[node], end[node]):
+                j = child * 4
+                heapq.heappush(queue, (
+                    _box_distance2(boxes[j:j + 4], px, py),
+                    0 if child < count else 1, child))
+        return nearest
+
+
+
+class DynamicRTree(_SpatialIndex):
+    """Spatial index over a changing collection of shapes, supporting
+    O(log n) insertion, removal and update of individual shapes. Suitable
+    for indexing shapes that move, where rebuilding an :class:`RTree`
+    after every change would be too slow.
+
+    The index is a binary R-tree, kept balanced by tree rotations, where
+    shapes are inserted next to the node that least increases the total
+    perimeter of the tree's boxes. Queries are the same as for
+    :class:`RTree`.
+
+    Polygons are re-indexed automatically when mutated via item assignment,
+    in-place multiplication by a transform, or 
+    :meth:`Affine.itransform`. Other shapes, e.g.,
+    :class:`~polypaths_planar_override.LineSegment` objects, or polygons
+    mutated by other means, must be re-indexed by calling :meth:`update`.
+
+    :param shapes: Iterable of shapes to insert initially.
+    :param margin: Each shape's box is inflated by this amount on each
+        side in the tree. Updating a shape that moves less than this
+        distance does not modify the tree, at the expense of slightly
+        looser tree nodes.
+    :type margin: float
+    """
+
+    def __init__(self, shapes=(), margin=0.0):
+        if margin < 0:
+            raise ValueError("DynamicRTree: expected margin >= 0")
+        self._margin = margin
+        # Nodes are indexes into these lists. Leaf nodes have a shape
+        # and no children (-1), internal nodes have no shape
+        self._boxes = []
+        self._parent = []
+        self._left = []
+        self._right = []
+        self._height = []
+        self._shape = []
+        self._shape_box = []
+        self._order = []
+        self._free = []
+        self._root = -1
+        self._leaves = {}
+        self._count = 0
+        for shape in shapes:
+            self.insert(shape)
+
+    def __len__(self):
+        return len(self._leaves)
+
+    def __contains__(self, shape):
+        return id(shape) in self._leaves
+
+    def __iter__(self):
+        shape = self._shape
+        return (shape[node] for node in sorted(
+            self._leaves.values(), key=self._order.__getitem__))
+
+    def _new_node(self):
+        if self._free:
+            return self._free.pop()
+        self._boxes.append(None)
+        self._parent.append(-1)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._height.append(0)
+        self._shape.append(None)
+        self._shape_box.append(None)
+        self._order.append(0)
+        return len(self._boxes) - 1
+
+    def _free_node(self, node):
+        self._parent[node] = self._left[node] = self._right[node] = -1
+        self._height[node] = 0
+        self._shape[node] = self._shape_box[node] = None
+        self._free.append(node)
+
+    def _fat_box(self, box):
+        margin = self._margin
+        min_x, min_y, max_x, max_y = box
+        return (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+    def insert(self, shape):
+        """Add a shape to the index.
+
+        :param shape: The shape to add, with a ``bounding_box`` attribute,
+            or a :class:`~polypaths_planar_override.LineSegment`.
+        :raises ValueError: If the shape is already in the index.
+        """
+        if id(shape) in self._leaves:
+            raise ValueError("DynamicRTree.insert(): shape already in index")
+        box = _shape_box(shape)
+        leaf = self._new_node()
+        self._shape[leaf] = shape
+        self._shape_box[leaf] = box
+        self._boxes[leaf] = self._fat_box(box)
+        self._order[leaf] = self._count
+        self._count += 1
+        self._leaves[id(shape)] = leaf
+        self._insert_leaf(leaf)
+        observers = getattr(shape, '_observers', None)
+        if observers is not None:
+            observers.append(weakref.ref(self))
+
+    def remove(self, shape):
+        """Remove a shape from the index.
+
+        :param shape: The shape to remove.
+        :raises KeyError: If the shape is not in the index.
+        """
+        try:
+            leaf = self._leaves.pop(id(shape))
+        except KeyError:
+            raise KeyError("DynamicRTree.remove(): shape not in index")
+        self._remove_leaf(leaf)
+        self._free_node(leaf)
+        observers = getattr(shape, '_observers', None)
+        if observers is not None:
+            ref = weakref.ref(self)
+            if ref in observers:
+                observers.remove(ref)
+
+    def update(self, shape):
+        """Re-index a shape after it has changed. This is only necessary
+        for shapes that are not re-indexed automatically.
+
+        :param shape: The shape to update.
+        :raises KeyError: If the shape is not in the index.
+        """
+        try:
+            leaf = self._leaves[id(shape)]
+        except KeyError:
+            raise KeyError("DynamicRTree.update(): shape not in index")
+        box = _shape_box(shape)
+        self._shape_box[leaf] = box
+        fat_box = self._boxes[leaf]
+        loose_box = self._fat_box(self._fat_box(box))
+        # Keep the leaf where it is if its box still contains the shape
+        # and is not too loose, otherwise reinsert it
+        if not (fat_box[0] <= box[0] and fat_box[1] <= box[1]
+            and fat_box[2] >= box[2] and fat_box[3] >= box[3]
+            and fat_box[0] >= loose_box[0] and fat_box[1] >= loose_box[1]
+            and fat_box[2] <= loose_box[2] and fat_box[3] <= loose_box[3]):
+            self._remove_leaf(leaf)
+            self._boxes[leaf] = self._fat_box(box)
+            self._insert_leaf(leaf)
+
+    def _search(self, min_x, min_y, max_x, max_y):
+        """Return the shapes whose bounding boxes intersect the box,
+        in the order they were inserted.
+        """
+        if self._root == -1:
+            return []
+        boxes = self._boxes
+        left = self._left
+        right = self._right
+        shape_box = self._shape_box
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            box = boxes[node]
+            if (box[0] <= max_x and box[2] >= min_x
+                and box[1] <= max_y and box[3] >= min_y):
+                if left[node] != -1:
+                    stack.append(left[node])
+                    stack.append(right[node])
+                else:
+                    box = shape_box[node]
+                    if (box[0] <= max_x and box[2] >= min_x
+                        and box[1] <= max_y and box[3] >= min_y):
+                        found.append(node)
+        found.sort(key=self._order.__getitem__)
+        shape = self._shape
+        return [shape[node] for node in found]
+
+    def nearest(self, point, k=1):
+        """Return the ``k`` shapes whose bounding boxes are nearest to the
+        point, nearest first. Shapes whose bounding boxes contain the point
+        are at distance zero.
+
+        :param point: The point to query.
+        :type point: :class:`~polypaths_planar_override.Vec2`
+        :param k: The maximum number of shapes to return.
+        :type k: int
+        :rtype: list
+        """
+        if self._root == -1 or k < 1:
+            return []
+        px, py = point
+        boxes = self._boxes
+        left = self._left
+        right = self._right
+        shape_box = self._shape_box
+        nearest = []
+        # Best-first search, the heap holds (distance2, kind, node) where
+        # shapes (kind 0) are popped before nodes at an equal distance
+        queue = [(0.0, 1, self._root)]
+        while queue and len(nearest) < k:
+            dist2, kind, node = heapq.heappop(queue)
+            if kind == 0:
+                nearest.append(self._shape[node])
+            elif left[node] == -1:
+                heapq.heappush(queue, (
+                    _box_distance2(shape_box[node], px, py), 0, node))
+            else:
+                for child in (left[node], right[node]):
+                    heapq.heappush(queue, (
+                        _box_distance2(boxes[child], px, py), 1, child))
+        return nearest
+
+    def _shape_changed(self, shape):
+        if id(shape) in self._leaves:
+            self.update(shape)
+
+    def _insert_leaf(self, leaf):
+        boxes = self._boxes
+        left = self._left
+        right = self._right
+        parent = self._parent
+        if self._root == -1:
+            self._root = leaf
+            parent[leaf] = -1
+            return
+        # Descend to the best sibling for the new leaf
+        box = boxes[leaf]
+        node = self._root
+        while left[node] != -1:
+            node_perimeter = _perimeter(boxes[node])
+            combined_perimeter = _perimeter(_union(boxes[node], box))
+            # Cost of making a new parent for this node and the new leaf
+            cost = 2.0 * combined_perimeter
+            # Minimum cost of pushing the leaf further down the tree
+            inheritance_cost = 2.0 * (combined_perimeter - node_perimeter)
+            child_costs = []
+            for child in (left[node], right[node]):
+                child_cost = _perimeter(_union(boxes[child], box))
+                if left[child] != -1:
+                    child_cost -= _perimeter(boxes[child])
+                child_costs.append(child_cost + inheritance_cost)
+            if cost < child_costs[0] and cost < child_costs[1]:
+                break
+            if child_costs[0] < child_costs[1]:
+                node = left[node]
+            else:
+                node = right[node]
+        sibling = node
+
+        # Create a new parent for the sibling and the leaf
+        old_parent = parent[sibling]
+        new_parent = self._new_node()
+        parent[new_parent] = old_parent
+        boxes[new_parent] = _union(box, boxes[sibling])
+        self._height[new_parent] = self._height[sibling] + 1
+        left[new_parent] = sibling
+        right[new_parent] = leaf
+        parent[sibling] = new_parent
+        parent[leaf] = new_parent
+        if old_parent == -1:
+            self._root = new_parent
+        elif left[old_parent] == sibling:
+            left[old_parent] = new_parent
+        else:
+            right[old_parent] = new_parent
+        self._refit(parent[leaf])
+
+    def _remove_leaf(self, leaf):
+        left = self._left
+        right = self._right
+        parent = self._parent
+        if leaf == self._root:
+            self._root = -1
+            return
+        old_parent = parent[leaf]
+        grand_parent = parent[old_parent]
+        if left[old_parent] == leaf:
+            sibling = right[old_parent]
+        else:
+            sibling = left[old_parent]
+        # Replace the parent with the sibling
+        parent[sibling] = grand_parent
+        self._free_node(old_parent)
+        if grand_parent == -1:
+            self._root = sibling
+        else:
+            if left[grand_parent] == old_parent:
+                left[grand_parent] = sibling
+            else:
+                right[grand_parent] = sibling
+            self._refit(grand_parent)
+
+    def _refit(self, node):
+        """Walk up the tree from the node, rebalancing and recomputing
+        the boxes and heights of the ancestors
+        """
+        boxes = self._boxes
+        height = self._height
+        left = self._left
+        right = self._right
+        parent = self._parent
+        while node != -1:
+            node = self._balance(node)
+            a = left[node]
+            b = right[node]
+            height[node] = 1 + max(height[a], height[b])
+            boxes[node] = _union(boxes[a], boxes[b])
+            node = parent[node]
+
+    def _balance(self, a):
+        """Rotate the subtree at node a if it is unbalanced, returning the
+        index of the subtree's new root node
+        """
+        left = self._left
+        if left[a] == -1:
+            return a
+        b = left[a]
+        c = self._right[a]
+        balance = self._height[c] - self._height[b]
+        if balance > 1:
+            return self._rotate(a, c, b)
+        if balance < -1:
+            return self._rotate(a, b, c)
+        return a
+
+    def _rotate(self, a, c, b):
+        """Rotate node c, the taller child of a, up to take the place of
+        a, where b is the other child of a. Return the new subtree root.
+        """
+        left = self._left
+        right = self._right
+        parent = self._parent
+        height = self._height
+        boxes = self._boxes
+        f = left[c]
+        g = right[c]
+        # Swap a and c
+        left[c] = a
+        parent[c] = parent[a]
+        parent[a] = c
+        if parent[c] == -1:
+            self._root = c
+        elif left[parent[c]] == a:
+            left[parent[c]] = c
+        else:
+            right[parent[c]] = c
+        # The taller grandchild stays with c, the other moves to a
+        if height[f] > height[g]:
+            f, g = g, f
+        right[c] = g
+        if left[a] == c:
+            left[a] = f
+        else:
+            right[a] = f
+        parent[f] = a
+        boxes[a] = _union(boxes[b], boxes[f])
+        height[a] = 1 + max(height[b], height[f])
+        boxes[c] = _union(boxes[a], boxes[g])
+        height[c] = 1 + max(height[a], height[g])
+        return c
+
+
+
+class PointGrid(object):
+    """Uniform grid over a set of points, for finding the points within a
+    fixed distance of a point, or all pairs of points within a distance of
+    each other. The grid is built in O(n) time by counting sort of the
+    points into hashed grid cells, making it cheap enough to rebuild
+    whenever the points move.
+
+    The grid stores a copy of the point coordinates, changes to the points
+    after the grid is built are not reflected in it. Queries return the
+    indices of the points.
+
+    :param points: The points to index, a
+        :class:`~polypaths_planar_override.Vec2Array`, other sequence of
+        points, or buffer of float64 ``x, y`` pairs.
+    :param cell_size: The width and height of the grid cells. Queries are
+        fastest with a radius equal to, or a bit smaller than, the cell
+        size.
+    :type cell_size: float
+    """
+
+    def __init__(self, points, cell_size):
+        cell_size = float(cell_size)
+        if not cell_size > 0.0:
+            raise ValueError("PointGrid: expected cell_size > 0")
+        self._cell_size = cell_size
+        coords = self._coords = _point_coords(points, copy=True)
+        count = len(coords) // 2
+        use_numpy = numpy is not None and count >= _numpy_min_size
+        if use_numpy:
+            xy = numpy.frombuffer(coords, dtype=numpy.float64).reshape(-1, 2)
+            min_x, min_y = xy.min(axis=0).tolist()
+            max_x, max_y = xy.max(axis=0).tolist()
+        elif count:
+            xs = coords[0::2]
+            ys = coords[1::2]
+            min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
+        if count:
+            self._min_x = min_x
+            self._min_y = min_y
+            self._nx = int((max_x - min_x) // cell_size) + 1
+            self._ny = int((max_y - min_y) // cell_size) + 1
+        else:
+            self._min_x = self._min_y = 0.0
+            self._nx = self._ny = 1
+        # Cells are hashed into at least as many buckets as there are
+        # points. There are also more buckets than the distance between
+        # the first and last of any 3x3 block of cells, so that the cells
+        # of a block never share a bucket.
+        self._cell_count = self._nx * self._ny
+        self._size = min(self._cell_count, max(count, 2*self._nx + 3))
+        if use_numpy:
+            self._build_numpy()
+        else:
+            self._build()
+
+    def _build(self):
+        coords = self._coords
+        count = len(coords) // 2
+        min_x = self._min_x
+        min_y = self._min_y
+        cell_size = self._cell_size
+        nx = self._nx
+        size = self._size
+        keys = [(int((x - min_x) // cell_size)
+                + int((y - min_y) // cell_size) * nx) % size
+            for x, y in zip(coords[0::2], coords[1::2])]
+        # Counting sort of the point indices by bucket
+        start = [0] * (size + 1)
+        for key in keys:
+            start[key + 1] += 1
+        for key in range(size):
+            start[key + 1] += start[key]
+        fill = start[:-1]
+        order = [0] * count
+        for i, key in enumerate(keys):
+            order[fill[key]] = i
+            fill[key] += 1
+        self._start = array('l', start)
+        self._order = array('l', order)
+
+    def _build_numpy(self):
+        xy = numpy.frombuffer(self._coords, dtype=numpy.float64).reshape(-1, 2)
+        cell_size = self._cell_size
+        size = self._size
+        ix = ((xy[:, 0] - self._min_x) // cell_size).astype(numpy.int64)
+        iy = ((xy[:, 1] - self._min_y) // cell_size).astype(numpy.int64)
+        # Reduce the terms first, so the products cannot overflow
+        keys = (ix % size + (iy % size) * (self._nx % size)) % size
+        start = numpy.zeros(size + 1, dtype='l')
+        numpy.cumsum(numpy.bincount(keys, minlength=size), out=start[1:])
+        self._start = array('l', start.tobytes())
+        self._order = array('l', 
+            numpy.argsort(keys, kind='stable').astype('l').tobytes())
+
+    def __len__(self):
+        return len(self._coords) // 2
+
+    def _cell_range(self, lo, hi, origin, cell_count):
+        """Return the range of cell indices along an axis overlapping
+        the interval lo to hi
+        """
+        cell_size = self._cell_size
+        first = max((lo - origin) // cell_size, 0.0)
+        last = min((hi - origin) // cell_size, cell_count - 1.0)
+        return range(int(first), int(last) + 1)
+
+    def query_radius(self, point, radius):
+        """Return the indices of the points within the given distance of
+        a point, in ascending order.
+
+        :param point: The point to query.
+        :type point: :class:`~polypaths_planar_override.Vec2`
+        :param radius: The maximum distance of the points from ``point``,
+            inclusive.
+        :type radius: float
+        :rtype: list
+        """
+        if radius < 0.0:
+            return []
+        px, py = point
+        coords = self._coords
+        radius2 = radius * radius
+        x_cells = self._cell_range(px - radius, px + radius, 
+            self._min_x, self._nx)
+        y_cells = self._cell_range(py - radius, py + radius, 
+            self._min_y, self._ny)
+        if len(x_cells) * len(y_cells) >= self._size:
+            # Covers as many cells as there are buckets, test every point
+            return [i for i in range(len(coords) // 2)
+                if (coords[2*i] - px)**2 + (coords[2*i + 1] - py)**2 
+                <= radius2]
+        start = self._start
+        order = self._order
+        nx = self._nx
+        size = self._size
+        seen = set()
+        found = []
+        for iy in y_cells:
+            for ix in x_cells:
+                key = (ix + iy * nx) % size
+                if key in seen:
+                    continue
+                seen.add(key)
+                for i in order[start[key]:start[key + 1]]:
+                    dx = coords[2*i] - px
+                    dy = coords[2*i + 1] - py
+                    if dx*dx + dy*dy <= radius2:
+                        found.append(i)
+        found.sort()
+        return found
+
+    def query_radius_points(self, points, radius):
+        """Batch version of :meth:`query_radius`.
+
+        :param points: Iterable of points, e.g., a
+            :class:`~polypaths_planar_override.Vec2Array`.
+        :param radius: The maximum distance of the points from each point.
+        :type radius: float
+        :return: A list containing a list of indices for each point.
+        """
+        query_radius = self.query_radius
+        return [query_radius(point, radius) for point in points]
+
+    def pairs(self, radius=None):
+        """Iterate the pairs of points within the given distance of each
+        other, in no particular order.
+
+        :param radius: The maximum distance between the points of each
+            pair, inclusive. This must not be larger than the cell size,
+            which is the default.
+        :type radius: float
+        :return: An iterator of ``(i, j)`` tuples of point indices,
+            where ``i < j``.
+        """
+        if radius is None:
+            radius = self._cell_size
+        elif radius > self._cell_size:
+            raise ValueError(
+                "PointGrid.pairs(): radius must not exceed the cell size")
+        if numpy is not None and len(self) >= _numpy_min_size:
+            return self._pairs_numpy(radius)
+        return self._pairs(radius)
+
+    def _pairs(self, radius):
+        coords = self._coords
+        start = self._start
+        order = self._order
+        min_x = self._min_x
+        min_y = self._min_y
+        cell_size = self._cell_size
+        nx = self._nx
+        ny = self._ny
+        size = self._size
+        radius2 = radius * radius
+        for i in range(len(coords) // 2):
+            px = coords[2*i]
+            py = coords[2*i + 1]
+            ix = int((px - min_x) // cell_size)
+            iy = int((py - min_y) // cell_size)
+            for cy in range(max(iy - 1, 0), min(iy + 2, ny)):
+                for cx in range(max(ix - 1, 0), min(ix + 2, nx)):
+                    key = (cx + cy * nx) % size
+                    for j in order[start[key]:start[key + 1]]:
+                        if j > i:
+                            dx = coords[2*j] - px
+                            dy = coords[2*j + 1] - py
+                            if dx*dx + dy*dy <= radius2:
+                                yield (i, j)
+
+    def _pairs_numpy(self, radius, chunk_size=65536):
+        xy = numpy.frombuffer(self._coords, dtype=numpy.float64).reshape(-1, 2)
+        start = numpy.frombuffer(self._start, dtype='l')
+        order = numpy.frombuffer(self._order, dtype='l')
+        cell_size = self._cell_size
+        nx = self._nx
+        ny = self._ny
+        size = self._size
+        radius2 = radius * radius
+        for lo in range(0, len(xy), chunk_size):
+            i = numpy.arange(lo, min(lo + chunk_size, len(xy)))
+            ix = ((xy[i, 0] - self._min_x) // cell_size).astype(numpy.int64)
+            iy = ((xy[i, 1] - self._min_y) // cell_size).astype(numpy.int64)
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    cx = ix + dx
+                    cy = iy + dy
+                    valid = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+                    key = (cx % size + (cy % size) * (nx % size)) % size
+                    first = start[key]
+                    count = numpy.where(valid, start[key + 1] - first, 0)
+                    # Expand each point into one candidate pair for each
+                    # point in the neighboring cell's bucket
+                    total = count.sum()
+                    if not total:
+                        continue
+                    offset = numpy.cumsum(count) - count
+                    pi = numpy.repeat(i, count)
+                    pos = (numpy.arange(total) - numpy.repeat(offset, count)
+                        + numpy.repeat(first, count))
+                    pj = order[pos]
+                    d = xy[pj] - xy[pi]
+                    keep = (pj > pi) & ((d * d).sum(axis=1) <= radius2)
+                    for pair in zip(pi[keep].tolist(), pj[keep].tolist()):
+                        yield pair
+
+
+
+class KDTree(object):
+    """Balanced 2D k-d tree over a set of points, for finding the nearest
+    points to a point, or the points within a distance of a point, in
+    O(log n) time. Queries return the indices of the points.
+
+    The tree is stored implicitly in flat arrays. The points are reordered
+    so that the median point of each node's range splits it in two, and
+    small ranges at the bottom of the tree are scanned linearly. The tree
+    stores a copy of the point coordinates, changes to the points after
+    the tree is built are not reflected in it.
+
+    :param points: The points to index, a
+        :class:`~polypaths_planar_override.Vec2Array`,
+        :class:`~polypaths_planar_override.Polygon`, other sequence of
+        points, or buffer of float64 ``x, y`` pairs.
+    :param leaf_size: The maximum number of points scanned linearly at
+        the leaves of the tree.
+    :type leaf_size: int
+    """
+
+    def __init__(self, points, leaf_size=8):
+        if leaf_size < 1:
+            raise ValueError("KDTree: expected leaf_size >= 1")
+        self._leaf_size = leaf_size
+        coords = _point_coords(points, copy=True)
+        count = len(coords) // 2
+        # Split axis of the node whose median is at each position
+        self._axis = bytearray(count)
+        if numpy is not None and count >= _numpy_min_size:
+            self._build_numpy(coords)
+        else:
+            self._build(coords)
+
+    def _split(self, lo, hi, ranges):
+        """Record the split of the range lo to hi at its median, and
+        add the child ranges that need splitting to ranges
+        """
+        mid = (lo + hi) // 2
+        for child_lo, child_hi in ((lo, mid), (mid + 1, hi)):
+            if child_hi - child_lo > self._leaf_size:
+                ranges.append((child_lo, child_hi))
+        return mid
+
+    def _build(self, coords):
+        xs = coords[0::2]
+        ys = coords[1::2]
+        order = list(range(len(xs)))
+        ranges = [(0, len(order))] if len(order) > self._leaf_size else []
+        while ranges:
+            lo, hi = ranges.pop()
+            node = order[lo:hi]
+            # Split along the axis where the points are most spread out
+            node_xs = [xs[i] for i in node]
+            node_ys = [ys[i] for i in node]
+            axis = int(max(node_ys) - min(node_ys) 
+                > max(node_xs) - min(node_xs))
+            node.sort(key=(ys if axis else xs).__getitem__)
+            order[lo:hi] = node
+            self._axis[self._split(lo, hi, ranges)] = axis
+        self._index = array('l', order)
+        self._coords = array('d', 
+            [c for i in order for c in (xs[i], ys[i])])
+
+    def _build_numpy(self, coords):
+        xy = numpy.frombuffer(coords, dtype=numpy.float64).reshape(-1, 2)
+        order = numpy.arange(len(xy))
+        ranges = [(0, len(order))] if len(order) > self._leaf_size else []
+        while ranges:
+            lo, hi = ranges.pop()
+            node = order[lo:hi]
+            node_xy = xy[node]
+            spread = node_xy.max(axis=0) - node_xy.min(axis=0)
+            axis = int(spread[1] > spread[0])
+            mid = self._split(lo, hi, ranges)
+            # Partial sort, only the median needs to be in its place
+            order[lo:hi] = node[numpy.argpartition(node_xy[:, axis], mid - lo)]
+            self._axis[mid] = axis
+        self._index = array('l', order.astype('l').tobytes())
+        self._coords = array('d', xy[order].tobytes())
+
+    def __len__(self):
+        return len(self._index)
+
+    def nearest(self, point, k=1):
+        """Return the indices of the ``k`` points nearest to a point,
+        nearest first. Points at equal distance are ordered by index.
+
+        :param point: The point to query.
+        :type point: :class:`~polypaths_planar_override.Vec2`
+        :param k: The maximum number of points to return.
+        :type k: int
+        :rtype: list
+        """
+        if k < 1 or not len(self._index):
+            return []
+        px, py = point
+        coords = self._coords
+        index = self._index
+        axis = self._axis
+        leaf_size = self._leaf_size
+        # The best points found so far are kept in a heap of
+        # (-distance2, -index), with the worst of them at the top
+        best = []
+
+        def visit(pos):
+            dx = coords[2*pos] - px
+            dy = coords[2*pos + 1] - py
+            entry = (-(dx*dx + dy*dy), -index[pos])
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+        def search(lo, hi):
+            if hi - lo <= leaf_size:
+                for pos in range(lo, hi):
+                    visit(pos)
+                return
+            mid = (lo + hi) // 2
+            visit(mid)
+            diff = (py if axis[mid] else px) - coords[2*mid + axis[mid]]
+            if diff < 0.0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+            search(*near)
+            if len(best) < k or diff*diff <= -best[0][0]:
+                search(*far)
+
+        search(0, len(index))
+        return [-i for _, i in sorted(best, reverse=True)]
+
+    def query_radius(self, point, radius):
+        """Return the indices of the points within the given distance of
+        a point, in ascending order.
+
+        :param point: The point to query.
+        :type point: :class:`~polypaths_planar_override.Vec2`
+        :param radius: The maximum distance of the points from ``point``,
+            inclusive.
+        :type radius: float
+        :rtype: list
+        """
+        if radius < 0.0:
+            return []
+        px, py = point
+        coords = self._coords
+        index = self._index
+        axis = self._axis
+        leaf_size = self._leaf_size
+        radius2 = radius * radius
+        found = []
+        ranges = [(0, len(index))]
+        while ranges:
+            lo, hi = ranges.pop()
+            if hi - lo <= leaf_size:
+                mid = hi
+            else:
+                mid = (lo + hi) // 2
+                diff = (py if axis[mid] else px) - coords[2*mid + axis[mid]]
+                if diff <= radius:
+                    ranges.append((lo, mid))
+                if diff >= -radius:
+                    ranges.append((mid + 1, hi))
+                lo = mid
+                hi = mid + 1
+            for pos in range(lo, hi):
+                dx = coords[2*pos] - px
+                dy = coords[2*pos + 1] - py
+                if dx*dx + dy*dy <= radius2:
+                    found.append(index[pos])
+        found.sort()
+        return found
+
+    def nearest_points(self, points, k=1):
+        """Batch version of :meth:`nearest`.
+
+        :param points: Iterable of points, e.g., a
+            :class:`~polypaths_planar_override.Vec2Array`.
+        :param k: The maximum number of points to return for each point.
+        :type k: int
+        :return: A list containing a list of indices for each point.
+        """
+        nearest = self.nearest
+        return [nearest(point, k) for point in points]
+
+    def query_radius_points(self, points, radius):
+        """Batch version of :meth:`query_radius`.
+
+        :param points: Iterable of points, e.g., a
+            :class:`~polypaths_planar_override.Vec2Array`.
+        :param radius: The maximum distance of the points from each point.
+        :type radius: float
+        :return: A list containing a list of indices for each point.
+        """
+        query_radius = self.query_radius
+        return [query_radius(point, radius) for point in points]
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
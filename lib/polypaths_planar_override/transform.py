@@ -29,8 +29,15 @@
 from __future__ import division
 
 import math
+from array import array
 import polypaths_planar_override
 from polypaths_planar_override.util import cached_property, assert_unorderable, cos_sin_deg
+from polypaths_planar_override.vector import Vec2Array, _vec2_coords, _numpy_min_size
+
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
 
 
 class Affine(tuple):
@@ -257,6 +264,10 @@ class Affine(tuple):
                 (sa*oa + sb*od, sa*ob + sb*oe, sa*oc + sb*of + sc,
                  sd*oa + se*od, sd*ob + se*oe, sd*oc + se*of + sf,
                  0.0, 0.0, 1.0))
+        elif isinstance(other, Vec2Array):
+            result = other.__copy__()
+            self.itransform(result)
+            return result
         elif hasattr(other, 'from_points'):
             # Point/vector array
             Point = polypaths_planar_override.Point
@@ -295,10 +306,69 @@ class Affine(tuple):
         :returns: None, the input sequence is mutated in place.
         """
         if self is not identity and self != identity:
-            sa, sb, sc, sd, se, sf, _, _, _ = self
-            Vec2 = polypaths_planar_override.Vec2
-            for i, (x, y) in enumerate(seq):
-                seq[i] = Vec2(x*sa + y*sd + sc, x*sb + y*se + sf)
+            if hasattr(seq, '_notify_observers'):
+                # Polygons must also discard their cached properties and
+                # notify their observers, as when multiplied in place
+                seq *= self
+                return
+            try:
+                coords = _vec2_coords(seq, writable=True)
+            except TypeError:
+                # General vector sequence
+                sa, sb, sc, sd, se, sf, _, _, _ = self
+                Vec2 = polypaths_planar_override.Vec2
+                for i, (x, y) in enumerate(seq):
+                    seq[i] = Vec2(x*sa + y*sd + sc, x*sb + y*se + sf)
+            else:
+                self._transform_coords(coords, coords)
+
+    def transform(self, points, out=None):
+        """Transform a batch of points in a single pass over their
+        coordinates.
+
+        :param points: The points to transform, a 
+            :class:`~polypaths_planar_override.Vec2Array`, other 
+            :class:`~polypaths_planar_override.Seq2`, or an object
+            supporting the buffer protocol containing float64 ``x, y`` 
+            pairs, such as an ``(n, 2)`` NumPy array.
+        :param out: Optional destination for the transformed points, a
+            :class:`~polypaths_planar_override.Vec2Array` or writable 
+            buffer with the same number of points. This may be ``points``
+            itself to transform them in place.
+        :returns: ``out`` if specified, otherwise a new
+            :class:`~polypaths_planar_override.Vec2Array`.
+        """
+        src = _vec2_coords(points)
+        if out is None:
+            out = Vec2Array.__new__(Vec2Array)
+            out._coords = dst = array('d', [0.0]) * len(src)
+        else:
+            dst = _vec2_coords(out, writable=True)
+            if len(dst) != len(src):
+                raise ValueError("Affine.transform(): out must have the "
+                    "same number of points as the input")
+        self._transform_coords(src, dst)
+        return out
+
+    def _transform_coords(self, src, dst):
+        """Transform the points in the flat coordinate sequence src,
+        storing the results in dst, which may be the same as src.
+        """
+        sa, sb, sc, sd, se, sf, _, _, _ = self
+        if numpy is not None and len(src) >= 2 * _numpy_min_size:
+            src = numpy.frombuffer(src, dtype=numpy.float64)
+            dst = numpy.frombuffer(dst, dtype=numpy.float64)
+            x = src[0::2]
+            y = src[1::2]
+            tx = x*sa + y*sd + sc
+            ty = x*sb + y*se + sf
+        else:
+            x = src[0::2]
+            y = src[1::2]
+            tx = array('d', [px*sa + py*sd + sc for px, py in zip(x, y)])
+            ty = array('d', [px*sb + py*se + sf for px, py in zip(x, y)])
+        dst[0::2] = tx
+        dst[1::2] = ty
 
     def __invert__(self):
         """Return the inverse transform.
@@ -0,0 +1,292 @@
+#############################################################################
+# Copyright (c) 2010 by Casey Duncan
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name(s) of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from this
+#   software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AS IS AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO
+# EVENT SHALL THE COPYRIGHT HOLDERS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#############################################################################
+"""Polygon triangulation by monotone decomposition"""
+
+from __future__ import division
+
+import math
+from array import array
+from polypaths_planar_override.vector import _point_coords
+from polypaths_planar_override.intersect import _SweepStatus
+
+# Vertex types for the monotone decomposition sweep
+_START, _SPLIT, _END, _MERGE, _REGULAR = range(5)
+
+
+def _fan_triangles(count):
+    """Return the triangles fanning from the first vertex of a convex
+    polygon as an index array
+    """
+    triangles = array('I')
+    for i in range(1, count - 1):
+        triangles.extend((0, i, i + 1))
+    return triangles
+
+
+def _monotone_diagonals(xs, ys):
+    """Return the diagonals splitting a simple, counter-clockwise polygon
+    into y-monotone pieces as (i, j) index pairs, using a top to bottom
+    plane sweep.
+
+    Vertices at the same height are ordered as if the plane were rotated
+    slightly, so that the one to the left is above.
+    """
+    count = len(xs)
+    order = sorted(range(count), key=lambda i: (-ys[i], xs[i]))
+    rank = [0] * count
+    for r, i in enumerate(order):
+        rank[i] = r
+    kinds = [_REGULAR] * count
+    for i in range(count):
+        prev = i - 1
+        after = (i + 1) % count
+        turn = ((xs[i] - xs[prev]) * (ys[after] - ys[i])
+            - (ys[i] - ys[prev]) * (xs[after] - xs[i]))
+        if rank[prev] > rank[i] and rank[after] > rank[i]:
+            kinds[i] = _START if turn > 0.0 else _SPLIT
+        elif rank[prev] < rank[i] and rank[after] < rank[i]:
+            kinds[i] = _END if turn > 0.0 else _MERGE
+
+    # The status holds the edges with the polygon interior to their right,
+    # ordered from left to right. Edge i runs from vertex i down to vertex
+    # i + 1.
+    status = _SweepStatus(count)
+    helper = [0] * count
+    diagonals = set()
+
+    def add_diagonal(i, j):
+        diagonals.add((i, j) if i < j else (j, i))
+
+    def side(edge, px, py):
+        """Return positive if the point is right of the edge"""
+        ux = xs[edge]
+        uy = ys[edge]
+        lower = (edge + 1) % count
+        return ((xs[lower] - ux) * (py - uy)
+            - (px - ux) * (ys[lower] - uy))
+
+    def insert(edge):
+        px = xs[edge]
+        py = ys[edge]
+        lower = (edge + 1) % count
+        qx = xs[lower]
+        qy = ys[lower]
+
+        def below(other):
+            other_side = side(other, px, py) or side(other, qx, qy)
+            return other_side < 0.0
+
+        status.insert(edge, below)
+        helper[edge] = edge
+
+    def left_edge(i):
+        px = xs[i]
+        py = ys[i]
+        return status.find(lambda edge: side(edge, px, py) > 0.0)
+
+    def end_edge(i):
+        # Finish the edge ending at vertex i
+        edge = i - 1 if i else count - 1
+        if kinds[helper[edge]] == _MERGE:
+            add_diagonal(i, helper[edge])
+        status.remove(edge)
+
+    def left_helper(i):
+        # Make vertex i the helper of the edge to its left
+        edge = left_edge(i)
+        if edge != -1:
+            if kinds[helper[edge]] == _MERGE:
+                add_diagonal(i, helper[edge])
+            helper[edge] = i
+
+    for i in order:
+        kind = kinds[i]
+        if kind == _START:
+            insert(i)
+        elif kind == _END:
+            end_edge(i)
+        elif kind == _SPLIT:
+            edge = left_edge(i)
+            add_diagonal(i, helper[edge])
+            helper[edge] = i
+            insert(i)
+        elif kind == _MERGE:
+            end_edge(i)
+            left_helper(i)
+        elif rank[(i + 1) % count] > rank[i]:
+            # On the left side, the interior is to the right
+            end_edge(i)
+            insert(i)
+        else:
+            left_helper(i)
+    return sorted(diagonals)
+
+
+def _monotone_pieces(xs, ys, diagonals):
+    """Generate the vertex index lists of the counter-clockwise faces
+    that the diagonals divide a counter-clockwise polygon into
+    """
+    count = len(xs)
+    neighbors = [[(i - 1) % count, (i + 1) % count] for i in range(count)]
+    for i, j in diagonals:
+        neighbors[i].append(j)
+        neighbors[j].append(i)
+    # Order the neighbors of each vertex counter-clockwise, so the next
+    # vertex of a face is the neighbor clockwise from the previous one
+    position = {}
+    for i, around in enumerate(neighbors):
+        if len(around) > 2:
+            around.sort(key=lambda j: math.atan2(ys[j] - ys[i], xs[j] - xs[i]))
+        for k, j in enumerate(around):
+            position[i, j] = k
+    starts = [(i, (i + 1) % count) for i in range(count)]
+    starts.extend(diagonals)
+    starts.extend((j, i) for i, j in diagonals)
+    visited = set()
+    for start in starts:
+        if start in visited:
+            continue
+        piece = []
+        i, j = start
+        while (i, j) not in visited:
+            visited.add((i, j))
+            piece.append(i)
+            around = neighbors[j]
+            i, j = j, around[position[j, i] - 1]
+        yield piece
+
+
+def _triangulate_monotone(xs, ys, piece, triangles):
+    """Append the triangles of a y-monotone, counter-clockwise polygon
+    piece to the index array
+    """
+    if len(piece) == 3:
+        triangles.extend(piece)
+        return
+    key = lambda i: (-ys[i], xs[i])
+    top = min(range(len(piece)), key=lambda k: key(piece[k]))
+    bottom = max(range(len(piece)), key=lambda k: key(piece[k]))
+    # Counter-clockwise from the top vertex runs down the left chain
+    on_left = {}
+    k = top
+    while k != bottom:
+        on_left[piece[k]] = True
+        k = (k + 1) % len(piece)
+    while k != top:
+        on_left[piece[k]] = False
+        k = (k + 1) % len(piece)
+    vertices = sorted(piece, key=key)
+
+    def turn(a, b, c):
+        return ((xs[b] - xs[a]) * (ys[c] - ys[a])
+            - (xs[c] - xs[a]) * (ys[b] - ys[a]))
+
+    def add(a, b, c):
+        # Wind each triangle counter-clockwise
+        if turn(a, b, c) < 0.0:
+            b, c = c, b
+        triangles.extend((a, b, c))
+
+    stack = vertices[:2]
+    for v in vertices[2:-1]:
+        if on_left[v] != on_left[stack[-1]]:
+            for k in range(len(stack) - 1):
+                add(v, stack[k], stack[k + 1])
+            stack = [stack[-1], v]
+        else:
+            last = stack.pop()
+            while stack:
+                if on_left[v]:
+                    inside = turn(stack[-1], last, v) > 0.0
+                else:
+                    inside = turn(v, last, stack[-1]) > 0.0
+                if not inside:
+                    break
+                add(v, last, stack[-1])
+                last = stack.pop()
+            stack.append(last)
+            stack.append(v)
+    v = vertices[-1]
+    for k in range(len(stack) - 1):
+        add(v, stack[k], stack[k + 1])
+
+
+def _triangulate_polygon(poly):
+    """Return the triangulation of a simple polygon as an array of vertex
+    index triples, wound in the same direction as the polygon
+    """
+    coords = _point_coords(poly)
+    count = len(coords) // 2
+    if poly.is_convex:
+        return _fan_triangles(count)
+    if not poly.is_simple:
+        raise ValueError("Cannot triangulate a non-simple polygon")
+    xs = coords[0::2]
+    ys = coords[1::2]
+    # Triangulate without repeated consecutive vertices, whose
+    # zero-length edges the sweep cannot order
+    index = [i for i in range(count)
+        if xs[i] != xs[i - 1] or ys[i] != ys[i - 1]]
+    if len(index) < 3:
+        # No area, the vertices are on one or two points
+        return _fan_triangles(count)
+    xs = [xs[i] for i in index]
+    ys = [ys[i] for i in index]
+    area = 0.0
+    for i in range(len(index)):
+        area += xs[i - 1] * ys[i] - xs[i] * ys[i - 1]
+    if area < 0.0:
+        # Triangulate the reversed, counter-clockwise polygon
+        index.reverse()
+        xs.reverse()
+        ys.reverse()
+    triangles = array('I')
+    diagonals = _monotone_diagonals(xs, ys)
+    for piece in _monotone_pieces(xs, ys, diagonals):
+        if len(piece) < 3:
+            break
+        _triangulate_monotone(xs, ys, piece, triangles)
+    if len(triangles) != (len(index) - 2) * 3:
+        # is_simple allows collinear edges to overlap
+        raise ValueError("Cannot triangulate a polygon with overlapping edges")
+    for k in range(0, len(triangles), 3):
+        a, b, c = triangles[k:k + 3]
+        if area < 0.0:
+            # Wind the triangles clockwise, like the polygon
+            b, c = c, b
+        triangles[k:k + 3] = array('I', (index[a], index[b], index[c]))
+    # Each repeated vertex adds a triangle with no area, so that there
+    # are still n - 2
+    kept = set(index)
+    for i in range(count):
+        if i not in kept:
+            triangles.extend(((i - 1) % count, i, (i + 1) % count))
+    return triangles
+
+
+# vim: ai ts=4 sts=4 et sw=4 tw=78
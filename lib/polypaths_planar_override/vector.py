@@ -31,9 +31,20 @@
 from __future__ import division
 
 import math
+import sys
+from array import array
+from operator import itemgetter
 import polypaths_planar_override
 from polypaths_planar_override.util import cached_property, assert_unorderable, cos_sin_deg
 
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None
+
+# Bound once, as looking up tuple.__new__ on each vector created is a
+# measurable part of the cost of pure Python vector arithmetic
+_tuple_new = tuple.__new__
 
 class Vec2(tuple):
     """Two dimensional immutable vector.
@@ -45,7 +56,7 @@ class Vec2(tuple):
     """
 
     def __new__(self, x, y):
-        return tuple.__new__(Vec2, ((x * 1.0, y * 1.0)))
+        return _tuple_new(Vec2, ((x * 1.0, y * 1.0)))
 
     @classmethod
     def polar(cls, angle, length=1.0):
@@ -58,7 +69,7 @@ class Vec2(tuple):
         :rtype: Vec2
         """
         x, y = cos_sin_deg(angle)
-        vec = tuple.__new__(cls, (x * length, y * length))
+        vec = _tuple_new(cls, (x * length, y * length))
         vec.__dict__['length'] = length * 1.0
         return vec
 
@@ -70,28 +81,25 @@ class Vec2(tuple):
         """Precise string representation."""
         return "Vec2(%r, %r)" % self
 
-    @property
-    def x(self):
-        """The horizontal coordinate."""
-        return self[0]
-
-    @property
-    def y(self):
-        """The vertical coordinate."""
-        return self[1]
+    # Coordinate getters implemented in C
+    x = property(itemgetter(0), doc="""The horizontal coordinate.""")
+    y = property(itemgetter(1), doc="""The vertical coordinate.""")
 
     @cached_property
     def length(self):
         """The length or scalar magnitude of the vector."""
         return self.length2 ** 0.5
 
-    @cached_property
+    # length2 and is_null are cheaper to compute than to cache, which
+    # would create an instance dict for each vector they are used on
+
+    @property
     def length2(self):
         """The square of the length of the vector."""
         x, y = self
         return x*x + y*y
 
-    @cached_property
+    @property
     def is_null(self):
         """Flag indicating if the vector is effectively zero-length.
         
@@ -103,6 +111,8 @@ class Vec2(tuple):
         """A vector is True if it is not the null vector."""
         return self[0] != 0.0 or self[1] != 0.0
 
+    __bool__ = __nonzero__
+
     def almost_equals(self, other):
         """Compare vectors for approximate equality.
 
@@ -123,8 +133,8 @@ class Vec2(tuple):
         """
         L = self.length
         if L > polypaths_planar_override.EPSILON:
-            v = tuple.__new__(Vec2, (self[0] / L, self[1] / L))
-            v.__dict__['length'] = v.__dict__['length2'] = 1.0
+            v = _tuple_new(Vec2, (self[0] / L, self[1] / L))
+            v.__dict__['length'] = 1.0
             return v
         else:
             return null
@@ -134,7 +144,7 @@ class Vec2(tuple):
         
         :rtype: Vec2
         """
-        return tuple.__new__(Vec2, (-self[1], self[0]))
+        return _tuple_new(Vec2, (-self[1], self[0]))
 
     def dot(self, other):
         """Compute the dot product with another vector.
@@ -193,7 +203,7 @@ class Vec2(tuple):
         """
         vx, vy = self
         ca, sa = cos_sin_deg(angle)
-        return tuple.__new__(Vec2, (vx * ca - vy * sa, vx * sa + vy * ca))
+        return _tuple_new(Vec2, (vx * ca - vy * sa, vx * sa + vy * ca))
 
     def scaled_to(self, length):
         """Compute the vector scaled to a given length. If the
@@ -208,7 +218,7 @@ class Vec2(tuple):
         if L > polypaths_planar_override.EPSILON:
             vx, vy = self
             s = length / L
-            v = tuple.__new__(Vec2, (vx * s, vy * s))
+            v = _tuple_new(Vec2, (vx * s, vy * s))
             v.__dict__['length'] = length
             return v
         else:
@@ -224,7 +234,7 @@ class Vec2(tuple):
         L = self.length2
         if L > polypaths_planar_override.EPSILON2:
             s = self.dot(other) / L
-            return tuple.__new__(Vec2, (self[0] * s, self[1] * s))
+            return _tuple_new(Vec2, (self[0] * s, self[1] * s))
         else:
             return null
 
@@ -240,7 +250,7 @@ class Vec2(tuple):
         L = (x2 * x2 + y2 * y2)
         if L > polypaths_planar_override.EPSILON2:
             temp = 2 * (x1 * x2 + y1 * y2) / L
-            return tuple.__new__(Vec2, (x2 * temp - x1, y2 * temp - y1))
+            return _tuple_new(Vec2, (x2 * temp - x1, y2 * temp - y1))
         else:
             return null
 
@@ -282,7 +292,7 @@ class Vec2(tuple):
         """
         ox, oy = other
         b1 = 1.0 - bias
-        return tuple.__new__(Vec2,
+        return _tuple_new(Vec2,
             (self[0] * b1 + ox * bias, self[1] * b1 + oy * bias))
 
     def __eq__(self, other):
@@ -345,7 +355,7 @@ class Vec2(tuple):
             ox, oy = other
         except Exception:
             return NotImplemented
-        return tuple.__new__(Vec2, (self[0] + ox, self[1] + oy))
+        return _tuple_new(Vec2, (self[0] + ox, self[1] + oy))
 
     __iadd__ = __add__
 
@@ -359,10 +369,22 @@ class Vec2(tuple):
             ox, oy = other
         except Exception:
             return NotImplemented
-        return tuple.__new__(Vec2, (self[0] - ox, self[1] - oy))
+        return _tuple_new(Vec2, (self[0] - ox, self[1] - oy))
 
     __isub__ = __sub__
 
+    def __rsub__(self, other):
+        """Subtract this vector from another componentwise.
+
+        :param other: The vector to subtract from.
+        :type other: Vec2
+        """
+        try:
+            ox, oy = other
+        except Exception:
+            return NotImplemented
+        return _tuple_new(Vec2, (ox - self[0], oy - self[1]))
+
     def __mul__(self, other):
         """Either multiply the vector by a scalar or componentwise
         with another vector.
@@ -372,13 +394,13 @@ class Vec2(tuple):
         """
         try:
             other = float(other)
-            return tuple.__new__(Vec2, (self[0] * other, self[1] * other))
+            return _tuple_new(Vec2, (self[0] * other, self[1] * other))
         except TypeError:
             try:
                 ox, oy = other
             except Exception:
                 return NotImplemented
-            return tuple.__new__(Vec2, (self[0] * ox, self[1] * oy))
+            return _tuple_new(Vec2, (self[0] * ox, self[1] * oy))
     
     __rmul__ = __imul__ = __mul__
 
@@ -391,13 +413,13 @@ class Vec2(tuple):
         """
         try:
             other = float(other)
-            return tuple.__new__(Vec2, (self[0] / other, self[1] / other))
+            return _tuple_new(Vec2, (self[0] / other, self[1] / other))
         except TypeError:
             try:
                 ox, oy = other
             except Exception:
                 return NotImplemented
-            return tuple.__new__(Vec2, (self[0] / ox, self[1] / oy))
+            return _tuple_new(Vec2, (self[0] / ox, self[1] / oy))
 
     __itruediv__ = __truediv__
 
@@ -409,13 +431,13 @@ class Vec2(tuple):
         """
         try:
             other = float(other)
-            return tuple.__new__(Vec2, (other / self[0], other / self[1]))
+            return _tuple_new(Vec2, (other / self[0], other / self[1]))
         except TypeError:
             try:
                 ox, oy = other
             except Exception:
                 return NotImplemented
-            return tuple.__new__(Vec2, (ox / self[0], oy / self[1]))
+            return _tuple_new(Vec2, (ox / self[0], oy / self[1]))
 
     def __floordiv__(self, other):
         """Divide the vector by a scalar or componentwise by
@@ -426,13 +448,13 @@ class Vec2(tuple):
         """
         try:
             other = float(other)
-            return tuple.__new__(Vec2, (self[0] // other, self[1] // other))
+            return _tuple_new(Vec2, (self[0] // other, self[1] // other))
         except TypeError:
             try:
                 ox, oy = other
             except Exception:
                 return NotImplemented
-            return tuple.__new__(Vec2, (self[0] // ox, self[1] // oy))
+            return _tuple_new(Vec2, (self[0] // ox, self[1] // oy))
 
     __ifloordiv__ = __floordiv__
 
@@ -445,20 +467,20 @@ class Vec2(tuple):
         """
         try:
             other = float(other)
-            return tuple.__new__(Vec2, (other // self[0], other // self[1]))
+            return _tuple_new(Vec2, (other // self[0], other // self[1]))
         except TypeError:
             try:
                 ox, oy = other
             except Exception:
                 return NotImplemented
-            return tuple.__new__(Vec2, (ox // self[0], oy // self[1]))
+            return _tuple_new(Vec2, (ox // self[0], oy // self[1]))
 
     def __pos__(self):
         return self
 
     def __neg__(self):
         """Compute the unary negation of the vector."""
-        return tuple.__new__(Vec2, (-self[0], -self[1]))
+        return _tuple_new(Vec2, (-self[0], -self[1]))
     
     def __abs__(self):
         """Compute the absolute magnitude of the vector."""
@@ -532,27 +554,287 @@ class Seq2(object):
     def __nonzero__(self):
         return bool(self._vectors)
 
+    __bool__ = __nonzero__
+
     def __hash__(self):
         raise TypeError("unhashable type: %s" % self.__class__.__name__)
 
 
+# NumPy array interface type string for native double precision floats
+_float64_typestr = '<f8' if sys.byteorder == 'little' else '>f8'
+
+# struct module byte order character for native doubles
+_native_byte_order = '<' if sys.byteorder == 'little' else '>'
+
+
+def _flatten(vectors):
+    """Yield the x and y coordinates of each vector in turn"""
+    for v in vectors:
+        if type(v) is not Vec2:
+            v = Vec2(*v)
+        yield v[0]
+        yield v[1]
+
+
+def _buffer_format_kind(format):
+    """Return 'd' if the buffer format describes native doubles,
+    'B' if it describes raw bytes, otherwise None
+    """
+    if format[:1] in ('@', '=', _native_byte_order):
+        format = format[1:]
+    if format == 'd':
+        return 'd'
+    if format in ('B', 'b', 'c'):
+        return 'B'
+
+
+# Vec2Array batch operations use NumPy, if available, for arrays
+# with at least this many vectors. Below this size the overhead of
+# calling into NumPy outweighs the gain.
+_numpy_min_size = 32
+
+
+def _use_numpy(varray):
+    """Return True if batch operations on the array should use NumPy"""
+    return numpy is not None and len(varray) >= _numpy_min_size
+
+
+def _length2(v):
+    """Return the squared lengths of the vectors in an (n, 2) ndarray"""
+    x = v[:, 0]
+    y = v[:, 1]
+    return x*x + y*y
+
+
+def _normalized(v):
+    """Return the vectors in an (n, 2) ndarray scaled to unit length,
+    null vectors become the null vector, as for :meth:`Vec2.normalized`.
+    """
+    L = numpy.sqrt(_length2(v))
+    result = numpy.zeros_like(v)
+    numpy.divide(v, L[:, numpy.newaxis], out=result, 
+        where=(L > polypaths_planar_override.EPSILON)[:, numpy.newaxis])
+    return result
+
+
+def _clamped(v, min_length, max_length):
+    """Return the vectors in an (n, 2) ndarray with their lengths 
+    clamped, as for :meth:`Vec2.clamped`.
+    """
+    if (min_length is not None and max_length is not None 
+        and min_length > max_length):
+        raise ValueError(
+            "Vec2Array.clamped: expected min_length <= max_length")
+    L2 = _length2(v)
+    L = numpy.sqrt(L2)
+    target = L.copy()
+    clamped = numpy.zeros(len(v), dtype=bool)
+    if min_length is not None:
+        too_short = L2 < min_length**2
+        target[too_short] = min_length
+        clamped |= too_short
+    if max_length is not None:
+        too_long = L2 > max_length**2
+        target[too_long] = max_length
+        clamped |= too_long
+    result = v.copy()
+    scaled = clamped & (L > polypaths_planar_override.EPSILON)
+    result[scaled] *= (target[scaled] / L[scaled])[:, numpy.newaxis]
+    # Null vectors cannot be scaled
+    result[clamped & ~scaled] = 0.0
+    return result
+
+
 class Vec2Array(Seq2):
-    """Sequence of 2D vectors for batch operations"""
+    """Sequence of 2D vectors for batch operations.
+
+    The vectors are stored contiguously in a single array of double
+    precision floats as ``x, y`` pairs. This storage can be shared without
+    copying, e.g., with NumPy, as a 2D ``(n, 2)`` array.
+    """
 
     def __init__(self, vectors=()):
-        super(Vec2Array, self).__init__(vectors)
+        self._coords = array('d')
+        self.extend(vectors)
+
+    @classmethod
+    def from_points(cls, points):
+        """Create a new 2D sequence from an iterable of points"""
+        self = cls.__new__(cls)
+        if isinstance(points, Vec2Array):
+            self._coords = array('d', points._coords)
+        else:
+            self._coords = array('d', _flatten(points))
+        return self
+
+    @classmethod
+    def from_buffer(cls, buffer, copy=False):
+        """Create an array from an object supporting the buffer protocol
+        containing float64 values as consecutive ``x, y`` pairs, or raw 
+        bytes to be interpreted as such. No vector objects are created.
+
+        Unless ``copy`` is true, the array shares memory with the buffer:
+        changes to either are visible in the other, and the array cannot
+        be resized. This requires a writable, C-contiguous buffer.
+
+        :param buffer: Source of the coordinates, e.g., an ``array('d')``,
+            a ``bytearray`` or a NumPy array.
+        :param copy: If true, copy the coordinates into a new array 
+            instead.
+        :type copy: bool
+        :rtype: Vec2Array
+        """
+        return cls._new_from_buffer(buffer, copy, False)
+
+    @classmethod
+    def from_numpy(cls, array, copy=False):
+        """Create an array from an ``(n, 2)`` NumPy array of float64.
+        No vector objects are created.
+
+        Unless ``copy`` is true, the array shares memory with the NumPy
+        array, see :meth:`from_buffer`. Pass ``copy=True`` for read-only 
+        or non-contiguous arrays.
+
+        :param array: Array of shape ``(n, 2)`` with dtype float64.
+        :param copy: If true, copy the coordinates into a new array 
+            instead.
+        :type copy: bool
+        :rtype: Vec2Array
+        """
+        return cls._new_from_buffer(array, copy, True)
+
+    @classmethod
+    def _new_from_buffer(cls, buffer, copy, pairs):
+        view = memoryview(buffer)
+        kind = _buffer_format_kind(view.format)
+        if pairs and (kind != 'd' or view.ndim != 2 or view.shape[1] != 2):
+            raise ValueError(
+                "%s: expected an (n, 2) array of float64" % cls.__name__)
+        if kind is None:
+            raise ValueError(
+                "%s: expected a buffer of float64, got format '%s'" 
+                % (cls.__name__, view.format))
+        if view.nbytes % 16 != 0:
+            raise ValueError(
+                "%s: buffer size must be a multiple of 16 bytes" 
+                % cls.__name__)
+        self = cls.__new__(cls)
+        if copy:
+            self._coords = array('d', view.tobytes())
+        else:
+            if view.readonly:
+                raise ValueError(
+                    "%s: cannot wrap a read-only buffer, use copy=True" 
+                    % cls.__name__)
+            if not view.c_contiguous:
+                raise ValueError(
+                    "%s: cannot wrap a non-contiguous buffer, use copy=True" 
+                    % cls.__name__)
+            if view.nbytes:
+                self._coords = view.cast('B').cast('d')
+            else:
+                # Views with zeros in their shape cannot be cast
+                self._coords = memoryview(array('d'))
+        return self
+
+    @classmethod
+    def _from_ndarray(cls, values):
+        """Create an array from an (n, 2) ndarray of float64"""
+        self = cls.__new__(cls)
+        self._coords = array('d')
+        self._coords.frombytes(
+            memoryview(numpy.ascontiguousarray(values)).cast('B'))
+        return self
+
+    def _ndarray(self):
+        """Return an (n, 2) ndarray sharing memory with this array"""
+        return numpy.frombuffer(self._coords, dtype=numpy.float64
+            ).reshape(-1, 2)
+
+    def _check_resizable(self):
+        if not isinstance(self._coords, array):
+            raise BufferError(
+                "cannot resize a %s that wraps an external buffer" 
+                % self.__class__.__name__)
+
+    def _set_vectors(self, vectors):
+        """Replace the contents of the array with the vectors
+        from the iterable supplied, reusing the existing storage
+        so that exported buffers remain valid.
+        """
+        self._coords[:] = array('d', _flatten(vectors))
+
+    def __len__(self):
+        return len(self._coords) // 2
+
+    def __iter__(self):
+        coords = iter(self._coords)
+        new = tuple.__new__
+        for x in coords:
+            yield new(Vec2, (x, next(coords)))
+
+    def _index(self, index):
+        """Return the start of the coordinates for the vector index"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Vec2Array index out of range")
+        return index * 2
 
     def __getitem__(self, index):
         if isinstance(index, slice):
-            return self.from_points(self._vectors[index])
+            start, stop, step = index.indices(len(self))
+            coords = self._coords
+            if step == 1:
+                sliced = self.__class__.__new__(self.__class__)
+                sliced._coords = array('d', coords[start*2:max(start, stop)*2])
+                return sliced
+            return self.from_points(
+                (coords[i*2], coords[i*2 + 1]) 
+                for i in range(start, stop, step))
         else:
-            return self._vectors[index]
+            i = self._index(index)
+            return _tuple_new(Vec2, self._coords[i:i + 2])
 
     def __setitem__(self, index, value):
         if isinstance(index, slice):
-            self._vectors[index] = [Vec2(*i) for i in value]
+            start, stop, step = index.indices(len(self))
+            values = array('d', _flatten(value))
+            if step == 1:
+                if len(values) != (max(start, stop) - start) * 2:
+                    self._check_resizable()
+                self._coords[start*2:max(start, stop)*2] = values
+            else:
+                indices = range(start, stop, step)
+                if len(values) != len(indices) * 2:
+                    raise ValueError(
+                        "attempt to assign sequence of size %s "
+                        "to extended slice of size %s" 
+                        % (len(values) // 2, len(indices)))
+                coords = self._coords
+                for i, j in enumerate(indices):
+                    coords[j*2] = values[i*2]
+                    coords[j*2 + 1] = values[i*2 + 1]
+        else:
+            x, y = Vec2(*value)
+            i = self._index(index)
+            self._coords[i] = x
+            self._coords[i + 1] = y
+
+    def __delitem__(self, index):
+        self._check_resizable()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                del self._coords[start*2:max(start, stop)*2]
+            else:
+                indices = sorted(range(start, stop, step), reverse=True)
+                for i in indices:
+                    del self._coords[i*2:i*2 + 2]
         else:
-            self._vectors[index] = Vec2(*value)
+            i = self._index(index)
+            del self._coords[i:i + 2]
 
     def append(self, vector):
         """Append a vector to the end of the array.
@@ -560,14 +842,19 @@ class Vec2Array(Seq2):
         :param vector: Vector to append.
         :type vector: Vec2 or 2-number sequence.
         """
-        self._vectors.append(Vec2(*vector))
+        self._check_resizable()
+        self._coords.extend(Vec2(*vector))
 
     def extend(self, iterable):
         """Append all vectors in iterable to the end of the array.
         
         :param iterable: Iterable object containing vectors.
         """
-        self._vectors.extend(Vec2(*vector) for vector in iterable)
+        self._check_resizable()
+        if isinstance(iterable, Vec2Array):
+            self._coords.extend(iterable._coords)
+        else:
+            self._coords.extend(array('d', _flatten(iterable)))
 
     def insert(self, index, vector):
         """Insert a vector at the specified index.
@@ -577,16 +864,52 @@ class Vec2Array(Seq2):
         :param vector: Vector to insert.
         :type vector: Vec2 or 2-number sequence.
         """
-        self._vectors.insert(index, Vec2(*vector))
+        self._check_resizable()
+        x, y = Vec2(*vector)
+        size = len(self)
+        if index < 0:
+            index = max(index + size, 0)
+        index = min(index, size)
+        self._coords[index*2:index*2] = array('d', (x, y))
 
-    def __delitem__(self, index):
-        del self._vectors[index]
+    def __copy__(self, memo=None):
+        return self.from_points(self)
+
+    __deepcopy__ = __copy__
+
+    def __nonzero__(self):
+        return bool(self._coords)
+
+    __bool__ = __nonzero__
+
+    @property
+    def __array_interface__(self):
+        """Share the coordinate storage with NumPy as an (n, 2) array.
+        The memoryview provided as the data source locks the array
+        against resizing for as long as the NumPy array is alive.
+        """
+        return {
+            'shape': (len(self), 2),
+            'typestr': _float64_typestr,
+            'data': memoryview(self._coords),
+            'version': 3,
+        }
+
+    def __buffer__(self, flags):
+        """Export the coordinate storage as a 2D (n, 2) buffer of
+        doubles (Python 3.12+).
+        """
+        return memoryview(self._coords).cast('B').cast('d', (len(self), 2))
     
     def longest(self):
         """Return the vector in the array with the maximum length."""
+        if _use_numpy(self):
+            L2 = _length2(self._ndarray())
+            i = int(L2.argmax())
+            return self[i] if L2[i] > 0 else None
         longest = None
         max_len = 0
-        for vector in self._vectors:
+        for vector in self:
             len = vector.length2
             if len > max_len:
                 longest = vector
@@ -595,11 +918,13 @@ class Vec2Array(Seq2):
     
     def shortest(self):
         """Return the vector in the array with the minimum length."""
+        if _use_numpy(self):
+            return self[int(_length2(self._ndarray()).argmin())]
         shortest = None
-        if self._vectors:
-            shortest = self._vectors[0]
+        if self:
+            shortest = self[0]
             min_len = shortest.length2
-            for vector in self._vectors:
+            for vector in self:
                 len = vector.length2
                 if len < min_len:
                     shortest = vector
@@ -612,12 +937,18 @@ class Vec2Array(Seq2):
 
         :rtype: Vec2Array
         """
+        if _use_numpy(self):
+            return self._from_ndarray(_normalized(self._ndarray()))
         return self.from_points(
-            vector.normalized() for vector in self._vectors)
+            vector.normalized() for vector in self)
 
     def normalize(self):
         """Normalize the vectors in the array in place."""
-        self._vectors = [vector.normalized() for vector in self._vectors]
+        if _use_numpy(self):
+            v = self._ndarray()
+            v[:] = _normalized(v)
+            return
+        self._set_vectors(vector.normalized() for vector in self)
 
     def clamped(self, min_length=None, max_length=None):
         """Create a new array of vectors with lengths clamped between
@@ -633,9 +964,12 @@ class Vec2Array(Seq2):
         if min_length is not None and min_length < 0.0:
             raise ValueError(
                 "Vec2Array.clamped: expected min_length >= 0")
+        if _use_numpy(self):
+            return self._from_ndarray(
+                _clamped(self._ndarray(), min_length, max_length))
         return self.from_points(
             vector.clamped(min_length, max_length) 
-            for vector in self._vectors)
+            for vector in self)
 
     def clamp(self, min_length=None, max_length=None):
         """Clamp the length of the vectors in this array in place between
@@ -650,8 +984,37 @@ class Vec2Array(Seq2):
         if min_length is not None and min_length < 0.0:
             raise ValueError(
                 "Vec2Array.clamp: expected min_length >= 0")
-        self._vectors = [vector.clamped(min_length, max_length) 
-            for vector in self._vectors]
+        if _use_numpy(self):
+            v = self._ndarray()
+            v[:] = _clamped(v, min_length, max_length)
+            return
+        self._set_vectors(vector.clamped(min_length, max_length) 
+            for vector in self)
+
+    def simplify_mask(self, tolerance=None, method='douglas-peucker',
+        preserve_simple=False):
+        """Simplify the array as a polyline, choosing the vertices to keep
+        without copying them. The first and last vertices are always kept.
+
+        :param tolerance: The largest distance a removed vertex may lie
+            from the simplified polyline, in the same units as
+            :attr:`polypaths_planar_override.EPSILON`, which is the default.
+            For the Visvalingam method, vertices whose triangles with 
+            their neighbors have an area no larger than ``tolerance`` 
+            squared are removed.
+        :type tolerance: float
+        :param method: ``'douglas-peucker'`` to split the polyline at the
+            vertex farthest from each segment, in O(n log n) expected 
+            time, or ``'visvalingam'`` to repeatedly remove the vertex
+            with the smallest triangle area, in O(n log n) time.
+        :param preserve_simple: If True, restore removed vertices until
+            no two non-adjacent segments of the result intersect.
+        :return: A ``bytearray`` with a 1 for each vertex kept, and a 0
+            for each removed.
+        :rtype: bytearray
+        """
+        from polypaths_planar_override.simplify import _simplify_mask
+        return _simplify_mask(self, False, tolerance, method, preserve_simple)
 
     def __add__(self, other):
         """Add this array to another vector sequence, or a single vector. When
@@ -665,6 +1028,9 @@ class Vec2Array(Seq2):
         """
         if isinstance(other, Seq2):
             if len(self) == len(other):
+                if isinstance(other, Vec2Array) and _use_numpy(self):
+                    return other._from_ndarray(
+                        self._ndarray() + other._ndarray())
                 return other.from_points(
                     a + b for a, b in zip(self, other))
             else:
@@ -674,6 +1040,8 @@ class Vec2Array(Seq2):
                 b = Vec2(*other)
             except Exception:
                 return NotImplemented
+            if _use_numpy(self):
+                return self._from_ndarray(self._ndarray() + b)
             return self.from_points(a + b for a in self)
 
     __radd__ = __add__
@@ -684,7 +1052,11 @@ class Vec2Array(Seq2):
         """
         if isinstance(other, Seq2):
             if len(self) == len(other):
-                self._vectors = [a + b for a, b in zip(self, other)]
+                if isinstance(other, Vec2Array) and _use_numpy(self):
+                    v = self._ndarray()
+                    v += other._ndarray()
+                else:
+                    self._set_vectors(a + b for a, b in zip(self, other))
                 return self
             else:
                 raise ValueError("cannot add arrays with different lengths")
@@ -693,7 +1065,11 @@ class Vec2Array(Seq2):
                 b = Vec2(*other)
             except Exception:
                 return NotImplemented
-            self._vectors = [a + b for a in self]
+            if _use_numpy(self):
+                v = self._ndarray()
+                v += b
+            else:
+                self._set_vectors(a + b for a in self)
             return self
 
     def __sub__(self, other):
@@ -737,7 +1113,7 @@ class Vec2Array(Seq2):
         """
         if isinstance(other, Vec2Array):
             if len(self) == len(other):
-                self._vectors = [a - b for a, b in zip(self, other)]
+                self._set_vectors(a - b for a, b in zip(self, other))
                 return self
             else:
                 raise ValueError(
@@ -747,7 +1123,7 @@ class Vec2Array(Seq2):
                 b = Vec2(*other)
             except Exception:
                 return NotImplemented
-            self._vectors = [a - b for a in self]
+            self._set_vectors(a - b for a in self)
             return self
 
     def __mul__(self, other):
@@ -763,6 +1139,9 @@ class Vec2Array(Seq2):
         """
         if isinstance(other, Seq2):
             if len(self) == len(other):
+                if isinstance(other, Vec2Array) and _use_numpy(self):
+                    return other._from_ndarray(
+                        self._ndarray() * other._ndarray())
                 return other.from_points(
                     a * b for a, b in zip(self, other))
             else:
@@ -776,6 +1155,8 @@ class Vec2Array(Seq2):
                     b = Vec2(*other)
                 except Exception:
                     return NotImplemented
+            if _use_numpy(self):
+                return self._from_ndarray(self._ndarray() * b)
             return self.from_points(a * b for a in self)
 
     __rmul__ = __mul__
@@ -789,7 +1170,11 @@ class Vec2Array(Seq2):
             other.itransform(self)
         elif isinstance(other, Vec2Array):
             if len(self) == len(other):
-                self._vectors = [a * b for a, b in zip(self, other)]
+                if _use_numpy(self):
+                    v = self._ndarray()
+                    v *= other._ndarray()
+                else:
+                    self._set_vectors(a * b for a, b in zip(self, other))
             else:
                 raise ValueError(
                     "cannot multiply arrays with different lengths")
@@ -802,7 +1187,11 @@ class Vec2Array(Seq2):
                 except Exception:
                     raise TypeError("Cannot multiply %s with %s"
                         % (type(self).__name__, type(other).__name__))
-            self._vectors = [a * b for a in self]
+            if _use_numpy(self):
+                v = self._ndarray()
+                v *= b
+            else:
+                self._set_vectors(a * b for a in self)
         return self
 
     def __truediv__(self, other):
@@ -849,7 +1238,7 @@ class Vec2Array(Seq2):
         """
         if isinstance(other, Vec2Array):
             if len(self) == len(other):
-                self._vectors = [a / b for a, b in zip(self, other)]
+                self._set_vectors(a / b for a, b in zip(self, other))
                 return self
             else:
                 raise ValueError(
@@ -862,7 +1251,7 @@ class Vec2Array(Seq2):
                     b = Vec2(*other)
                 except Exception:
                     return NotImplemented
-            self._vectors = [a / b for a in self]
+            self._set_vectors(a / b for a in self)
             return self
 
     def __floordiv__(self, other):
@@ -910,7 +1299,7 @@ class Vec2Array(Seq2):
         """
         if isinstance(other, Vec2Array):
             if len(self) == len(other):
-                self._vectors = [a // b for a, b in zip(self, other)]
+                self._set_vectors(a // b for a, b in zip(self, other))
                 return self
             else:
                 raise ValueError(
@@ -923,22 +1312,75 @@ class Vec2Array(Seq2):
                     b = Vec2(*other)
                 except Exception:
                     return NotImplemented
-            self._vectors = [a // b for a in self]
+            self._set_vectors(a // b for a in self)
             return self
 
     def __pos__(self):
-        return self.from_points(self._vectors)
+        return self.from_points(self)
 
     def __neg__(self):
         """Create an array of the negation of the vectors in this array."""
-        return self.from_points(-v for v in self._vectors)
+        return self.from_points(-v for v in self)
 
     def __repr__(self):
         return "%s([%s])" % (self.__class__.__name__,
-            ', '.join("(%r, %r)" % v for v in self._vectors))
+            ', '.join("(%r, %r)" % v for v in self))
 
     __str__ = __repr__
 
 
+def _vec2_coords(points, writable=False):
+    """Return a flat sequence of the x, y coordinates of points, a
+    Vec2Array, other Seq2, or buffer of float64 x, y pairs. The coordinates
+    share memory with points, except for Seq2 objects other than Vec2Array,
+    which are copied, and cannot be written to.
+
+    :raises TypeError: If points is not a Seq2 and does not support the 
+        buffer protocol.
+    """
+    if isinstance(points, Vec2Array):
+        return points._coords
+    if isinstance(points, Seq2) and not writable:
+        return array('d', _flatten(points))
+    view = memoryview(points)
+    if _buffer_format_kind(view.format) is None:
+        raise ValueError(
+            "expected a buffer of float64, got format '%s'" % view.format)
+    if view.nbytes % 16 != 0:
+        raise ValueError("buffer size must be a multiple of 16 bytes")
+    if writable and view.readonly:
+        raise BufferError("cannot write to a read-only buffer")
+    if not view.c_contiguous:
+        raise BufferError("buffer is not C-contiguous")
+    if not view.nbytes:
+        return array('d')
+    return view.cast('B').cast('d')
+
+
+def _point_coords(points, copy=False):
+    """Return a flat sequence of the x, y coordinates of points, sharing
+    memory with Vec2Arrays and float64 buffers, and copying others 
+    without creating a vector for each point.
+
+    :param copy: If true, always return a new ``array('d')``, owned by
+        the caller.
+    """
+    try:
+        coords = _vec2_coords(points)
+    except (TypeError, ValueError, BufferError):
+        # Sequences, and buffers of other types or not contiguous
+        coords = array('d')
+        extend = coords.extend
+        for x, y in points:
+            extend((x, y))
+        return coords
+    if copy:
+        owned = array('d')
+        if len(coords):
+            owned.frombytes(memoryview(coords).cast('B'))
+        return owned
+    return coords
+
+
 # vim: ai ts=4 sts=4 et sw=4 tw=78
 
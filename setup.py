@@ -4,25 +4,22 @@
 
 import os
 import sys
-import shutil
-from distutils.core import setup, Extension
 
 try:
-    from distutils.command.build_py import build_py_2to3 as build_py
+    from setuptools import setup, Extension
+    from setuptools.command.build_ext import build_ext
 except ImportError:
-    if sys.version_info >= (3, 0):
-        raise ImportError("build_py_2to3 not found in distutils - it is required for Python 3.x")
-    from distutils.command.build_py import build_py
-    suffix = ""
-else:
-    suffix = "-py3k"
+    from distutils.core import setup, Extension
+    from distutils.command.build_ext import build_ext
+from distutils.errors import CCompilerError, DistutilsExecError, \
+    DistutilsPlatformError
 
 srcdir = os.path.dirname(__file__)
 
 def read(fname):
     return open(os.path.join(srcdir, fname)).read()
 
-include_dirs = ['include']
+include_dirs = ['lib/polypaths_planar_override']
 extra_compile_args = []
 
 if 'SETUP_PY_CFLAGS' in os.environ:
@@ -31,6 +28,49 @@ if 'SETUP_PY_CFLAGS' in os.environ:
 	# causes linking to fail for some python versions
 	extra_compile_args.append(os.environ['SETUP_PY_CFLAGS'])
 
+# Setting this env var skips the C extension entirely, leaving only
+# the pure-Python implementation. Keep in sync with __init__.py
+pure_python = bool(os.environ.get('POLYPATHS_PLANAR_OVERRIDE_PURE_PYTHON'))
+
+ext_modules = [
+	Extension('polypaths_planar_override.c', 
+		['lib/polypaths_planar_override/cmodule.c', 
+		 'lib/polypaths_planar_override/cvector.c',
+		 'lib/polypaths_planar_override/ctransform.c',
+		 'lib/polypaths_planar_override/cline.c',
+		 'lib/polypaths_planar_override/cbox.c',
+		 'lib/polypaths_planar_override/cpolygon.c',
+		], 
+		depends=['lib/polypaths_planar_override/planar.h'],
+		include_dirs=include_dirs,
+		extra_compile_args=extra_compile_args,
+	),
+]
+
+class optional_build_ext(build_ext):
+	"""Build the C extension if possible, but do not fail the
+	install if it cannot be compiled, the package falls back
+	to the Python implementation at import time.
+	"""
+
+	def run(self):
+		try:
+			build_ext.run(self)
+		except DistutilsPlatformError as err:
+			self._warn(err)
+
+	def build_extension(self, ext):
+		try:
+			build_ext.build_extension(self, ext)
+		except (CCompilerError, DistutilsExecError, 
+			DistutilsPlatformError, ValueError) as err:
+			self._warn(err)
+
+	def _warn(self, err):
+		sys.stderr.write(
+			"WARNING: could not build the polypaths_planar_override C "
+			"extension (%s), using the Python implementation only\n" % err)
+
 setup(
     name='polypaths_planar_override',
     version='0.4', # *** REMEMBER TO UPDATE __init__.py ***
@@ -46,10 +86,9 @@ setup(
         'Topic :: Software Development :: Libraries :: Python Modules',
         'License :: OSI Approved :: BSD License',
         'Intended Audience :: Developers',
-        'Programming Language :: Python :: 2.6',
         'Programming Language :: Python :: 2.7',
 		'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.1',
+        'Programming Language :: C',
         'Operating System :: MacOS :: MacOS X',
         'Operating System :: Microsoft :: Windows',
         'Operating System :: POSIX',
@@ -58,23 +97,7 @@ setup(
 
     package_dir={'polypaths_planar_override': 'lib/polypaths_planar_override'},
     packages=['polypaths_planar_override'], 
-	#ext_modules=[
-	#	Extension('planar.c', 
-	#		['lib/planar/cmodule.c', 
-	#		 'lib/planar/cvector.c',
-	#		 'lib/planar/ctransform.c',
-	#		 'lib/planar/cline.c',
-	#		 'lib/planar/cbox.c',
-	#		 'lib/planar/cpolygon.c',
-	#		], 
-	#		include_dirs=include_dirs,
-	#		#library_dirs=library_dirs,
-	#		#libraries=libraries,
-	#		#extra_link_args=extra_link_args,
-	#		extra_compile_args=extra_compile_args,
-	#		#define_macros=macros,
-	#	),
-    #],
+	ext_modules=[] if pure_python else ext_modules,
 
-    cmdclass = {'build_py': build_py},
+    cmdclass = {'build_ext': optional_build_ext},
 )